@@ -3,6 +3,7 @@
 Script de lancement de PMT Analytics
 """
 
+import multiprocessing
 import sys
 import os
 from pathlib import Path
@@ -50,5 +51,7 @@ def main():
             os.chdir(original_cwd)
 
 if __name__ == "__main__":
+    # Exécutable PyInstaller : les processus du pool de calcul ne relancent pas l'application
+    multiprocessing.freeze_support()
     main()
 
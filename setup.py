@@ -20,10 +20,10 @@ def install_requirements():
 
 
 def run_tests():
-    """Lance les tests unitaires"""
+    """Lance les tests (pytest, voir tests/conftest.py)"""
     print("\nLancement des tests...")
     try:
-        subprocess.check_call([sys.executable, "-m", "unittest", "discover", "-s", "tests", "-v"])
+        subprocess.check_call([sys.executable, "-m", "pytest", "tests", "-q"])
         print("✅ Tous les tests sont passés")
         return True
     except subprocess.CalledProcessError as e:
@@ -0,0 +1,688 @@
+"""
+Interface en ligne de commande de La Gabinette (mode batch, sans interface graphique)
+
+Exemples:
+    python -m src.cli load data/input/*.csv
+    python -m src.cli classify extraction.csv
+    python -m src.cli export "data/input/*.csv" --format xlsx --format parquet
+    python -m src.cli compare export_mai.xlsx export_juin.xlsx --output ecarts.xlsx
+    python -m src.cli export extraction.csv --format parquet --store
+    python -m src.cli export "data/input/*.csv" --format dataset
+    python -m src.cli compare extraction_mai.csv extraction_juin.csv
+    python -m src.cli metrics --agency Grenelle --category TIPS --from 2024-01-01
+    python -m src.cli watch --workers 4
+    python -m src.cli serve extraction.csv --port 8765
+    python -m src.cli rows extraction.csv --nni A12345
+    python -m src.cli periods extraction.csv --granularity quarter
+    python -m src.cli series extraction.csv --window month --metric overtime_hours
+    python -m src.cli top extraction.csv --metric sick_leave_periods --group agency,category --limit 20
+    python -m src.cli outliers extraction.csv --method iqr --group agency
+    python -m src.cli records extraction.csv --format csv --team "PV G POLE RIP" --output equipe.csv
+    python -m src.cli --backend process --processes 8 export extraction_annuelle.csv
+
+Ce module ne doit jamais importer tkinter ni ttkbootstrap : il est destiné
+aux serveurs batch Linux sans affichage.
+"""
+
+import argparse
+import glob
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Ajouter le répertoire src au PYTHONPATH (mêmes imports que l'application graphique)
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.config.settings import ensure_directories
+from src.utils.instrumentation import format_timing_tree, start_run, timed
+from src.utils.logger import logger
+
+
+EXPORT_FORMATS = ["xlsx", "txt", "parquet", "dataset"]
+
+
+def expand_inputs(patterns: List[str]) -> List[Path]:
+    """
+    Développe les motifs glob (utile sous Windows où le shell ne le fait pas)
+
+    Args:
+        patterns: Chemins ou motifs glob
+
+    Returns:
+        Liste des fichiers correspondants, sans doublons, dans l'ordre donné
+    """
+    files: List[Path] = []
+    seen = set()
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True)) if glob.has_magic(pattern) else [pattern]
+        for match in matches:
+            path = Path(match)
+            key = str(path.resolve())
+            if key not in seen:
+                seen.add(key)
+                files.append(path)
+    return files
+
+
+def _process_file(path: Path, command: str, formats: List[str], output_dir: Optional[Path],
+                  store=None) -> Dict[str, Any]:
+    """
+    Charge un fichier PMT puis applique la commande demandée
+
+    Args:
+        path: Fichier CSV à traiter
+        command: 'load', 'classify' ou 'export'
+        formats: Formats d'export (commande 'export')
+        output_dir: Répertoire de sortie des exports
+        store: Base des métriques (MetricsStore) où enregistrer les métriques par employé
+
+    Returns:
+        Entrée du rapport pour ce fichier (arbre des durées par étape sous 'timings')
+    """
+    entry: Dict[str, Any] = {"file": str(path), "success": False, "outputs": []}
+    with start_run(f"Fichier {path.name}") as run:
+        _run_file_stages(entry, path, command, formats, output_dir, store)
+    entry["timings"] = run.to_dict()
+    return entry
+
+
+def _run_file_stages(entry: Dict[str, Any], path: Path, command: str, formats: List[str],
+                     output_dir: Optional[Path], store=None) -> None:
+    """Étapes de _process_file ; complète `entry` au fil du traitement"""
+    from src.services.csv_processor import CSVProcessor
+
+    processor = CSVProcessor()
+    result = processor.load_file(str(path))
+
+    entry.update({
+        "rows": result.records_processed,
+        "rows_valid": result.records_valid,
+        "rows_with_warnings": result.records_with_warnings,
+        "rows_with_errors": result.records_with_errors
+    })
+
+    if not result.success:
+        entry["error"] = result.error_message
+        return
+
+    entry["encoding"] = result.csv_format.encoding
+    entry["separator"] = result.csv_format.separator
+    records = processor.get_records()
+
+    if command in ("classify", "export"):
+        summary = processor.get_classification_summary()
+        entry["classification"] = {
+            category: {
+                "employees": stats["nombre_employes"],
+                "rows": stats["nombre_enregistrements"]
+            }
+            for category, stats in summary.items()
+        }
+
+    if command == "export":
+        from src.services.export_service import ExportService
+
+        export_service = ExportService(metrics_store=store)
+        dataset = processor.get_dataset_ref() if store is not None else None
+        if dataset is not None:
+            entry["dataset"] = dataset.fingerprint
+        exporters = {
+            "xlsx": export_service.export_to_excel,
+            "txt": export_service.export_summary_to_text,
+            "parquet": export_service.export_to_parquet,
+            "dataset": export_service.export_to_dataset
+        }
+        for export_format in formats:
+            output_path = None
+            if output_dir is not None:
+                # Archive partitionnée : un seul répertoire, complété à chaque extraction
+                output_path = output_dir / ("dataset" if export_format == "dataset" else f"{path.stem}.{export_format}")
+
+            try:
+                options = {"metrics": processor.metrics}
+                if export_format != "txt":
+                    options["dataset"] = dataset
+                entry["outputs"].append(exporters[export_format](records, output_path=output_path, **options))
+            except Exception as e:
+                entry["error"] = str(e)
+                return
+
+    entry["success"] = True
+
+
+def run_files_command(args: argparse.Namespace) -> Dict[str, Any]:
+    """Exécute load / classify / export sur chaque fichier d'entrée"""
+    files = expand_inputs(args.inputs)
+    output_dir = Path(args.output_dir) if getattr(args, "output_dir", None) else None
+    if output_dir is not None:
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+    formats = getattr(args, "formats", None) or ["xlsx"]
+
+    store = None
+    if getattr(args, "store", False):
+        from src.services.metrics_store import MetricsStore
+        store = MetricsStore()
+
+    report: Dict[str, Any] = {"command": args.command, "files": []}
+    if not files:
+        report["error"] = "Aucun fichier ne correspond aux motifs donnés"
+
+    for path in files:
+        try:
+            report["files"].append(_process_file(path, args.command, formats, output_dir, store))
+        except Exception as e:
+            logger.get_logger("CLI").error(f"Erreur sur {path}: {str(e)}")
+            report["files"].append({"file": str(path), "success": False, "error": str(e)})
+
+    report["rows_total"] = sum(entry.get("rows", 0) for entry in report["files"])
+    report["success"] = bool(files) and all(entry["success"] for entry in report["files"])
+    return report
+
+
+def _store_csv_dataset(store, path: Path) -> str:
+    """
+    Garantit la présence d'une extraction CSV dans la base des métriques
+
+    Si le contenu du fichier (empreinte SHA-1) y est déjà, rien n'est
+    recalculé ; sinon le fichier est chargé et ses métriques enregistrées.
+
+    Returns:
+        Empreinte de l'extraction
+    """
+    from src.models.data_model import DatasetRef
+
+    fingerprint = store.fingerprint_file(path)
+    if store.get_dataset(fingerprint) is not None:
+        return fingerprint
+
+    from src.services.csv_processor import CSVProcessor
+    from src.services.export_service import ExportService
+
+    processor = CSVProcessor()
+    result = processor.load_file(str(path))
+    if not result.success:
+        raise Exception(result.error_message)
+
+    ExportService(metrics_store=store).store_metrics(
+        processor.get_records(), DatasetRef(fingerprint, path.name), metrics=processor.metrics
+    )
+    return fingerprint
+
+
+def run_compare_command(args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Compare deux exports Excel, ou deux extractions CSV via la base des métriques,
+    et exporte éventuellement les écarts
+    """
+    from src.services.compare import ComparisonService
+
+    comparison_service = ComparisonService()
+    report: Dict[str, Any] = {"command": "compare", "files": [args.file1, args.file2]}
+
+    with start_run("Comparaison CLI") as run:
+        try:
+            if all(Path(name).suffix.lower() == ".csv" for name in (args.file1, args.file2)):
+                from src.services.metrics_store import MetricsStore
+
+                store = MetricsStore()
+                with timed("Base des métriques"):
+                    fingerprints = [_store_csv_dataset(store, Path(name)) for name in (args.file1, args.file2)]
+                report["datasets"] = fingerprints
+                results = comparison_service.compare_datasets(store, *fingerprints)
+            else:
+                results = comparison_service.compare_files(args.file1, args.file2)
+        except Exception as e:
+            report.update({"success": False, "error": str(e)})
+            return report
+
+        if args.output:
+            report["output"] = comparison_service.export_comparison_results(results, output_path=args.output)
+    report["timings"] = run.to_dict()
+
+    report["sheets"] = {
+        sheet_name: {
+            "file1_rows": sheet["file1_rows"],
+            "file2_rows": sheet["file2_rows"],
+            "common_employees": len(sheet["common_employees"]),
+            "only_in_file1": len(sheet["employees_only_in_file1"]),
+            "only_in_file2": len(sheet["employees_only_in_file2"]),
+            "employees_with_differences": len(sheet["differences"])
+        }
+        for sheet_name, sheet in results["sheets_comparison"].items()
+    }
+
+    report["success"] = True
+    return report
+
+
+def run_metrics_command(args: argparse.Namespace) -> Dict[str, Any]:
+    """Interroge la base des métriques par employé"""
+    from src.services.metrics_store import MetricsStore
+
+    store = MetricsStore()
+    report: Dict[str, Any] = {"command": "metrics"}
+
+    if args.datasets:
+        report["datasets"] = store.list_datasets()
+    else:
+        report["rows"] = store.query(
+            nni=args.nni, category=args.category, agency=args.agency,
+            period_start=args.date_from, period_end=args.date_to, fingerprint=args.dataset
+        )
+        report["count"] = len(report["rows"])
+
+    report["success"] = True
+    return report
+
+
+def run_watch_command(args: argparse.Namespace) -> Dict[str, Any]:
+    """Surveille le dossier d'entrée (ou le traite une seule fois avec --once)"""
+    from src.services.ingestion import IngestionService
+
+    service = IngestionService(
+        input_dir=Path(args.input_dir) if args.input_dir else None,
+        output_dir=Path(args.output_dir) if args.output_dir else None,
+        workers=args.workers, queue_size=args.queue_size,
+        poll_interval=args.interval, formats=args.formats
+    )
+
+    if args.once:
+        results = service.run_once()
+    else:
+        service.run_forever()
+        results = service.results
+
+    return {
+        "command": "watch",
+        "input_dir": str(service.input_dir),
+        "output_dir": str(service.output_dir),
+        "files": [{key: value for key, value in entry.items() if key != "timings"} for entry in results],
+        "success": all(entry["success"] for entry in results)
+    }
+
+
+def run_serve_command(args: argparse.Namespace) -> Dict[str, Any]:
+    """Charge une extraction puis sert l'API HTTP jusqu'à interruption"""
+    from src.services.api_server import MetricsAPIServer
+
+    server = MetricsAPIServer(host=args.host, port=args.port)
+    report: Dict[str, Any] = {"command": "serve", "file": args.input}
+    try:
+        report["status"] = server.load(args.input)
+    except Exception as e:
+        report.update({"success": False, "error": str(e)})
+        return report
+
+    print(f"API disponible sur http://{server.host}:{server.port}/api/status (Ctrl+C pour arrêter)",
+          file=sys.stderr)
+    server.run()
+    report["success"] = True
+    return report
+
+
+def run_rows_command(args: argparse.Namespace) -> Dict[str, Any]:
+    """Affiche les lignes d'un employé relues depuis l'index du fichier (sans chargement complet)"""
+    from src.services.csv_processor import CSVProcessor
+
+    processor = CSVProcessor()
+    report: Dict[str, Any] = {"command": "rows", "file": args.input, "nni": args.nni}
+    with start_run(f"Lignes {args.nni}") as run:
+        try:
+            with timed("Indexation"):
+                index = processor.index_file(args.input)
+            with timed("Relecture des lignes"):
+                records = processor.get_employee_records(args.nni, jour=args.date)
+        except Exception as e:
+            report.update({"success": False, "error": str(e)})
+            return report
+
+    report.update({
+        "indexed_rows": index.row_count,
+        "count": len(records),
+        "records": [record.to_dict() for record in records],
+        "timings": run.to_dict(),
+        "success": True
+    })
+    return report
+
+
+def run_periods_command(args: argparse.Namespace) -> Dict[str, Any]:
+    """Calcule les métriques par période (mois, trimestre...) d'une extraction"""
+    from datetime import datetime
+    from src.services.csv_processor import CSVProcessor
+
+    report: Dict[str, Any] = {"command": "periods", "file": args.input, "granularity": args.granularity}
+    with start_run(f"Périodes {Path(args.input).name}") as run:
+        try:
+            start = datetime.strptime(args.date_from, "%Y-%m-%d").date() if args.date_from else None
+            end = datetime.strptime(args.date_to, "%Y-%m-%d").date() if args.date_to else None
+            processor = CSVProcessor()
+            result = processor.load_file(args.input)
+            if not result.success:
+                raise Exception(result.error_message)
+            periods = processor.metrics.get_period_metrics(start, end, args.granularity)
+        except Exception as e:
+            report.update({"success": False, "error": str(e)})
+            return report
+
+    # Résultats mémorisés par la table des métriques : copiés, jamais modifiés
+    rows = []
+    for period in periods:
+        row = {key: value for key, value in period.items() if key != "employees"}
+        if args.nni:
+            row["employee"] = period["employees"].get(args.nni)
+        rows.append(row)
+    report.update({"periods": rows, "timings": run.to_dict(), "success": True})
+    return report
+
+
+def run_series_command(args: argparse.Namespace) -> Dict[str, Any]:
+    """Séries journalières et sommes glissantes d'un employé, ou pics glissants de tous les employés"""
+    from src.services.csv_processor import CSVProcessor
+
+    window = int(args.window) if args.window.isdigit() else args.window
+    report: Dict[str, Any] = {"command": "series", "file": args.input, "window": args.window}
+    with start_run(f"Séries {Path(args.input).name}") as run:
+        try:
+            processor = CSVProcessor()
+            result = processor.load_file(args.input)
+            if not result.success:
+                raise Exception(result.error_message)
+            series = processor.metrics.get_time_series()
+            if args.nni:
+                report["series"] = series.employee_series(args.nni, window)
+                if report["series"] is None:
+                    raise Exception(f"NNI inconnu: {args.nni}")
+            else:
+                peaks = sorted(series.peaks(args.metric, window), key=lambda peak: peak["value"], reverse=True)
+                report.update({"metric": args.metric, "peaks": peaks[:args.limit]})
+        except Exception as e:
+            report.update({"success": False, "error": str(e)})
+            return report
+
+    report.update({"timings": run.to_dict(), "success": True})
+    return report
+
+
+def _load_ranking(input_path: str):
+    """Charge une extraction et range ses lignes employé (colonnes d'export) pour les classements"""
+    from src.services.csv_processor import CSVProcessor
+    from src.services.export_service import ExportService
+    from src.services.metric_ranking import EmployeeRanking
+
+    processor = CSVProcessor()
+    result = processor.load_file(input_path)
+    if not result.success:
+        raise Exception(result.error_message)
+    rows_by_category = ExportService().build_employee_rows(processor.get_records(), metrics=processor.metrics)
+    return EmployeeRanking(rows_by_category)
+
+
+def _group_keys(group: str) -> List[str]:
+    """Clés de regroupement de l'option --group ("agency,category", "none" = tous les employés)"""
+    return [key.strip() for key in group.split(",") if key.strip() and key.strip() != "none"]
+
+
+def run_top_command(args: argparse.Namespace) -> Dict[str, Any]:
+    """Employés de plus forte valeur d'une métrique, par agence et/ou catégorie"""
+    report: Dict[str, Any] = {"command": "top", "file": args.input, "metric": args.metric, "group": args.group}
+    with start_run(f"Top {Path(args.input).name}") as run:
+        try:
+            ranking = _load_ranking(args.input)
+            report["groups"] = ranking.top_k(args.metric, args.limit, _group_keys(args.group))
+        except Exception as e:
+            report.update({"success": False, "error": str(e)})
+            return report
+
+    report.update({"timings": run.to_dict(), "success": True})
+    return report
+
+
+def run_outliers_command(args: argparse.Namespace) -> Dict[str, Any]:
+    """Valeurs atypiques (z-score ou IQR) d'une métrique, par agence et/ou catégorie"""
+    report: Dict[str, Any] = {"command": "outliers", "file": args.input, "group": args.group}
+    with start_run(f"Valeurs atypiques {Path(args.input).name}") as run:
+        try:
+            ranking = _load_ranking(args.input)
+            report.update(ranking.outliers(args.metric, args.method, args.threshold, _group_keys(args.group)))
+        except Exception as e:
+            report.update({"success": False, "error": str(e)})
+            return report
+
+    report.update({"timings": run.to_dict(), "success": True})
+    return report
+
+
+def run_records_command(args: argparse.Namespace) -> Dict[str, Any]:
+    """Exporte les enregistrements d'une extraction (filtrés ou non) en NDJSON ou CSV, en flux"""
+    from src.services.csv_processor import CSVProcessor
+    from src.services.export_service import ExportService
+
+    criteria = {name: value for name, value in (("nni", args.nni), ("equipe_lib", args.team),
+                                                ("jour", args.date), ("code", args.code)) if value}
+    report: Dict[str, Any] = {"command": "records", "file": args.input, "format": args.format, "filters": criteria}
+    written: Dict[str, int] = {}
+    with start_run(f"Enregistrements {Path(args.input).name}") as run:
+        try:
+            processor = CSVProcessor()
+            result = processor.load_file(args.input)
+            if not result.success:
+                raise Exception(result.error_message)
+            records = processor.get_records()
+            if criteria:
+                # Filtrage paresseux : les enregistrements retenus ne sont jamais rassemblés en liste
+                records = (record for record in records
+                           if all(getattr(record, name) == value for name, value in criteria.items()))
+            output_path = ExportService().export_records(
+                records, output_path=args.output, export_format=args.format, batch_size=args.batch_size,
+                progress_callback=lambda event: written.update(count=event.rows_processed)
+            )
+        except Exception as e:
+            report.update({"success": False, "error": str(e)})
+            return report
+
+    report.update({"output": output_path, "count": written.get("count", 0),
+                   "timings": run.to_dict(), "success": True})
+    return report
+
+
+def configure_parallel(backend: Optional[str], processes: Optional[int]) -> None:
+    """
+    Applique les options --backend / --processes à PARALLEL_CONFIG
+
+    Les services lisent la configuration à leur création : l'appel doit
+    précéder tout traitement.
+    """
+    from src.config.settings import PARALLEL_CONFIG
+
+    if backend:
+        PARALLEL_CONFIG["backend"] = backend
+    if processes:
+        PARALLEL_CONFIG["workers"] = processes
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Construit l'analyseur d'arguments"""
+    parser = argparse.ArgumentParser(
+        prog="python -m src.cli",
+        description="La Gabinette - traitement batch des extractions PMT (sans interface graphique)"
+    )
+    parser.add_argument("--report", help="Écrire aussi le rapport JSON dans ce fichier")
+    parser.add_argument("--timings", action="store_true",
+                        help="Afficher l'arbre des durées par étape sur la sortie d'erreur")
+    parser.add_argument("--backend", choices=["auto", "process", "inline"],
+                        help="Calcul des métriques par employé : pool de processus au-delà du seuil (auto), "
+                             "toujours (process) ou jamais (inline)")
+    parser.add_argument("--processes", type=int, help="Processus du pool de calcul (défaut: nombre de cœurs)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    load_parser = subparsers.add_parser("load", help="Charger et valider des fichiers CSV")
+    load_parser.add_argument("inputs", nargs="+", help="Fichiers CSV ou motifs glob")
+
+    classify_parser = subparsers.add_parser("classify", help="Charger et classifier les employés")
+    classify_parser.add_argument("inputs", nargs="+", help="Fichiers CSV ou motifs glob")
+
+    export_parser = subparsers.add_parser("export", help="Charger, classifier et exporter")
+    export_parser.add_argument("inputs", nargs="+", help="Fichiers CSV ou motifs glob")
+    export_parser.add_argument("--format", dest="formats", action="append", choices=EXPORT_FORMATS,
+                               help="Format d'export (répétable, défaut: xlsx ; dataset = archive Parquet partitionnée)")
+    export_parser.add_argument("--output-dir", help="Répertoire de sortie (défaut: data/output)")
+    export_parser.add_argument("--store", action="store_true",
+                               help="Enregistrer les métriques par employé dans la base (data/metrics.sqlite3)")
+
+    compare_parser = subparsers.add_parser(
+        "compare", help="Comparer deux exports Excel (ou deux extractions CSV via la base des métriques)"
+    )
+    compare_parser.add_argument("file1", help="Premier export Excel ou extraction CSV")
+    compare_parser.add_argument("file2", help="Deuxième export Excel ou extraction CSV")
+    compare_parser.add_argument("--output", help="Exporter les écarts vers ce fichier Excel")
+
+    watch_parser = subparsers.add_parser(
+        "watch", help="Traiter automatiquement les extractions déposées dans le dossier d'entrée"
+    )
+    watch_parser.add_argument("--input-dir", help="Dossier surveillé (défaut: data/input)")
+    watch_parser.add_argument("--output-dir", help="Dossier des exports (défaut: data/output)")
+    watch_parser.add_argument("--format", dest="formats", action="append", choices=EXPORT_FORMATS,
+                              help="Format d'export (répétable, défaut: xlsx ; dataset = archive Parquet partitionnée)")
+    watch_parser.add_argument("--workers", type=int, help="Fichiers traités simultanément")
+    watch_parser.add_argument("--queue-size", type=int, help="Fichiers en attente avant suspension du parcours")
+    watch_parser.add_argument("--interval", type=float, help="Secondes entre deux parcours du dossier")
+    watch_parser.add_argument("--once", action="store_true",
+                              help="Traiter les fichiers présents puis s'arrêter")
+
+    serve_parser = subparsers.add_parser("serve", help="Servir les métriques d'une extraction en HTTP (JSON)")
+    serve_parser.add_argument("input", help="Extraction CSV gardée en mémoire")
+    serve_parser.add_argument("--host", help="Adresse d'écoute (défaut: 127.0.0.1)")
+    serve_parser.add_argument("--port", type=int, help="Port d'écoute (défaut: 8765)")
+
+    rows_parser = subparsers.add_parser("rows", help="Lignes d'un employé, relues à la demande depuis l'extraction")
+    rows_parser.add_argument("input", help="Extraction CSV")
+    rows_parser.add_argument("--nni", required=True, help="NNI de l'employé")
+    rows_parser.add_argument("--date", help="Limiter à un jour (JJ/MM/AAAA)")
+
+    periods_parser = subparsers.add_parser("periods", help="Métriques par période (jour, semaine, mois, trimestre, année)")
+    periods_parser.add_argument("input", help="Extraction CSV")
+    periods_parser.add_argument("--granularity", default="month",
+                                choices=["day", "week", "month", "quarter", "year", "all"],
+                                help="Découpage des périodes (défaut: month ; all = fenêtre --from/--to entière)")
+    periods_parser.add_argument("--from", dest="date_from", help="Début de période (AAAA-MM-JJ)")
+    periods_parser.add_argument("--to", dest="date_to", help="Fin de période (AAAA-MM-JJ)")
+    periods_parser.add_argument("--nni", help="Ajouter les métriques de cet employé à chaque période")
+
+    series_parser = subparsers.add_parser(
+        "series", help="Séries journalières et sommes glissantes (heures supplémentaires, absences)"
+    )
+    series_parser.add_argument("input", help="Extraction CSV")
+    series_parser.add_argument("--nni", help="Séries de cet employé (sinon : pics glissants de tous les employés)")
+    series_parser.add_argument("--window", default="week",
+                               help="Fenêtre glissante : week (7 jours), month (30 jours) ou nombre de jours")
+    series_parser.add_argument("--metric", default="overtime_hours",
+                               choices=["overtime_hours", "absence_hours", "full_days", "partial_days"],
+                               help="Métrique des pics (sans --nni)")
+    series_parser.add_argument("--limit", type=int, default=20, help="Nombre de pics affichés (sans --nni)")
+
+    ranking_metrics = ["overtime_hours", "classic_sick_leaves", "long_sick_leaves", "sick_leave_periods",
+                       "avg_hours_per_sick_leave", "full_days", "partial_days", "total_absence_hours"]
+    top_parser = subparsers.add_parser("top", help="Employés de plus forte valeur d'une métrique par agence/catégorie")
+    top_parser.add_argument("input", help="Extraction CSV")
+    top_parser.add_argument("--metric", default="overtime_hours", choices=ranking_metrics, help="Métrique classée")
+    top_parser.add_argument("--group", default="agency",
+                            help="Regroupement : agency, category, agency,category ou none (défaut: agency)")
+    top_parser.add_argument("--limit", type=int, help="Employés par groupe (défaut: 20)")
+
+    outliers_parser = subparsers.add_parser(
+        "outliers", help="Valeurs atypiques d'une métrique (z-score ou écart interquartile) par agence/catégorie"
+    )
+    outliers_parser.add_argument("input", help="Extraction CSV")
+    outliers_parser.add_argument("--metric", default="overtime_hours", choices=ranking_metrics,
+                                 help="Métrique analysée")
+    outliers_parser.add_argument("--method", default="zscore", choices=["zscore", "iqr"],
+                                 help="z-score (|z| > seuil) ou écart interquartile (hors de Q1/Q3 -/+ seuil x IQR)")
+    outliers_parser.add_argument("--threshold", type=float, help="Seuil (défaut: 3.0 en z-score, 1.5 en IQR)")
+    outliers_parser.add_argument("--group", default="agency",
+                                 help="Regroupement : agency, category, agency,category ou none (défaut: agency)")
+
+    records_parser = subparsers.add_parser(
+        "records", help="Exporter les enregistrements (une ligne par enregistrement) en NDJSON ou CSV, en flux"
+    )
+    records_parser.add_argument("input", help="Extraction CSV")
+    records_parser.add_argument("--format", default="ndjson", choices=["ndjson", "csv"],
+                                help="Format de sortie (défaut: ndjson)")
+    records_parser.add_argument("--output", help="Fichier de sortie (défaut: data/output/enregistrements_gabinette_*)")
+    records_parser.add_argument("--batch-size", type=int, help="Enregistrements écrits par lot (défaut: 10000)")
+    records_parser.add_argument("--nni", help="Seulement les enregistrements de ce NNI")
+    records_parser.add_argument("--team", help="Seulement cette équipe (libellé exact)")
+    records_parser.add_argument("--date", help="Seulement ce jour (JJ/MM/AAAA)")
+    records_parser.add_argument("--code", help="Seulement ce code d'activité (ex: 41)")
+
+    metrics_parser = subparsers.add_parser("metrics", help="Interroger la base des métriques par employé")
+    metrics_parser.add_argument("--nni", help="NNI de l'employé")
+    metrics_parser.add_argument("--category", choices=["ASTREINTES", "TIPS", "3X8", "AUTRES"], help="Catégorie")
+    metrics_parser.add_argument("--agency", help="Agence (ex: Grenelle)")
+    metrics_parser.add_argument("--from", dest="date_from", help="Début de période (AAAA-MM-JJ)")
+    metrics_parser.add_argument("--to", dest="date_to", help="Fin de période (AAAA-MM-JJ)")
+    metrics_parser.add_argument("--dataset", help="Empreinte d'une extraction")
+    metrics_parser.add_argument("--datasets", action="store_true", help="Lister les extractions enregistrées")
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Point d'entrée de la ligne de commande
+
+    Le rapport JSON (durées, nombres de lignes) est écrit sur la sortie
+    standard ; les logs restent sur la sortie d'erreur.
+
+    Returns:
+        Code de sortie (0 si tous les traitements ont réussi)
+    """
+    args = build_parser().parse_args(argv)
+    ensure_directories()
+    configure_parallel(args.backend, args.processes)
+
+    start = time.perf_counter()
+    if args.command == "compare":
+        report = run_compare_command(args)
+    elif args.command == "metrics":
+        report = run_metrics_command(args)
+    elif args.command == "watch":
+        report = run_watch_command(args)
+    elif args.command == "serve":
+        report = run_serve_command(args)
+    elif args.command == "rows":
+        report = run_rows_command(args)
+    elif args.command == "periods":
+        report = run_periods_command(args)
+    elif args.command == "series":
+        report = run_series_command(args)
+    elif args.command == "top":
+        report = run_top_command(args)
+    elif args.command == "outliers":
+        report = run_outliers_command(args)
+    elif args.command == "records":
+        report = run_records_command(args)
+    else:
+        report = run_files_command(args)
+    report["total_seconds"] = round(time.perf_counter() - start, 4)
+
+    report_json = json.dumps(report, ensure_ascii=False, indent=2, default=str)
+    print(report_json)
+    if args.report:
+        Path(args.report).write_text(report_json, encoding="utf-8")
+
+    if args.timings:
+        trees = [entry["timings"] for entry in report.get("files", []) if isinstance(entry, dict) and "timings" in entry]
+        if "timings" in report:
+            trees.append(report["timings"])
+        for tree in trees:
+            print("\n".join(format_timing_tree(tree)), file=sys.stderr)
+
+    return 0 if report.get("success") else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,14 +12,31 @@ INPUT_DIR = DATA_DIR / "input"
 OUTPUT_DIR = DATA_DIR / "output"
 SAMPLES_DIR = DATA_DIR / "samples"
 LOGS_DIR = BASE_DIR / "logs"
+METRICS_DB_PATH = DATA_DIR / "metrics.sqlite3"  # Métriques par employé persistées (SQLite)
+DATASET_DIR = DATA_DIR / "dataset"  # Archive Parquet partitionnée des enregistrements
+
+
+
+def ensure_directories() -> None:
+    """
+    Crée les répertoires de données et de logs s'ils n'existent pas
+
+    Appelée par les points d'entrée (application, ligne de commande) plutôt
+    qu'à l'import du module, pour ne pas toucher au disque au démarrage.
+    """
+    for directory in [DATA_DIR, INPUT_DIR, OUTPUT_DIR, SAMPLES_DIR, LOGS_DIR]:
+        directory.mkdir(exist_ok=True)
 
-# Créer les répertoires s'ils n'existent pas
-for directory in [DATA_DIR, INPUT_DIR, OUTPUT_DIR, SAMPLES_DIR, LOGS_DIR]:
-    directory.mkdir(exist_ok=True)
 
 # Configuration CSV
 CSV_SEPARATOR = ";"
 CSV_ENCODING = "latin1"  # ISO-8859-1
+CSV_CHUNK_SIZE = 50_000  # Lignes lues par bloc (progression et annulation entre deux blocs)
+
+# Détection du format (voir src/utils/csv_format.py) : CSV_ENCODING et
+# CSV_SEPARATOR restent les valeurs par défaut des extractions Enedis
+CSV_SNIFF_BYTES = 64 * 1024  # Octets lus en tête de fichier
+CSV_SEPARATOR_CANDIDATES = [";", "|", ",", "\t"]
 
 # Colonnes attendues dans le CSV (ordre exact)
 EXPECTED_COLUMNS = [
@@ -69,4 +86,49 @@ EXPORT_CONFIG = {
     "time_format": "%H:%M:%S"
 }
 
+# Surveillance du dossier d'entrée (python -m src.cli watch)
+INGESTION_CONFIG = {
+    "poll_interval": 5.0,  # Secondes entre deux parcours de INPUT_DIR
+    "stable_polls": 2,     # Parcours consécutifs sans changement de taille/date avant traitement
+    "workers": 2,          # Fichiers traités simultanément
+    "queue_size": 8,       # Fichiers en attente au-delà desquels le parcours est suspendu
+    "formats": ["xlsx"],   # Exports produits dans OUTPUT_DIR
+    "pattern": "*.csv"
+}
+
+# API HTTP locale (python -m src.cli serve)
+API_CONFIG = {
+    "host": "127.0.0.1",   # Écoute locale uniquement par défaut
+    "port": 8765,
+    "max_records": 1000,   # Enregistrements renvoyés au plus par /api/records (pagination)
+    "cache_entries": 256   # Réponses conservées pour les ETag
+}
 
+# Calcul des métriques par employé (classification, heures supplémentaires,
+# arrêts maladie, jours de travail) réparti entre processus
+PARALLEL_CONFIG = {
+    "backend": "auto",          # "auto" (processus au-delà du seuil), "process" ou "inline"
+    "workers": None,            # Processus du pool (None : nombre de cœurs)
+    "min_records": 200_000,     # Enregistrements en dessous desquels "auto" calcule dans le processus courant
+    "shards_per_worker": 4      # Lots d'employés par processus (équilibrage)
+}
+
+# Classements et valeurs atypiques des métriques par employé (python -m src.cli top / outliers)
+RANKING_CONFIG = {
+    "top_k": 20,                # Employés retenus par groupe
+    "zscore_threshold": 3.0,    # |z| au-delà duquel une valeur est atypique
+    "iqr_factor": 1.5           # Valeur atypique hors de [Q1 - f x IQR, Q3 + f x IQR]
+}
+
+# Export ligne à ligne des enregistrements (NDJSON / CSV), par lots de taille fixe
+RECORD_EXPORT_CONFIG = {
+    "batch_size": 10_000,   # Enregistrements sérialisés et écrits ensemble
+    "csv_separator": ";"    # Séparateur des exports CSV (comme les extractions PMT)
+}
+
+# Archive Parquet partitionnée des enregistrements (export "dataset")
+DATASET_CONFIG = {
+    "partition_by": ["month", "agency", "category"],  # Répertoires month=AAAA-MM/agency=.../category=...
+    "compression": "zstd",
+    "compression_level": None   # Niveau zstd (None : défaut de pyarrow)
+}
@@ -9,9 +9,8 @@ from pathlib import Path
 # Ajouter le répertoire src au PYTHONPATH
 sys.path.insert(0, str(Path(__file__).parent))
 
-from src.ui.main_window import MainWindow
 from src.utils.logger import logger
-from src.config.settings import UI_CONFIG
+from src.config.settings import ensure_directories
 
 
 def main():
@@ -23,6 +22,12 @@ def main():
         app_logger.info("DÉMARRAGE DE LA GABINETTE")
         app_logger.info("=" * 50)
 
+        ensure_directories()
+
+        # Import différé : l'interface (et ttkbootstrap) ne sont chargés qu'ici,
+        # les services et pandas le sont après l'affichage de la fenêtre
+        from src.ui.main_window import MainWindow
+
         # Créer et lancer l'interface utilisateur
         app = MainWindow()
         app.run()
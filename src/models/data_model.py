@@ -10,6 +10,22 @@ from enum import Enum
 from src.utils.helpers import clean_string, safe_convert_to_int, safe_convert_to_float
 
 
+# Poste 3x8 d'un enregistrement (PMTRecord.shift_code), calculé au chargement
+SHIFT_UNKNOWN = -1   # Pas encore calculé (enregistrement construit hors chargement)
+SHIFT_NONE = 0
+SHIFT_MORNING = 1    # 07:30 - 15:30
+SHIFT_AFTERNOON = 2  # 15:30 - 23:30
+SHIFT_NIGHT = 3      # 23:30 - 07:30
+
+# Paires d'horaires examinées, dans l'ordre de détection
+SHIFT_TIME_PAIRS = (
+    ('ht_de_1', 'ht_a_1'), ('ht_de_2', 'ht_a_2'),
+    ('htm_de_1', 'htm_a_1'), ('htm_de_2', 'htm_a_2'),
+    ('he_de_1', 'he_a_1'), ('he_de_2', 'he_a_2'),
+    ('heure_debut', 'heure_fin')
+)
+
+
 class ValidationStatus(Enum):
     """Statuts de validation"""
     VALID = "valid"
@@ -38,6 +54,20 @@ class FileInfo:
     exists: bool = True
 
 
+@dataclass
+class CSVFormat:
+    """Format détecté d'une extraction (voir src/utils/csv_format.py)"""
+    encoding: str   # Encodage pour pandas / decode ("utf-8-sig" si BOM)
+    separator: str
+    columns: List[str] = field(default_factory=list)  # En-tête tel qu'écrit dans le fichier
+    header_size: int = 0  # Octets de l'en-tête (BOM et fin de ligne compris)
+
+    @property
+    def byte_encoding(self) -> str:
+        """Encodage des lignes après l'en-tête (sans BOM)"""
+        return "utf-8" if self.encoding == "utf-8-sig" else self.encoding
+
+
 @dataclass
 class PMTRecord:
     """
@@ -109,6 +139,7 @@ class PMTRecord:
     # Métadonnées
     row_number: int = 0
     validation_results: List[ValidationResult] = field(default_factory=list)
+    shift_code: int = field(default=SHIFT_UNKNOWN, compare=False, repr=False)  # Voir get_shift_code
 
     @classmethod
     def from_csv_row(cls, row_data: Dict[str, Any], row_number: int = 0) -> 'PMTRecord':
@@ -184,6 +215,39 @@ class PMTRecord:
 
         return record
 
+    def compute_shift_code(self) -> int:
+        """
+        Détecte le poste 3x8 des horaires de l'enregistrement
+
+        La première paire (début, fin) dont les heures contiennent celles
+        d'un poste 3x8 détermine le code.
+
+        Returns:
+            SHIFT_MORNING, SHIFT_AFTERNOON, SHIFT_NIGHT ou SHIFT_NONE
+        """
+        for start_name, end_name in SHIFT_TIME_PAIRS:
+            debut = getattr(self, start_name)
+            fin = getattr(self, end_name)
+            if debut and fin:
+                if '07:30:00' in debut and '15:30:00' in fin:
+                    return SHIFT_MORNING
+                if '15:30:00' in debut and '23:30:00' in fin:
+                    return SHIFT_AFTERNOON
+                if '23:30:00' in debut and '07:30:00' in fin:
+                    return SHIFT_NIGHT
+        return SHIFT_NONE
+
+    def get_shift_code(self) -> int:
+        """
+        Poste 3x8 de l'enregistrement, calculé au chargement (ou au premier appel)
+
+        Returns:
+            Code SHIFT_* (SHIFT_NONE si aucun horaire 3x8)
+        """
+        if self.shift_code == SHIFT_UNKNOWN:
+            self.shift_code = self.compute_shift_code()
+        return self.shift_code
+
     def validate(self) -> List[ValidationResult]:
         """
         Valide l'enregistrement selon les règles métier
@@ -316,4 +380,16 @@ class ProcessingResult:
     validation_results: List[ValidationResult] = field(default_factory=list)
     processing_time: float = 0.0
     error_message: Optional[str] = None
- 
\ No newline at end of file
+    cancelled: bool = False
+    timings: Dict[str, Any] = field(default_factory=dict)  # Arbre des durées par étape
+    incremental: bool = False  # Seules les lignes ajoutées depuis le dernier chargement ont été lues
+    records_appended: int = 0
+    csv_format: Optional[CSVFormat] = None  # Encodage et séparateur détectés
+ 
+
+
+@dataclass
+class DatasetRef:
+    """Référence d'une extraction dans la base des métriques"""
+    fingerprint: str  # SHA-1 du contenu lu
+    source_name: str
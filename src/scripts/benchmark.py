@@ -0,0 +1,243 @@
+"""
+Benchmark de montée en charge de La Gabinette
+
+Pour chaque taille demandée, génère une extraction PMT synthétique (voir
+generate_pmt_data.py) puis mesure, dans un processus dédié, le chargement,
+la classification, chaque calculateur, l'export Excel et la comparaison.
+Chaque taille tourne dans son propre processus pour que le pic de mémoire
+(RSS) mesuré lui soit propre.
+
+Exemples:
+    python src/scripts/benchmark.py --sizes 10k,100k
+    python src/scripts/benchmark.py --sizes 10k,100k,1M,10M --data-dir /data/bench --json bench.json
+    python src/scripts/benchmark.py --sizes 1M --stages load,classify
+"""
+
+import argparse
+import json
+import logging
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+
+# Mêmes chemins d'import que l'application (voir main.py)
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.scripts.generate_pmt_data import employees_for_rows, generate_pmt_file
+
+
+DEFAULT_SIZES = "10k,100k,1M,10M"
+STAGES = ["load", "classify", "overtime", "sick_leave", "work_days", "export_excel", "compare"]
+DAYS = 31
+
+
+def parse_size(text: str) -> int:
+    """Convertit '10k', '1M' ou '2500' en nombre de lignes"""
+    text = text.strip().lower()
+    multipliers = {"k": 1_000, "m": 1_000_000}
+    if text and text[-1] in multipliers:
+        return int(float(text[:-1]) * multipliers[text[-1]])
+    return int(text)
+
+
+def peak_rss_mb() -> Optional[float]:
+    """
+    Pic de mémoire résidente du processus courant, en Mo
+
+    Utilise le module resource (Linux/macOS), psutil en repli (Windows) ;
+    None si aucun des deux n'est disponible.
+    """
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss est en octets sous macOS, en kilo-octets sous Linux
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        pass
+
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss) / (1024 * 1024)
+    except ImportError:
+        return None
+
+
+def run_worker(csv_path: Path, stages: List[str], work_dir: Path) -> Dict[str, Any]:
+    """
+    Exécute les étapes mesurées sur un fichier (dans le processus courant)
+
+    Args:
+        csv_path: Extraction PMT à traiter
+        stages: Étapes à mesurer (sous-ensemble de STAGES)
+        work_dir: Répertoire des fichiers produits (export, comparaison)
+
+    Returns:
+        Durées, débits et pic mémoire
+    """
+    from src.services.csv_processor import CSVProcessor
+    from src.services.employee_classifier import EmployeeClassifier
+    from src.services.export_service import ExportService
+    from src.services.overtime_calculator import OvertimeCalculator
+    from src.services.sick_leave_calculator import SickLeaveCalculator
+    from src.services.work_time_calculator import WorkTimeCalculator
+
+    results: Dict[str, Any] = {"stages": {}}
+    context: Dict[str, Any] = {}
+
+    def measure(name: str, func: Callable[[], Any], rows: Optional[int]) -> Any:
+        start = time.perf_counter()
+        value = func()
+        seconds = time.perf_counter() - start
+        results["stages"][name] = {
+            "seconds": round(seconds, 4),
+            "rows_per_second": round(rows / seconds, 1) if rows and seconds > 0 else None
+        }
+        return value
+
+    processor = CSVProcessor()
+    load_result = measure("load", lambda: processor.load_file(str(csv_path)), None)
+    if not load_result.success:
+        raise RuntimeError(load_result.error_message)
+
+    records = processor.get_records()
+    rows = len(records)
+    results["rows"] = rows
+    results["stages"]["load"]["rows_per_second"] = round(rows / results["stages"]["load"]["seconds"], 1)
+
+    classifier = EmployeeClassifier()
+    classifications = measure("classify", lambda: classifier.classify_employees(records), rows)
+
+    if "overtime" in stages:
+        measure("overtime", lambda: OvertimeCalculator().calculate_all_employees_overtime(records), rows)
+    if "sick_leave" in stages:
+        measure("sick_leave", lambda: SickLeaveCalculator().calculate_all_employees_sick_leave(records), rows)
+    if "work_days" in stages:
+        measure("work_days",
+                lambda: WorkTimeCalculator().calculate_all_employees_work_days(records, classifications), rows)
+
+    if "export_excel" in stages or "compare" in stages:
+        export_path = work_dir / f"{csv_path.stem}.xlsx"
+        context["export"] = measure("export_excel",
+                                    lambda: ExportService().export_to_excel(records, output_path=str(export_path)),
+                                    rows)
+
+    if "compare" in stages:
+        # Export comparé à lui-même : même volume de lecture et de comparaison
+        from src.services.compare import ComparisonService
+        measure("compare", lambda: ComparisonService().compare_files(context["export"], context["export"]), rows)
+
+    results["stages"] = {name: value for name, value in results["stages"].items()
+                         if name in stages or name in ("load", "classify")}
+    results["peak_rss_mb"] = peak_rss_mb()
+    return results
+
+
+def run_size(rows: int, stages: List[str], data_dir: Path, timeout: Optional[float]) -> Dict[str, Any]:
+    """
+    Génère (ou réutilise) le fichier d'une taille et le mesure dans un sous-processus
+
+    Args:
+        rows: Nombre de lignes visé
+        stages: Étapes à mesurer
+        data_dir: Répertoire des fichiers générés (réutilisés d'une exécution à l'autre)
+        timeout: Durée maximale du sous-processus en secondes
+
+    Returns:
+        Résultats pour cette taille
+    """
+    csv_path = data_dir / f"pmt_bench_{rows}.csv"
+    report: Dict[str, Any] = {"target_rows": rows, "file": str(csv_path)}
+
+    if not csv_path.exists():
+        start = time.perf_counter()
+        generate_pmt_file(csv_path, employees_for_rows(rows, DAYS), DAYS)
+        report["generation_seconds"] = round(time.perf_counter() - start, 2)
+    report["file_size_mb"] = round(csv_path.stat().st_size / (1024 * 1024), 1)
+
+    command = [sys.executable, str(Path(__file__).resolve()), "--worker", str(csv_path),
+               "--stages", ",".join(stages), "--data-dir", str(data_dir)]
+    try:
+        completed = subprocess.run(command, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        report["error"] = f"Délai dépassé ({timeout:.0f} s)"
+        return report
+
+    if completed.returncode != 0:
+        lines = completed.stderr.strip().splitlines()
+        report["error"] = lines[-1] if lines else f"Code de sortie {completed.returncode}"
+        return report
+
+    report.update(json.loads(completed.stdout.strip().splitlines()[-1]))
+    return report
+
+
+def print_report(reports: List[Dict[str, Any]], stages: List[str]) -> None:
+    """Affiche un tableau durée / débit par taille et par étape"""
+    header = f"{'Lignes':>10} {'Étape':<14} {'Durée (s)':>10} {'Lignes/s':>12}"
+    print(header)
+    print("-" * len(header))
+    for report in reports:
+        label = f"{report.get('rows', report['target_rows']):,}".replace(",", " ")
+        if "error" in report:
+            print(f"{label:>10} ERREUR : {report['error']}")
+            continue
+        for stage in stages:
+            values = report["stages"].get(stage)
+            if values is None:
+                continue
+            throughput = f"{values['rows_per_second']:,.0f}".replace(",", " ") if values["rows_per_second"] else "-"
+            print(f"{label:>10} {stage:<14} {values['seconds']:>10.2f} {throughput:>12}")
+            label = ""
+        peak = report.get("peak_rss_mb")
+        print(f"{'':>10} {'pic RSS':<14} {f'{peak:.0f} Mo' if peak is not None else 'n/d':>10}")
+    print()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de montée en charge (chargement, calculs, exports)")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help=f"Tailles en lignes (défaut: {DEFAULT_SIZES})")
+    parser.add_argument("--stages", default=",".join(STAGES), help="Étapes à mesurer, séparées par des virgules")
+    parser.add_argument("--data-dir", help="Répertoire des fichiers générés (défaut: dossier temporaire)")
+    parser.add_argument("--timeout", type=float, help="Durée maximale par taille, en secondes")
+    parser.add_argument("--json", help="Écrire les résultats JSON dans ce fichier")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    stages = [stage.strip() for stage in args.stages.split(",") if stage.strip()]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"Étapes inconnues: {', '.join(sorted(unknown))} (disponibles: {', '.join(STAGES)})")
+
+    data_dir = Path(args.data_dir) if args.data_dir else Path(tempfile.gettempdir()) / "gabinette_bench"
+    data_dir.mkdir(parents=True, exist_ok=True)
+
+    if args.worker:
+        # Processus de mesure : seuls les avertissements sont journalisés
+        from src.utils.logger import logger
+        logger.get_logger().setLevel(logging.WARNING)
+        print(json.dumps(run_worker(Path(args.worker), stages, data_dir)))
+        return 0
+
+    reports = []
+    for size in args.sizes.split(","):
+        rows = parse_size(size)
+        print(f"Taille {rows:,} lignes...".replace(",", " "), file=sys.stderr)
+        reports.append(run_size(rows, stages, data_dir, args.timeout))
+
+    print_report(reports, stages)
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(reports, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    return 1 if any("error" in report for report in reports) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,267 @@
+"""
+Générateur d'extractions PMT synthétiques pour les tests de charge
+
+Produit un CSV au format de l'extraction Enedis (colonnes EXPECTED_COLUMNS,
+séparateur ';', encodage latin1) avec une ligne par employé et par jour :
+weekends, jours fériés, semaines d'astreinte, postes 3x8 (matin / après-midi
+/ nuit), heures supplémentaires (code D) et arrêts maladie (codes 41 et 5H).
+
+Exemples:
+    python src/scripts/generate_pmt_data.py --rows 100000 --output data/samples/pmt_100k.csv
+    python src/scripts/generate_pmt_data.py --employees 500 --days 31 --start-date 01/03/2024
+"""
+
+import argparse
+import csv
+import math
+import random
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+# Ajouter la racine du projet au PYTHONPATH
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from src.config.settings import CSV_ENCODING, CSV_SEPARATOR, EXPECTED_COLUMNS
+
+
+# Agences : (code UM, libellé, sigle utilisé dans les libellés d'équipe)
+AGENCES = [
+    ("7501", "BATIGNOLLES", "B"),
+    ("7502", "GRENELLE", "G"),
+    ("7503", "ITALIE", "IT"),
+    ("7504", "PARIS EST", "PE"),
+]
+
+# Équipes hors astreinte par agence (cf. EmployeeClassifier.CODES_EQUIPES_HORS_ASTREINTE)
+TIP_TEAMS = {
+    "B": ["PV B SANS ASTREINTE", "PV B TERRAIN"],
+    "G": ["PV G SANS ASTREINTE", "PV G CLI/TRAVAUX", "PV G POLE RIP"],
+    "IT": ["PV IT SANS ASTREINTE", "PF IT TERRAIN"],
+    "PE": ["PV PE SANS ASTREINTE", "PF PE TERRAIN"],
+}
+OTHER_TEAMS = ["AUTRE EQUIPE", "SUPPORT", "ETUDES"]
+
+# Répartition des employés par profil (cf. EmployeeClassifier)
+PROFILE_WEIGHTS = {
+    "ASTREINTES": 0.30,
+    "TIPS": 0.35,
+    "3X8": 0.15,
+    "AUTRES": 0.20,
+}
+
+# Probabilités journalières des codes (jours travaillés)
+OVERTIME_RATE = 0.04          # Code D
+SICK_LEAVE_START_RATE = 0.012  # Début d'un arrêt 41
+LONG_SICK_LEAVE_START_RATE = 0.0015  # Début d'un arrêt 5H
+ASTREINTE_ROTATION_WEEKS = 4  # Une semaine d'astreinte toutes les 4 semaines
+
+JOURS = ["Lundi", "Mardi", "Mercredi", "Jeudi", "Vendredi", "Samedi", "Dimanche"]
+NOMS = ["MARTIN", "BERNARD", "DUBOIS", "THOMAS", "ROBERT", "RICHARD", "PETIT", "DURAND",
+        "LEROY", "MOREAU", "SIMON", "LAURENT", "LEFEBVRE", "MICHEL", "GARCIA", "DAVID",
+        "BERTRAND", "ROUX", "VINCENT", "FOURNIER", "MOREL", "GIRARD", "ANDRE", "MERCIER"]
+PRENOMS = ["Jean", "Marie", "Pierre", "Sophie", "Paul", "Julie", "Michel", "Camille",
+           "Nicolas", "Léa", "Thomas", "Chloé", "Antoine", "Inès", "Hélène", "François"]
+
+DAY_SHIFT = ("08:00:00", "17:00:00")
+SHIFTS_3X8 = [("07:30:00", "15:30:00"), ("15:30:00", "23:30:00"), ("23:30:00", "07:30:00")]
+
+
+def french_holidays(year: int) -> Set[date]:
+    """
+    Jours fériés français d'une année (fixes + mobiles calculés depuis Pâques)
+
+    Args:
+        year: Année
+
+    Returns:
+        Ensemble des dates fériées
+    """
+    # Algorithme de Meeus/Jones/Butcher pour le dimanche de Pâques
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = b // 4, b % 4
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month = (h + l - 7 * m + 114) // 31
+    day = ((h + l - 7 * m + 114) % 31) + 1
+    easter = date(year, month, day)
+
+    return {
+        date(year, 1, 1), date(year, 5, 1), date(year, 5, 8), date(year, 7, 14),
+        date(year, 8, 15), date(year, 11, 1), date(year, 11, 11), date(year, 12, 25),
+        easter + timedelta(days=1),   # Lundi de Pâques
+        easter + timedelta(days=39),  # Ascension
+        easter + timedelta(days=50),  # Lundi de Pentecôte
+    }
+
+
+def _build_employees(count: int, rng: random.Random) -> List[Dict[str, Any]]:
+    """Crée la population d'employés (profil, agence, équipe, identité)"""
+    profiles = list(PROFILE_WEIGHTS)
+    weights = list(PROFILE_WEIGHTS.values())
+    employees = []
+
+    for index in range(count):
+        profile = rng.choices(profiles, weights)[0]
+        um, agence_lib, sigle = rng.choice(AGENCES)
+
+        if profile == "ASTREINTES":
+            equipe_lib = f"PV {sigle} ASTREINTE"
+        elif profile in ("TIPS", "3X8"):
+            equipe_lib = rng.choice(TIP_TEAMS[sigle])
+        else:
+            equipe_lib = rng.choice(OTHER_TEAMS)
+            um, agence_lib = "7505", "AUTRE AGENCE"
+
+        employees.append({
+            "profile": profile,
+            "um": um,
+            "agence_lib": agence_lib,
+            "equipe_lib": equipe_lib,
+            "nni": f"{chr(65 + index % 26)}{index:06d}",
+            "nom": rng.choice(NOMS),
+            "prenom": rng.choice(PRENOMS),
+            "astreinte_week": rng.randrange(ASTREINTE_ROTATION_WEEKS),
+        })
+
+    return employees
+
+
+def iter_pmt_rows(employees: int, days: int, start_date: date, seed: Optional[int] = None) -> Iterator[List[str]]:
+    """
+    Génère les lignes d'une extraction PMT (une par employé et par jour)
+
+    Args:
+        employees: Nombre d'employés
+        days: Nombre de jours couverts
+        start_date: Premier jour de l'extraction
+        seed: Graine du générateur aléatoire (reproductibilité)
+
+    Yields:
+        Lignes de EXPECTED_COLUMNS valeurs
+    """
+    rng = random.Random(seed)
+    population = _build_employees(employees, rng)
+    dates = [start_date + timedelta(days=offset) for offset in range(days)]
+    holidays: Set[date] = set()
+    for year in {current.year for current in dates}:
+        holidays |= french_holidays(year)
+
+    empty_pairs = [""] * 4
+
+    for employee in population:
+        sick_days_left = 0
+        sick_code = ""
+        shift_index = rng.randrange(3)
+
+        for current in dates:
+            weekday = current.weekday()
+            is_weekend = weekday >= 5
+            is_holiday = current in holidays
+            week_number = current.isocalendar()[1]
+
+            on_astreinte = (employee["profile"] == "ASTREINTES"
+                            and week_number % ASTREINTE_ROTATION_WEEKS == employee["astreinte_week"])
+
+            # Horaires : service continu en 3x8 (rotation hebdomadaire des postes)
+            if employee["profile"] == "3X8":
+                debut, fin = SHIFTS_3X8[(shift_index + week_number) % 3]
+                works = weekday not in ((week_number + shift_index) % 7, (week_number + shift_index + 1) % 7)
+            else:
+                debut, fin = DAY_SHIFT
+                works = not is_weekend and not is_holiday
+
+            ht = "J" if works else ""
+            code = designation_code = valeur = unite = ""
+
+            # Arrêts maladie : épisodes de plusieurs jours consécutifs
+            if sick_days_left == 0 and works:
+                if rng.random() < LONG_SICK_LEAVE_START_RATE:
+                    sick_days_left, sick_code = rng.randint(15, 60), "5H"
+                elif rng.random() < SICK_LEAVE_START_RATE:
+                    sick_days_left, sick_code = rng.randint(1, 5), "41"
+
+            if sick_days_left > 0:
+                sick_days_left -= 1
+                code = sick_code
+                designation_code = "Maladie" if sick_code == "41" else "Maladie longue durée"
+                valeur, unite = "1", "Jour(s)"
+            elif works and rng.random() < OVERTIME_RATE:
+                code, designation_code = "D", "Heures supplémentaires"
+                valeur, unite = str(rng.choice([1, 1.5, 2, 3, 4])), "Heure(s)"
+
+            time_pair = [debut, fin] if works else ["", ""]
+            yield [
+                "75", "DR PARIS", employee["um"], employee["agence_lib"],
+                employee["um"] + "01", "SDUM_LIB", employee["um"] + "01", "FSDUM_LIB",
+                "D", "DISTRIBUTION", "D01", "CLIENTELE", employee["um"], employee["equipe_lib"],
+                employee["nni"], employee["nom"], employee["prenom"],
+                current.strftime("%d/%m/%Y"), JOURS[weekday], "X" if is_holiday else "",
+                "N", "I" if on_astreinte else "", "",
+                ht, *time_pair, "", "",
+                "", *empty_pairs,
+                "", *empty_pairs,
+                code, designation_code, valeur, unite, *time_pair
+            ]
+
+
+def generate_pmt_file(output_path: Path, employees: int, days: int = 31,
+                      start_date: date = date(2024, 1, 1), seed: Optional[int] = 42) -> int:
+    """
+    Écrit une extraction PMT synthétique sur le disque
+
+    Args:
+        output_path: Fichier CSV à créer
+        employees: Nombre d'employés
+        days: Nombre de jours couverts
+        start_date: Premier jour de l'extraction
+        seed: Graine du générateur aléatoire
+
+    Returns:
+        Nombre de lignes de données écrites
+    """
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    rows = 0
+    with open(output_path, "w", encoding=CSV_ENCODING, newline="") as file:
+        writer = csv.writer(file, delimiter=CSV_SEPARATOR, lineterminator="\n")
+        writer.writerow(EXPECTED_COLUMNS)
+        for row in iter_pmt_rows(employees, days, start_date, seed):
+            writer.writerow(row)
+            rows += 1
+
+    return rows
+
+
+def employees_for_rows(rows: int, days: int) -> int:
+    """Nombre d'employés nécessaire pour atteindre environ `rows` lignes"""
+    return max(1, math.ceil(rows / days))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Génère une extraction PMT synthétique (latin1, ';')")
+    size = parser.add_mutually_exclusive_group(required=True)
+    size.add_argument("--rows", type=int, help="Nombre de lignes visé (employés = lignes / jours)")
+    size.add_argument("--employees", type=int, help="Nombre d'employés")
+    parser.add_argument("--days", type=int, default=31, help="Nombre de jours couverts (défaut: 31)")
+    parser.add_argument("--start-date", default="01/01/2024", help="Premier jour (JJ/MM/AAAA)")
+    parser.add_argument("--seed", type=int, default=42, help="Graine aléatoire (défaut: 42)")
+    parser.add_argument("--output", required=True, help="Fichier CSV à créer")
+    args = parser.parse_args()
+
+    day, month, year = (int(part) for part in args.start_date.split("/"))
+    employees = args.employees or employees_for_rows(args.rows, args.days)
+
+    rows = generate_pmt_file(Path(args.output), employees, args.days, date(year, month, day), args.seed)
+    print(f"{rows} lignes écrites ({employees} employés x {args.days} jours) dans {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
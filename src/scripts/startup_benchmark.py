@@ -0,0 +1,164 @@
+"""
+Benchmark du démarrage à froid de La Gabinette
+
+Importe les modules de démarrage dans un interpréteur neuf avec
+`python -X importtime`, puis affiche le temps total, les modules les plus
+coûteux et les modules lourds chargés trop tôt (pandas, xlsxwriter...).
+
+Exemples:
+    python src/scripts/startup_benchmark.py
+    python src/scripts/startup_benchmark.py --module src.ui.main_window --runs 5 --top 15
+    python src/scripts/startup_benchmark.py --json rapport_demarrage.json
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+
+# Modules qui ne doivent être chargés qu'au premier usage
+HEAVY_MODULES = ["pandas", "numpy", "xlsxwriter", "openpyxl", "pyarrow", "matplotlib", "seaborn", "PIL"]
+
+
+def parse_importtime(stderr: str) -> List[Dict[str, Any]]:
+    """
+    Analyse la sortie de `-X importtime`
+
+    Args:
+        stderr: Sortie d'erreur de l'interpréteur
+
+    Returns:
+        Liste de modules avec temps propre et cumulé (microsecondes)
+    """
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            # Format: "import time: <self us> | <cumulé us> | <indentation><module>"
+            self_part, cumulative_part, name = line.split(":", 1)[1].split("|", 2)
+            self_us = int(self_part)
+            cumulative_us = int(cumulative_part)
+        except ValueError:
+            continue
+        modules.append({
+            "module": name.strip(),
+            "depth": (len(name) - len(name.lstrip())) // 2,
+            "self_ms": self_us / 1000,
+            "cumulative_ms": cumulative_us / 1000
+        })
+    return modules
+
+
+def run_once(module: str) -> Dict[str, Any]:
+    """
+    Importe un module dans un interpréteur neuf
+
+    Args:
+        module: Module à importer (ex: src.main)
+
+    Returns:
+        Durée totale, profil d'import et éventuelle erreur
+    """
+    code = f"import sys; sys.path.insert(0, {str(PROJECT_ROOT / 'src')!r}); import {module}"
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=str(PROJECT_ROOT), capture_output=True, text=True
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+
+    error = None
+    if completed.returncode != 0:
+        error = completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else "échec"
+
+    return {"wall_ms": wall_ms, "modules": parse_importtime(completed.stderr), "error": error}
+
+
+def benchmark(module: str, runs: int, top: int) -> Dict[str, Any]:
+    """
+    Mesure le démarrage sur plusieurs exécutions
+
+    Args:
+        module: Module de démarrage à importer
+        runs: Nombre d'exécutions (la médiane est retenue)
+        top: Nombre de modules les plus coûteux à retenir
+
+    Returns:
+        Rapport du benchmark
+    """
+    results = [run_once(module) for _ in range(runs)]
+    last = results[-1]
+
+    imported = {entry["module"] for entry in last["modules"]}
+    target = next((entry for entry in last["modules"] if entry["module"] == module), None)
+    slowest = sorted(last["modules"], key=lambda entry: entry["self_ms"], reverse=True)[:top]
+    top_level = sorted(
+        (entry for entry in last["modules"] if entry["depth"] == 0),
+        key=lambda entry: entry["cumulative_ms"], reverse=True
+    )[:top]
+
+    return {
+        "module": module,
+        "python": sys.version.split()[0],
+        "runs": runs,
+        "wall_ms_median": statistics.median(result["wall_ms"] for result in results),
+        "import_ms": target["cumulative_ms"] if target else None,
+        "modules_imported": len(imported),
+        "heavy_modules_loaded": [name for name in HEAVY_MODULES if name in imported],
+        "top_level_cumulative": top_level,
+        "slowest_self": slowest,
+        "error": last["error"]
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    """Affiche le rapport de façon lisible"""
+    print(f"=== Démarrage : import {report['module']} (Python {report['python']}) ===")
+    if report["error"]:
+        print(f"  ERREUR : {report['error']}")
+    print(f"  Interpréteur complet (médiane sur {report['runs']}) : {report['wall_ms_median']:.1f} ms")
+    if report["import_ms"] is not None:
+        print(f"  Import du module : {report['import_ms']:.1f} ms ({report['modules_imported']} modules)")
+    heavy = report["heavy_modules_loaded"]
+    print(f"  Modules lourds chargés au démarrage : {', '.join(heavy) if heavy else 'aucun'}")
+
+    print("\n  Imports de premier niveau (cumulé) :")
+    for entry in report["top_level_cumulative"]:
+        print(f"    {entry['cumulative_ms']:9.1f} ms  {entry['module']}")
+
+    print("\n  Modules les plus coûteux (temps propre) :")
+    for entry in report["slowest_self"]:
+        print(f"    {entry['self_ms']:9.1f} ms  {entry['module']}")
+    print()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark du démarrage à froid (-X importtime)")
+    parser.add_argument("--module", action="append", dest="modules",
+                        help="Module à importer (répétable, défaut: src.main et src.ui.main_window)")
+    parser.add_argument("--runs", type=int, default=3, help="Nombre d'exécutions par module")
+    parser.add_argument("--top", type=int, default=10, help="Nombre de modules affichés")
+    parser.add_argument("--json", help="Écrire le rapport JSON dans ce fichier")
+    args = parser.parse_args()
+
+    reports = [benchmark(module, args.runs, args.top)
+               for module in (args.modules or ["src.main", "src.ui.main_window"])]
+    for report in reports:
+        print_report(report)
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(reports, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    return 1 if any(report["error"] for report in reports) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
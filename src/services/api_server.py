@@ -0,0 +1,359 @@
+"""
+API HTTP locale de La Gabinette (asyncio, bibliothèque standard uniquement)
+
+Garde en mémoire la dernière extraction chargée (enregistrements, métriques
+par employé, lignes d'export) et sert des réponses JSON :
+
+    GET  /api/status                       Fichier chargé, nombre d'enregistrements, version
+    GET  /api/employees/<NNI>              Métriques d'un employé et ses lignes d'export
+    GET  /api/aggregates?group=agency,category
+                                           Totaux par agence et/ou catégorie
+    GET  /api/records?equipe_lib=...&offset=0&limit=100
+                                           Enregistrements filtrés (champs de PMTRecord ; valeur, row_number numériques)
+    POST /api/reload                       Relire les lignes ajoutées au fichier
+
+Chaque réponse porte un ETag ; une requête répétée avec If-None-Match
+reçoit 304 sans recalcul tant que les données n'ont pas été rechargées.
+
+Les chargements sont sérialisés et préparent un nouvel état complet
+(enregistrements, métriques, lignes d'export) publié d'un bloc : une
+requête lit toujours un seul état, celui dont la version sert de clé de
+cache, même pendant un rechargement.
+"""
+
+import asyncio
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from src.config.settings import API_CONFIG
+from src.services.record_exporter import RECORD_COLUMNS
+from src.utils.logger import logger
+
+
+# Colonnes numériques des lignes d'export totalisées par /api/aggregates
+AGGREGATED_COLUMNS = ['Heure_Supp', 'Arret_Maladie_41', 'Arret_Maladie_5H', 'Periode_Arret_Maladie',
+                      'Jour_Complet', 'Jour_Partiel', 'Total_Heures_Absence']
+
+# Critères acceptés par /api/records : champ de PMTRecord -> conversion de la valeur du paramètre
+RECORD_FILTERS: Dict[str, Callable[[str], Any]] = dict.fromkeys(RECORD_COLUMNS, str)
+RECORD_FILTERS.update(valeur=float, row_number=int)
+
+HTTP_REASONS = {200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found",
+                405: "Method Not Allowed", 409: "Conflict", 500: "Internal Server Error"}
+
+
+class HTTPError(Exception):
+    """Erreur renvoyée au client avec un code HTTP"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class MetricsAPIServer:
+    """Serveur HTTP des métriques de l'extraction chargée"""
+
+    def __init__(self, host: Optional[str] = None, port: Optional[int] = None):
+        self.logger = logger.get_logger("MetricsAPIServer")
+        self.host = host or API_CONFIG["host"]
+        self.port = port if port is not None else API_CONFIG["port"]
+        # Processeur du dernier chargement : utilisé uniquement sous _reload_lock
+        self.processor = None
+
+        self._reload_lock = threading.Lock()
+        self._data_lock = threading.Lock()
+        # État publié, remplacé d'un bloc à chaque chargement (jamais modifié ensuite)
+        self._data: Dict[str, Any] = {
+            "version": 0,
+            "file": None,
+            "loaded_at": None,
+            "records": [],
+            "employee_metrics": {},
+            "employee_rows": {},
+            "rows_by_category": {}
+        }
+
+        # (version, chemin, paramètres) -> (ETag, corps) ; les versions périmées sortent du cache
+        self._cache: "OrderedDict[Tuple[Any, ...], Tuple[str, bytes]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    def load(self, file_path: str, incremental: bool = False) -> Dict[str, Any]:
+        """
+        Charge une extraction et précalcule ses métriques (appel bloquant)
+
+        Un seul chargement à la fois. Un chargement complet lit le fichier
+        avec un nouveau CSVProcessor ; un rechargement incrémental complète
+        celui du chargement précédent, que les requêtes ne lisent jamais.
+        Le nouvel état n'est publié qu'une fois entièrement calculé ; en cas
+        d'échec, l'état précédent reste servi.
+
+        Args:
+            file_path: Extraction CSV
+            incremental: Ne relire que les lignes ajoutées depuis le dernier chargement
+
+        Returns:
+            État du serveur après chargement
+        """
+        from src.services.csv_processor import CSVProcessor
+        from src.services.export_service import ExportService
+
+        with self._reload_lock:
+            processor = self.processor if incremental and self.processor is not None else CSVProcessor()
+            result = processor.load_file(file_path, incremental=incremental)
+            if not result.success:
+                raise HTTPError(409, result.error_message or "Chargement impossible")
+            self.processor = processor
+
+            records = processor.get_records()
+            rows_by_category = ExportService().build_employee_rows(records, metrics=processor.metrics)
+            employee_rows: Dict[str, List[Dict[str, Any]]] = {}
+            for category, rows in rows_by_category.items():
+                for row in rows:
+                    employee_rows.setdefault(row['NNI'], []).append(dict(row, Catégorie=category))
+            employee_metrics = {nni: processor.metrics.get_employee_metrics(nni)
+                                for nni in processor.metrics.get_categories()}
+
+            with self._data_lock:
+                data = self._data = {
+                    "version": self._data["version"] + 1,
+                    "file": file_path,
+                    "loaded_at": datetime.now().isoformat(timespec="seconds"),
+                    "records": records,
+                    "employee_metrics": employee_metrics,
+                    "employee_rows": employee_rows,
+                    "rows_by_category": rows_by_category
+                }
+            with self._cache_lock:
+                self._cache.clear()
+
+        self.logger.info(f"Extraction {Path(file_path).name} en mémoire (version {data['version']}, "
+                         f"{result.records_processed} enregistrements)")
+        return self._status(data)
+
+    def _snapshot(self) -> Dict[str, Any]:
+        """État publié courant (cohérent : un seul chargement)"""
+        with self._data_lock:
+            return self._data
+
+    def run(self) -> None:
+        """Démarre le serveur jusqu'à interruption (Ctrl+C)"""
+        try:
+            asyncio.run(self.serve())
+        except KeyboardInterrupt:
+            self.logger.info("Arrêt du serveur")
+
+    async def serve(self) -> None:
+        """Écoute les connexions (coroutine)"""
+        server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        addresses = ", ".join(str(sock.getsockname()) for sock in server.sockets)
+        self.logger.info(f"API HTTP à l'écoute sur {addresses}")
+        async with server:
+            await server.serve_forever()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Traite les requêtes d'une connexion (keep-alive HTTP/1.1)"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode("latin1").strip().split(" ", 2)
+                except ValueError:
+                    await self._write_response(writer, 400, self._json_body({"error": "Requête invalide"}))
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                try:
+                    length = int(headers.get("content-length", "0") or 0)
+                    if length < 0:
+                        raise ValueError(length)
+                except ValueError:
+                    await self._write_response(
+                        writer, 400, self._json_body({"error": "En-tête Content-Length invalide"})
+                    )
+                    break
+                if length:
+                    await reader.readexactly(length)
+
+                status, etag, body = await self._dispatch(method, target, headers)
+                keep_alive = (version == "HTTP/1.1" and headers.get("connection", "").lower() != "close")
+                await self._write_response(writer, status, body, etag, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method: str, target: str,
+                        headers: Dict[str, str]) -> Tuple[int, Optional[str], bytes]:
+        """Route une requête ; les calculs sont exécutés hors de la boucle asyncio"""
+        url = urlsplit(target)
+        path = unquote(url.path).rstrip("/") or "/"
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        loop = asyncio.get_running_loop()
+
+        try:
+            if method == "POST" and path == "/api/reload":
+                file_path = self._snapshot()["file"]
+                if file_path is None:
+                    raise HTTPError(409, "Aucune extraction chargée")
+                if self._reload_lock.locked():
+                    raise HTTPError(409, "Rechargement déjà en cours")
+                status = await loop.run_in_executor(None, self.load, file_path, True)
+                return 200, None, self._json_body(status)
+
+            if method != "GET":
+                raise HTTPError(405, f"Méthode {method} non prise en charge")
+
+            data = self._snapshot()
+            key = (data["version"], path, tuple(sorted(params.items())))
+            with self._cache_lock:
+                cached = self._cache.get(key)
+                if cached is not None:
+                    self._cache.move_to_end(key)
+            if cached is None:
+                payload = await loop.run_in_executor(None, self._route_get, data, path, params)
+                body = self._json_body(payload)
+                cached = (f'"{key[0]}-{hashlib.sha1(body).hexdigest()[:20]}"', body)
+                with self._cache_lock:
+                    if data is not self._snapshot():
+                        # Rechargé entre-temps : la réponse reste juste pour sa version, inutile de la garder
+                        return 200, cached[0], body
+                    self._cache[key] = cached
+                    while len(self._cache) > API_CONFIG["cache_entries"]:
+                        self._cache.popitem(last=False)
+
+            etag, body = cached
+            if headers.get("if-none-match") == etag:
+                return 304, etag, b""
+            return 200, etag, body
+
+        except HTTPError as e:
+            return e.status, None, self._json_body({"error": str(e)})
+        except Exception as e:
+            self.logger.error(f"Erreur API sur {method} {target}: {str(e)}")
+            return 500, None, self._json_body({"error": str(e)})
+
+    def _route_get(self, data: Dict[str, Any], path: str, params: Dict[str, str]) -> Any:
+        """Calcule la réponse d'une requête GET à partir d'un état publié"""
+        if path == "/api/status":
+            return self._status(data)
+        if data["file"] is None:
+            raise HTTPError(409, "Aucune extraction chargée")
+
+        if path.startswith("/api/employees/"):
+            return self._employee(data, path[len("/api/employees/"):])
+        if path == "/api/aggregates":
+            return self._aggregates(data, params.get("group", "agency,category"))
+        if path == "/api/records":
+            return self._records(data, params)
+        raise HTTPError(404, f"Ressource inconnue: {path}")
+
+    def _status(self, data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """État de l'extraction en mémoire"""
+        data = data if data is not None else self._snapshot()
+        return {
+            "file": data["file"],
+            "loaded_at": data["loaded_at"],
+            "version": data["version"],
+            "records": len(data["records"]),
+            "employees": len(data["employee_rows"])
+        }
+
+    @staticmethod
+    def _employee(data: Dict[str, Any], nni: str) -> Dict[str, Any]:
+        """Métriques d'un employé et ses lignes d'export"""
+        metrics = data["employee_metrics"].get(nni)
+        if metrics is None:
+            raise HTTPError(404, f"NNI inconnu: {nni}")
+        return dict(metrics, rows=data["employee_rows"].get(nni, []))
+
+    @staticmethod
+    def _aggregates(data: Dict[str, Any], group: str) -> List[Dict[str, Any]]:
+        """Totaux des lignes d'export par agence et/ou catégorie"""
+        keys = [key.strip() for key in group.split(",") if key.strip()]
+        if not keys or any(key not in ("agency", "category") for key in keys):
+            raise HTTPError(400, "Paramètre group attendu: agency, category ou agency,category")
+
+        groups: Dict[Tuple[str, ...], Dict[str, Any]] = {}
+        for category, rows in data["rows_by_category"].items():
+            for row in rows:
+                values = {"agency": row['Agence'], "category": category}
+                group_key = tuple(values[key] for key in keys)
+                totals = groups.get(group_key)
+                if totals is None:
+                    totals = groups[group_key] = dict({key: values[key] for key in keys}, employees=0,
+                                                      **{column: 0 for column in AGGREGATED_COLUMNS})
+                totals["employees"] += 1
+                for column in AGGREGATED_COLUMNS:
+                    totals[column] += row.get(column) or 0
+
+        return [groups[group_key] for group_key in sorted(groups)]
+
+    @staticmethod
+    def _records(data: Dict[str, Any], params: Dict[str, str]) -> Dict[str, Any]:
+        """Enregistrements filtrés (critères = champs de PMTRecord), paginés"""
+        try:
+            offset = int(params.pop("offset", 0))
+            limit = min(int(params.pop("limit", API_CONFIG["max_records"])), API_CONFIG["max_records"])
+        except ValueError:
+            raise HTTPError(400, "offset et limit doivent être des entiers")
+        if offset < 0 or limit < 0:
+            raise HTTPError(400, "offset et limit doivent être positifs")
+
+        unknown = set(params) - set(RECORD_FILTERS)
+        if unknown:
+            raise HTTPError(400, f"Critères inconnus: {', '.join(sorted(unknown))}")
+
+        criteria = {}
+        for field_name, value in params.items():
+            try:
+                criteria[field_name] = RECORD_FILTERS[field_name](value)
+            except ValueError:
+                raise HTTPError(400, f"Valeur invalide pour {field_name}: {value}")
+
+        records = data["records"]
+        for field_name, value in criteria.items():
+            records = [record for record in records if getattr(record, field_name) == value]
+        return {
+            "total": len(records),
+            "offset": offset,
+            "limit": limit,
+            "records": [record.to_dict() for record in records[offset:offset + limit]]
+        }
+
+    @staticmethod
+    def _json_body(payload: Any) -> bytes:
+        """Sérialise une réponse en JSON UTF-8"""
+        return json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+
+    @staticmethod
+    async def _write_response(writer: asyncio.StreamWriter, status: int, body: bytes,
+                              etag: Optional[str] = None, keep_alive: bool = False) -> None:
+        """Écrit une réponse HTTP/1.1 JSON"""
+        headers = [
+            f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}",
+            "Content-Type: application/json; charset=utf-8",
+            f"Content-Length: {len(body)}",
+            "Cache-Control: no-cache",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}"
+        ]
+        if etag:
+            headers.append(f"ETag: {etag}")
+        writer.write(("\r\n".join(headers) + "\r\n\r\n").encode("latin1") + body)
+        await writer.drain()
@@ -6,10 +6,10 @@ import pandas as pd
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
-import tkinter as tk
-from tkinter import filedialog
 
 from src.utils.logger import logger
+from src.utils.instrumentation import start_run, timed
+from src.utils.progress import CancellationToken, ProgressCallback, ProgressReporter
 
 
 class ComparisonService:
@@ -94,25 +94,46 @@ class ComparisonService:
         except Exception as e:
             return False, f"Erreur lors de la validation: {str(e)}", {}
 
-    def compare_files(self, file1_path: str, file2_path: str) -> Dict[str, Any]:
+    def compare_files(self, file1_path: str, file2_path: str,
+                      progress_callback: Optional[ProgressCallback] = None,
+                      cancel_token: Optional[CancellationToken] = None) -> Dict[str, Any]:
         """
         Compare deux fichiers Excel et retourne les différences
         
         Args:
             file1_path: Chemin vers le premier fichier
             file2_path: Chemin vers le deuxième fichier
+            progress_callback: Callback recevant la progression par étape
+            cancel_token: Jeton d'annulation vérifié entre deux feuilles
             
         Returns:
             Dictionnaire contenant les résultats de la comparaison
+            (durées par étape sous la clé 'timings')
         """
+        with start_run("Comparaison") as run:
+            comparison_results = self._compare_files(file1_path, file2_path, progress_callback, cancel_token)
+        comparison_results['timings'] = run.to_dict()
+        return comparison_results
+
+    def _compare_files(self, file1_path: str, file2_path: str,
+                       progress_callback: Optional[ProgressCallback],
+                       cancel_token: Optional[CancellationToken]) -> Dict[str, Any]:
+        """Implémentation de compare_files (exécutée dans une exécution instrumentée)"""
         self.logger.info(f"Début de la comparaison entre {file1_path} et {file2_path}")
+
+        # 2 lectures de fichiers + 4 feuilles comparées
+        reporter = ProgressReporter(progress_callback, cancel_token, total_steps=6)
         
         # Valider les deux fichiers
-        valid1, error1, data1 = self.validate_excel_file(file1_path)
+        reporter.advance("Lecture du fichier 1")
+        with timed("Lecture du fichier 1"):
+            valid1, error1, data1 = self.validate_excel_file(file1_path)
         if not valid1:
             raise ValueError(f"Fichier 1 invalide: {error1}")
         
-        valid2, error2, data2 = self.validate_excel_file(file2_path)
+        reporter.advance("Lecture du fichier 2")
+        with timed("Lecture du fichier 2"):
+            valid2, error2, data2 = self.validate_excel_file(file2_path)
         if not valid2:
             raise ValueError(f"Fichier 2 invalide: {error2}")
         
@@ -128,19 +149,86 @@ class ComparisonService:
         }
         
         # Comparer chaque feuille
+        rows_compared = 0
         for sheet_name in ['ASTREINTES', 'HORS ASTREINTE', '3X8', 'AUTRES']:
             df1 = data1.get(sheet_name, pd.DataFrame())
             df2 = data2.get(sheet_name, pd.DataFrame())
             
-            sheet_comparison = self._compare_sheets(df1, df2, sheet_name)
+            reporter.advance(f"Comparaison de la feuille {sheet_name}", rows=rows_compared)
+            with timed(f"Feuille {sheet_name}"):
+                sheet_comparison = self._compare_sheets(df1, df2, sheet_name)
             comparison_results['sheets_comparison'][sheet_name] = sheet_comparison
+            rows_compared += len(df1) + len(df2)
+        
+        reporter.report("Terminé", rows=rows_compared, force=True)
         
         # Générer le résumé
-        comparison_results['summary'] = self._generate_summary(comparison_results)
+        with timed("Résumé"):
+            comparison_results['summary'] = self._generate_summary(comparison_results)
         
         self.logger.info("Comparaison terminée avec succès")
         return comparison_results
 
+    def compare_datasets(self, store, fingerprint1: str, fingerprint2: str) -> Dict[str, Any]:
+        """
+        Compare deux extractions enregistrées dans la base des métriques
+
+        Même résultat que compare_files sur les exports Excel des deux
+        extractions, mais obtenu par des jointures indexées (catégorie, NNI)
+        sans relire de classeur ni recalculer les métriques.
+
+        Args:
+            store: Base des métriques (MetricsStore)
+            fingerprint1: Empreinte de la première extraction
+            fingerprint2: Empreinte de la deuxième extraction
+
+        Returns:
+            Dictionnaire contenant les résultats de la comparaison
+            (durées par étape sous la clé 'timings')
+        """
+        with start_run("Comparaison (base des métriques)") as run:
+            dataset1 = store.get_dataset(fingerprint1)
+            dataset2 = store.get_dataset(fingerprint2)
+            if dataset1 is None or dataset2 is None:
+                raise ValueError("Extraction absente de la base des métriques")
+
+            comparison_results = {
+                'file1_path': dataset1['source_name'],
+                'file2_path': dataset2['source_name'],
+                'file1_name': dataset1['source_name'],
+                'file2_name': dataset2['source_name'],
+                'comparison_date': datetime.now().strftime("%d/%m/%Y %H:%M:%S"),
+                'sheets_comparison': {},
+                'summary': ""
+            }
+
+            for category, sheet_name in [('ASTREINTES', 'ASTREINTES'), ('TIPS', 'HORS ASTREINTE'),
+                                         ('3X8', '3X8'), ('AUTRES', 'AUTRES')]:
+                with timed(f"Feuille {sheet_name}"):
+                    only1, only2, common = store.diff_datasets(fingerprint1, fingerprint2, category)
+                    comparison = {
+                        'sheet_name': sheet_name,
+                        'file1_rows': len(only1) + len(common),
+                        'file2_rows': len(only2) + len(common),
+                        'employees_only_in_file1': only1,
+                        'employees_only_in_file2': only2,
+                        'common_employees': [row1['NNI'] for row1, _ in common],
+                        'differences': []
+                    }
+                    for row1, row2 in common:
+                        employee_diff = self._compare_employee_data(
+                            pd.Series(row1), pd.Series(row2), row1['NNI'], sheet_name
+                        )
+                        if employee_diff['has_differences']:
+                            comparison['differences'].append(employee_diff)
+                comparison_results['sheets_comparison'][sheet_name] = comparison
+
+            with timed("Résumé"):
+                comparison_results['summary'] = self._generate_summary(comparison_results)
+
+        comparison_results['timings'] = run.to_dict()
+        return comparison_results
+
     def _compare_sheets(self, df1: pd.DataFrame, df2: pd.DataFrame, sheet_name: str) -> Dict[str, Any]:
         """
         Compare deux feuilles Excel
@@ -310,7 +398,10 @@ class ComparisonService:
             Chemin du fichier créé
         """
         if use_file_dialog:
-            # Ouvrir un sélecteur de fichier
+            # Ouvrir un sélecteur de fichier (import local : le service reste utilisable sans interface)
+            import tkinter as tk
+            from tkinter import filedialog
+
             root = tk.Tk()
             root.withdraw()  # Cacher la fenêtre
 
@@ -343,7 +434,7 @@ class ComparisonService:
         self.logger.info(f"Export de la comparaison vers: {output_path}")
 
         try:
-            with pd.ExcelWriter(output_path, engine='xlsxwriter') as writer:
+            with start_run("Export de la comparaison"), pd.ExcelWriter(output_path, engine='xlsxwriter') as writer:
                 # Feuille de résumé
                 summary_df = pd.DataFrame({'Résumé': [results['summary']]})
                 summary_df.to_excel(writer, sheet_name='RÉSUMÉ', index=False)
@@ -2,19 +2,30 @@
 Service de traitement des fichiers CSV pour La Gabinette
 """
 
-import csv
+import hashlib
 import time
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Any, Iterator
 import pandas as pd
 
 from src.config.settings import (
-    CSV_SEPARATOR, CSV_ENCODING, EXPECTED_COLUMNS, INPUT_DIR, OUTPUT_DIR
+    CSV_SEPARATOR, CSV_ENCODING, CSV_CHUNK_SIZE, EXPECTED_COLUMNS, INPUT_DIR, OUTPUT_DIR
+)
+from src.models.data_model import (
+    CSVFormat, DatasetRef, PMTRecord, ProcessingResult, FileInfo, ValidationResult, ValidationStatus
 )
-from src.models.data_model import PMTRecord, ProcessingResult, FileInfo, ValidationResult, ValidationStatus
 from src.services.employee_classifier import EmployeeClassifier
+from src.services.employee_metrics import EmployeeMetricsTable
+from src.services.metrics_store import MetricsStore
+from src.services.record_statistics import RecordStatistics
+from src.services.row_index import CSVRowIndex
 from src.utils.logger import logger
+from src.utils.csv_format import sniff_csv_format
 from src.utils.helpers import get_file_info, validate_csv_structure, create_backup_filename
+from src.utils.instrumentation import add_time, count, start_run, timed
+from src.utils.progress import (
+    CancellationToken, OperationCancelledError, ProgressCallback, ProgressReporter
+)
 
 
 class CSVProcessor:
@@ -26,18 +37,43 @@ class CSVProcessor:
         self._current_file_path: Optional[Path] = None
         self._records: List[PMTRecord] = []
         self._processing_result: Optional[ProcessingResult] = None
-        self._classifications: Optional[Dict[str, List[PMTRecord]]] = None
 
-    def load_file(self, file_path: str) -> ProcessingResult:
+        # Métriques par employé, recalculées seulement pour les employés modifiés
+        self.metrics = EmployeeMetricsTable()
+
+        # Statistiques de résumé accumulées pendant la lecture
+        self._statistics = RecordStatistics()
+
+        # Dernière version lue (rechargement incrémental) : voir _get_append_offset
+        self._load_state: Optional[Dict[str, Any]] = None
+
+        # Index des lignes brutes par NNI / date (vues de détail) : voir index_file
+        self._row_index: Optional[CSVRowIndex] = None
+
+    def load_file(self, file_path: str, progress_callback: Optional[ProgressCallback] = None,
+                  cancel_token: Optional[CancellationToken] = None,
+                  incremental: bool = False) -> ProcessingResult:
         """
         Charge et traite un fichier CSV
 
         Args:
             file_path: Chemin vers le fichier CSV
+            progress_callback: Callback recevant la progression (lignes, octets, étape)
+            cancel_token: Jeton d'annulation vérifié entre deux blocs de lignes
+            incremental: Si le fichier déjà chargé a seulement été complété de
+                nouvelles lignes, ne traiter que ces lignes (sinon rechargement complet)
 
         Returns:
-            Résultat du traitement
+            Résultat du traitement (durées par étape dans `timings`)
         """
+        with start_run("Chargement CSV") as run:
+            result = self._load_file(file_path, progress_callback, cancel_token, incremental)
+        result.timings = run.to_dict()
+        return result
+
+    def _load_file(self, file_path: str, progress_callback: Optional[ProgressCallback],
+                   cancel_token: Optional[CancellationToken], incremental: bool = False) -> ProcessingResult:
+        """Implémentation de load_file (exécutée dans une exécution instrumentée)"""
         start_time = time.time()
         self.logger.info(f"Début du traitement du fichier: {file_path}")
 
@@ -58,8 +94,12 @@ class CSVProcessor:
                 extension=file_info_dict["extension"]
             )
 
+            reporter = ProgressReporter(progress_callback, cancel_token, total_bytes=file_info.size)
+            reporter.report("Validation de la structure", force=True)
+
             # Valider la structure du fichier
-            validation_result = self._validate_file_structure(path)
+            with timed("Validation de la structure"):
+                validation_result = self._validate_file_structure(path)
             if not validation_result["is_valid"]:
                 return ProcessingResult(
                     success=False,
@@ -68,13 +108,42 @@ class CSVProcessor:
                     processing_time=time.time() - start_time
                 )
 
-            # Traiter le fichier
-            records, validation_results = self._process_csv_file(path)
+            csv_format = validation_result["format"]
+            self.logger.info(f"Format détecté: encodage {csv_format.encoding}, séparateur {csv_format.separator!r}")
+
+            # Reprendre après la dernière ligne lue si seul l'ajout de lignes a eu lieu
+            append_offset = self._get_append_offset(path, csv_format) if incremental else None
+            if append_offset is not None:
+                self.logger.info(f"Rechargement incrémental à partir de l'octet {append_offset}")
+                new_records, new_validation_results, read_info = self._process_csv_file(
+                    path, reporter, start_offset=append_offset,
+                    columns=self._load_state["columns"],
+                    first_row_number=self._load_state["rows"] + 2,
+                    csv_format=csv_format
+                )
+            else:
+                new_records, new_validation_results, read_info = self._process_csv_file(
+                    path, reporter, csv_format=csv_format
+                )
 
-            # Calculer les statistiques
-            records_valid = sum(1 for r in records if not any(v.status == ValidationStatus.ERROR for v in r.validation_results))
-            records_with_warnings = sum(1 for r in records if any(v.status == ValidationStatus.WARNING for v in r.validation_results))
-            records_with_errors = sum(1 for r in records if any(v.status == ValidationStatus.ERROR for v in r.validation_results))
+            # Statistiques des nouvelles lignes, accumulées pendant la lecture
+            new_statistics: RecordStatistics = read_info["statistics"]
+            records_valid = new_statistics.records_valid
+            records_with_warnings = new_statistics.records_with_warnings
+            records_with_errors = new_statistics.records_with_errors
+
+            if append_offset is not None:
+                previous = self._processing_result
+                records = self._records + new_records
+                validation_results = previous.validation_results + new_validation_results
+                records_valid += previous.records_valid
+                records_with_warnings += previous.records_with_warnings
+                records_with_errors += previous.records_with_errors
+                self.metrics.add_records(new_records)
+            else:
+                records = new_records
+                validation_results = new_validation_results
+                self.metrics.reset(records)
 
             # Créer le résultat
             result = ProcessingResult(
@@ -85,17 +154,47 @@ class CSVProcessor:
                 records_with_warnings=records_with_warnings,
                 records_with_errors=records_with_errors,
                 validation_results=validation_results,
-                processing_time=time.time() - start_time
+                processing_time=time.time() - start_time,
+                records_appended=len(new_records) if append_offset is not None else 0,
+                incremental=append_offset is not None,
+                csv_format=csv_format
             )
 
             # Sauvegarder l'état
             self._current_file_path = path
             self._records = records
             self._processing_result = result
+            if append_offset is not None:
+                self._statistics.merge(new_statistics)
+            else:
+                self._statistics = new_statistics
+            rows_read = read_info["rows"]
+            if append_offset is not None:
+                rows_read += self._load_state["rows"]
+            self._load_state = {
+                "path": path.resolve(),
+                "offset": read_info["end_offset"],
+                "last_row_hash": self._hash_last_row(path, read_info["end_offset"]),
+                "columns": read_info["columns"],
+                "rows": rows_read,
+                "format": csv_format
+            }
 
+            reporter.report("Terminé", rows=len(records), bytes_processed=file_info.size, force=True)
             self.logger.info(f"Traitement terminé: {len(records)} enregistrements traités en {result.processing_time:.2f}s")
             return result
 
+        except OperationCancelledError as e:
+            # L'état précédent (dernier fichier chargé) est conservé
+            self.logger.info(f"Chargement annulé: {file_path}")
+            return ProcessingResult(
+                success=False,
+                file_info=file_info,
+                error_message=str(e),
+                processing_time=time.time() - start_time,
+                cancelled=True
+            )
+
         except Exception as e:
             error_msg = f"Erreur lors du traitement du fichier: {str(e)}"
             self.logger.error(error_msg)
@@ -123,15 +222,14 @@ class CSVProcessor:
             file_path: Chemin vers le fichier
 
         Returns:
-            Résultat de la validation
+            Résultat de la validation (format détecté dans 'format' si le fichier est lisible)
         """
         try:
-            # Lire seulement la première ligne pour vérifier les en-têtes
-            with open(file_path, 'r', encoding=CSV_ENCODING) as file:
-                reader = csv.reader(file, delimiter=CSV_SEPARATOR)
-                headers = next(reader, [])
-
-            return validate_csv_structure(headers, EXPECTED_COLUMNS)
+            # Lire seulement les premiers Ko : encodage, séparateur et en-têtes
+            csv_format = sniff_csv_format(file_path)
+            result = validate_csv_structure(csv_format.columns, EXPECTED_COLUMNS)
+            result["format"] = csv_format
+            return result
 
         except Exception as e:
             self.logger.error(f"Erreur lors de la validation de la structure: {str(e)}")
@@ -144,61 +242,190 @@ class CSVProcessor:
                 "column_count": 0
             }
 
-    def _process_csv_file(self, file_path: Path) -> Tuple[List[PMTRecord], List[ValidationResult]]:
+    def _process_csv_file(self, file_path: Path,
+                          reporter: Optional[ProgressReporter] = None,
+                          start_offset: Optional[int] = None,
+                          columns: Optional[List[str]] = None,
+                          first_row_number: int = 2,
+                          csv_format: Optional[CSVFormat] = None) -> Tuple[List[PMTRecord], List[ValidationResult], Dict[str, Any]]:
         """
-        Traite le contenu du fichier CSV
+        Traite le contenu du fichier CSV par blocs de CSV_CHUNK_SIZE lignes
 
         Args:
             file_path: Chemin vers le fichier
+            reporter: Suivi de progression / annulation (optionnel)
+            start_offset: Octet de reprise (lecture de la fin du fichier, sans en-tête)
+            columns: Noms de colonnes tels que lus par pandas lors de la première lecture
+                (obligatoires avec start_offset)
+            first_row_number: Numéro de ligne de la première ligne lue (2 = après l'en-tête)
+            csv_format: Encodage et séparateur détectés (défaut: CSV_ENCODING / CSV_SEPARATOR)
 
         Returns:
-            Tuple contenant la liste des enregistrements et les résultats de validation
+            Tuple (enregistrements, résultats de validation, informations de lecture :
+            'columns', 'end_offset', 'rows' lues et 'statistics' des enregistrements)
         """
         records = []
         all_validation_results = []
+        statistics = RecordStatistics()
+        reporter = reporter or ProgressReporter()
+        csv_format = csv_format or CSVFormat(encoding=CSV_ENCODING, separator=CSV_SEPARATOR)
+        # Une reprise en milieu de fichier ne repasse pas par le BOM
+        encoding = csv_format.encoding if start_offset is None else csv_format.byte_encoding
 
         try:
-            # Utiliser pandas pour une lecture plus robuste
-            df = pd.read_csv(
-                file_path,
-                sep=CSV_SEPARATOR,
-                encoding=CSV_ENCODING,
-                dtype=str,  # Tout lire comme string pour éviter les conversions automatiques
-                na_filter=False  # Éviter la conversion des valeurs vides en NaN
-            )
+            with open(file_path, 'rb') as raw_file:
+                read_options = {}
+                if start_offset is not None:
+                    raw_file.seek(start_offset)
+                    read_options = {"header": None, "names": columns}
+
+                # Utiliser pandas pour une lecture plus robuste
+                reader = pd.read_csv(
+                    raw_file,
+                    sep=csv_format.separator,
+                    encoding=encoding,
+                    dtype=str,  # Tout lire comme string pour éviter les conversions automatiques
+                    na_filter=False,  # Éviter la conversion des valeurs vides en NaN
+                    chunksize=CSV_CHUNK_SIZE,
+                    **read_options
+                )
 
-            self.logger.info(f"Fichier lu avec pandas: {len(df)} lignes, {len(df.columns)} colonnes")
+                total_rows = 0
+                chunks = iter(reader)
+                while True:
+                    with timed("read_csv"):
+                        df = next(chunks, None)
+                    if df is None:
+                        break
+
+                    total_rows += len(df)
+                    if columns is None:
+                        columns = list(df.columns)
+                    reporter.report("Lecture du fichier", rows=len(records), bytes_processed=raw_file.tell())
+
+                    # Durées cumulées à la main : un chronomètre par ligne coûterait trop cher
+                    build_seconds = 0.0
+                    validate_seconds = 0.0
+                    row_errors = 0
+
+                    # Traiter chaque ligne
+                    for index, row in df.iterrows():
+                        row_number = index + first_row_number  # index commence à 0, l'en-tête est la ligne 1
+
+                        try:
+                            # Créer l'enregistrement PMT
+                            step_start = time.perf_counter()
+                            record = self._create_pmt_record(row.to_dict(), row_number)
+                            step_end = time.perf_counter()
+                            build_seconds += step_end - step_start
+
+                            # Valider l'enregistrement
+                            validation_results = record.validate()
+                            statistics.add(record, validation_results)
+                            validate_seconds += time.perf_counter() - step_end
+                            all_validation_results.extend(validation_results)
+
+                            records.append(record)
+
+                        except Exception as e:
+                            row_errors += 1
+                            error_msg = f"Erreur lors du traitement de la ligne {row_number}: {str(e)}"
+                            self.logger.error(error_msg)
+
+                            all_validation_results.append(ValidationResult(
+                                status=ValidationStatus.ERROR,
+                                message=error_msg,
+                                row_number=row_number
+                            ))
+
+                    add_time("Construction des enregistrements", build_seconds, calls=len(df))
+                    add_time("Validation des enregistrements", validate_seconds, calls=len(df))
+                    count("lignes", len(df))
+                    if row_errors:
+                        count("lignes_en_erreur", row_errors)
+
+                    # Point d'annulation entre deux blocs
+                    reporter.report("Construction des enregistrements", rows=len(records),
+                                    bytes_processed=raw_file.tell())
+
+                end_offset = raw_file.tell()
+
+            self.logger.info(f"Fichier lu avec pandas: {total_rows} lignes")
+            read_info = {"columns": columns, "end_offset": end_offset, "rows": total_rows,
+                         "statistics": statistics}
+            return records, all_validation_results, read_info
+
+        except OperationCancelledError:
+            raise
+
+        except Exception as e:
+            error_msg = f"Erreur lors de la lecture du fichier CSV: {str(e)}"
+            self.logger.error(error_msg)
+            raise
 
-            # Traiter chaque ligne
-            for index, row in df.iterrows():
-                row_number = index + 2  # +2 car index commence à 0 et on compte l'en-tête
+    def _get_append_offset(self, path: Path, csv_format: CSVFormat) -> Optional[int]:
+        """
+        Détermine si le fichier est le dernier chargé, seulement complété de lignes
 
-                try:
-                    # Créer l'enregistrement PMT
-                    record = self._create_pmt_record(row.to_dict(), row_number)
+        Le fichier doit avoir le même chemin, une taille au moins égale à la
+        précédente lecture, se terminer alors par une fin de ligne et sa
+        dernière ligne lue doit être inchangée (empreinte). Une extraction
+        régénérée ou modifiée en place est donc rechargée entièrement.
 
-                    # Valider l'enregistrement
-                    validation_results = record.validate()
-                    all_validation_results.extend(validation_results)
+        Args:
+            path: Fichier à charger
+            csv_format: Format détecté (doit être celui de la lecture précédente)
 
-                    records.append(record)
+        Returns:
+            Octet à partir duquel lire les nouvelles lignes, ou None
+        """
+        state = self._load_state
+        if state is None or self._processing_result is None or state["columns"] is None:
+            return None
+        if path.resolve() != state["path"]:
+            return None
+        if state["format"] != csv_format:
+            self.logger.info("Format du fichier modifié depuis le dernier chargement: rechargement complet")
+            return None
 
-                except Exception as e:
-                    error_msg = f"Erreur lors du traitement de la ligne {row_number}: {str(e)}"
-                    self.logger.error(error_msg)
+        try:
+            if path.stat().st_size < state["offset"]:
+                self.logger.info("Fichier raccourci depuis le dernier chargement: rechargement complet")
+                return None
+            if state["last_row_hash"] is None:
+                # Dernière ligne lue sans fin de ligne : un ajout a pu la prolonger
+                self.logger.info("Dernière ligne lue incomplète: rechargement complet")
+                return None
+            if self._hash_last_row(path, state["offset"]) != state["last_row_hash"]:
+                self.logger.info("Fichier modifié depuis le dernier chargement: rechargement complet")
+                return None
+        except OSError:
+            return None
+
+        return state["offset"]
+
+    @staticmethod
+    def _hash_last_row(path: Path, offset: int) -> Optional[str]:
+        """
+        Empreinte SHA-1 de la dernière ligne complète avant `offset`
 
-                    all_validation_results.append(ValidationResult(
-                        status=ValidationStatus.ERROR,
-                        message=error_msg,
-                        row_number=row_number
-                    ))
+        Args:
+            path: Fichier CSV
+            offset: Fin de la zone déjà lue
 
-            return records, all_validation_results
+        Returns:
+            Empreinte hexadécimale, ou None si la zone ne se termine pas par une fin de ligne
+        """
+        block_size = 64 * 1024
+        with open(path, 'rb') as file:
+            start = max(0, offset - block_size)
+            file.seek(start)
+            tail = file.read(offset - start)
 
-        except Exception as e:
-            error_msg = f"Erreur lors de la lecture du fichier CSV: {str(e)}"
-            self.logger.error(error_msg)
-            raise
+        if not tail.endswith(b"\n"):
+            return None  # Dernière ligne incomplète : un ajout la prolongerait
+        last_line = tail[:-1].rsplit(b"\n", 1)[-1]
+        return hashlib.sha1(last_line).hexdigest()
 
     def _create_pmt_record(self, row_data: Dict[str, Any], row_number: int) -> PMTRecord:
         """
@@ -225,6 +452,9 @@ class CSVProcessor:
         # Cette partie nécessite une logique spécifique basée sur l'ordre des colonnes
         self._map_time_columns(record, de_a_columns)
 
+        # Poste 3x8 calculé une fois ici, relu par la classification et les filtres
+        record.shift_code = record.compute_shift_code()
+
         return record
 
     def _map_time_columns(self, record: PMTRecord, de_a_columns: List[Tuple[str, str]]) -> None:
@@ -278,6 +508,102 @@ class CSVProcessor:
         """
         return self._records.copy()
 
+    def index_file(self, file_path: str) -> CSVRowIndex:
+        """
+        Indexe les lignes d'un fichier par NNI et par date, sans les charger
+
+        Le fichier est projeté en mémoire ; seules les positions des lignes
+        sont conservées. Les enregistrements d'un employé sont ensuite relus
+        à la demande par get_employee_records.
+
+        Args:
+            file_path: Chemin vers le fichier CSV
+
+        Returns:
+            Index des lignes
+        """
+        path = Path(file_path)
+        if not path.exists():
+            raise FileNotFoundError(f"Le fichier {file_path} n'existe pas")
+
+        validation_result = self._validate_file_structure(path)
+        if not validation_result["is_valid"]:
+            raise Exception(f"Structure de fichier invalide: {'; '.join(validation_result['errors'])}")
+
+        csv_format = validation_result["format"]
+        with timed("Indexation des lignes"):
+            index = CSVRowIndex(path, csv_format).build()
+        count("lignes_indexees", index.row_count)
+
+        if self._row_index is not None:
+            self._row_index.close()
+        self._row_index = index
+        return index
+
+    def get_employee_records(self, nni: str, jour: Optional[str] = None,
+                             file_path: Optional[str] = None) -> List[PMTRecord]:
+        """
+        Relit les enregistrements d'un employé depuis l'index des lignes brutes
+
+        L'index est construit au premier appel (ou reconstruit si le fichier a
+        changé) ; les enregistrements obtenus sont identiques à ceux d'un
+        chargement complet, numéros de ligne compris.
+
+        Args:
+            nni: NNI de l'employé
+            jour: Limiter à un jour (JJ/MM/AAAA)
+            file_path: Fichier à lire (défaut: dernier fichier chargé ou indexé)
+
+        Returns:
+            Enregistrements de l'employé, dans l'ordre du fichier
+        """
+        index = self._row_index
+        if file_path is not None:
+            path = Path(file_path)
+        elif self._current_file_path is not None:
+            path = self._current_file_path
+        elif index is not None:
+            path = index.file_path
+        else:
+            return []
+
+        if index is None or index.file_path.resolve() != path.resolve() or index.is_stale():
+            index = self.index_file(str(path))
+
+        records = []
+        for row_number, row_data in index.get_rows(nni=nni, date=jour):
+            record = self._create_pmt_record(row_data, row_number)
+            record.validate()
+            records.append(record)
+        return records
+
+    def get_dataset_ref(self) -> Optional[DatasetRef]:
+        """
+        Référence des données chargées pour la base des métriques (MetricsStore)
+
+        L'empreinte porte sur les octets effectivement lus ; elle est calculée
+        au premier appel puis conservée jusqu'au prochain chargement.
+
+        Returns:
+            Référence, ou None si aucun fichier n'est chargé ou s'il a été modifié depuis
+        """
+        state = self._load_state
+        if state is None:
+            return None
+        if "fingerprint" not in state:
+            path = state["path"]
+            try:
+                if state["last_row_hash"] is None:
+                    # Sans fin de ligne, pas d'empreinte de la dernière ligne : seul un fichier de même taille est sûr
+                    if path.stat().st_size != state["offset"]:
+                        return None
+                elif self._hash_last_row(path, state["offset"]) != state["last_row_hash"]:
+                    return None
+                state["fingerprint"] = MetricsStore.fingerprint_file(path, state["offset"])
+            except OSError:
+                return None
+        return DatasetRef(fingerprint=state["fingerprint"], source_name=state["path"].name)
+
     def get_processing_result(self) -> Optional[ProcessingResult]:
         """
         Retourne le résultat du dernier traitement
@@ -311,57 +637,33 @@ class CSVProcessor:
 
     def get_summary_statistics(self) -> Dict[str, Any]:
         """
-        Calcule des statistiques de résumé sur les données
+        Retourne les statistiques de résumé sur les données
+
+        Les statistiques sont accumulées pendant la lecture (voir
+        RecordStatistics) : aucun parcours des enregistrements ici.
 
         Returns:
             Dictionnaire avec les statistiques
         """
         if not self._records:
             return {}
+        return self._statistics.to_dict()
 
-        stats = {
-            "total_records": len(self._records),
-            "unique_employees": len(set((r.nom, r.prenom) for r in self._records if r.nom and r.prenom)),
-            "unique_teams": len(set(r.equipe_lib for r in self._records if r.equipe_lib)),
-            "date_range": self._get_date_range(),
-            "validation_summary": self._get_validation_summary()
-        }
-
-        return stats
-
-    def _get_date_range(self) -> Dict[str, str]:
-        """Calcule la plage de dates des enregistrements"""
-        dates = [r.jour for r in self._records if r.jour]
-        if not dates:
-            return {"min_date": "", "max_date": ""}
-
-        return {
-            "min_date": min(dates),
-            "max_date": max(dates)
-        }
-
-    def _get_validation_summary(self) -> Dict[str, int]:
-        """Calcule un résumé des validations"""
-        total_errors = sum(
-            len([v for v in r.validation_results if v.status == ValidationStatus.ERROR])
-            for r in self._records
-        )
-        total_warnings = sum(
-            len([v for v in r.validation_results if v.status == ValidationStatus.WARNING])
-            for r in self._records
-        )
-
-        return {
-            "total_errors": total_errors,
-            "total_warnings": total_warnings,
-            "records_with_errors": len([r for r in self._records if any(v.status == ValidationStatus.ERROR for v in r.validation_results)]),
-            "records_with_warnings": len([r for r in self._records if any(v.status == ValidationStatus.WARNING for v in r.validation_results)])
-        }
+    def get_teams(self) -> List[str]:
+        """
+        Libellés d'équipe présents dans les données, triés
+
+        Returns:
+            Liste des équipes
+        """
+        return self._statistics.teams
 
     def classify_employees(self) -> Dict[str, List[PMTRecord]]:
         """
         Classifie les employés en 4 catégories
 
+        Le résultat est partagé (mémorisé jusqu'au prochain chargement) : ne pas le modifier.
+
         Returns:
             Dictionnaire avec les classifications
         """
@@ -370,9 +672,20 @@ class CSVProcessor:
             return {'ASTREINTES': [], 'TIPS': [], '3X8': [], 'AUTRES': []}
 
         self.logger.info("Classification des employés en cours...")
-        self._classifications = self.classifier.classify_employees(self._records)
-        
-        return self._classifications
+        with start_run("Classification"):
+            # Seuls les employés ajoutés ou complétés depuis le dernier calcul sont reclassés
+            return self.metrics.get_classifications()
+
+    def get_filtered_classifications(self) -> Dict[str, List[PMTRecord]]:
+        """
+        Enregistrements de chaque catégorie retenus par ses règles métier (mémorisés)
+
+        Returns:
+            Dictionnaire catégorie -> enregistrements filtrés
+        """
+        if not self._records:
+            return {'ASTREINTES': [], 'TIPS': [], '3X8': [], 'AUTRES': []}
+        return self.metrics.get_filtered_classifications()
 
     def get_classifications(self) -> Optional[Dict[str, List[PMTRecord]]]:
         """
@@ -381,9 +694,7 @@ class CSVProcessor:
         Returns:
             Classifications des employés
         """
-        if self._classifications is None:
-            return self.classify_employees()
-        return self._classifications
+        return self.classify_employees()
 
     def get_classification_summary(self) -> Dict[str, Any]:
         """
@@ -392,8 +703,7 @@ class CSVProcessor:
         Returns:
             Résumé des classifications
         """
-        if self._classifications is None:
-            self.classify_employees()
-        
-        return self.classifier.get_classification_summary(self._classifications)
+        if not self._records:
+            return self.classifier.get_classification_summary(self.classify_employees())
+        return self.metrics.get_classification_summary()
  
\ No newline at end of file
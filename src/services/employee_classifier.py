@@ -2,11 +2,10 @@
 Service de classification des employés pour La Gabinette
 """
 
-from typing import List, Dict, Set, Any
+from typing import List, Dict, Mapping, Optional, Set, Any
 from collections import defaultdict
-import pandas as pd
 
-from src.models.data_model import PMTRecord
+from src.models.data_model import PMTRecord, SHIFT_NONE
 from src.utils.logger import logger
 
 
@@ -37,12 +36,17 @@ class EmployeeClassifier:
     def __init__(self):
         self.logger = logger.get_logger("EmployeeClassifier")
 
-    def classify_employees(self, records: List[PMTRecord]) -> Dict[str, List[PMTRecord]]:
+    def classify_employees(self, records: List[PMTRecord],
+                           employees_records: Optional[Mapping[str, List[PMTRecord]]] = None,
+                           categories: Optional[Dict[str, str]] = None) -> Dict[str, List[PMTRecord]]:
         """
         Classifie tous les employés en 4 catégories
 
         Args:
             records: Liste des enregistrements PMT
+            employees_records: Enregistrements déjà groupés par NNI (ex: EmployeeRecordStore) ;
+                à défaut ils sont groupés ici
+            categories: Catégories déjà calculées par categorize_employees (optionnel)
 
         Returns:
             Dictionnaire avec les 4 catégories d'employés
@@ -50,7 +54,10 @@ class EmployeeClassifier:
         self.logger.info(f"Classification de {len(records)} enregistrements")
 
         # Grouper les enregistrements par employé (NNI)
-        employees_records = self._group_by_employee(records)
+        if employees_records is None:
+            employees_records = self._group_by_employee(records)
+        if categories is None:
+            categories = self.categorize_employees(employees_records)
         
         # Classifier chaque employé
         classifications = {
@@ -59,18 +66,34 @@ class EmployeeClassifier:
             '3X8': [],
             'AUTRES': []
         }
+        employee_counts = dict.fromkeys(classifications, 0)
 
         for nni, employee_records in employees_records.items():
-            category = self._classify_single_employee(employee_records)
+            category = categories[nni]
             classifications[category].extend(employee_records)
+            employee_counts[category] += 1
 
         # Log des statistiques
         for category, records_list in classifications.items():
-            unique_employees = len(set(record.nni for record in records_list))
-            self.logger.info(f"{category}: {unique_employees} employés, {len(records_list)} enregistrements")
+            self.logger.info(f"{category}: {employee_counts[category]} employés, {len(records_list)} enregistrements")
 
         return classifications
 
+    def categorize_employees(self, employees_records: Mapping[str, List[PMTRecord]]) -> Dict[str, str]:
+        """
+        Catégorie de chaque employé
+
+        Args:
+            employees_records: Enregistrements groupés par NNI
+
+        Returns:
+            Dictionnaire NNI -> catégorie, dans l'ordre des employés
+        """
+        return {
+            nni: self._classify_single_employee(employee_records)
+            for nni, employee_records in employees_records.items()
+        }
+
     def _group_by_employee(self, records: List[PMTRecord]) -> Dict[str, List[PMTRecord]]:
         """
         Groupe les enregistrements par employé (NNI)
@@ -159,48 +182,8 @@ class EmployeeClassifier:
         Returns:
             True si 3x8
         """
-        # Vérifier si au moins un enregistrement a des horaires 3x8
-        for record in employee_records:
-            if self._est_horaire_3x8(record):
-                return True
-        return False
-
-    def _est_horaire_3x8(self, record: PMTRecord) -> bool:
-        """
-        Détecte si un enregistrement correspond à des horaires 3x8
-
-        Args:
-            record: Enregistrement PMT
-
-        Returns:
-            True si horaires 3x8
-        """
-        # Vérifier toutes les paires d'horaires possibles
-        time_pairs = [
-            (getattr(record, 'ht_de_1', '') or '', getattr(record, 'ht_a_1', '') or ''),
-            (getattr(record, 'ht_de_2', '') or '', getattr(record, 'ht_a_2', '') or ''),
-            (getattr(record, 'htm_de_1', '') or '', getattr(record, 'htm_a_1', '') or ''),
-            (getattr(record, 'htm_de_2', '') or '', getattr(record, 'htm_a_2', '') or ''),
-            (getattr(record, 'he_de_1', '') or '', getattr(record, 'he_a_1', '') or ''),
-            (getattr(record, 'he_de_2', '') or '', getattr(record, 'he_a_2', '') or ''),
-            (getattr(record, 'heure_debut', '') or '', getattr(record, 'heure_fin', '') or '')
-        ]
-
-        for debut, fin in time_pairs:
-            if debut and fin:
-                # Poste du matin (7h30-15h30)
-                if '07:30:00' in debut and '15:30:00' in fin:
-                    return True
-                    
-                # Poste d'après-midi (15h30-23h30) 
-                if '15:30:00' in debut and '23:30:00' in fin:
-                    return True
-                    
-                # Poste de nuit (23h30-7h30)
-                if '23:30:00' in debut and '07:30:00' in fin:
-                    return True
-                    
-        return False
+        # Au moins un enregistrement sur un poste 3x8 (code calculé au chargement)
+        return any(record.get_shift_code() != SHIFT_NONE for record in employee_records)
 
     def _is_dr_paris_employee(self, record: PMTRecord) -> bool:
         """
@@ -226,22 +209,32 @@ class EmployeeClassifier:
         Returns:
             Liste filtrée des enregistrements
         """
-        filtered_records = []
-
-        for record in records:
-            if self._should_include_record(record, category):
-                filtered_records.append(record)
-
-        self.logger.info(f"Filtrage {category}: {len(filtered_records)}/{len(records)} enregistrements conservés")
+        if category == '3X8':
+            # ✅ Inclut les weekends et jours fériés (service continu)
+            # ❌ Exclut uniquement les jours d'astreinte (colonne 'Astreinte' = 'I')
+            # 📋 Horaires acceptés : matin, après-midi ou nuit (code de poste calculé
+            #    au chargement, voir PMTRecord.compute_shift_code)
+            filtered_records = [
+                record for record in records
+                if record.astreinte != 'I' and record.get_shift_code() != SHIFT_NONE
+            ]
+        else:
+            filtered_records = [record for record in records if self._should_include_record(record, category)]
+
+        # Appelée par chaque feuille et chaque graphique : DEBUG pour rester hors des profils
+        self.logger.debug(f"Filtrage {category}: {len(filtered_records)}/{len(records)} enregistrements conservés")
         return filtered_records
 
     def _should_include_record(self, record: PMTRecord, category: str) -> bool:
         """
         Détermine si un enregistrement doit être inclus selon les règles métier
 
+        La catégorie 3X8 est filtrée directement sur le code de poste par
+        filter_records_by_business_rules.
+
         Args:
             record: Enregistrement PMT
-            category: Catégorie
+            category: Catégorie ('ASTREINTES', 'TIPS', 'AUTRES')
 
         Returns:
             True si l'enregistrement doit être inclus
@@ -280,15 +273,6 @@ class EmployeeClassifier:
                 return False
             return ht == 'J'
 
-        elif category == '3X8':
-            # ✅ Inclut les weekends et jours fériés (service continu)
-            # ❌ Exclut uniquement les jours d'astreinte (colonne 'Astreinte' = 'I')
-            # 📋 Horaires acceptés : Tous les horaires 3x8 détectés
-            
-            if astreinte == 'I':
-                return False
-            return self._est_horaire_3x8(record)
-
         elif category == 'AUTRES':
             # ❌ Exclut les jours d'astreinte (colonne 'Astreinte' = 'I')
             # ❌ Exclut les jours fériés (colonne 'Jour férié' = 'X')
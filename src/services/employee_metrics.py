@@ -0,0 +1,281 @@
+"""
+Table des métriques par employé (NNI) pour La Gabinette
+"""
+
+import threading
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from src.models.data_model import PMTRecord
+from src.services.employee_classifier import EmployeeClassifier
+from src.services.overtime_calculator import OvertimeCalculator
+from src.services.parallel_metrics import ParallelMetricsExecutor
+from src.services.period_metrics import PeriodMetrics
+from src.services.record_store import EmployeeRecordStore
+from src.services.results_cache import DerivedResultsCache
+from src.services.sick_leave_calculator import SickLeaveCalculator
+from src.services.time_series import EmployeeTimeSeries
+from src.services.work_time_calculator import WorkTimeCalculator
+from src.utils.instrumentation import count, timed
+from src.utils.logger import logger
+
+
+CATEGORIES = ['ASTREINTES', 'TIPS', '3X8', 'AUTRES']
+
+
+class EmployeeMetricsTable:
+    """
+    Métriques calculées par employé, invalidées employé par employé
+
+    Toutes les métriques des services (catégorie, heures supplémentaires,
+    arrêts maladie, jours de travail) ne dépendent que des enregistrements
+    de l'employé concerné. Lorsque des lignes sont ajoutées (extraction
+    complétée de nouveaux jours), seuls les employés touchés sont marqués
+    à recalculer ; les autres conservent leurs résultats.
+
+    Les employés sont dans l'ordre de leur première apparition dans le
+    fichier. Au recalcul, les enregistrements des employés invalidés sont
+    rangés dans un EmployeeRecordStore (tri par date, tranches contiguës)
+    que tous les calculateurs parcourent ; chaque employé conserve ensuite
+    ses enregistrements dans cet ordre, ce qui donne les mêmes résultats
+    qu'un calcul complet.
+
+    Les vues assemblées (classifications, dictionnaires par NNI, vues
+    filtrées par les règles métier) sont mémorisées dans `results` jusqu'au
+    prochain ajout d'enregistrements ; elles ne doivent pas être modifiées.
+    """
+
+    def __init__(self):
+        self.logger = logger.get_logger("EmployeeMetricsTable")
+        self.classifier = EmployeeClassifier()
+        self.overtime_calculator = OvertimeCalculator()
+        self.sick_leave_calculator = SickLeaveCalculator()
+        self.work_time_calculator = WorkTimeCalculator()
+        self.executor = ParallelMetricsExecutor()  # Pool de processus au-delà de PARALLEL_CONFIG["min_records"]
+
+        self._lock = threading.RLock()
+        self._records_by_nni: Dict[str, List[PMTRecord]] = {}
+        self._categories: Dict[str, str] = {}
+        self._overtime: Dict[str, float] = {}
+        self._sick_leave: Dict[str, Dict[str, Any]] = {}
+        self._work_days: Dict[str, Dict[str, Any]] = {}
+        self._dirty: Set[str] = set()
+        self.results = DerivedResultsCache(self._lock)
+
+    def reset(self, records: Iterable[PMTRecord]) -> None:
+        """Remplace toutes les données (chargement complet d'un fichier)"""
+        with self._lock:
+            self._records_by_nni = {}
+            self._categories = {}
+            self._overtime = {}
+            self._sick_leave = {}
+            self._work_days = {}
+            self._dirty = set()
+            self.add_records(records)
+
+    def add_records(self, records: Iterable[PMTRecord]) -> Set[str]:
+        """
+        Ajoute des enregistrements et invalide les employés concernés
+
+        Args:
+            records: Nouveaux enregistrements (ordre du fichier)
+
+        Returns:
+            NNI des employés invalidés
+        """
+        touched: Set[str] = set()
+        with self._lock:
+            for record in records:
+                if not record.nni:
+                    continue  # Ignorés par tous les calculateurs
+                self._records_by_nni.setdefault(record.nni, []).append(record)
+                touched.add(record.nni)
+            self._dirty |= touched
+            self.results.invalidate()
+        return touched
+
+    @property
+    def dirty_count(self) -> int:
+        """Nombre d'employés à recalculer"""
+        return len(self._dirty)
+
+    def refresh(self) -> int:
+        """
+        Recalcule les métriques des seuls employés invalidés
+
+        Returns:
+            Nombre d'employés recalculés
+        """
+        with self._lock:
+            if not self._dirty:
+                return 0
+
+            dirty = [nni for nni in self._records_by_nni if nni in self._dirty]
+            self.logger.info(f"Recalcul des métriques de {len(dirty)}/{len(self._records_by_nni)} employés")
+
+            with timed("Métriques par employé"):
+                count("employes_recalcules", len(dirty))
+
+                with timed("Partitionnement par employé"):
+                    store = EmployeeRecordStore(
+                        record for nni in dirty for record in self._records_by_nni[nni]
+                    )
+                    records = store.records
+                    for nni, employee_records in store.items():
+                        self._records_by_nni[nni] = employee_records
+
+                if self.executor.should_run(len(records)):
+                    categories, overtime, sick_leave, work_days = self.executor.compute(store)
+                    self._overtime.update(overtime)
+                    self._sick_leave.update(sick_leave)
+                else:
+                    with timed("Classification"):
+                        categories = self.classifier.categorize_employees(store)
+                        classifications = self.classifier.classify_employees(records, store, categories)
+
+                    with timed("OvertimeCalculator"):
+                        self._overtime.update(self.overtime_calculator.calculate_all_employees_overtime(records, store))
+                    with timed("SickLeaveCalculator"):
+                        self._sick_leave.update(self.sick_leave_calculator.calculate_all_employees_sick_leave(records, store))
+                    with timed("WorkTimeCalculator"):
+                        work_days = self.work_time_calculator.calculate_all_employees_work_days(
+                            records, classifications, store, categories
+                        )
+                self._categories.update(categories)
+
+            for nni in dirty:
+                # Un employé peut changer de catégorie : on efface l'ancienne valeur
+                self._work_days.pop(nni, None)
+            for category, stats_by_nni in work_days.items():
+                for nni, stats in stats_by_nni.items():
+                    self._work_days[nni] = {'category': category, 'stats': stats}
+
+            self._dirty.clear()
+            return len(dirty)
+
+    def get_classifications(self) -> Dict[str, List[PMTRecord]]:
+        """Enregistrements par catégorie (même forme que EmployeeClassifier.classify_employees)"""
+        return self.results.get("classifications", self._build_classifications)
+
+    def get_filtered_classifications(self) -> Dict[str, List[PMTRecord]]:
+        """Enregistrements par catégorie retenus par les règles métier de la catégorie"""
+        return self.results.get("filtered_classifications", lambda: {
+            category: self.classifier.filter_records_by_business_rules(records, category)
+            for category, records in self.get_classifications().items()
+        })
+
+    def get_classification_summary(self) -> Dict[str, Any]:
+        """Résumé des classifications (EmployeeClassifier.get_classification_summary)"""
+        return self.results.get("classification_summary", lambda: self.classifier.get_classification_summary(
+            self.get_classifications()
+        ))
+
+    def _build_classifications(self) -> Dict[str, List[PMTRecord]]:
+        """Assemble les classifications à partir des catégories par NNI"""
+        with self._lock:
+            self.refresh()
+            classifications: Dict[str, List[PMTRecord]] = {category: [] for category in CATEGORIES}
+            for nni, records in self._records_by_nni.items():
+                classifications[self._categories[nni]].extend(records)
+            return classifications
+
+    def get_categories(self) -> Dict[str, str]:
+        """Catégorie de chaque NNI, dans l'ordre des employés"""
+        return self.results.get("categories", self._build_categories)
+
+    def _build_categories(self) -> Dict[str, str]:
+        """Assemble les catégories dans l'ordre des employés"""
+        with self._lock:
+            self.refresh()
+            return {nni: self._categories[nni] for nni in self._records_by_nni}
+
+    def get_overtime_by_employee(self) -> Dict[str, float]:
+        """Heures supplémentaires par NNI"""
+        return self.results.get("overtime", self._build_overtime)
+
+    def _build_overtime(self) -> Dict[str, float]:
+        """Assemble les heures supplémentaires dans l'ordre des employés"""
+        with self._lock:
+            self.refresh()
+            return {nni: self._overtime[nni] for nni in self._records_by_nni}
+
+    def get_sick_leave_by_employee(self) -> Dict[str, Dict[str, Any]]:
+        """Statistiques d'arrêt maladie par NNI"""
+        return self.results.get("sick_leave", self._build_sick_leave)
+
+    def _build_sick_leave(self) -> Dict[str, Dict[str, Any]]:
+        """Assemble les arrêts maladie dans l'ordre des employés"""
+        with self._lock:
+            self.refresh()
+            return {nni: self._sick_leave[nni] for nni in self._records_by_nni}
+
+    def get_work_days_by_category(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Jours de travail par catégorie puis par NNI (ASTREINTES et TIPS)"""
+        return self.results.get("work_days", self._build_work_days)
+
+    def _build_work_days(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Assemble les jours de travail par catégorie"""
+        with self._lock:
+            self.refresh()
+            if not self._records_by_nni:
+                return {}
+            work_days: Dict[str, Dict[str, Dict[str, Any]]] = {"ASTREINTES": {}, "TIPS": {}}
+            for nni in self._records_by_nni:
+                entry = self._work_days.get(nni)
+                if entry is not None:
+                    work_days[entry['category']][nni] = entry['stats']
+            return work_days
+
+    def get_record_store(self) -> EmployeeRecordStore:
+        """Enregistrements partitionnés par employé (triés par date), sans nouveau tri"""
+        return self.results.get("record_store", self._build_record_store)
+
+    def _build_record_store(self) -> EmployeeRecordStore:
+        """Assemble le magasin à partir des enregistrements déjà triés de chaque employé"""
+        with self._lock:
+            self.refresh()
+            records: List[PMTRecord] = []
+            offsets = [0]
+            for employee_records in self._records_by_nni.values():
+                records.extend(employee_records)
+                offsets.append(len(records))
+            return EmployeeRecordStore.from_sorted(records, list(self._records_by_nni), offsets)
+
+    def get_period_metrics(self, start: Optional[date] = None, end: Optional[date] = None,
+                           granularity: str = "month") -> List[Dict[str, Any]]:
+        """
+        Métriques par employé de chaque période (voir PeriodMetrics.metrics)
+
+        Args:
+            start: Premier jour (défaut: première date de l'extraction)
+            end: Dernier jour (défaut: dernière date de l'extraction)
+            granularity: "day", "week", "month", "quarter", "year" ou "all"
+
+        Returns:
+            Une entrée par période
+        """
+        key = ("period_metrics", start, end, granularity)
+        return self.results.get(key, lambda: PeriodMetrics(
+            self.get_record_store(), dict(self._categories)
+        ).metrics(start, end, granularity))
+
+    def get_time_series(self) -> EmployeeTimeSeries:
+        """Séries journalières par employé (fenêtres glissantes sans recalcul)"""
+        return self.results.get("time_series", lambda: EmployeeTimeSeries(
+            self.get_record_store(), dict(self._categories)
+        ))
+
+    def get_employee_metrics(self, nni: str) -> Optional[Dict[str, Any]]:
+        """Métriques d'un employé (None s'il est inconnu)"""
+        with self._lock:
+            if nni not in self._records_by_nni:
+                return None
+            self.refresh()
+            work_days = self._work_days.get(nni)
+            return {
+                'nni': nni,
+                'category': self._categories[nni],
+                'overtime_hours': self._overtime.get(nni, 0.0),
+                'sick_leave': self._sick_leave.get(nni, {}),
+                'work_days': work_days['stats'] if work_days else {}
+            }
@@ -2,33 +2,65 @@
 Service d'export pour La Gabinette
 """
 
+import time
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import Iterable, List, Dict, Any, Optional, Set, Tuple
 import pandas as pd
 from datetime import datetime
 
 from src.config.settings import OUTPUT_DIR, EXPORT_CONFIG
-from src.models.data_model import PMTRecord, ValidationResult
+from src.models.data_model import DatasetRef, PMTRecord, ValidationResult
 from src.services.employee_classifier import EmployeeClassifier
+from src.services.employee_metrics import EmployeeMetricsTable
+from src.services.metrics_store import MetricsStore
 from src.services.overtime_calculator import OvertimeCalculator
+from src.services.parallel_metrics import ParallelMetricsExecutor
+from src.services.parquet_dataset import PartitionedParquetDataset
+from src.services.record_exporter import RECORD_EXPORT_FORMATS, write_records
+from src.services.record_store import EmployeeRecordStore
 from src.services.sick_leave_calculator import SickLeaveCalculator
 from src.services.work_time_calculator import WorkTimeCalculator
 from src.utils.logger import logger
 from src.utils.helpers import create_backup_filename
+from src.utils.instrumentation import TimingNode, add_time, start_run, timed
+from src.utils.progress import (
+    CancellationToken, OperationCancelledError, ProgressCallback, ProgressReporter
+)
+
+
+# Agences détaillées dans le résumé texte (section AGENCES)
+SUMMARY_AGENCIES = ['Batignolles', 'Italie', 'Grenelle', 'Paris Est']
 
 
 class ExportService:
     """Service d'export des données PMT"""
 
-    def __init__(self):
+    def __init__(self, metrics_store: Optional[MetricsStore] = None):
         self.logger = logger.get_logger("ExportService")
+        self.metrics_store = metrics_store
         self.classifier = EmployeeClassifier()
         self.overtime_calculator = OvertimeCalculator()
         self.sick_leave_calculator = SickLeaveCalculator()
         self.work_time_calculator = WorkTimeCalculator()
+        self.executor = ParallelMetricsExecutor()  # Pool de processus au-delà de PARALLEL_CONFIG["min_records"]
+        self._last_run: Optional[TimingNode] = None
+        # Catégorie -> (liste source, vue filtrée par les règles métier) : voir _filter_by_rules
+        self._rule_views: Dict[str, Tuple[List[PMTRecord], List[PMTRecord]]] = {}
+
+    @property
+    def last_timings(self) -> Dict[str, Any]:
+        """Arbre des durées par étape du dernier export (vide si aucun)"""
+        return self._last_run.to_dict() if self._last_run is not None else {}
+
+    # Étapes de l'export Excel : 4 calculs, 4 feuilles, graphiques, enregistrement
+    EXCEL_EXPORT_STEPS = 10
 
     def export_to_excel(self, records: List[PMTRecord], output_path: Optional[str] = None,
-                       use_file_dialog: bool = False) -> str:
+                       use_file_dialog: bool = False,
+                       progress_callback: Optional[ProgressCallback] = None,
+                       cancel_token: Optional[CancellationToken] = None,
+                       metrics: Optional[EmployeeMetricsTable] = None,
+                       dataset: Optional[DatasetRef] = None) -> str:
         """
         Exporte les enregistrements vers un fichier Excel avec classification par catégorie d'employés
 
@@ -36,6 +68,12 @@ class ExportService:
             records: Liste des enregistrements à exporter
             output_path: Chemin de sortie (optionnel)
             use_file_dialog: Si True, ouvre un sélecteur de fichier
+            progress_callback: Callback recevant la progression par étape
+            cancel_token: Jeton d'annulation vérifié entre deux étapes
+            metrics: Métriques par employé déjà calculées pour exactement ces
+                enregistrements (ex: CSVProcessor.metrics), réutilisées au lieu d'être recalculées
+            dataset: Extraction exportée (CSVProcessor.get_dataset_ref) ; avec un
+                metrics_store, les métriques par employé y sont enregistrées ou relues
 
         Returns:
             Chemin du fichier créé
@@ -77,147 +115,75 @@ class ExportService:
 
         self.logger.info(f"Export Excel avec classification vers: {output_path}")
 
-        try:
-            # Classifier les employés
-            classifications = self.classifier.classify_employees(records)
-
-            # Calculer les heures supplémentaires pour tous les employés
-            overtime_by_employee = self.overtime_calculator.calculate_all_employees_overtime(records)
-
-            # Calculer les arrêts maladie pour tous les employés
-            sick_leave_by_employee = self.sick_leave_calculator.calculate_all_employees_sick_leave(records)
-            self.logger.info(f"Statistiques d'arrêt maladie calculées pour {len(sick_leave_by_employee)} employés")
-
-            # Calculer les jours de travail pour tous les employés
-            work_days_by_category = self.work_time_calculator.calculate_all_employees_work_days(records, classifications)
-            self.logger.info(f"Statistiques de jours de travail calculées pour {len(work_days_by_category)} catégories")
-
-            # Créer le fichier Excel avec les 4 feuilles par catégorie
-            with pd.ExcelWriter(output_path, engine='xlsxwriter') as writer:
-
-                # Créer une feuille pour chaque catégorie
-                for category in ['ASTREINTES', 'TIPS', '3X8', 'AUTRES']:
-                    category_records = classifications.get(category, [])
-
-                    if category_records:
-                        # Appliquer les règles métier pour filtrer les enregistrements
-                        filtered_records = self.classifier.filter_records_by_business_rules(
-                            category_records, category
-                        )
-
-                        if filtered_records:
-                            # Grouper par employé pour avoir une ligne par employé distinct
-                            employees = {}
-                            for record in filtered_records:
-                                nni = record.nni
-                                if nni and nni not in employees:
-                                    # Déterminer l'agence à partir de l'équipe
-                                    agence = self._get_agence_from_equipe_lib(record.equipe_lib)
-
-                                    # Récupérer les heures supplémentaires pour cet employé
-                                    overtime_hours = overtime_by_employee.get(nni, 0.0)
-
-                                    # Récupérer les statistiques d'arrêts maladie pour cet employé
-                                    sick_leave_stats = sick_leave_by_employee.get(nni, {})
-                                    classic_sick_leaves = sick_leave_stats.get('classic_sick_leaves', 0)
-                                    long_sick_leaves = sick_leave_stats.get('long_sick_leaves', 0)
-                                    sick_leave_periods = sick_leave_stats.get('sick_leave_periods', 0)
-                                    avg_hours_per_sick_leave = sick_leave_stats.get('avg_hours_per_sick_leave', 0.0)
-
-                                    # Récupérer les statistiques de jours de travail pour cet employé
-                                    work_days_stats = {}
-                                    if category in work_days_by_category:
-                                        work_days_stats = work_days_by_category[category].get(nni, {})
-                                    full_days = work_days_stats.get('full_days', 0)
-                                    partial_days = work_days_stats.get('partial_days', 0)
-                                    total_absence_hours = work_days_stats.get('total_absence_hours', 0.0)
-
-                                    employees[nni] = {
-                                        'NNI': nni,
-                                        'Équipe': record.equipe_lib or '',
-                                        'Nom': record.nom or '',
-                                        'Prénom': record.prenom or '',
-                                        'Agence': agence,
-                                        'Heure_Supp': overtime_hours,
-                                        'Arret_Maladie_41': classic_sick_leaves,
-                                        'Arret_Maladie_5H': long_sick_leaves,
-                                        'Periode_Arret_Maladie': sick_leave_periods,
-                                        'Moy_Heures_Par_Arret': avg_hours_per_sick_leave,
-                                        'Jour_Complet': full_days,
-                                        'Jour_Partiel': partial_days,
-                                        'Total_Heures_Absence': total_absence_hours
-                                    }
-
-                            if employees:
-                                # Convertir en DataFrame avec les colonnes spécifiées
-                                df = pd.DataFrame(list(employees.values()))
-
-                                # Réorganiser les colonnes dans l'ordre souhaité
-                                if category == '3X8':
-                                    # Pour la feuille 3X8, on affiche Heure_Supp mais pas Jour_Complet, Jour_Partiel, Total_Heures_Absence
-                                    column_order = ['NNI', 'Agence', 'Équipe', 'Nom', 'Prénom', 'Heure_Supp',
-                                                   'Arret_Maladie_41', 'Arret_Maladie_5H',
-                                                   'Periode_Arret_Maladie', 'Moy_Heures_Par_Arret']
-                                    # Supprimer seulement les colonnes de jours de travail
-                                    columns_to_remove = ['Jour_Complet', 'Jour_Partiel', 'Total_Heures_Absence']
-                                    for col in columns_to_remove:
-                                        if col in df.columns:
-                                            df = df.drop(columns=[col])
-                                elif category == 'AUTRES':
-                                    # Pour la feuille AUTRES, on n'affiche pas Heure_Supp, Jour_Complet, Jour_Partiel, Total_Heures_Absence
-                                    column_order = ['NNI', 'Agence', 'Équipe', 'Nom', 'Prénom',
-                                                   'Arret_Maladie_41', 'Arret_Maladie_5H',
-                                                   'Periode_Arret_Maladie', 'Moy_Heures_Par_Arret']
-                                    # Supprimer les colonnes non désirées
-                                    columns_to_remove = ['Heure_Supp', 'Jour_Complet', 'Jour_Partiel', 'Total_Heures_Absence']
-                                    for col in columns_to_remove:
-                                        if col in df.columns:
-                                            df = df.drop(columns=[col])
-                                else:
-                                    # Pour ASTREINTES et TIPS, afficher toutes les colonnes avec Jour_Complet, Jour_Partiel, Total_Heures_Absence après Prénom
-                                    column_order = ['NNI', 'Agence', 'Équipe', 'Nom', 'Prénom',
-                                                   'Jour_Complet', 'Jour_Partiel', 'Total_Heures_Absence',
-                                                   'Heure_Supp', 'Arret_Maladie_41', 'Arret_Maladie_5H',
-                                                   'Periode_Arret_Maladie', 'Moy_Heures_Par_Arret']
-
-                                df = df[column_order]
-
-                                # Exporter vers la feuille avec nom d'affichage
-                                sheet_name = 'HORS ASTREINTE' if category == 'TIPS' else category
-                                df.to_excel(writer, sheet_name=sheet_name, index=False)
-                                self.logger.info(f"Feuille {category}: {len(employees)} employés uniques")
-                            else:
-                                # Créer une feuille vide avec un message
-                                sheet_name = 'HORS ASTREINTE' if category == 'TIPS' else category
-                                empty_df = pd.DataFrame({'Message': ['Aucun employé avec NNI valide pour cette catégorie']})
-                                empty_df.to_excel(writer, sheet_name=sheet_name, index=False)
-                        else:
-                            # Créer une feuille vide avec un message
-                            sheet_name = 'HORS ASTREINTE' if category == 'TIPS' else category
-                            empty_df = pd.DataFrame({'Message': ['Aucun enregistrement après application des règles métier']})
-                            empty_df.to_excel(writer, sheet_name=sheet_name, index=False)
-                    else:
-                        # Créer une feuille vide
-                        sheet_name = 'HORS ASTREINTE' if category == 'TIPS' else category
-                        empty_df = pd.DataFrame({'Message': ['Aucun employé dans cette catégorie']})
-                        empty_df.to_excel(writer, sheet_name=sheet_name, index=False)
-
-                # Créer une feuille avec des graphiques
-                self._create_charts_sheet(writer, classifications, overtime_by_employee, sick_leave_by_employee, work_days_by_category)
-
-                # Formatage des feuilles
-                self._format_classification_sheets(writer, classifications)
-
-            self.logger.info(f"Export Excel terminé: 4 catégories d'employés exportées + feuille graphiques")
-            return str(output_path)
-
-        except Exception as e:
-            error_msg = f"Erreur lors de l'export Excel: {str(e)}"
-            self.logger.error(error_msg)
-            raise Exception(error_msg)
+        reporter = ProgressReporter(progress_callback, cancel_token,
+                                    total_rows=len(records), total_steps=self.EXCEL_EXPORT_STEPS)
+
+        with start_run("Export Excel") as run:
+            self._last_run = run
+            try:
+                classifications, overtime_by_employee, sick_leave_by_employee, work_days_by_category = \
+                    self._compute_metrics(records, reporter, metrics)
+
+                if self.metrics_store is not None and dataset and self.metrics_store.get_dataset(dataset.fingerprint) is None:
+                    with timed("Enregistrement des métriques"):
+                        self._save_metrics(dataset, records, self._build_export_rows(
+                            classifications, overtime_by_employee, sick_leave_by_employee, work_days_by_category
+                        ))
+
+                rows_exported = 0
+
+                # Créer le fichier Excel avec les 4 feuilles par catégorie
+                with pd.ExcelWriter(output_path, engine='xlsxwriter') as writer:
+
+                    # Créer une feuille pour chaque catégorie
+                    for category in ['ASTREINTES', 'TIPS', '3X8', 'AUTRES']:
+                        category_records = classifications.get(category, [])
+                        rows_exported += len(category_records)
+                        reporter.advance(f"Feuille {category}", rows=rows_exported)
+                        sheet_name = self._get_sheet_name(category)
+
+                        with timed(f"Feuille {sheet_name}"):
+                            self._write_category_sheet(
+                                writer, category, category_records, overtime_by_employee,
+                                sick_leave_by_employee, work_days_by_category
+                            )
+
+                    # Créer une feuille avec des graphiques
+                    reporter.advance("Graphiques")
+                    with timed("Graphiques"):
+                        self._create_charts_sheet(writer, classifications, overtime_by_employee, sick_leave_by_employee, work_days_by_category)
+
+                    # Formatage des feuilles
+                    with timed("Mise en forme"):
+                        self._format_classification_sheets(writer, classifications)
+
+                    # Dernier point d'annulation avant l'écriture du classeur
+                    reporter.advance("Enregistrement du classeur")
+                    save_start = time.perf_counter()
+
+                # La sortie du bloc `with` écrit le classeur sur le disque
+                add_time("Enregistrement du classeur", time.perf_counter() - save_start)
+
+                reporter.report("Terminé", force=True)
+                self.logger.info(f"Export Excel terminé: 4 catégories d'employés exportées + feuille graphiques")
+                return str(output_path)
+
+            except OperationCancelledError:
+                # Ne pas laisser de fichier partiel derrière soi
+                Path(output_path).unlink(missing_ok=True)
+                self.logger.info(f"Export Excel annulé: {output_path}")
+                raise
+
+            except Exception as e:
+                error_msg = f"Erreur lors de l'export Excel: {str(e)}"
+                self.logger.error(error_msg)
+                raise Exception(error_msg)
 
     def export_summary_to_text(self, records: List[PMTRecord], output_path: Optional[str] = None,
-                           use_file_dialog: bool = False) -> str:
+                           use_file_dialog: bool = False,
+                           progress_callback: Optional[ProgressCallback] = None,
+                           cancel_token: Optional[CancellationToken] = None,
+                           metrics: Optional[EmployeeMetricsTable] = None) -> str:
         """
         Exporte le résumé des classifications vers un fichier texte avec un format amélioré
 
@@ -225,6 +191,10 @@ class ExportService:
             records: Liste des enregistrements à exporter
             output_path: Chemin de sortie (optionnel)
             use_file_dialog: Si True, ouvre un sélecteur de fichier
+            progress_callback: Callback recevant la progression par étape
+            cancel_token: Jeton d'annulation vérifié entre deux étapes
+            metrics: Métriques par employé déjà calculées pour exactement ces
+                enregistrements (ex: CSVProcessor.metrics), réutilisées au lieu d'être recalculées
 
         Returns:
             Chemin du fichier créé
@@ -266,35 +236,515 @@ class ExportService:
 
         self.logger.info(f"Export du résumé des classifications vers: {output_path}")
 
+        reporter = ProgressReporter(progress_callback, cancel_token, total_rows=len(records), total_steps=5)
+
+        with start_run("Export résumé") as run:
+            self._last_run = run
+            try:
+                classifications, overtime_by_employee, sick_leave_by_employee, work_days_by_category = \
+                    self._compute_metrics(records, reporter, metrics)
+
+                # Créer le contenu du résumé avec le nouveau format
+                reporter.advance("Rédaction du résumé")
+                with timed("Rédaction du résumé"):
+                    summary_text = self._create_formatted_summary_text(classifications, overtime_by_employee, sick_leave_by_employee, work_days_by_category)
+
+                # Écrire dans le fichier texte
+                with timed("Écriture du fichier"):
+                    with open(output_path, 'w', encoding='utf-8') as f:
+                        f.write(summary_text)
+
+                reporter.report("Terminé", rows=len(records), force=True)
+                self.logger.info(f"Export du résumé terminé: {output_path}")
+                return str(output_path)
+
+            except OperationCancelledError:
+                self.logger.info(f"Export du résumé annulé: {output_path}")
+                raise
+
+            except Exception as e:
+                error_msg = f"Erreur lors de l'export du résumé: {str(e)}"
+                self.logger.error(error_msg)
+                raise Exception(error_msg)
+
+    def export_to_parquet(self, records: List[PMTRecord], output_path: Optional[str] = None,
+                          progress_callback: Optional[ProgressCallback] = None,
+                          cancel_token: Optional[CancellationToken] = None,
+                          metrics: Optional[EmployeeMetricsTable] = None,
+                          dataset: Optional[DatasetRef] = None) -> str:
+        """
+        Exporte une ligne par employé et par catégorie vers un fichier Parquet
+
+        Mêmes colonnes que les feuilles Excel, plus une colonne 'Catégorie'
+        (nom de feuille). Nécessite pyarrow.
+
+        Args:
+            records: Liste des enregistrements à exporter
+            output_path: Chemin de sortie (optionnel)
+            progress_callback: Callback recevant la progression par étape
+            cancel_token: Jeton d'annulation vérifié entre deux étapes
+            metrics: Métriques par employé déjà calculées pour exactement ces
+                enregistrements (ex: CSVProcessor.metrics), réutilisées au lieu d'être recalculées
+            dataset: Extraction exportée (CSVProcessor.get_dataset_ref) ; avec un
+                metrics_store, les métriques par employé y sont enregistrées ou relues
+
+        Returns:
+            Chemin du fichier créé
+        """
+        if not output_path:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            output_path = OUTPUT_DIR / f"export_gabinette_{timestamp}.parquet"
+        else:
+            output_path = Path(output_path)
+
+        self.logger.info(f"Export Parquet vers: {output_path}")
+
+        reporter = ProgressReporter(progress_callback, cancel_token, total_rows=len(records), total_steps=5)
+
         try:
-            # Classifier les employés
-            classifications = self.classifier.classify_employees(records)
+            import pyarrow  # noqa: F401  Moteur Parquet utilisé par pandas
+        except ImportError:
+            raise Exception("Export Parquet impossible: le module pyarrow n'est pas installé")
+
+        with start_run("Export Parquet") as run:
+            self._last_run = run
+            try:
+                rows_by_category = None
+                if self.metrics_store is not None and dataset:
+                    # Extraction déjà traitée : simple lecture indexée de la base
+                    with timed("Lecture des métriques enregistrées"):
+                        rows_by_category = self.metrics_store.get_export_rows(dataset.fingerprint)
+
+                if rows_by_category is None:
+                    rows_by_category = self._build_export_rows(*self._compute_metrics(records, reporter, metrics))
+                    if self.metrics_store is not None and dataset:
+                        with timed("Enregistrement des métriques"):
+                            self._save_metrics(dataset, records, rows_by_category)
+
+                reporter.advance("Écriture du fichier Parquet")
+                rows = []
+                for category in ['ASTREINTES', 'TIPS', '3X8', 'AUTRES']:
+                    for employee in rows_by_category.get(category, []):
+                        rows.append(dict(employee, **{'Catégorie': self._get_sheet_name(category)}))
+
+                columns = ['Catégorie'] + self.CATEGORY_COLUMNS['ASTREINTES']
+                df = pd.DataFrame(rows, columns=columns)
+                with timed("Écriture du fichier"):
+                    df.to_parquet(output_path, index=False)
+
+                reporter.report("Terminé", rows=len(records), force=True)
+                self.logger.info(f"Export Parquet terminé: {len(df)} lignes employé")
+                return str(output_path)
+
+            except OperationCancelledError:
+                Path(output_path).unlink(missing_ok=True)
+                self.logger.info(f"Export Parquet annulé: {output_path}")
+                raise
+
+            except Exception as e:
+                error_msg = f"Erreur lors de l'export Parquet: {str(e)}"
+                self.logger.error(error_msg)
+                raise Exception(error_msg)
+
+    def export_to_dataset(self, records: List[PMTRecord], output_path: Optional[str] = None,
+                          progress_callback: Optional[ProgressCallback] = None,
+                          cancel_token: Optional[CancellationToken] = None,
+                          metrics: Optional[EmployeeMetricsTable] = None,
+                          dataset: Optional[DatasetRef] = None) -> str:
+        """
+        Ajoute les enregistrements à l'archive Parquet partitionnée (mois / agence / catégorie)
 
-            # Calculer les heures supplémentaires pour tous les employés
-            overtime_by_employee = self.overtime_calculator.calculate_all_employees_overtime(records)
+        Seuls les jours absents de l'archive sont écrits (voir
+        PartitionedParquetDataset). Nécessite pyarrow.
 
-            # Calculer les arrêts maladie pour tous les employés
-            sick_leave_by_employee = self.sick_leave_calculator.calculate_all_employees_sick_leave(records)
-            self.logger.info(f"Statistiques d'arrêt maladie calculées pour {len(sick_leave_by_employee)} employés")
+        Args:
+            records: Enregistrements à archiver
+            output_path: Répertoire de l'archive (défaut: DATASET_DIR)
+            progress_callback: Callback recevant la progression par partition
+            cancel_token: Jeton d'annulation vérifié entre deux partitions
+            metrics: Métriques par employé déjà calculées pour exactement ces
+                enregistrements (catégories réutilisées au lieu d'être recalculées)
+            dataset: Extraction archivée, notée dans le manifeste
 
-            # Calculer les jours de travail pour tous les employés
-            work_days_by_category = self.work_time_calculator.calculate_all_employees_work_days(records, classifications)
-            self.logger.info(f"Statistiques de jours de travail calculées pour {len(work_days_by_category)} catégories")
+        Returns:
+            Répertoire de l'archive
+        """
+        archive = PartitionedParquetDataset(Path(output_path) if output_path else None)
+        self.logger.info(f"Export Parquet partitionné vers: {archive.root}")
+        reporter = ProgressReporter(progress_callback, cancel_token, total_rows=len(records))
+
+        with start_run("Export Parquet partitionné") as run:
+            self._last_run = run
+            try:
+                with timed("Classification"):
+                    if metrics is not None:
+                        categories = metrics.get_categories()
+                    else:
+                        categories = self.classifier.categorize_employees(EmployeeRecordStore(records))
+                source = dataset.source_name if dataset else ""
+                archive.append(records, categories, self._get_agence_from_equipe_lib, source=source, reporter=reporter)
+                reporter.report("Terminé", rows=len(records), force=True)
+                return str(archive.root)
+
+            except OperationCancelledError:
+                self.logger.info(f"Export Parquet partitionné annulé: {archive.root}")
+                raise
+
+            except Exception as e:
+                error_msg = f"Erreur lors de l'export Parquet partitionné: {str(e)}"
+                self.logger.error(error_msg)
+                raise Exception(error_msg)
+
+    def export_records(self, records: Iterable[PMTRecord], output_path: Optional[str] = None,
+                       export_format: str = "ndjson", batch_size: Optional[int] = None,
+                       progress_callback: Optional[ProgressCallback] = None,
+                       cancel_token: Optional[CancellationToken] = None,
+                       total_rows: Optional[int] = None) -> str:
+        """
+        Exporte les enregistrements eux-mêmes (une ligne par enregistrement) en NDJSON ou CSV
 
-            # Créer le contenu du résumé avec le nouveau format
-            summary_text = self._create_formatted_summary_text(classifications, overtime_by_employee, sick_leave_by_employee, work_days_by_category)
+        Contrairement aux autres exports, aucune métrique n'est calculée :
+        les enregistrements sont écrits en flux, par lots de taille fixe
+        (voir record_exporter.write_records). `records` peut être un
+        générateur (ex: filtrage paresseux) ; la mémoire utilisée ne dépend
+        que de la taille des lots.
 
-            # Écrire dans le fichier texte
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(summary_text)
+        Args:
+            records: Enregistrements à exporter (liste ou itérable)
+            output_path: Chemin de sortie (optionnel)
+            export_format: "ndjson" ou "csv"
+            batch_size: Enregistrements par lot (défaut: RECORD_EXPORT_CONFIG["batch_size"])
+            progress_callback: Callback recevant la progression (lignes écrites)
+            cancel_token: Jeton d'annulation vérifié après chaque lot
+            total_rows: Nombre d'enregistrements attendus (progression d'un générateur)
 
-            self.logger.info(f"Export du résumé terminé: {output_path}")
-            return str(output_path)
+        Returns:
+            Chemin du fichier créé
+        """
+        if export_format not in RECORD_EXPORT_FORMATS:
+            raise Exception(f"Format inconnu: {export_format} (valeurs possibles: {', '.join(RECORD_EXPORT_FORMATS)})")
+        if not output_path:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            output_path = OUTPUT_DIR / f"enregistrements_gabinette_{timestamp}.{export_format}"
+        else:
+            output_path = Path(output_path)
 
-        except Exception as e:
-            error_msg = f"Erreur lors de l'export du résumé: {str(e)}"
-            self.logger.error(error_msg)
-            raise Exception(error_msg)
+        self.logger.info(f"Export des enregistrements ({export_format}) vers: {output_path}")
+
+        if total_rows is None and hasattr(records, "__len__"):
+            total_rows = len(records)
+        reporter = ProgressReporter(progress_callback, cancel_token, total_rows=total_rows)
+
+        with start_run(f"Export {export_format.upper()}") as run:
+            self._last_run = run
+            try:
+                # newline="" : les fins de ligne sont celles écrites par le sérialiseur
+                with timed("Écriture du fichier"), open(output_path, "w", encoding="utf-8", newline="") as output:
+                    written = write_records(records, output, export_format, batch_size, reporter=reporter)
+
+                reporter.report("Terminé", rows=written, force=True)
+                self.logger.info(f"Export {export_format.upper()} terminé: {written} enregistrements")
+                return str(output_path)
+
+            except OperationCancelledError:
+                Path(output_path).unlink(missing_ok=True)
+                self.logger.info(f"Export {export_format.upper()} annulé: {output_path}")
+                raise
+
+            except Exception as e:
+                Path(output_path).unlink(missing_ok=True)
+                error_msg = f"Erreur lors de l'export des enregistrements: {str(e)}"
+                self.logger.error(error_msg)
+                raise Exception(error_msg)
+
+    def _compute_metrics(self, records: List[PMTRecord], reporter: Optional[ProgressReporter] = None,
+                         metrics: Optional[EmployeeMetricsTable] = None):
+        """
+        Classifie les employés et calcule toutes les métriques nécessaires aux exports
+
+        Args:
+            records: Liste des enregistrements
+            reporter: Suivi de progression (une étape par calcul)
+            metrics: Table des métriques par employé de ces enregistrements ; seuls
+                les employés modifiés depuis le dernier calcul sont alors recalculés
+
+        Returns:
+            Tuple (classifications, heures supp, arrêts maladie, jours de travail)
+        """
+        reporter = reporter or ProgressReporter()
+        self._rule_views = {}
+
+        if metrics is not None:
+            reporter.advance("Calcul des métriques par employé")
+            with timed("Métriques par employé"):
+                classifications = metrics.get_classifications()
+                overtime_by_employee = metrics.get_overtime_by_employee()
+                sick_leave_by_employee = metrics.get_sick_leave_by_employee()
+                work_days_by_category = metrics.get_work_days_by_category()
+                # Vues filtrées mémorisées par la table : aucun filtrage pendant l'export
+                for category, filtered_records in metrics.get_filtered_classifications().items():
+                    self._rule_views[category] = (classifications[category], filtered_records)
+            # Même nombre d'étapes de progression que le calcul complet
+            for step in ("Heures supplémentaires", "Arrêts maladie", "Jours de travail"):
+                reporter.advance(step)
+            return classifications, overtime_by_employee, sick_leave_by_employee, work_days_by_category
+
+        # Classifier les employés (enregistrements partitionnés une fois par employé)
+        reporter.advance("Classification des employés")
+        with timed("Partitionnement par employé"):
+            store = EmployeeRecordStore(records)
+        if self.executor.should_run(len(store.records)):
+            # Toutes les métriques en une fois dans le pool de processus
+            categories, overtime_by_employee, sick_leave_by_employee, work_days_by_category = \
+                self.executor.compute(store)
+            classifications = self.classifier.classify_employees(records, store, categories)
+            for step in ("Heures supplémentaires", "Arrêts maladie", "Jours de travail"):
+                reporter.advance(step)
+            return classifications, overtime_by_employee, sick_leave_by_employee, work_days_by_category
+
+        with timed("Classification"):
+            categories = self.classifier.categorize_employees(store)
+            classifications = self.classifier.classify_employees(records, store, categories)
+
+        # Calculer les heures supplémentaires pour tous les employés
+        reporter.advance("Calcul des heures supplémentaires")
+        with timed("OvertimeCalculator"):
+            overtime_by_employee = self.overtime_calculator.calculate_all_employees_overtime(records, store)
+
+        # Calculer les arrêts maladie pour tous les employés
+        reporter.advance("Calcul des arrêts maladie")
+        with timed("SickLeaveCalculator"):
+            sick_leave_by_employee = self.sick_leave_calculator.calculate_all_employees_sick_leave(records, store)
+        self.logger.info(f"Statistiques d'arrêt maladie calculées pour {len(sick_leave_by_employee)} employés")
+
+        # Calculer les jours de travail pour tous les employés
+        reporter.advance("Calcul des jours de travail")
+        with timed("WorkTimeCalculator"):
+            work_days_by_category = self.work_time_calculator.calculate_all_employees_work_days(
+                records, classifications, store, categories
+            )
+        self.logger.info(f"Statistiques de jours de travail calculées pour {len(work_days_by_category)} catégories")
+
+        return classifications, overtime_by_employee, sick_leave_by_employee, work_days_by_category
+
+    def _filter_by_rules(self, records: List[PMTRecord], category: str) -> List[PMTRecord]:
+        """
+        Enregistrements retenus par les règles métier, filtrés une fois par catégorie
+
+        Les feuilles, graphiques et résumés reçoivent tous la même liste
+        `classifications[category]` : la vue filtrée est réutilisée tant que
+        la liste source est la même (même objet).
+
+        Args:
+            records: Enregistrements de la catégorie
+            category: Catégorie ('ASTREINTES', 'TIPS', '3X8', 'AUTRES')
+
+        Returns:
+            Enregistrements filtrés (à ne pas modifier)
+        """
+        view = self._rule_views.get(category)
+        if view is None or view[0] is not records:
+            view = (records, self.classifier.filter_records_by_business_rules(records, category))
+            self._rule_views[category] = view
+        return view[1]
+
+    def build_employee_rows(self, records: List[PMTRecord],
+                            metrics: Optional[EmployeeMetricsTable] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Lignes employé de chaque catégorie, telles qu'écrites dans les feuilles Excel
+
+        Args:
+            records: Enregistrements
+            metrics: Table des métriques par employé de ces enregistrements (optionnelle)
+
+        Returns:
+            Dictionnaire catégorie -> lignes (toutes les colonnes d'export)
+        """
+        return self._build_export_rows(*self._compute_metrics(records, metrics=metrics))
+
+    def store_metrics(self, records: List[PMTRecord], dataset: DatasetRef,
+                      metrics: Optional[EmployeeMetricsTable] = None) -> None:
+        """
+        Calcule les lignes employé d'une extraction et les enregistre dans metrics_store
+
+        Args:
+            records: Enregistrements de l'extraction
+            dataset: Référence de l'extraction
+            metrics: Table des métriques par employé de ces enregistrements (optionnelle)
+        """
+        if self.metrics_store is None:
+            raise Exception("Aucune base des métriques configurée")
+
+        with start_run("Enregistrement des métriques"):
+            rows_by_category = self.build_employee_rows(records, metrics=metrics)
+            self._save_metrics(dataset, records, rows_by_category)
+
+    def _build_export_rows(self, classifications: Dict[str, List[PMTRecord]],
+                           overtime_by_employee: Dict[str, float],
+                           sick_leave_by_employee: Dict[str, Dict[str, Any]],
+                           work_days_by_category: Dict[str, Dict[str, Dict[str, Any]]]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Construit les lignes employé de chaque catégorie (règles métier appliquées)
+
+        Returns:
+            Dictionnaire catégorie -> lignes d'export, dans l'ordre des feuilles Excel
+        """
+        rows_by_category = {}
+        for category in ['ASTREINTES', 'TIPS', '3X8', 'AUTRES']:
+            filtered_records = self._filter_by_rules(
+                classifications.get(category, []), category
+            )
+            employees = self._build_category_employees(
+                category, filtered_records, overtime_by_employee,
+                sick_leave_by_employee, work_days_by_category
+            )
+            rows_by_category[category] = list(employees.values())
+        return rows_by_category
+
+    def _save_metrics(self, dataset: DatasetRef, records: List[PMTRecord],
+                      rows_by_category: Dict[str, List[Dict[str, Any]]]) -> None:
+        """Enregistre les lignes employé d'une extraction dans la base des métriques"""
+        dates = set()
+        for jour in {record.jour for record in records if record.jour}:
+            try:
+                dates.add(datetime.strptime(jour, "%d/%m/%Y").date())
+            except ValueError:
+                continue
+        period = (min(dates).isoformat(), max(dates).isoformat()) if dates else (None, None)
+        self.metrics_store.save_dataset(dataset.fingerprint, dataset.source_name, rows_by_category,
+                                        period, len(records))
+
+    # Colonnes exportées par catégorie, dans l'ordre d'affichage
+    CATEGORY_COLUMNS = {
+        # Pour ASTREINTES et TIPS, afficher toutes les colonnes avec Jour_Complet, Jour_Partiel, Total_Heures_Absence après Prénom
+        'ASTREINTES': ['NNI', 'Agence', 'Équipe', 'Nom', 'Prénom',
+                       'Jour_Complet', 'Jour_Partiel', 'Total_Heures_Absence',
+                       'Heure_Supp', 'Arret_Maladie_41', 'Arret_Maladie_5H',
+                       'Periode_Arret_Maladie', 'Moy_Heures_Par_Arret'],
+        'TIPS': ['NNI', 'Agence', 'Équipe', 'Nom', 'Prénom',
+                 'Jour_Complet', 'Jour_Partiel', 'Total_Heures_Absence',
+                 'Heure_Supp', 'Arret_Maladie_41', 'Arret_Maladie_5H',
+                 'Periode_Arret_Maladie', 'Moy_Heures_Par_Arret'],
+        # Pour la feuille 3X8, on affiche Heure_Supp mais pas Jour_Complet, Jour_Partiel, Total_Heures_Absence
+        '3X8': ['NNI', 'Agence', 'Équipe', 'Nom', 'Prénom', 'Heure_Supp',
+                'Arret_Maladie_41', 'Arret_Maladie_5H',
+                'Periode_Arret_Maladie', 'Moy_Heures_Par_Arret'],
+        # Pour la feuille AUTRES, on n'affiche pas Heure_Supp, Jour_Complet, Jour_Partiel, Total_Heures_Absence
+        'AUTRES': ['NNI', 'Agence', 'Équipe', 'Nom', 'Prénom',
+                   'Arret_Maladie_41', 'Arret_Maladie_5H',
+                   'Periode_Arret_Maladie', 'Moy_Heures_Par_Arret']
+    }
+
+    def _get_sheet_name(self, category: str) -> str:
+        """Retourne le nom de feuille affiché pour une catégorie"""
+        return 'HORS ASTREINTE' if category == 'TIPS' else category
+
+    def _order_category_columns(self, df: pd.DataFrame, category: str) -> pd.DataFrame:
+        """Réorganise (et restreint) les colonnes dans l'ordre souhaité pour la catégorie"""
+        return df[self.CATEGORY_COLUMNS[category]]
+
+    def _write_category_sheet(self, writer, category: str, category_records: List[PMTRecord],
+                              overtime_by_employee: Dict[str, float],
+                              sick_leave_by_employee: Dict[str, Dict[str, Any]],
+                              work_days_by_category: Dict[str, Dict[str, Dict[str, Any]]]) -> None:
+        """
+        Écrit la feuille Excel d'une catégorie (une ligne par employé distinct)
+
+        Args:
+            writer: Writer Excel
+            category: Catégorie d'employés
+            category_records: Enregistrements classés dans la catégorie
+            overtime_by_employee: Heures supplémentaires par employé
+            sick_leave_by_employee: Arrêts maladie par employé
+            work_days_by_category: Jours de travail par catégorie puis par employé
+        """
+        sheet_name = self._get_sheet_name(category)
+
+        if category_records:
+            # Appliquer les règles métier pour filtrer les enregistrements
+            filtered_records = self._filter_by_rules(
+                category_records, category
+            )
+
+            if filtered_records:
+                # Grouper par employé pour avoir une ligne par employé distinct
+                employees = self._build_category_employees(
+                    category, filtered_records, overtime_by_employee,
+                    sick_leave_by_employee, work_days_by_category
+                )
+
+                if employees:
+                    # Convertir en DataFrame avec les colonnes spécifiées
+                    df = self._order_category_columns(pd.DataFrame(list(employees.values())), category)
+
+                    # Exporter vers la feuille avec nom d'affichage
+                    df.to_excel(writer, sheet_name=sheet_name, index=False)
+                    self.logger.info(f"Feuille {category}: {len(employees)} employés uniques")
+                else:
+                    # Créer une feuille vide avec un message
+                    empty_df = pd.DataFrame({'Message': ['Aucun employé avec NNI valide pour cette catégorie']})
+                    empty_df.to_excel(writer, sheet_name=sheet_name, index=False)
+            else:
+                # Créer une feuille vide avec un message
+                empty_df = pd.DataFrame({'Message': ['Aucun enregistrement après application des règles métier']})
+                empty_df.to_excel(writer, sheet_name=sheet_name, index=False)
+        else:
+            # Créer une feuille vide
+            empty_df = pd.DataFrame({'Message': ['Aucun employé dans cette catégorie']})
+            empty_df.to_excel(writer, sheet_name=sheet_name, index=False)
+
+    def _build_category_employees(self, category: str, filtered_records: List[PMTRecord],
+                                  overtime_by_employee: Dict[str, float],
+                                  sick_leave_by_employee: Dict[str, Dict[str, Any]],
+                                  work_days_by_category: Dict[str, Dict[str, Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Construit une ligne par employé distinct d'une catégorie
+
+        Args:
+            category: Catégorie des enregistrements
+            filtered_records: Enregistrements de la catégorie après règles métier
+            overtime_by_employee: Heures supplémentaires par employé
+            sick_leave_by_employee: Arrêts maladie par employé
+            work_days_by_category: Jours de travail par catégorie puis par employé
+
+        Returns:
+            Dictionnaire NNI -> ligne d'export
+        """
+        employees = {}
+        for record in filtered_records:
+            nni = record.nni
+            if nni and nni not in employees:
+                # Déterminer l'agence à partir de l'équipe
+                agence = self._get_agence_from_equipe_lib(record.equipe_lib)
+
+                # Récupérer les heures supplémentaires pour cet employé
+                overtime_hours = overtime_by_employee.get(nni, 0.0)
+
+                # Récupérer les statistiques d'arrêts maladie pour cet employé
+                sick_leave_stats = sick_leave_by_employee.get(nni, {})
+
+                # Récupérer les statistiques de jours de travail pour cet employé
+                work_days_stats = {}
+                if category in work_days_by_category:
+                    work_days_stats = work_days_by_category[category].get(nni, {})
+
+                employees[nni] = {
+                    'NNI': nni,
+                    'Équipe': record.equipe_lib or '',
+                    'Nom': record.nom or '',
+                    'Prénom': record.prenom or '',
+                    'Agence': agence,
+                    'Heure_Supp': overtime_hours,
+                    'Arret_Maladie_41': sick_leave_stats.get('classic_sick_leaves', 0),
+                    'Arret_Maladie_5H': sick_leave_stats.get('long_sick_leaves', 0),
+                    'Periode_Arret_Maladie': sick_leave_stats.get('sick_leave_periods', 0),
+                    'Moy_Heures_Par_Arret': sick_leave_stats.get('avg_hours_per_sick_leave', 0.0),
+                    'Jour_Complet': work_days_stats.get('full_days', 0),
+                    'Jour_Partiel': work_days_stats.get('partial_days', 0),
+                    'Total_Heures_Absence': work_days_stats.get('total_absence_hours', 0.0)
+                }
+
+        return employees
 
     def _create_formatted_summary_text(self, classifications: Dict[str, List[PMTRecord]],
                                        overtime_by_employee: Dict[str, float],
@@ -329,6 +779,12 @@ class ExportService:
         summary.append(SEPARATOR)
         summary.append("")
 
+        # Une seule agrégation : catégories, agences et DR, puis rendu du texte
+        groups = self._aggregate_summary_groups(
+            classifications, overtime_by_employee, sick_leave_by_employee, work_days_by_category
+        )
+        total_employees = groups[('dr', 'DR PARIS')]['employees']
+
         # Statistiques par catégorie d'employés
         categories = {
             'ASTREINTES': 'Astreinte',
@@ -337,110 +793,25 @@ class ExportService:
             'AUTRES': 'Autres'
         }
 
-        # Nombre total d'employés uniques
-        all_employees = set()
-        for records in classifications.values():
-            for record in records:
-                if record.nni:
-                    all_employees.add(record.nni)
-
-        total_employees = len(all_employees)
-
-        # Statistiques pour chaque catégorie
         for category_key, category_name in categories.items():
-            category_records = classifications.get(category_key, [])
-
-            # Filtrer les enregistrements selon les règles métier
-            filtered_records = self.classifier.filter_records_by_business_rules(
-                category_records, category_key
-            )
-
-            # Employés uniques dans cette catégorie
-            unique_employees = set()
-            for record in filtered_records:
-                if record.nni:
-                    unique_employees.add(record.nni)
-
-            employee_count = len(unique_employees)
-            percentage = (employee_count / total_employees * 100) if total_employees > 0 else 0
-
-            # Calculer les statistiques des heures supplémentaires pour cette catégorie
-            category_overtime = [overtime_by_employee.get(nni, 0.0) for nni in unique_employees]
-            employees_with_overtime = [h for h in category_overtime if h > 0]
-
-            # Moyenne incluant tous les employés (avec et sans heures supp)
-            avg_overtime_all = sum(category_overtime) / len(category_overtime) if category_overtime else 0
-
-            # Moyenne uniquement parmi ceux qui ont fait des heures supplémentaires
-            avg_overtime_with_overtime_only = sum(employees_with_overtime) / len(employees_with_overtime) if employees_with_overtime else 0
-
-            # Pourcentage d'employés ayant fait des heures supplémentaires
-            percentage_with_overtime = (len(employees_with_overtime) / len(unique_employees) * 100) if unique_employees else 0
-
-            # Calculer les statistiques d'arrêts maladie pour cette catégorie
-            total_classic_sick_leaves = 0
-            total_long_sick_leaves = 0
-            total_sick_leave_periods = 0
-            total_sick_leave_hours = 0
-
-            for nni in unique_employees:
-                if nni in sick_leave_by_employee:
-                    stats = sick_leave_by_employee[nni]
-                    total_classic_sick_leaves += stats.get('classic_sick_leaves', 0)
-                    total_long_sick_leaves += stats.get('long_sick_leaves', 0)
-                    total_sick_leave_periods += stats.get('sick_leave_periods', 0)
-
-                    # Calculer le total des heures d'arrêt maladie
-                    classic_sick_leaves = stats.get('classic_sick_leaves', 0)
-                    long_sick_leaves = stats.get('long_sick_leaves', 0)
-                    avg_hours = stats.get('avg_hours_per_sick_leave', 0.0)
-                    total_sick_leave_hours += (classic_sick_leaves + long_sick_leaves) * avg_hours
-
-            # Calculer les moyennes par employé
-            avg_classic_sick_leaves = total_classic_sick_leaves / len(unique_employees) if unique_employees else 0
-            avg_long_sick_leaves = total_long_sick_leaves / len(unique_employees) if unique_employees else 0
-            avg_sick_leave_periods = total_sick_leave_periods / len(unique_employees) if unique_employees else 0
-            avg_sick_leave_hours = total_sick_leave_hours / len(unique_employees) if unique_employees else 0
-
-            # Calculer les statistiques de jours de travail pour cette catégorie
-            total_full_days = 0
-            total_partial_days = 0
-
-            # Récupérer les données de jours de travail pour cette catégorie
-            category_work_days = work_days_by_category.get(category_key, {})
-
-            for nni in unique_employees:
-                if nni in category_work_days:
-                    stats = category_work_days[nni]
-                    total_full_days += stats.get('full_days', 0)
-                    total_partial_days += stats.get('partial_days', 0)
-
-            # Calculer les moyennes par employé
-            avg_full_days = total_full_days / len(unique_employees) if unique_employees else 0
-            avg_partial_days = total_partial_days / len(unique_employees) if unique_employees else 0
-            total_work_days = total_full_days + total_partial_days
-            percentage_full_days = (total_full_days / total_work_days * 100) if total_work_days > 0 else 0
-
-            # Convertir en jours (en supposant 7 heures par jour)
-            avg_overtime_all_days = avg_overtime_all / 7.0
-            avg_overtime_with_overtime_only_days = avg_overtime_with_overtime_only / 7.0
-            avg_sick_leave_days = avg_sick_leave_hours / 7.0
+            group = self._summary_averages(groups[('category', category_key)])
+            percentage = (group['employees'] / total_employees * 100) if total_employees > 0 else 0
 
             summary.append(f"{category_name} :")
-            summary.append(f"- Nombre d'employés : {employee_count} ({percentage:.1f}% du total)")
+            summary.append(f"- Nombre d'employés : {group['employees']} ({percentage:.1f}% du total)")
             if category_key != 'AUTRES':  # Ne pas afficher les heures supp pour la catégorie AUTRES
-                summary.append(f"- Employés avec heures supplémentaires : {len(employees_with_overtime)} ({percentage_with_overtime:.1f}%)")
-                if employees_with_overtime:
-                    summary.append(f"- Moyenne heures supplémentaires par employé : {avg_overtime_with_overtime_only:.2f}h ({avg_overtime_with_overtime_only_days:.2f} jours)")
-            summary.append(f"- Arrêts maladie classiques (41) : {total_classic_sick_leaves} (moy. {avg_classic_sick_leaves:.2f} par employé)")
-            summary.append(f"- Arrêts maladie longs (5H) : {total_long_sick_leaves} (moy. {avg_long_sick_leaves:.2f} par employé)")
-            summary.append(f"- Périodes d'arrêt maladie : {total_sick_leave_periods} (moy. {avg_sick_leave_periods:.2f} par employé)")
-            summary.append(f"- Moyenne des heures par arrêt maladie : {avg_sick_leave_hours:.2f}h ({avg_sick_leave_days:.2f} jours)")
+                summary.append(f"- Employés avec heures supplémentaires : {group['with_overtime']} ({group['percentage_with_overtime']:.1f}%)")
+                if group['with_overtime']:
+                    summary.append(f"- Moyenne heures supplémentaires par employé : {group['avg_overtime']:.2f}h ({group['avg_overtime'] / 7.0:.2f} jours)")
+            summary.append(f"- Arrêts maladie classiques (41) : {group['classic_sick_leaves']} (moy. {group['avg_classic_sick_leaves']:.2f} par employé)")
+            summary.append(f"- Arrêts maladie longs (5H) : {group['long_sick_leaves']} (moy. {group['avg_long_sick_leaves']:.2f} par employé)")
+            summary.append(f"- Périodes d'arrêt maladie : {group['sick_leave_periods']} (moy. {group['avg_sick_leave_periods']:.2f} par employé)")
+            summary.append(f"- Moyenne des heures par arrêt maladie : {group['avg_sick_leave_hours']:.2f}h ({group['avg_sick_leave_hours'] / 7.0:.2f} jours)")
             # Afficher les jours complets/partiels seulement pour ASTREINTES et TIPS
             if category_key in ['ASTREINTES', 'TIPS']:
-                summary.append(f"- Jours complets (8h) : {total_full_days} (moy. {avg_full_days:.2f} par employé)")
-                summary.append(f"- Jours partiels (<8h) : {total_partial_days} (moy. {avg_partial_days:.2f} par employé)")
-                summary.append(f"- Pourcentage jours complets : {percentage_full_days:.1f}%")
+                summary.append(f"- Jours complets (8h) : {group['full_days']} (moy. {group['avg_full_days']:.2f} par employé)")
+                summary.append(f"- Jours partiels (<8h) : {group['partial_days']} (moy. {group['avg_partial_days']:.2f} par employé)")
+                summary.append(f"- Pourcentage jours complets : {group['percentage_full_days']:.1f}%")
             summary.append("")
 
         # --- SECTION AGENCES ---
@@ -449,95 +820,21 @@ class ExportService:
         summary.append(SEPARATOR)
         summary.append("")
 
-        # Statistiques par agence
-        agence_stats = self._get_agence_statistics(classifications)
-        agences = {
-            'Batignolles': 'Batignolles',
-            'Italie': 'Italie',
-            'Grenelle': 'Grenelle',
-            'Paris Est': 'Paris Est'
-        }
-
-        for agence_key, agence_name in agences.items():
-            stats = agence_stats.get(agence_key, {'employees': 0, 'records': 0, 'percentage': 0})
-
-            # Calculer la moyenne des heures supplémentaires pour cette agence
-            agence_employees = set()
-            for category, records in classifications.items():
-                for record in records:
-                    if record.nni and self._get_agence_from_equipe_lib(record.equipe_lib) == agence_key:
-                        agence_employees.add(record.nni)
-
-            # Statistiques des heures supplémentaires
-            agence_overtime = [overtime_by_employee.get(nni, 0.0) for nni in agence_employees]
-            employees_with_overtime_agence = [h for h in agence_overtime if h > 0]
-
-            # Moyennes pour l'agence
-            avg_overtime_all = sum(agence_overtime) / len(agence_overtime) if agence_overtime else 0
-            avg_overtime_with_overtime_only = sum(employees_with_overtime_agence) / len(employees_with_overtime_agence) if employees_with_overtime_agence else 0
-            percentage_with_overtime_agence = (len(employees_with_overtime_agence) / len(agence_employees) * 100) if agence_employees else 0
-
-            avg_overtime_all_days = avg_overtime_all / 7.0
-            avg_overtime_with_overtime_only_days = avg_overtime_with_overtime_only / 7.0
-
-            # Statistiques des arrêts maladie
-            total_classic_sick_leaves = 0
-            total_long_sick_leaves = 0
-            total_sick_leave_periods = 0
-            total_sick_leave_hours = 0
-
-            for nni in agence_employees:
-                if nni in sick_leave_by_employee:
-                    stats = sick_leave_by_employee[nni]
-                    total_classic_sick_leaves += stats.get('classic_sick_leaves', 0)
-                    total_long_sick_leaves += stats.get('long_sick_leaves', 0)
-                    total_sick_leave_periods += stats.get('sick_leave_periods', 0)
-
-                    # Calculer le total des heures d'arrêt maladie
-                    classic_sick_leaves = stats.get('classic_sick_leaves', 0)
-                    long_sick_leaves = stats.get('long_sick_leaves', 0)
-                    avg_hours = stats.get('avg_hours_per_sick_leave', 0.0)
-                    total_sick_leave_hours += (classic_sick_leaves + long_sick_leaves) * avg_hours
-
-            # Statistiques des jours de travail
-            total_full_days_agence = 0
-            total_partial_days_agence = 0
-
-            for nni in agence_employees:
-                # Chercher dans toutes les catégories car un employé peut être dans n'importe laquelle
-                for category_key in ['ASTREINTES', 'TIPS']:  # Seulement ces 2 catégories ont des données
-                    category_work_days = work_days_by_category.get(category_key, {})
-                    if nni in category_work_days:
-                        stats = category_work_days[nni]
-                        total_full_days_agence += stats.get('full_days', 0)
-                        total_partial_days_agence += stats.get('partial_days', 0)
-                        break  # Trouvé dans une catégorie, pas besoin de chercher dans les autres
-
-            # Moyennes par employé
-            employee_count = len(agence_employees)
-            avg_classic_sick_leaves = total_classic_sick_leaves / employee_count if employee_count else 0
-            avg_long_sick_leaves = total_long_sick_leaves / employee_count if employee_count else 0
-            avg_sick_leave_periods = total_sick_leave_periods / employee_count if employee_count else 0
-            avg_sick_leave_hours = total_sick_leave_hours / employee_count if employee_count else 0
-            avg_sick_leave_days = avg_sick_leave_hours / 7.0
-
-            avg_full_days_agence = total_full_days_agence / employee_count if employee_count else 0
-            avg_partial_days_agence = total_partial_days_agence / employee_count if employee_count else 0
-            total_work_days_agence = total_full_days_agence + total_partial_days_agence
-            percentage_full_days_agence = (total_full_days_agence / total_work_days_agence * 100) if total_work_days_agence > 0 else 0
+        for agence_name in SUMMARY_AGENCIES:
+            group = self._summary_averages(groups.get(('agency', agence_name), self._empty_summary_group()))
 
             summary.append(f"{agence_name} :")
-            summary.append(f"- Nombre d'employés : {employee_count}")
-            summary.append(f"- Employés avec heures supplémentaires : {len(employees_with_overtime_agence)} ({percentage_with_overtime_agence:.1f}%)")
-            if employees_with_overtime_agence:
-                summary.append(f"- Moyenne heures supplémentaires par employé : {avg_overtime_with_overtime_only:.2f}h ({avg_overtime_with_overtime_only_days:.2f} jours)")
-            summary.append(f"- Arrêts maladie classiques (41) : {total_classic_sick_leaves} (moy. {avg_classic_sick_leaves:.2f} par employé)")
-            summary.append(f"- Arrêts maladie longs (5H) : {total_long_sick_leaves} (moy. {avg_long_sick_leaves:.2f} par employé)")
-            summary.append(f"- Périodes d'arrêt maladie : {total_sick_leave_periods} (moy. {avg_sick_leave_periods:.2f} par employé)")
-            summary.append(f"- Moyenne des heures par arrêt maladie : {avg_sick_leave_hours:.2f}h ({avg_sick_leave_days:.2f} jours)")
-            summary.append(f"- Jours complets (8h) : {total_full_days_agence} (moy. {avg_full_days_agence:.2f} par employé)")
-            summary.append(f"- Jours partiels (<8h) : {total_partial_days_agence} (moy. {avg_partial_days_agence:.2f} par employé)")
-            summary.append(f"- Pourcentage jours complets : {percentage_full_days_agence:.1f}%")
+            summary.append(f"- Nombre d'employés : {group['employees']}")
+            summary.append(f"- Employés avec heures supplémentaires : {group['with_overtime']} ({group['percentage_with_overtime']:.1f}%)")
+            if group['with_overtime']:
+                summary.append(f"- Moyenne heures supplémentaires par employé : {group['avg_overtime']:.2f}h ({group['avg_overtime'] / 7.0:.2f} jours)")
+            summary.append(f"- Arrêts maladie classiques (41) : {group['classic_sick_leaves']} (moy. {group['avg_classic_sick_leaves']:.2f} par employé)")
+            summary.append(f"- Arrêts maladie longs (5H) : {group['long_sick_leaves']} (moy. {group['avg_long_sick_leaves']:.2f} par employé)")
+            summary.append(f"- Périodes d'arrêt maladie : {group['sick_leave_periods']} (moy. {group['avg_sick_leave_periods']:.2f} par employé)")
+            summary.append(f"- Moyenne des heures par arrêt maladie : {group['avg_sick_leave_hours']:.2f}h ({group['avg_sick_leave_hours'] / 7.0:.2f} jours)")
+            summary.append(f"- Jours complets (8h) : {group['full_days']} (moy. {group['avg_full_days']:.2f} par employé)")
+            summary.append(f"- Jours partiels (<8h) : {group['partial_days']} (moy. {group['avg_partial_days']:.2f} par employé)")
+            summary.append(f"- Pourcentage jours complets : {group['percentage_full_days']:.1f}%")
             summary.append("")
 
         # --- SECTION DIRECTION RÉGIONALE ---
@@ -546,80 +843,141 @@ class ExportService:
         summary.append(SEPARATOR)
         summary.append("")
 
-        # Statistiques globales pour la DR Paris
-        # Heures supplémentaires
-        all_overtime = [overtime_by_employee.get(nni, 0.0) for nni in all_employees]
-        employees_with_overtime_dr = [h for h in all_overtime if h > 0]
-
-        avg_overtime_all_dr = sum(all_overtime) / len(all_overtime) if all_overtime else 0
-        avg_overtime_with_overtime_only_dr = sum(employees_with_overtime_dr) / len(employees_with_overtime_dr) if employees_with_overtime_dr else 0
-        percentage_with_overtime_dr = (len(employees_with_overtime_dr) / len(all_employees) * 100) if all_employees else 0
-
-        avg_overtime_all_days_dr = avg_overtime_all_dr / 7.0
-        avg_overtime_with_overtime_only_days_dr = avg_overtime_with_overtime_only_dr / 7.0
-
-        # Arrêts maladie
-        total_classic_sick_leaves_dr = 0
-        total_long_sick_leaves_dr = 0
-        total_sick_leave_periods_dr = 0
-        total_sick_leave_hours_dr = 0
-
-        for nni in all_employees:
-            if nni in sick_leave_by_employee:
-                stats = sick_leave_by_employee[nni]
-                total_classic_sick_leaves_dr += stats.get('classic_sick_leaves', 0)
-                total_long_sick_leaves_dr += stats.get('long_sick_leaves', 0)
-                total_sick_leave_periods_dr += stats.get('sick_leave_periods', 0)
-
-                # Calculer le total des heures d'arrêt maladie
-                classic_sick_leaves = stats.get('classic_sick_leaves', 0)
-                long_sick_leaves = stats.get('long_sick_leaves', 0)
-                avg_hours = stats.get('avg_hours_per_sick_leave', 0.0)
-                total_sick_leave_hours_dr += (classic_sick_leaves + long_sick_leaves) * avg_hours
-
-        # Jours de travail
-        total_full_days_dr = 0
-        total_partial_days_dr = 0
-
-        for nni in all_employees:
-            # Chercher dans toutes les catégories car un employé peut être dans n'importe laquelle
-            for category_key in ['ASTREINTES', 'TIPS']:  # Seulement ces 2 catégories ont des données
-                category_work_days = work_days_by_category.get(category_key, {})
-                if nni in category_work_days:
-                    stats = category_work_days[nni]
-                    total_full_days_dr += stats.get('full_days', 0)
-                    total_partial_days_dr += stats.get('partial_days', 0)
-                    break  # Trouvé dans une catégorie, pas besoin de chercher dans les autres
-
-        # Moyennes par employé
-        total_employees_dr = len(all_employees)
-        avg_classic_sick_leaves_dr = total_classic_sick_leaves_dr / total_employees_dr if total_employees_dr else 0
-        avg_long_sick_leaves_dr = total_long_sick_leaves_dr / total_employees_dr if total_employees_dr else 0
-        avg_sick_leave_periods_dr = total_sick_leave_periods_dr / total_employees_dr if total_employees_dr else 0
-        avg_sick_leave_hours_dr = total_sick_leave_hours_dr / total_employees_dr if total_employees_dr else 0
-        avg_sick_leave_days_dr = avg_sick_leave_hours_dr / 7.0
-
-        avg_full_days_dr = total_full_days_dr / total_employees_dr if total_employees_dr else 0
-        avg_partial_days_dr = total_partial_days_dr / total_employees_dr if total_employees_dr else 0
-        total_work_days_dr = total_full_days_dr + total_partial_days_dr
-        percentage_full_days_dr = (total_full_days_dr / total_work_days_dr * 100) if total_work_days_dr > 0 else 0
-
+        group = self._summary_averages(groups[('dr', 'DR PARIS')])
         summary.append("DR PARIS :")
         summary.append(f"- Nombre total d'employés : {total_employees}")
-        summary.append(f"- Employés avec heures supplémentaires : {len(employees_with_overtime_dr)} ({percentage_with_overtime_dr:.1f}%)")
-        if employees_with_overtime_dr:
-            summary.append(f"- Moyenne heures supplémentaires par employé : {avg_overtime_with_overtime_only_dr:.2f}h ({avg_overtime_with_overtime_only_days_dr:.2f} jours)")
-        summary.append(f"- Total arrêts maladie classiques (41) : {total_classic_sick_leaves_dr} (moy. {avg_classic_sick_leaves_dr:.2f} par employé)")
-        summary.append(f"- Total arrêts maladie longs (5H) : {total_long_sick_leaves_dr} (moy. {avg_long_sick_leaves_dr:.2f} par employé)")
-        summary.append(f"- Total périodes d'arrêt maladie : {total_sick_leave_periods_dr} (moy. {avg_sick_leave_periods_dr:.2f} par employé)")
-        summary.append(f"- Moyenne des heures par arrêt maladie : {avg_sick_leave_hours_dr:.2f}h ({avg_sick_leave_days_dr:.2f} jours)")
-        summary.append(f"- Total jours complets (8h) : {total_full_days_dr} (moy. {avg_full_days_dr:.2f} par employé)")
-        summary.append(f"- Total jours partiels (<8h) : {total_partial_days_dr} (moy. {avg_partial_days_dr:.2f} par employé)")
-        summary.append(f"- Pourcentage jours complets : {percentage_full_days_dr:.1f}%")
+        summary.append(f"- Employés avec heures supplémentaires : {group['with_overtime']} ({group['percentage_with_overtime']:.1f}%)")
+        if group['with_overtime']:
+            summary.append(f"- Moyenne heures supplémentaires par employé : {group['avg_overtime']:.2f}h ({group['avg_overtime'] / 7.0:.2f} jours)")
+        summary.append(f"- Total arrêts maladie classiques (41) : {group['classic_sick_leaves']} (moy. {group['avg_classic_sick_leaves']:.2f} par employé)")
+        summary.append(f"- Total arrêts maladie longs (5H) : {group['long_sick_leaves']} (moy. {group['avg_long_sick_leaves']:.2f} par employé)")
+        summary.append(f"- Total périodes d'arrêt maladie : {group['sick_leave_periods']} (moy. {group['avg_sick_leave_periods']:.2f} par employé)")
+        summary.append(f"- Moyenne des heures par arrêt maladie : {group['avg_sick_leave_hours']:.2f}h ({group['avg_sick_leave_hours'] / 7.0:.2f} jours)")
+        summary.append(f"- Total jours complets (8h) : {group['full_days']} (moy. {group['avg_full_days']:.2f} par employé)")
+        summary.append(f"- Total jours partiels (<8h) : {group['partial_days']} (moy. {group['avg_partial_days']:.2f} par employé)")
+        summary.append(f"- Pourcentage jours complets : {group['percentage_full_days']:.1f}%")
 
         # Joindre toutes les lignes
         return "\n".join(summary)
 
+    @staticmethod
+    def _empty_summary_group() -> Dict[str, Any]:
+        """Totaux vides d'un groupe du résumé texte"""
+        return {'employees': 0, 'with_overtime': 0, 'overtime_hours': 0.0,
+                'classic_sick_leaves': 0, 'long_sick_leaves': 0, 'sick_leave_periods': 0,
+                'sick_leave_hours': 0.0, 'full_days': 0, 'partial_days': 0}
+
+    def _aggregate_summary_groups(self, classifications: Dict[str, List[PMTRecord]],
+                                  overtime_by_employee: Dict[str, float],
+                                  sick_leave_by_employee: Dict[str, Dict[str, Any]],
+                                  work_days_by_category: Dict[str, Dict[str, Dict[str, Any]]]
+                                  ) -> Dict[Tuple[str, str], Dict[str, Any]]:
+        """
+        Totaux du résumé texte pour chaque catégorie, agence et pour la DR, en un passage
+
+        Un index des employés est construit une fois : NNI -> agences (toutes
+        ses lignes, l'agence étant déterminée une fois par libellé d'équipe)
+        et catégorie dont il a des lignes retenues par les règles métier.
+        Les métriques de chaque employé sont ensuite ajoutées aux totaux de
+        tous ses groupes.
+
+        Args:
+            classifications: Classifications des employés
+            overtime_by_employee: Heures supplémentaires par employé
+            sick_leave_by_employee: Arrêts maladie par employé
+            work_days_by_category: Jours de travail par catégorie puis par employé
+
+        Returns:
+            Dictionnaire (type de groupe, nom) -> totaux ; types 'category', 'agency' et 'dr'
+        """
+        # Index des employés (ordre de première apparition)
+        agency_by_team: Dict[str, str] = {}
+        agencies_by_nni: Dict[str, Set[str]] = {}
+        for records in classifications.values():
+            for record in records:
+                if not record.nni:
+                    continue
+                team = record.equipe_lib
+                agency = agency_by_team.get(team)
+                if agency is None:
+                    agency = agency_by_team[team] = self._get_agence_from_equipe_lib(team)
+                agencies = agencies_by_nni.get(record.nni)
+                if agencies is None:
+                    agencies = agencies_by_nni[record.nni] = set()
+                agencies.add(agency)
+
+        categories_by_nni: Dict[str, List[str]] = {}
+        for category in ['ASTREINTES', 'TIPS', '3X8', 'AUTRES']:
+            seen = set()
+            for record in self._filter_by_rules(classifications.get(category, []), category):
+                if record.nni and record.nni not in seen:
+                    seen.add(record.nni)
+                    categories_by_nni.setdefault(record.nni, []).append(category)
+
+        groups: Dict[Tuple[str, str], Dict[str, Any]] = {
+            ('category', category): self._empty_summary_group()
+            for category in ['ASTREINTES', 'TIPS', '3X8', 'AUTRES']
+        }
+        groups[('dr', 'DR PARIS')] = self._empty_summary_group()
+        astreintes_days = work_days_by_category.get('ASTREINTES', {})
+        tips_days = work_days_by_category.get('TIPS', {})
+
+        def add(group: Dict[str, Any], overtime: float, sick: Optional[Dict[str, Any]],
+                days: Optional[Dict[str, Any]]) -> None:
+            group['employees'] += 1
+            if overtime > 0:
+                group['with_overtime'] += 1
+                group['overtime_hours'] += overtime
+            if sick is not None:
+                classic = sick.get('classic_sick_leaves', 0)
+                long_leaves = sick.get('long_sick_leaves', 0)
+                group['classic_sick_leaves'] += classic
+                group['long_sick_leaves'] += long_leaves
+                group['sick_leave_periods'] += sick.get('sick_leave_periods', 0)
+                group['sick_leave_hours'] += (classic + long_leaves) * sick.get('avg_hours_per_sick_leave', 0.0)
+            if days is not None:
+                group['full_days'] += days.get('full_days', 0)
+                group['partial_days'] += days.get('partial_days', 0)
+
+        for nni, agencies in agencies_by_nni.items():
+            overtime = overtime_by_employee.get(nni, 0.0)
+            sick = sick_leave_by_employee.get(nni)
+            # Agences et DR : jours de travail ASTREINTES, sinon TIPS (seules catégories calculées)
+            days = astreintes_days.get(nni)
+            if days is None:
+                days = tips_days.get(nni)
+
+            add(groups[('dr', 'DR PARIS')], overtime, sick, days)
+            for agency in agencies:
+                group = groups.get(('agency', agency))
+                if group is None:
+                    group = groups[('agency', agency)] = self._empty_summary_group()
+                add(group, overtime, sick, days)
+            for category in categories_by_nni.get(nni, ()):
+                add(groups[('category', category)], overtime, sick,
+                    work_days_by_category.get(category, {}).get(nni))
+
+        return groups
+
+    @staticmethod
+    def _summary_averages(group: Dict[str, Any]) -> Dict[str, Any]:
+        """Ajoute aux totaux d'un groupe les moyennes par employé et pourcentages affichés"""
+        employees = group['employees']
+        with_overtime = group['with_overtime']
+        work_days = group['full_days'] + group['partial_days']
+        return dict(
+            group,
+            avg_overtime=group['overtime_hours'] / with_overtime if with_overtime else 0,
+            percentage_with_overtime=(with_overtime / employees * 100) if employees else 0,
+            avg_classic_sick_leaves=group['classic_sick_leaves'] / employees if employees else 0,
+            avg_long_sick_leaves=group['long_sick_leaves'] / employees if employees else 0,
+            avg_sick_leave_periods=group['sick_leave_periods'] / employees if employees else 0,
+            avg_sick_leave_hours=group['sick_leave_hours'] / employees if employees else 0,
+            avg_full_days=group['full_days'] / employees if employees else 0,
+            avg_partial_days=group['partial_days'] / employees if employees else 0,
+            percentage_full_days=(group['full_days'] / work_days * 100) if work_days > 0 else 0
+        )
+
     def _format_excel_sheets(self, writer, main_df: pd.DataFrame) -> None:
         """
         Formate les feuilles Excel
@@ -695,7 +1053,7 @@ class ExportService:
         for category, records in classifications.items():
             if records:
                 # Appliquer les règles métier pour obtenir les vrais chiffres
-                filtered_records = self.classifier.filter_records_by_business_rules(records, category)
+                filtered_records = self._filter_by_rules(records, category)
 
                 # Compter les employés uniques avec NNI valide
                 unique_employees = set()
@@ -762,7 +1120,7 @@ class ExportService:
         total_records = 0
 
         for category, records in classifications.items():
-            filtered_records = self.classifier.filter_records_by_business_rules(records, category)
+            filtered_records = self._filter_by_rules(records, category)
             total_records += len(filtered_records)
 
             for record in filtered_records:
@@ -923,34 +1281,44 @@ class ExportService:
             worksheet = workbook.add_worksheet('GRAPHIQUES')
 
             # Préparer les données pour les graphiques
-            chart_data = self._prepare_chart_data(classifications, overtime_by_employee, sick_leave_by_employee, work_days_by_category)
+            with timed("Données des graphiques"):
+                chart_data = self._prepare_chart_data(classifications, overtime_by_employee, sick_leave_by_employee, work_days_by_category)
 
             # 1. Graphique en barres - Heures supplémentaires ASTREINTES par agence (total)
-            self._create_bar_chart_astreintes_overtime_by_agency(workbook, worksheet, classifications, overtime_by_employee, 0, 0)
+            with timed("astreintes_overtime_by_agency"):
+                self._create_bar_chart_astreintes_overtime_by_agency(workbook, worksheet, classifications, overtime_by_employee, 0, 0)
 
             # 2. Graphique en barres - Moyenne heures supplémentaires ASTREINTES par agence
-            self._create_bar_chart_astreintes_avg_overtime_by_agency(workbook, worksheet, classifications, overtime_by_employee, 0, 12)
+            with timed("astreintes_avg_overtime_by_agency"):
+                self._create_bar_chart_astreintes_avg_overtime_by_agency(workbook, worksheet, classifications, overtime_by_employee, 0, 12)
 
             # 3. Graphique en barres - Heures supplémentaires 3X8 par agence (total)
-            self._create_bar_chart_3x8_overtime_by_agency(workbook, worksheet, classifications, overtime_by_employee, 27, 0)
+            with timed("3x8_overtime_by_agency"):
+                self._create_bar_chart_3x8_overtime_by_agency(workbook, worksheet, classifications, overtime_by_employee, 27, 0)
 
             # 4. Graphique en barres - Moyenne heures supplémentaires 3X8 par agence
-            self._create_bar_chart_3x8_avg_overtime_by_agency(workbook, worksheet, classifications, overtime_by_employee, 27, 12)
+            with timed("3x8_avg_overtime_by_agency"):
+                self._create_bar_chart_3x8_avg_overtime_by_agency(workbook, worksheet, classifications, overtime_by_employee, 27, 12)
 
             # 5. Graphique en barres - Nombre d'arrêts maladie 41 et 5H par agence
-            self._create_bar_chart_sick_leaves_by_agency(workbook, worksheet, classifications, sick_leave_by_employee, 54, 0)
+            with timed("sick_leaves_by_agency"):
+                self._create_bar_chart_sick_leaves_by_agency(workbook, worksheet, classifications, sick_leave_by_employee, 54, 0)
 
             # 6. Graphique en barres - Moyenne jours d'arrêt maladie par agence
-            self._create_bar_chart_avg_sick_leave_days_by_agency(workbook, worksheet, classifications, sick_leave_by_employee, 54, 12)
+            with timed("avg_sick_leave_days_by_agency"):
+                self._create_bar_chart_avg_sick_leave_days_by_agency(workbook, worksheet, classifications, sick_leave_by_employee, 54, 12)
 
             # 7. Graphique en barres - Nombre de périodes d'arrêt maladie par agence
-            self._create_bar_chart_sick_leave_periods_by_agency(workbook, worksheet, classifications, sick_leave_by_employee, 87, 0)
+            with timed("sick_leave_periods_by_agency"):
+                self._create_bar_chart_sick_leave_periods_by_agency(workbook, worksheet, classifications, sick_leave_by_employee, 87, 0)
 
             # 8. Graphique en barres - Moyenne de jours d'arrêt par période par agence
-            self._create_bar_chart_avg_days_per_period_by_agency(workbook, worksheet, classifications, sick_leave_by_employee, 87, 12)
+            with timed("avg_days_per_period_by_agency"):
+                self._create_bar_chart_avg_days_per_period_by_agency(workbook, worksheet, classifications, sick_leave_by_employee, 87, 12)
 
             # 9. Graphique en barres - Nombre de périodes d'arrêt par agent par agence
-            self._create_bar_chart_avg_periods_per_agent_by_agency(workbook, worksheet, classifications, sick_leave_by_employee, 120, 0)
+            with timed("avg_periods_per_agent_by_agency"):
+                self._create_bar_chart_avg_periods_per_agent_by_agency(workbook, worksheet, classifications, sick_leave_by_employee, 120, 0)
 
             self.logger.info("Feuille graphiques créée avec succès")
 
@@ -977,7 +1345,7 @@ class ExportService:
 
         # Données par catégorie
         for category, records in classifications.items():
-            filtered_records = self.classifier.filter_records_by_business_rules(records, category)
+            filtered_records = self._filter_by_rules(records, category)
             unique_employees = set(record.nni for record in filtered_records if record.nni)
 
             # Nombre d'employés par catégorie
@@ -1020,7 +1388,7 @@ class ExportService:
 
         # Obtenir les employés ASTREINTES seulement
         astreintes_records = classifications.get('ASTREINTES', [])
-        filtered_astreintes = self.classifier.filter_records_by_business_rules(astreintes_records, 'ASTREINTES')
+        filtered_astreintes = self._filter_by_rules(astreintes_records, 'ASTREINTES')
 
         # Grouper les employés ASTREINTES par agence
         agence_overtime = {
@@ -1085,7 +1453,7 @@ class ExportService:
 
         # Obtenir les employés ASTREINTES seulement
         astreintes_records = classifications.get('ASTREINTES', [])
-        filtered_astreintes = self.classifier.filter_records_by_business_rules(astreintes_records, 'ASTREINTES')
+        filtered_astreintes = self._filter_by_rules(astreintes_records, 'ASTREINTES')
 
         # Grouper les employés ASTREINTES par agence
         employees_by_agency = {
@@ -1146,7 +1514,7 @@ class ExportService:
 
         # Obtenir les employés 3X8 seulement
         three_x8_records = classifications.get('3X8', [])
-        filtered_3x8 = self.classifier.filter_records_by_business_rules(three_x8_records, '3X8')
+        filtered_3x8 = self._filter_by_rules(three_x8_records, '3X8')
 
         # Grouper les employés 3X8 par agence
         employees_by_agency = {
@@ -1203,7 +1571,7 @@ class ExportService:
 
         # Obtenir les employés 3X8 seulement
         three_x8_records = classifications.get('3X8', [])
-        filtered_3x8 = self.classifier.filter_records_by_business_rules(three_x8_records, '3X8')
+        filtered_3x8 = self._filter_by_rules(three_x8_records, '3X8')
 
         # Grouper les employés 3X8 par agence
         employees_by_agency = {
@@ -1277,7 +1645,7 @@ class ExportService:
         employees_by_agency = {agency: set() for agency in target_agencies}
 
         for category, records in classifications.items():
-            filtered_records = self.classifier.filter_records_by_business_rules(records, category)
+            filtered_records = self._filter_by_rules(records, category)
 
             for record in filtered_records:
                 if record.nni:
@@ -1342,7 +1710,7 @@ class ExportService:
 
         # Regrouper les employés par agence
         for category, records in classifications.items():
-            filtered_records = self.classifier.filter_records_by_business_rules(records, category)
+            filtered_records = self._filter_by_rules(records, category)
             for record in filtered_records:
                 if record.nni:
                     agence = self._get_agence_from_sdum_lib(record.sdum_lib or '')
@@ -1393,7 +1761,7 @@ class ExportService:
 
         # Regrouper les employés par agence
         for category, records in classifications.items():
-            filtered_records = self.classifier.filter_records_by_business_rules(records, category)
+            filtered_records = self._filter_by_rules(records, category)
             for record in filtered_records:
                 if record.nni:
                     agence = self._get_agence_from_sdum_lib(record.sdum_lib or '')
@@ -1440,7 +1808,7 @@ class ExportService:
 
         # Regrouper les employés par agence
         for category, records in classifications.items():
-            filtered_records = self.classifier.filter_records_by_business_rules(records, category)
+            filtered_records = self._filter_by_rules(records, category)
             for record in filtered_records:
                 if record.nni:
                     agence = self._get_agence_from_sdum_lib(record.sdum_lib or '')
@@ -1492,7 +1860,7 @@ class ExportService:
 
         # Regrouper les employés par agence
         for category, records in classifications.items():
-            filtered_records = self.classifier.filter_records_by_business_rules(records, category)
+            filtered_records = self._filter_by_rules(records, category)
             for record in filtered_records:
                 if record.nni:
                     agence = self._get_agence_from_sdum_lib(record.sdum_lib or '')
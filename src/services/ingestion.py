@@ -0,0 +1,301 @@
+"""
+Ingestion automatique des extractions déposées dans le dossier d'entrée
+"""
+
+import fnmatch
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.config.settings import INGESTION_CONFIG, INPUT_DIR, OUTPUT_DIR
+from src.models.data_model import DatasetRef
+from src.services.metrics_store import MetricsStore
+from src.utils.instrumentation import start_run
+from src.utils.logger import logger
+
+
+class IngestionService:
+    """
+    Surveille un dossier et traite chaque extraction CSV déposée
+
+    Le dossier est parcouru toutes les `poll_interval` secondes (sans
+    dépendance à inotify, pour fonctionner à l'identique sous Windows). Un
+    fichier n'est pris en charge qu'une fois sa taille et sa date de
+    modification stables pendant `stable_polls` parcours, pour ne pas lire
+    une copie en cours.
+
+    Les fichiers prêts passent par une file bornée consommée par `workers`
+    threads : quand elle est pleine, le parcours s'arrête et les fichiers
+    restants sont repris au parcours suivant (contre-pression lors d'un dépôt
+    massif). Chaque fichier est chargé, exporté dans le dossier de sortie et
+    ses métriques par employé sont enregistrées ; une ligne d'ingestion est
+    écrite dans la base des métriques, qu'il ait réussi ou non. Un contenu
+    déjà ingéré avec succès (même empreinte) n'est pas retraité.
+    """
+
+    def __init__(self, input_dir: Optional[Path] = None, output_dir: Optional[Path] = None,
+                 store: Optional[MetricsStore] = None, workers: Optional[int] = None,
+                 queue_size: Optional[int] = None, poll_interval: Optional[float] = None,
+                 stable_polls: Optional[int] = None, formats: Optional[List[str]] = None,
+                 pattern: Optional[str] = None):
+        self.logger = logger.get_logger("IngestionService")
+        self.input_dir = Path(input_dir) if input_dir else INPUT_DIR
+        self.output_dir = Path(output_dir) if output_dir else OUTPUT_DIR
+        self.store = store or MetricsStore()
+        self.workers = workers or INGESTION_CONFIG["workers"]
+        self.poll_interval = poll_interval if poll_interval is not None else INGESTION_CONFIG["poll_interval"]
+        self.stable_polls = stable_polls or INGESTION_CONFIG["stable_polls"]
+        self.formats = formats or INGESTION_CONFIG["formats"]
+        self.pattern = pattern or INGESTION_CONFIG["pattern"]
+
+        self._queue: "queue.Queue[Optional[Tuple[Path, Tuple[int, float]]]]" = queue.Queue(
+            maxsize=queue_size or INGESTION_CONFIG["queue_size"]
+        )
+        self._stop_event = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+
+        # Chemin -> (signature (taille, date), nombre de parcours sans changement)
+        self._candidates: Dict[Path, Tuple[Tuple[int, float], int]] = {}
+        # Chemin -> signature déjà mise en file ou traitée
+        self._handled: Dict[Path, Tuple[int, float]] = {}
+        self._in_flight = 0
+        self.results: List[Dict[str, Any]] = []
+
+    def start(self) -> None:
+        """Démarre les threads de traitement"""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self._stop_event.clear()
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._worker_loop, name=f"Ingestion-{index + 1}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        self.logger.info(f"Surveillance de {self.input_dir} ({self.workers} traitements simultanés, "
+                         f"file de {self._queue.maxsize})")
+
+    def stop(self, wait: bool = True) -> None:
+        """Arrête les threads après le fichier en cours (les fichiers en file sont abandonnés)"""
+        self._stop_event.set()
+        while True:
+            try:
+                self._queue.get_nowait()
+                self._queue.task_done()
+            except queue.Empty:
+                break
+        for _ in self._threads:
+            self._queue.put(None)
+        if wait:
+            for thread in self._threads:
+                thread.join()
+        self._threads = []
+
+    def run_forever(self) -> None:
+        """Surveille le dossier jusqu'à interruption (Ctrl+C) ou appel de stop()"""
+        self.start()
+        try:
+            while not self._stop_event.is_set():
+                self.poll()
+                self._stop_event.wait(self.poll_interval)
+        except KeyboardInterrupt:
+            self.logger.info("Arrêt demandé")
+        finally:
+            self.stop()
+
+    def run_once(self) -> List[Dict[str, Any]]:
+        """
+        Traite les fichiers présents puis s'arrête (mode batch / planificateur)
+
+        Les fichiers sont considérés comme complets : pas d'attente de stabilité.
+
+        Returns:
+            Résultats des ingestions
+        """
+        self.start()
+        try:
+            pending = self._list_files()
+            while pending and not self._stop_event.is_set():
+                path, signature = pending[0]
+                try:
+                    # Attente bornée : la file reste pleine tant que les threads sont occupés
+                    self._queue.put((path, signature), timeout=1.0)
+                except queue.Full:
+                    continue
+                self._mark_queued(path, signature)
+                pending.pop(0)
+            self._queue.join()
+        finally:
+            self.stop()
+        return self.results
+
+    def poll(self) -> int:
+        """
+        Parcourt le dossier une fois et met en file les fichiers stables
+
+        Returns:
+            Nombre de fichiers mis en file
+        """
+        queued = 0
+        queue_full = False
+        present = set()
+        for path, signature in self._list_files():
+            present.add(path)
+            if self._handled.get(path) == signature:
+                continue
+
+            previous = self._candidates.get(path)
+            stable = previous[1] + 1 if previous and previous[0] == signature else 0
+            self._candidates[path] = (signature, stable)
+            if stable < self.stable_polls or queue_full:
+                continue
+
+            try:
+                self._queue.put_nowait((path, signature))
+            except queue.Full:
+                # Contre-pression : les fichiers restants attendront le prochain parcours
+                self.logger.info(f"File d'ingestion pleine ({self._queue.maxsize}) : mise en file suspendue")
+                queue_full = True
+                continue
+            self._mark_queued(path, signature)
+            queued += 1
+
+        # Oublier les fichiers supprimés ou déplacés
+        for path in list(self._candidates):
+            if path not in present:
+                del self._candidates[path]
+        return queued
+
+    @property
+    def pending_count(self) -> int:
+        """Fichiers en file ou en cours de traitement"""
+        with self._lock:
+            return self._queue.qsize() + self._in_flight
+
+    def _list_files(self) -> List[Tuple[Path, Tuple[int, float]]]:
+        """Fichiers du dossier correspondant au motif, avec leur signature (taille, date)"""
+        files = []
+        try:
+            entries = list(os.scandir(self.input_dir))
+        except OSError as e:
+            self.logger.error(f"Impossible de parcourir {self.input_dir}: {str(e)}")
+            return files
+
+        for entry in sorted(entries, key=lambda item: item.name):
+            if not entry.is_file() or not fnmatch.fnmatch(entry.name.lower(), self.pattern.lower()):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue  # Supprimé entre-temps
+            files.append((Path(entry.path), (stat.st_size, stat.st_mtime)))
+        return files
+
+    def _mark_queued(self, path: Path, signature: Tuple[int, float]) -> None:
+        """Retient la version mise en file pour ne pas la reprendre au parcours suivant"""
+        self._handled[path] = signature
+        self._candidates.pop(path, None)
+
+    def _worker_loop(self) -> None:
+        """Consomme la file jusqu'à la sentinelle None"""
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                with self._lock:
+                    self._in_flight += 1
+                try:
+                    self.results.append(self.ingest_file(item[0]))
+                finally:
+                    with self._lock:
+                        self._in_flight -= 1
+            finally:
+                self._queue.task_done()
+
+    def ingest_file(self, path: Path) -> Dict[str, Any]:
+        """
+        Charge, exporte et enregistre les métriques d'une extraction
+
+        Args:
+            path: Extraction CSV
+
+        Returns:
+            Entrée d'ingestion (également enregistrée dans la base des métriques)
+        """
+        entry: Dict[str, Any] = {
+            "file": str(path), "success": False, "outputs": [],
+            "started_at": datetime.now().isoformat(timespec="seconds")
+        }
+        start = time.perf_counter()
+
+        with start_run(f"Ingestion {path.name}") as run:
+            try:
+                self._ingest(path, entry)
+                entry["success"] = True
+            except Exception as e:
+                entry["error"] = str(e)
+                self.logger.error(f"Ingestion de {path.name} en échec: {str(e)}")
+
+        entry["seconds"] = round(time.perf_counter() - start, 3)
+        entry["timings"] = run.to_dict()
+
+        if entry.get("skipped"):
+            return entry
+
+        try:
+            self.store.record_ingestion(entry)
+        except Exception as e:
+            self.logger.error(f"Impossible d'enregistrer l'ingestion de {path.name}: {str(e)}")
+
+        if entry["success"]:
+            self.logger.info(f"Ingestion de {path.name} terminée en {entry['seconds']:.1f}s "
+                             f"({entry.get('rows', 0)} lignes, {len(entry['outputs'])} exports)")
+        return entry
+
+    def _ingest(self, path: Path, entry: Dict[str, Any]) -> None:
+        """Étapes de ingest_file ; complète `entry` au fil du traitement"""
+        from src.services.csv_processor import CSVProcessor
+        from src.services.export_service import ExportService
+
+        fingerprint = self.store.fingerprint_file(path)
+        entry["fingerprint"] = fingerprint
+        if self.store.is_ingested(fingerprint):
+            entry["skipped"] = True
+            self.logger.info(f"{path.name} déjà ingéré (contenu identique) : ignoré")
+            return
+
+        processor = CSVProcessor()
+        result = processor.load_file(str(path))
+        entry["rows"] = result.records_processed
+        if not result.success:
+            raise Exception(result.error_message)
+
+        records = processor.get_records()
+        dataset = DatasetRef(fingerprint=fingerprint, source_name=path.name)
+        export_service = ExportService(metrics_store=self.store)
+        exporters = {
+            "xlsx": export_service.export_to_excel,
+            "parquet": export_service.export_to_parquet,
+            "dataset": export_service.export_to_dataset
+        }
+
+        for export_format in self.formats:
+            if export_format == "dataset":
+                # Archive partitionnée commune : chaque extraction n'y ajoute que ses nouveaux jours
+                output_path = self.output_dir / "dataset"
+            else:
+                output_path = self.output_dir / f"{path.stem}.{export_format}"
+            if export_format == "txt":
+                entry["outputs"].append(export_service.export_summary_to_text(
+                    records, output_path=output_path, metrics=processor.metrics
+                ))
+            else:
+                entry["outputs"].append(exporters[export_format](
+                    records, output_path=output_path, metrics=processor.metrics, dataset=dataset
+                ))
+
+        if self.store.get_dataset(fingerprint) is None:
+            export_service.store_metrics(records, dataset, metrics=processor.metrics)
@@ -0,0 +1,258 @@
+"""
+Classements (top K) et valeurs atypiques des métriques par employé pour La Gabinette
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.config.settings import RANKING_CONFIG
+from src.utils.instrumentation import timed
+from src.utils.logger import logger
+
+
+# Métrique -> colonne des lignes d'export (mêmes noms que PeriodMetrics)
+METRIC_COLUMNS = {
+    "overtime_hours": "Heure_Supp",
+    "classic_sick_leaves": "Arret_Maladie_41",
+    "long_sick_leaves": "Arret_Maladie_5H",
+    "sick_leave_periods": "Periode_Arret_Maladie",
+    "avg_hours_per_sick_leave": "Moy_Heures_Par_Arret",
+    "full_days": "Jour_Complet",
+    "partial_days": "Jour_Partiel",
+    "total_absence_hours": "Total_Heures_Absence"
+}
+
+GROUP_KEYS = ["agency", "category"]
+
+OUTLIER_METHODS = ["zscore", "iqr"]
+
+
+def top_k_indices(values: np.ndarray, k: int) -> np.ndarray:
+    """
+    Positions des k plus grandes valeurs, de la plus grande à la plus petite
+
+    La k-ième valeur est trouvée par np.partition (linéaire) ; seules les
+    valeurs qui l'atteignent sont ensuite triées. À valeur égale, la
+    position la plus petite passe devant.
+
+    Args:
+        values: Valeurs
+        k: Nombre de positions retenues
+
+    Returns:
+        Tableau d'au plus k positions
+    """
+    if k <= 0 or not len(values):
+        return np.empty(0, dtype=np.intp)
+    if k < len(values):
+        kth = np.partition(values, len(values) - k)[len(values) - k]
+        candidates = np.flatnonzero(values >= kth)
+    else:
+        candidates = np.arange(len(values))
+    order = np.lexsort((candidates, -values[candidates]))
+    return candidates[order[:k]]
+
+
+class EmployeeRanking:
+    """
+    Top K et valeurs atypiques des métriques par employé, par agence et/ou catégorie
+
+    Construit à partir des lignes employé de l'export
+    (ExportService.build_employee_rows) : une ligne par employé et par
+    catégorie, avec son agence. Chaque métrique est rangée une fois dans
+    un tableau numpy ; les groupes sont des codes entiers, si bien que
+    les sélections (np.partition) et les statistiques de groupe
+    (np.bincount, percentiles) sont calculées sans tri complet ni boucle
+    sur les employés.
+    """
+
+    def __init__(self, rows_by_category: Dict[str, List[Dict[str, Any]]]):
+        """
+        Args:
+            rows_by_category: Lignes employé par catégorie (colonnes d'export)
+        """
+        self.logger = logger.get_logger("EmployeeRanking")
+        self.rows: List[Dict[str, Any]] = []
+        categories: List[str] = []
+        for category, rows in rows_by_category.items():
+            self.rows.extend(rows)
+            categories.extend([category] * len(rows))
+
+        self._labels: Dict[str, List[str]] = {}
+        self._codes: Dict[str, np.ndarray] = {}
+        for key, values in (("agency", [row.get('Agence') or '' for row in self.rows]), ("category", categories)):
+            index: Dict[str, int] = {}
+            codes = [index.setdefault(value, len(index)) for value in values]
+            self._labels[key] = list(index)
+            self._codes[key] = np.asarray(codes, dtype=np.int64)
+        self._values: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def values(self, metric: str) -> np.ndarray:
+        """Valeurs d'une métrique pour toutes les lignes (0 si absente)"""
+        if metric not in METRIC_COLUMNS:
+            raise Exception(f"Métrique inconnue: {metric} (valeurs possibles: {', '.join(METRIC_COLUMNS)})")
+        values = self._values.get(metric)
+        if values is None:
+            column = METRIC_COLUMNS[metric]
+            values = self._values[metric] = np.fromiter(
+                (row.get(column) or 0 for row in self.rows), dtype=np.float64, count=len(self.rows)
+            )
+        return values
+
+    def _groups(self, group_by: Sequence[str]) -> Tuple[np.ndarray, List[Dict[str, str]]]:
+        """
+        Code de groupe de chaque ligne et description des groupes
+
+        Returns:
+            (code de groupe par ligne, {clé: valeur} de chaque groupe dans l'ordre des codes)
+        """
+        unknown = [key for key in group_by if key not in GROUP_KEYS]
+        if unknown:
+            raise Exception(f"Regroupement inconnu: {', '.join(unknown)} (valeurs possibles: {', '.join(GROUP_KEYS)})")
+
+        combined = np.zeros(len(self.rows), dtype=np.int64)
+        for key in group_by:
+            combined = combined * len(self._labels[key]) + self._codes[key]
+        group_codes, inverse = np.unique(combined, return_inverse=True)
+
+        groups = []
+        for code in group_codes.tolist():
+            labels = {}
+            for key in reversed(group_by):
+                code, position = divmod(code, len(self._labels[key]))
+                labels[key] = self._labels[key][position]
+            groups.append({key: labels[key] for key in group_by})
+        return inverse.reshape(-1), groups
+
+    def _entry(self, position: int, metric: str, value: float) -> Dict[str, Any]:
+        """Description d'une ligne employé dans un résultat"""
+        row = self.rows[position]
+        return {
+            "nni": row.get('NNI'),
+            "nom": row.get('Nom'),
+            "prenom": row.get('Prénom'),
+            "equipe": row.get('Équipe'),
+            "agency": self._labels["agency"][self._codes["agency"][position]],
+            "category": self._labels["category"][self._codes["category"][position]],
+            metric: value
+        }
+
+    def top_k(self, metric: str = "overtime_hours", k: Optional[int] = None,
+              group_by: Sequence[str] = ("agency",)) -> List[Dict[str, Any]]:
+        """
+        K employés de plus forte valeur d'une métrique dans chaque groupe
+
+        Les employés à 0 ne sont pas classés.
+
+        Args:
+            metric: Métrique (voir METRIC_COLUMNS)
+            k: Employés retenus par groupe (défaut: RANKING_CONFIG["top_k"])
+            group_by: Clés de regroupement ("agency", "category" ; vide = tous les employés)
+
+        Returns:
+            Une entrée par groupe : clés du groupe, nombre d'employés et classement
+        """
+        k = RANKING_CONFIG["top_k"] if k is None else k
+        values = self.values(metric)
+        with timed("Top K"):
+            inverse, groups = self._groups(group_by)
+            result = []
+            for group_index, group in enumerate(groups):
+                positions = np.flatnonzero(inverse == group_index)
+                ranked = positions[top_k_indices(values[positions], k)]
+                ranked = ranked[values[ranked] > 0]
+                result.append(dict(group, employees=len(positions), top=[
+                    dict(self._entry(position, metric, float(values[position])), rank=rank)
+                    for rank, position in enumerate(ranked.tolist(), start=1)
+                ]))
+            return result
+
+    def outliers(self, metric: str = "overtime_hours", method: str = "zscore", threshold: Optional[float] = None,
+                 group_by: Sequence[str] = ("agency",)) -> Dict[str, Any]:
+        """
+        Valeurs atypiques d'une métrique, comparées à celles de leur groupe
+
+        "zscore" : |valeur - moyenne| / écart-type du groupe au-delà du seuil.
+        "iqr" : valeur hors de [Q1 - seuil x IQR, Q3 + seuil x IQR] du groupe.
+        Un groupe sans dispersion (écart-type ou IQR nul) n'a pas de valeur
+        atypique.
+
+        Args:
+            metric: Métrique (voir METRIC_COLUMNS)
+            method: "zscore" ou "iqr"
+            threshold: Seuil (défaut: RANKING_CONFIG["zscore_threshold"] ou ["iqr_factor"])
+            group_by: Clés de regroupement ("agency", "category" ; vide = tous les employés)
+
+        Returns:
+            Statistiques de chaque groupe et lignes signalées (écart décroissant)
+        """
+        if method not in OUTLIER_METHODS:
+            raise Exception(f"Méthode inconnue: {method} (valeurs possibles: {', '.join(OUTLIER_METHODS)})")
+        if threshold is None:
+            threshold = RANKING_CONFIG["zscore_threshold" if method == "zscore" else "iqr_factor"]
+        values = self.values(metric)
+
+        with timed("Valeurs atypiques"):
+            inverse, groups = self._groups(group_by)
+            flags, scores, stats = (self._zscore_flags if method == "zscore" else self._iqr_flags)(
+                values, inverse, len(groups), threshold)
+
+            flagged = np.flatnonzero(flags)
+            flagged = flagged[np.lexsort((flagged, -np.abs(scores[flagged])))]
+            return {
+                "metric": metric,
+                "method": method,
+                "threshold": threshold,
+                "groups": [dict(group, **group_stats) for group, group_stats in zip(groups, stats)],
+                "outliers": [
+                    dict(self._entry(position, metric, float(values[position])),
+                         **groups[inverse[position]], score=round(float(scores[position]), 4))
+                    for position in flagged.tolist()
+                ]
+            }
+
+    @staticmethod
+    def _zscore_flags(values: np.ndarray, inverse: np.ndarray, group_count: int,
+                      threshold: float) -> Tuple[np.ndarray, np.ndarray, List[Dict[str, Any]]]:
+        """Z-scores par groupe (moyenne et écart-type de population via np.bincount)"""
+        counts = np.bincount(inverse, minlength=group_count).astype(np.float64)
+        means = np.bincount(inverse, weights=values, minlength=group_count) / np.maximum(counts, 1)
+        deviations = values - means[inverse]
+        stds = np.sqrt(np.bincount(inverse, weights=deviations ** 2, minlength=group_count) / np.maximum(counts, 1))
+
+        row_stds = stds[inverse]
+        scores = np.divide(deviations, row_stds, out=np.zeros_like(values), where=row_stds > 0)
+        flags = np.abs(scores) > threshold
+        stats = [
+            {"employees": int(counts[group]), "mean": round(float(means[group]), 4),
+             "std": round(float(stds[group]), 4), "outliers": int(count)}
+            for group, count in enumerate(np.bincount(inverse[flags], minlength=group_count).tolist())
+        ]
+        return flags, scores, stats
+
+    @staticmethod
+    def _iqr_flags(values: np.ndarray, inverse: np.ndarray, group_count: int,
+                   threshold: float) -> Tuple[np.ndarray, np.ndarray, List[Dict[str, Any]]]:
+        """Écarts interquartiles par groupe ; score = distance à la borne franchie en nombre d'IQR"""
+        quartiles = np.zeros((group_count, 2), dtype=np.float64)
+        counts = np.bincount(inverse, minlength=group_count)
+        for group in range(group_count):
+            if counts[group]:
+                quartiles[group] = np.percentile(values[inverse == group], [25, 75])
+        q1, q3 = quartiles[inverse, 0], quartiles[inverse, 1]
+        iqr = q3 - q1
+
+        below = np.divide(values - q1, iqr, out=np.zeros_like(values), where=iqr > 0)
+        above = np.divide(values - q3, iqr, out=np.zeros_like(values), where=iqr > 0)
+        scores = np.where(below < 0, below, np.maximum(above, 0))
+        flags = np.abs(scores) > threshold
+        stats = [
+            {"employees": int(counts[group]), "q1": round(float(quartiles[group, 0]), 4),
+             "q3": round(float(quartiles[group, 1]), 4), "outliers": int(count)}
+            for group, count in enumerate(np.bincount(inverse[flags], minlength=group_count).tolist())
+        ]
+        return flags, scores, stats
@@ -0,0 +1,348 @@
+"""
+Stockage persistant des métriques par employé pour La Gabinette (SQLite)
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.config.settings import METRICS_DB_PATH
+from src.utils.logger import logger
+
+
+# Colonne d'export -> colonne SQL (mêmes noms que les feuilles Excel)
+METRIC_COLUMNS = {
+    'NNI': 'nni',
+    'Agence': 'agence',
+    'Équipe': 'equipe',
+    'Nom': 'nom',
+    'Prénom': 'prenom',
+    'Jour_Complet': 'jour_complet',
+    'Jour_Partiel': 'jour_partiel',
+    'Total_Heures_Absence': 'total_heures_absence',
+    'Heure_Supp': 'heure_supp',
+    'Arret_Maladie_41': 'arret_maladie_41',
+    'Arret_Maladie_5H': 'arret_maladie_5h',
+    'Periode_Arret_Maladie': 'periode_arret_maladie',
+    'Moy_Heures_Par_Arret': 'moy_heures_par_arret'
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS datasets (
+    id INTEGER PRIMARY KEY,
+    fingerprint TEXT NOT NULL UNIQUE,
+    source_name TEXT NOT NULL,
+    period_start TEXT,
+    period_end TEXT,
+    records INTEGER NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_datasets_period ON datasets (period_start, period_end);
+
+CREATE TABLE IF NOT EXISTS employee_metrics (
+    dataset_id INTEGER NOT NULL REFERENCES datasets (id) ON DELETE CASCADE,
+    category TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    nni TEXT NOT NULL,
+    agence TEXT,
+    equipe TEXT,
+    nom TEXT,
+    prenom TEXT,
+    jour_complet INTEGER,
+    jour_partiel INTEGER,
+    total_heures_absence REAL,
+    heure_supp REAL,
+    arret_maladie_41 INTEGER,
+    arret_maladie_5h INTEGER,
+    periode_arret_maladie INTEGER,
+    moy_heures_par_arret REAL,
+    PRIMARY KEY (dataset_id, category, nni)
+);
+CREATE INDEX IF NOT EXISTS idx_metrics_nni ON employee_metrics (nni);
+CREATE INDEX IF NOT EXISTS idx_metrics_category_agence ON employee_metrics (category, agence);
+CREATE INDEX IF NOT EXISTS idx_metrics_agence ON employee_metrics (agence);
+
+CREATE TABLE IF NOT EXISTS ingestions (
+    id INTEGER PRIMARY KEY,
+    file_path TEXT NOT NULL,
+    fingerprint TEXT,
+    success INTEGER NOT NULL,
+    records INTEGER,
+    seconds REAL,
+    outputs TEXT,
+    error TEXT,
+    timings TEXT,
+    started_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_ingestions_fingerprint ON ingestions (fingerprint, success);
+"""
+
+
+class MetricsStore:
+    """
+    Métriques par employé persistées entre deux sessions
+
+    Une extraction (dataset) est identifiée par l'empreinte SHA-1 de son
+    contenu : recharger, réexporter ou comparer la même extraction interroge
+    la base au lieu de tout recalculer depuis le CSV. Chaque ligne correspond
+    à une ligne des feuilles d'export (catégorie, NNI) et porte la période
+    couverte par l'extraction.
+    """
+
+    def __init__(self, db_path: Optional[Path] = None):
+        self.logger = logger.get_logger("MetricsStore")
+        self.db_path = Path(db_path) if db_path else METRICS_DB_PATH
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        """Ouvre une connexion (une par appel : utilisable depuis n'importe quel thread)"""
+        if not self._initialized:
+            # Répertoire de la base créé avant la première connexion
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(str(self.db_path), timeout=30)
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA foreign_keys = ON")
+
+        with self._init_lock:
+            if not self._initialized:
+                connection.execute("PRAGMA journal_mode = WAL")
+                connection.executescript(SCHEMA)
+                self._initialized = True
+        return connection
+
+    @staticmethod
+    def fingerprint_file(path: Path, size: Optional[int] = None) -> str:
+        """
+        Empreinte SHA-1 du contenu d'un fichier
+
+        Args:
+            path: Fichier à lire
+            size: Nombre d'octets pris en compte (défaut: tout le fichier)
+
+        Returns:
+            Empreinte hexadécimale
+        """
+        digest = hashlib.sha1()
+        remaining = size
+        with open(path, 'rb') as file:
+            while remaining is None or remaining > 0:
+                block = file.read(1024 * 1024 if remaining is None else min(remaining, 1024 * 1024))
+                if not block:
+                    break
+                digest.update(block)
+                if remaining is not None:
+                    remaining -= len(block)
+        return digest.hexdigest()
+
+    def get_dataset(self, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """Informations d'une extraction stockée (None si inconnue)"""
+        with closing(self._connect()) as connection:
+            row = connection.execute(
+                "SELECT * FROM datasets WHERE fingerprint = ?", (fingerprint,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def list_datasets(self) -> List[Dict[str, Any]]:
+        """Extractions stockées, de la plus récente à la plus ancienne"""
+        with closing(self._connect()) as connection:
+            rows = connection.execute(
+                "SELECT d.*, COUNT(m.nni) AS employees FROM datasets d "
+                "LEFT JOIN employee_metrics m ON m.dataset_id = d.id "
+                "GROUP BY d.id ORDER BY d.created_at DESC"
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def save_dataset(self, fingerprint: str, source_name: str,
+                     rows_by_category: Dict[str, List[Dict[str, Any]]],
+                     period: Tuple[Optional[str], Optional[str]] = (None, None),
+                     records: int = 0) -> int:
+        """
+        Enregistre (ou remplace) les métriques d'une extraction
+
+        Args:
+            fingerprint: Empreinte du contenu de l'extraction
+            source_name: Nom du fichier source
+            rows_by_category: Lignes d'export (colonnes METRIC_COLUMNS) par catégorie
+            period: Dates ISO (début, fin) couvertes par l'extraction
+            records: Nombre d'enregistrements de l'extraction
+
+        Returns:
+            Identifiant de l'extraction
+        """
+        columns = list(METRIC_COLUMNS.values())
+        insert_sql = (f"INSERT INTO employee_metrics (dataset_id, category, position, {', '.join(columns)}) "
+                      f"VALUES ({', '.join('?' * (len(columns) + 3))})")
+
+        with closing(self._connect()) as connection, connection:
+            connection.execute("DELETE FROM datasets WHERE fingerprint = ?", (fingerprint,))
+            cursor = connection.execute(
+                "INSERT INTO datasets (fingerprint, source_name, period_start, period_end, records, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (fingerprint, source_name, period[0], period[1], records, datetime.now().isoformat(timespec="seconds"))
+            )
+            dataset_id = cursor.lastrowid
+            connection.executemany(insert_sql, (
+                (dataset_id, category, position, *(row.get(name) for name in METRIC_COLUMNS))
+                for category, rows in rows_by_category.items()
+                for position, row in enumerate(rows)
+            ))
+
+        self.logger.info(f"Métriques de {source_name} enregistrées ({sum(len(r) for r in rows_by_category.values())} lignes)")
+        return dataset_id
+
+    def get_export_rows(self, fingerprint: str) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+        """
+        Lignes d'export d'une extraction stockée, par catégorie, dans l'ordre d'origine
+
+        Returns:
+            Dictionnaire catégorie -> lignes (colonnes d'export), ou None si l'extraction est inconnue
+        """
+        dataset = self.get_dataset(fingerprint)
+        if dataset is None:
+            return None
+
+        with closing(self._connect()) as connection:
+            rows = connection.execute(
+                f"SELECT category, {', '.join(METRIC_COLUMNS.values())} FROM employee_metrics "
+                "WHERE dataset_id = ? ORDER BY category, position", (dataset['id'],)
+            ).fetchall()
+
+        rows_by_category: Dict[str, List[Dict[str, Any]]] = {}
+        for row in rows:
+            rows_by_category.setdefault(row['category'], []).append(self._to_export_row(row))
+        return rows_by_category
+
+    def query(self, nni: Optional[str] = None, category: Optional[str] = None,
+              agency: Optional[str] = None, period_start: Optional[str] = None,
+              period_end: Optional[str] = None, fingerprint: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Recherche des métriques par employé (tous les critères sont optionnels)
+
+        Args:
+            nni: NNI de l'employé
+            category: Catégorie (ASTREINTES, TIPS, 3X8, AUTRES)
+            agency: Agence (ex: Grenelle)
+            period_start: Date ISO : extractions couvrant au moins un jour à partir de cette date
+            period_end: Date ISO : extractions couvrant au moins un jour jusqu'à cette date
+            fingerprint: Restreindre à une extraction
+
+        Returns:
+            Lignes d'export complétées de 'Catégorie', 'Source', 'Début' et 'Fin'
+        """
+        conditions = []
+        parameters: List[Any] = []
+        for column, value in (("m.nni", nni), ("m.category", category), ("m.agence", agency),
+                              ("d.fingerprint", fingerprint)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                parameters.append(value)
+        if period_start is not None:
+            conditions.append("d.period_end >= ?")
+            parameters.append(period_start)
+        if period_end is not None:
+            conditions.append("d.period_start <= ?")
+            parameters.append(period_end)
+
+        sql = (f"SELECT m.category, d.source_name, d.period_start, d.period_end, "
+               f"{', '.join('m.' + column for column in METRIC_COLUMNS.values())} "
+               "FROM employee_metrics m JOIN datasets d ON d.id = m.dataset_id")
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY d.period_start, m.nni, m.category"
+
+        with closing(self._connect()) as connection:
+            rows = connection.execute(sql, parameters).fetchall()
+
+        results = []
+        for row in rows:
+            result = {'Catégorie': row['category'], 'Source': row['source_name'],
+                      'Début': row['period_start'], 'Fin': row['period_end']}
+            result.update(self._to_export_row(row))
+            results.append(result)
+        return results
+
+    def diff_datasets(self, fingerprint1: str, fingerprint2: str,
+                      category: str) -> Tuple[List[str], List[str], List[Tuple[Dict[str, Any], Dict[str, Any]]]]:
+        """
+        Rapproche deux extractions stockées pour une catégorie (jointure sur la clé primaire)
+
+        Returns:
+            Tuple (NNI seulement dans 1, NNI seulement dans 2, paires de lignes des NNI communs)
+        """
+        dataset1 = self.get_dataset(fingerprint1)
+        dataset2 = self.get_dataset(fingerprint2)
+        if dataset1 is None or dataset2 is None:
+            raise Exception("Extraction absente de la base des métriques")
+
+        columns = list(METRIC_COLUMNS.values())
+        only_sql = ("SELECT a.nni FROM employee_metrics a WHERE a.dataset_id = ? AND a.category = ? "
+                    "AND NOT EXISTS (SELECT 1 FROM employee_metrics b "
+                    "WHERE b.dataset_id = ? AND b.category = a.category AND b.nni = a.nni) ORDER BY a.position")
+        common_sql = (f"SELECT {', '.join('a.' + c for c in columns)}, {', '.join('b.' + c + ' AS b_' + c for c in columns)} "
+                      "FROM employee_metrics a JOIN employee_metrics b "
+                      "ON b.dataset_id = ? AND b.category = a.category AND b.nni = a.nni "
+                      "WHERE a.dataset_id = ? AND a.category = ? ORDER BY a.position")
+
+        with closing(self._connect()) as connection:
+            only1 = [row[0] for row in connection.execute(only_sql, (dataset1['id'], category, dataset2['id']))]
+            only2 = [row[0] for row in connection.execute(only_sql, (dataset2['id'], category, dataset1['id']))]
+            common = []
+            for row in connection.execute(common_sql, (dataset2['id'], dataset1['id'], category)):
+                row1 = {name: row[column] for name, column in METRIC_COLUMNS.items()}
+                row2 = {name: row['b_' + column] for name, column in METRIC_COLUMNS.items()}
+                common.append((row1, row2))
+
+        return only1, only2, common
+
+    def record_ingestion(self, entry: Dict[str, Any]) -> None:
+        """
+        Enregistre le résultat d'une ingestion automatique (une ligne par fichier traité)
+
+        Args:
+            entry: Clés 'file', 'fingerprint', 'success', 'rows', 'seconds',
+                'outputs', 'error', 'timings' et 'started_at'
+        """
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                "INSERT INTO ingestions (file_path, fingerprint, success, records, seconds, outputs, error, "
+                "timings, started_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (entry["file"], entry.get("fingerprint"), int(entry["success"]), entry.get("rows"),
+                 entry.get("seconds"), json.dumps(entry.get("outputs", []), ensure_ascii=False),
+                 entry.get("error"), json.dumps(entry.get("timings", {}), ensure_ascii=False),
+                 entry["started_at"])
+            )
+
+    def is_ingested(self, fingerprint: str) -> bool:
+        """Indique si un contenu identique a déjà été ingéré avec succès"""
+        with closing(self._connect()) as connection:
+            row = connection.execute(
+                "SELECT 1 FROM ingestions WHERE fingerprint = ? AND success = 1 LIMIT 1", (fingerprint,)
+            ).fetchone()
+        return row is not None
+
+    def list_ingestions(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """Dernières ingestions, de la plus récente à la plus ancienne"""
+        with closing(self._connect()) as connection:
+            rows = connection.execute(
+                "SELECT id, file_path, fingerprint, success, records, seconds, outputs, error, started_at "
+                "FROM ingestions ORDER BY id DESC LIMIT ?", (limit,)
+            ).fetchall()
+
+        results = []
+        for row in rows:
+            result = dict(row)
+            result["success"] = bool(result["success"])
+            result["outputs"] = json.loads(result["outputs"] or "[]")
+            results.append(result)
+        return results
+
+    @staticmethod
+    def _to_export_row(row: sqlite3.Row) -> Dict[str, Any]:
+        """Convertit une ligne SQL en ligne d'export"""
+        return {name: row[column] for name, column in METRIC_COLUMNS.items()}
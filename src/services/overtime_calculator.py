@@ -2,11 +2,11 @@
 Service de calcul des heures supplémentaires pour La Gabinette
 """
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Mapping, Optional
 from collections import defaultdict
 
 from src.models.data_model import PMTRecord
-from src.utils.logger import logger
+from src.utils.logger import AggregatedWarnings, logger
 
 
 class OvertimeCalculator:
@@ -16,6 +16,7 @@ class OvertimeCalculator:
         self.logger = logger.get_logger("OvertimeCalculator")
         self.OVERTIME_CODE = "D"  # Code pour les heures supplémentaires
         self.HOURS_PER_DAY = 8.0  # Conversion jour vers heures
+        self._unit_warnings = AggregatedWarnings(self.logger)  # Une ligne par unité inconnue
 
     def calculate_employee_overtime(self, records: List[PMTRecord]) -> Dict[str, float]:
         """
@@ -43,12 +44,15 @@ class OvertimeCalculator:
 
         return results
 
-    def calculate_all_employees_overtime(self, records: List[PMTRecord]) -> Dict[str, float]:
+    def calculate_all_employees_overtime(self, records: List[PMTRecord],
+                                         employees_records: Optional[Mapping[str, List[PMTRecord]]] = None) -> Dict[str, float]:
         """
         Calcule les heures supplémentaires pour tous les employés
 
         Args:
             records: Liste de tous les enregistrements
+            employees_records: Enregistrements déjà groupés par NNI (ex: EmployeeRecordStore) ;
+                à défaut ils sont groupés ici
 
         Returns:
             Dictionnaire avec les heures supplémentaires par employé (NNI -> heures)
@@ -59,10 +63,12 @@ class OvertimeCalculator:
             return {}
 
         # Grouper par employé
-        employee_records = defaultdict(list)
-        for record in records:
-            if record.nni:
-                employee_records[record.nni].append(record)
+        employee_records = employees_records
+        if employee_records is None:
+            employee_records = defaultdict(list)
+            for record in records:
+                if record.nni:
+                    employee_records[record.nni].append(record)
 
         # Calculer pour chaque employé
         results = {}
@@ -70,6 +76,7 @@ class OvertimeCalculator:
             overtime_hours = self._calculate_overtime_for_employee(employee_records_list)
             results[nni] = overtime_hours
 
+        self._unit_warnings.flush()
         self.logger.info(f"Heures supplémentaires calculées pour {len(results)} employés")
         return results
 
@@ -93,6 +100,22 @@ class OvertimeCalculator:
 
         return total_overtime
 
+    def calculate_daily_overtime(self, records: List[PMTRecord]) -> Dict[str, float]:
+        """
+        Heures supplémentaires d'un employé jour par jour (détail de _calculate_overtime_for_employee)
+
+        Args:
+            records: Enregistrements de l'employé
+
+        Returns:
+            Dictionnaire jour (JJ/MM/AAAA) -> heures supplémentaires (jours sans heures absents)
+        """
+        daily: Dict[str, float] = {}
+        for record in records:
+            if record.jour and self._is_overtime_record(record):
+                daily[record.jour] = daily.get(record.jour, 0.0) + self._calculate_overtime_hours(record)
+        return daily
+
     def _is_overtime_record(self, record: PMTRecord) -> bool:
         """
         Vérifie si un enregistrement correspond à des heures supplémentaires
@@ -156,7 +179,10 @@ class OvertimeCalculator:
             return float(record.valeur)
         else:
             # Unité inconnue, traiter comme des heures par défaut
-            self.logger.warning(f"Unité inconnue pour heures supplémentaires: '{record.des_unite}', traité comme heures")
+            self._unit_warnings.warning(
+                record.des_unite or "",
+                f"Unité inconnue pour heures supplémentaires: '{record.des_unite}', traité comme heures"
+            )
             return float(record.valeur)
 
     def get_overtime_summary(self, records: List[PMTRecord]) -> Dict[str, Any]:
@@ -0,0 +1,154 @@
+"""
+Calcul des métriques par employé réparti dans un pool de processus pour La Gabinette
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.config.settings import PARALLEL_CONFIG
+from src.services.record_store import EmployeeRecordStore
+from src.services.shared_columns import SharedRecordColumns, attach_worker, attached_columns
+from src.utils.instrumentation import count, timed
+from src.utils.logger import logger
+
+
+BACKENDS = ["auto", "process", "inline"]
+
+# Résultats d'un lot : (catégories, heures supp, arrêts maladie, jours de travail par catégorie)
+ShardResult = Tuple[Dict[str, str], Dict[str, float], Dict[str, Dict[str, Any]], Dict[str, Dict[str, Dict[str, Any]]]]
+
+
+_calculators = None
+
+
+def compute_store_metrics(store: EmployeeRecordStore, calculators=None) -> ShardResult:
+    """
+    Calcule toutes les métriques des employés d'un magasin
+
+    Args:
+        store: Enregistrements partitionnés par employé
+        calculators: (classifieur, heures supp, arrêts maladie, jours de travail) ;
+            par défaut des instances propres au processus
+
+    Returns:
+        Tuple (catégories, heures supp, arrêts maladie, jours de travail par catégorie)
+    """
+    global _calculators
+    if calculators is None:
+        if _calculators is None:
+            # Imports différés : le module est importé par chaque processus du pool
+            from src.services.employee_classifier import EmployeeClassifier
+            from src.services.overtime_calculator import OvertimeCalculator
+            from src.services.sick_leave_calculator import SickLeaveCalculator
+            from src.services.work_time_calculator import WorkTimeCalculator
+            _calculators = (EmployeeClassifier(), OvertimeCalculator(), SickLeaveCalculator(), WorkTimeCalculator())
+        calculators = _calculators
+
+    classifier, overtime_calculator, sick_leave_calculator, work_time_calculator = calculators
+    records = store.records
+    categories = classifier.categorize_employees(store)
+    classifications = classifier.classify_employees(records, store, categories)
+    overtime = overtime_calculator.calculate_all_employees_overtime(records, store)
+    sick_leave = sick_leave_calculator.calculate_all_employees_sick_leave(records, store)
+    work_days = work_time_calculator.calculate_all_employees_work_days(records, classifications, store, categories)
+    return categories, overtime, sick_leave, work_days
+
+
+def _compute_range(bounds: Tuple[int, int]) -> ShardResult:
+    """Point d'entrée des processus du pool : employés bounds[0]..bounds[1]-1 de la mémoire partagée"""
+    return compute_store_metrics(attached_columns().decode(*bounds))
+
+
+class ParallelMetricsExecutor:
+    """
+    Répartit le calcul des métriques par employé entre plusieurs processus
+
+    Toutes les métriques ne dépendent que des enregistrements de l'employé :
+    les employés du magasin sont découpés en lots contigus de tailles
+    voisines (en nombre d'enregistrements). Les colonnes utiles sont
+    copiées une fois dans une mémoire partagée (SharedRecordColumns) à
+    laquelle chaque processus du pool s'attache au démarrage : un lot n'est
+    qu'une paire de positions d'employés, et seuls les résultats par NNI
+    reviennent, réassemblés dans l'ordre des lots, c'est-à-dire l'ordre
+    des employés.
+
+    Le backend "auto" ne lance le pool qu'au-delà de `min_records`
+    enregistrements et s'il y a plus d'un processus : en dessous, le coût
+    de lancement et d'envoi dépasse le gain. En cas d'échec du pool, le
+    calcul est refait dans le processus courant.
+    """
+
+    def __init__(self, backend: Optional[str] = None, workers: Optional[int] = None,
+                 min_records: Optional[int] = None, shards_per_worker: Optional[int] = None):
+        self.logger = logger.get_logger("ParallelMetricsExecutor")
+        self.backend = backend or PARALLEL_CONFIG["backend"]
+        if self.backend not in BACKENDS:
+            raise Exception(f"Backend de calcul inconnu: {self.backend} (valeurs possibles: {', '.join(BACKENDS)})")
+        self.workers = workers or PARALLEL_CONFIG["workers"] or os.cpu_count() or 1
+        self.min_records = min_records if min_records is not None else PARALLEL_CONFIG["min_records"]
+        self.shards_per_worker = shards_per_worker or PARALLEL_CONFIG["shards_per_worker"]
+
+    def should_run(self, record_count: int) -> bool:
+        """Indique si le calcul de `record_count` enregistrements passe par le pool"""
+        if self.backend == "process":
+            return True
+        return self.backend == "auto" and self.workers > 1 and record_count >= self.min_records
+
+    def split(self, store: EmployeeRecordStore) -> List[Tuple[int, int]]:
+        """
+        Découpe les employés en lots contigus d'environ le même nombre d'enregistrements
+
+        Returns:
+            Liste des positions (premier, suivant le dernier) de chaque lot
+        """
+        shard_count = max(1, min(len(store), self.workers * self.shards_per_worker))
+        target = len(store.records) / shard_count
+        bounds = []
+        first = 0
+        for position in range(1, len(store) + 1):
+            if store.offsets[position] >= target * (len(bounds) + 1) or position == len(store):
+                bounds.append((first, position))
+                first = position
+        return bounds
+
+    def compute(self, store: EmployeeRecordStore) -> ShardResult:
+        """
+        Calcule les métriques de tous les employés du magasin dans le pool
+
+        Returns:
+            Tuple (catégories, heures supp, arrêts maladie, jours de travail par catégorie),
+            dans l'ordre des employés
+        """
+        categories: Dict[str, str] = {}
+        overtime: Dict[str, float] = {}
+        sick_leave: Dict[str, Dict[str, Any]] = {}
+        work_days: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        if not store.records:
+            return categories, overtime, sick_leave, work_days
+
+        bounds = self.split(store)
+        self.logger.info(f"Calcul des métriques de {len(store)} employés en {len(bounds)} lots "
+                         f"sur {self.workers} processus")
+        try:
+            with timed("Calcul parallèle"):
+                with timed("Mise en mémoire partagée"):
+                    columns = SharedRecordColumns.create(store)
+                count("lots", len(bounds))
+                count("octets_partages", columns.nbytes)
+                # Messages des processus réécrits par le parent (les handlers hérités n'écrivent rien)
+                with columns, logger.process_queue() as log_queue:
+                    with ProcessPoolExecutor(max_workers=self.workers, initializer=attach_worker,
+                                             initargs=(columns.layout, log_queue)) as pool:
+                        results = list(pool.map(_compute_range, bounds))
+        except Exception as e:
+            self.logger.warning(f"Calcul parallèle impossible ({e}) : calcul dans le processus courant")
+            return compute_store_metrics(store)
+
+        for shard_categories, shard_overtime, shard_sick_leave, shard_work_days in results:
+            categories.update(shard_categories)
+            overtime.update(shard_overtime)
+            sick_leave.update(shard_sick_leave)
+            for category, stats_by_nni in shard_work_days.items():
+                work_days.setdefault(category, {}).update(stats_by_nni)
+        return categories, overtime, sick_leave, work_days
@@ -0,0 +1,320 @@
+"""
+Archive Parquet partitionnée (mois / agence / catégorie) des enregistrements PMT pour La Gabinette
+"""
+
+import json
+import os
+import threading
+import uuid
+from datetime import date, datetime
+from operator import attrgetter
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from src.config.settings import DATASET_CONFIG, DATASET_DIR
+from src.models.data_model import PMTRecord
+from src.services.record_exporter import RECORD_COLUMNS
+from src.utils.helpers import date_sort_key
+from src.utils.instrumentation import count, timed
+from src.utils.logger import logger
+from src.utils.progress import ProgressReporter
+
+
+# À incrémenter à chaque changement des colonnes ou de leur type (les archives existantes sont alors refusées)
+DATASET_SCHEMA_VERSION = 1
+
+MANIFEST_NAME = "manifest.json"
+
+PARTITION_KEYS = ["month", "agency", "category"]
+
+# Colonnes non textuelles des fichiers ; toutes les autres colonnes de RECORD_COLUMNS sont des chaînes
+_NUMERIC_COLUMNS = {"valeur": "float64", "row_number": "int64"}
+
+# Un verrou par archive : les fichiers d'un même dossier surveillé (watch) peuvent être traités en parallèle
+_locks: Dict[str, threading.Lock] = {}
+_locks_guard = threading.Lock()
+
+
+def _dataset_lock(root: Path) -> threading.Lock:
+    """Verrou des ajouts à l'archive `root` dans ce processus"""
+    with _locks_guard:
+        return _locks.setdefault(str(root.resolve()), threading.Lock())
+
+
+def _record_date(record: PMTRecord) -> Optional[date]:
+    """Date d'un enregistrement (None si vide ou illisible)"""
+    key = date_sort_key(record.jour) if record.jour else None
+    if key is None:
+        return None
+    try:
+        return date(*key)
+    except ValueError:
+        return None
+
+
+class PartitionedParquetDataset:
+    """
+    Archive des enregistrements en fichiers Parquet (compression zstd) partitionnés
+
+    Les fichiers sont rangés par mois, agence et catégorie de l'employé
+    (répertoires month=2024-05/agency=Grenelle/category=TIPS, convention
+    Hive lue par pyarrow.dataset) ; les colonnes de partition ne sont pas
+    répétées dans les fichiers. Chaque ajout ne porte que sur les jours
+    absents de l'archive : les traitements quotidiens d'une extraction
+    complétée au fil de l'année n'écrivent que leurs nouveaux jours, en
+    nouveaux fichiers dans les partitions concernées, sans réécrire les
+    autres.
+
+    Le manifeste (manifest.json) décrit la version de schéma, les colonnes,
+    les jours archivés, les fichiers et nombres de lignes de chaque
+    partition et l'historique des ajouts. Il est réécrit atomiquement après
+    les fichiers d'un ajout : un fichier absent du manifeste (ajout
+    interrompu) n'en fait pas partie. Les lectures sélectives passent par
+    le manifeste et n'ouvrent que les partitions demandées.
+
+    La catégorie d'un enregistrement est celle de l'employé au moment de
+    l'ajout. Nécessite pyarrow.
+    """
+
+    def __init__(self, root: Optional[Path] = None, partition_by: Optional[List[str]] = None,
+                 compression: Optional[str] = None, compression_level: Optional[int] = None):
+        """
+        Args:
+            root: Répertoire de l'archive (défaut: DATASET_DIR)
+            partition_by: Clés de partition, parmi "month", "agency", "category"
+            compression: Codec Parquet (défaut: DATASET_CONFIG["compression"])
+            compression_level: Niveau du codec (défaut: DATASET_CONFIG["compression_level"])
+        """
+        self.logger = logger.get_logger("PartitionedParquetDataset")
+        self.root = Path(root) if root else DATASET_DIR
+        self.partition_by = list(partition_by or DATASET_CONFIG["partition_by"])
+        unknown = [key for key in self.partition_by if key not in PARTITION_KEYS]
+        if unknown:
+            raise Exception(f"Partition inconnue: {', '.join(unknown)} (valeurs possibles: {', '.join(PARTITION_KEYS)})")
+        self.compression = compression or DATASET_CONFIG["compression"]
+        self.compression_level = (compression_level if compression_level is not None
+                                  else DATASET_CONFIG["compression_level"])
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.root / MANIFEST_NAME
+
+    def read_manifest(self) -> Dict[str, Any]:
+        """
+        Manifeste de l'archive (manifeste vide si l'archive n'existe pas encore)
+
+        Raises:
+            Exception: Archive d'une autre version de schéma ou partitionnée autrement
+        """
+        if not self.manifest_path.exists():
+            return {
+                "schema_version": DATASET_SCHEMA_VERSION,
+                "format": "parquet",
+                "compression": self.compression,
+                "partition_by": self.partition_by,
+                "columns": ["date"] + list(RECORD_COLUMNS),
+                "total_rows": 0,
+                "dates": [],
+                "partitions": {},
+                "appends": []
+            }
+
+        manifest = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+        if manifest.get("schema_version") != DATASET_SCHEMA_VERSION:
+            raise Exception(f"Archive {self.root} en version de schéma {manifest.get('schema_version')} "
+                            f"(version attendue: {DATASET_SCHEMA_VERSION})")
+        if manifest.get("partition_by") != self.partition_by:
+            raise Exception(f"Archive {self.root} partitionnée par {', '.join(manifest.get('partition_by') or [])} "
+                            f"(attendu: {', '.join(self.partition_by)})")
+        return manifest
+
+    def _write_manifest(self, manifest: Dict[str, Any]) -> None:
+        """Remplace le manifeste (écriture dans un fichier temporaire puis renommage)"""
+        temporary = self.manifest_path.with_suffix(".json.tmp")
+        temporary.write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+        os.replace(temporary, self.manifest_path)
+
+    @staticmethod
+    def _schema():
+        """Schéma pyarrow des fichiers : date du jour puis colonnes de PMTRecord.to_dict"""
+        import pyarrow as pa
+
+        return pa.schema(
+            [pa.field("date", pa.date32())]
+            + [pa.field(column, getattr(pa, _NUMERIC_COLUMNS.get(column, "string"))()) for column in RECORD_COLUMNS]
+        )
+
+    def append(self, records: Iterable[PMTRecord], categories: Dict[str, str], agency_of: Callable[[str], str],
+               source: str = "", reporter: Optional[ProgressReporter] = None) -> Dict[str, Any]:
+        """
+        Ajoute à l'archive les enregistrements des jours qu'elle ne contient pas encore
+
+        Args:
+            records: Enregistrements (extraction complète ou jours récents)
+            categories: Catégorie de chaque NNI (défaut: AUTRES)
+            agency_of: Agence d'un libellé d'équipe
+            source: Nom de l'extraction, noté dans l'historique du manifeste
+            reporter: Progression (une étape par partition) et annulation
+
+        Returns:
+            Résumé de l'ajout : lignes écrites, jours ajoutés, lignes ignorées, partitions touchées
+        """
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise Exception("Export Parquet partitionné impossible: le module pyarrow n'est pas installé")
+
+        with _dataset_lock(self.root):
+            manifest = self.read_manifest()
+            archived = set(manifest["dates"])
+
+            with timed("Répartition par partition"):
+                groups, new_dates, skipped = self._group_new_records(records, archived, categories, agency_of)
+            count("partitions", len(groups))
+
+            schema = self._schema()
+            getter = attrgetter(*RECORD_COLUMNS)
+            token = f"{datetime.now().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}"
+            written_files: List[Path] = []
+            entries: Dict[str, Dict[str, Any]] = {}
+            if reporter is not None:
+                reporter.total_steps = len(groups)
+
+            try:
+                with timed("Écriture des partitions"):
+                    for partition, (days, partition_records) in groups.items():
+                        if reporter is not None:
+                            reporter.advance(f"Partition {partition}")
+                        directory = self.root / partition
+                        directory.mkdir(parents=True, exist_ok=True)
+                        first, last = min(days), max(days)
+                        path = directory / f"part-{first:%Y%m%d}-{last:%Y%m%d}-{token}.parquet"
+
+                        columns = list(zip(*map(getter, partition_records)))
+                        table = pa.Table.from_arrays(
+                            [pa.array(days, type=pa.date32())]
+                            + [pa.array(values, type=field.type) for values, field in zip(columns, list(schema)[1:])],
+                            schema=schema
+                        )
+                        pq.write_table(table, path, compression=self.compression,
+                                       compression_level=self.compression_level)
+                        written_files.append(path)
+                        entries[partition] = {
+                            "file": path.name,
+                            "rows": len(partition_records),
+                            "first_date": first.isoformat(),
+                            "last_date": last.isoformat(),
+                            "written_at": datetime.now().isoformat(timespec="seconds")
+                        }
+            except BaseException:
+                # Fichiers de l'ajout interrompu : jamais inscrits au manifeste
+                for path in written_files:
+                    path.unlink(missing_ok=True)
+                raise
+
+            rows = sum(entry["rows"] for entry in entries.values())
+            for partition, entry in entries.items():
+                partition_entry = manifest["partitions"].setdefault(partition, {"rows": 0, "files": []})
+                partition_entry["rows"] += entry["rows"]
+                partition_entry["files"].append(entry)
+            summary = {
+                "source": source,
+                "written_at": datetime.now().isoformat(timespec="seconds"),
+                "rows": rows,
+                "dates_added": len(new_dates),
+                "first_date": min(new_dates).isoformat() if new_dates else None,
+                "last_date": max(new_dates).isoformat() if new_dates else None,
+                "skipped_archived": skipped["archived"],
+                "skipped_undated": skipped["undated"],
+                "partitions": sorted(entries)
+            }
+            if entries:
+                manifest["total_rows"] += rows
+                manifest["dates"] = sorted(archived | {day.isoformat() for day in new_dates})
+                manifest["appends"].append({key: value for key, value in summary.items() if key != "partitions"})
+                self.root.mkdir(parents=True, exist_ok=True)
+                self._write_manifest(manifest)
+
+            count("lignes", rows)
+            self.logger.info(f"Archive {self.root}: {rows} lignes ajoutées ({len(new_dates)} jours, "
+                             f"{len(entries)} partitions), {skipped['archived']} lignes de jours déjà archivés")
+            return summary
+
+    def _group_new_records(self, records: Iterable[PMTRecord], archived: set, categories: Dict[str, str],
+                           agency_of: Callable[[str], str]) -> Tuple[Dict[str, Tuple[List[date], List[PMTRecord]]],
+                                                                      set, Dict[str, int]]:
+        """
+        Range par partition les enregistrements des jours non archivés
+
+        Returns:
+            (partition -> (dates, enregistrements), jours ajoutés, lignes ignorées par motif)
+        """
+        groups: Dict[str, Tuple[List[date], List[PMTRecord]]] = {}
+        new_dates = set()
+        skipped = {"archived": 0, "undated": 0}
+        days: Dict[str, Optional[date]] = {}
+        agencies: Dict[str, str] = {}
+        for record in records:
+            day = days.get(record.jour, False)
+            if day is False:
+                day = days[record.jour] = _record_date(record)
+            if day is None:
+                skipped["undated"] += 1
+                continue
+            if day.isoformat() in archived:
+                skipped["archived"] += 1
+                continue
+            new_dates.add(day)
+
+            agency = agencies.get(record.equipe_lib)
+            if agency is None:
+                agency = agencies[record.equipe_lib] = agency_of(record.equipe_lib or "")
+            values = {"month": f"{day.year}-{day.month:02d}", "agency": agency,
+                      "category": categories.get(record.nni, "AUTRES")}
+            partition = "/".join(f"{key}={values[key]}" for key in self.partition_by)
+
+            group = groups.get(partition)
+            if group is None:
+                group = groups[partition] = ([], [])
+            group[0].append(day)
+            group[1].append(record)
+        return groups, new_dates, skipped
+
+    def files(self, **criteria: str) -> List[Path]:
+        """
+        Fichiers des partitions correspondant aux critères, d'après le manifeste
+
+        Args:
+            **criteria: Valeur de clés de partition (ex: month="2024-05", agency="Grenelle")
+
+        Returns:
+            Chemins des fichiers, partition par partition
+        """
+        unknown = [key for key in criteria if key not in self.partition_by]
+        if unknown:
+            raise Exception(f"Critères inconnus: {', '.join(unknown)} (partitions: {', '.join(self.partition_by)})")
+
+        selected = []
+        for partition, entry in self.read_manifest()["partitions"].items():
+            values = dict(part.split("=", 1) for part in partition.split("/"))
+            if all(values.get(key) == value for key, value in criteria.items() if value is not None):
+                selected.extend(self.root / partition / file_entry["file"] for file_entry in entry["files"])
+        return selected
+
+    def read_table(self, **criteria: str):
+        """
+        Lit les partitions correspondant aux critères (voir files) en une table pyarrow
+
+        Les colonnes de partition sont reconstituées à partir des chemins.
+        """
+        try:
+            import pyarrow.dataset as ds
+        except ImportError:
+            raise Exception("Lecture de l'archive impossible: le module pyarrow n'est pas installé")
+
+        files = [str(path) for path in self.files(**criteria)]
+        if not files:
+            return self._schema().empty_table()
+        return ds.dataset(files, format="parquet", partitioning="hive",
+                          partition_base_dir=str(self.root)).to_table()
@@ -0,0 +1,236 @@
+"""
+Métriques par employé et par période (jour, semaine, mois, trimestre, année) pour La Gabinette
+"""
+
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.services.overtime_calculator import OvertimeCalculator
+from src.services.record_store import EmployeeRecordStore
+from src.services.sick_leave_calculator import SickLeaveCalculator
+from src.services.work_time_calculator import WorkTimeCalculator
+from src.utils.instrumentation import count, timed
+from src.utils.logger import logger
+
+
+GRANULARITIES = ["day", "week", "month", "quarter", "year", "all"]
+
+# Jours de travail calculés pour ces catégories seulement (comme calculate_all_employees_work_days)
+WORK_DAYS_CATEGORIES = ["ASTREINTES", "TIPS"]
+
+
+def _period_start(day: date, granularity: str) -> date:
+    """Premier jour de la période de `granularity` contenant `day`"""
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    if granularity == "quarter":
+        return date(day.year, 3 * ((day.month - 1) // 3) + 1, 1)
+    if granularity == "year":
+        return date(day.year, 1, 1)
+    return day
+
+
+def _next_period_start(day: date, granularity: str) -> date:
+    """Premier jour de la période suivant celle qui commence le `day`"""
+    if granularity == "day":
+        return day + timedelta(days=1)
+    if granularity == "week":
+        return day + timedelta(days=7)
+    months = {"month": 1, "quarter": 3, "year": 12}[granularity]
+    month_index = day.year * 12 + day.month - 1 + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def _period_label(day: date, granularity: str) -> str:
+    """Libellé d'une période (2024-05-14, 2024-S20, 2024-05, 2024-T2, 2024)"""
+    if granularity == "week":
+        year, week, _ = day.isocalendar()
+        return f"{year}-S{week:02d}"
+    if granularity == "month":
+        return f"{day.year}-{day.month:02d}"
+    if granularity == "quarter":
+        return f"{day.year}-T{(day.month - 1) // 3 + 1}"
+    if granularity == "year":
+        return str(day.year)
+    return day.isoformat()
+
+
+def period_boundaries(start: date, end: date, granularity: str = "month") -> List[Tuple[str, date, date]]:
+    """
+    Découpe [start, end] en périodes consécutives
+
+    La première et la dernière période sont tronquées à start et end
+    (fenêtre arbitraire). "all" donne une seule période.
+
+    Args:
+        start: Premier jour inclus
+        end: Dernier jour inclus
+        granularity: "day", "week", "month", "quarter", "year" ou "all"
+
+    Returns:
+        Liste de (libellé, premier jour, dernier jour)
+    """
+    if granularity not in GRANULARITIES:
+        raise Exception(f"Granularité inconnue: {granularity} (valeurs possibles: {', '.join(GRANULARITIES)})")
+    if end < start:
+        raise Exception(f"Période vide : fin {end.isoformat()} avant le début {start.isoformat()}")
+    if granularity == "all":
+        return [(f"{start.isoformat()}/{end.isoformat()}", start, end)]
+
+    boundaries = []
+    period_start = _period_start(start, granularity)
+    while period_start <= end:
+        next_start = _next_period_start(period_start, granularity)
+        boundaries.append((
+            _period_label(period_start, granularity),
+            max(period_start, start),
+            min(next_start - timedelta(days=1), end)
+        ))
+        period_start = next_start
+    return boundaries
+
+
+class PeriodMetrics:
+    """
+    Heures supplémentaires, arrêts maladie et jours de travail par période
+
+    Les enregistrements d'un employé étant triés par date dans le magasin,
+    les bornes de chaque période sont trouvées par dichotomie et les
+    tranches ainsi découpées alimentent directement les calculateurs, sans
+    nouveau regroupement ni rechargement du fichier.
+
+    La catégorie d'un employé est celle de l'extraction complète (une
+    période ne change pas la catégorie). Un arrêt maladie à cheval sur deux
+    périodes compte dans chacune d'elles.
+    """
+
+    def __init__(self, store: EmployeeRecordStore, categories: Dict[str, str]):
+        """
+        Args:
+            store: Enregistrements partitionnés par employé
+            categories: Catégorie de chaque NNI (EmployeeClassifier.categorize_employees)
+        """
+        self.logger = logger.get_logger("PeriodMetrics")
+        self.store = store
+        self.categories = categories
+        self.overtime_calculator = OvertimeCalculator()
+        self.sick_leave_calculator = SickLeaveCalculator()
+        self.work_time_calculator = WorkTimeCalculator()
+
+    def date_range(self) -> Optional[Tuple[date, date]]:
+        """Première et dernière date lisible des enregistrements (None si aucune)"""
+        first = last = None
+        keys = self.store.day_keys
+        offsets = self.store.offsets
+        for position in range(len(self.store)):
+            start, end = offsets[position], offsets[position + 1]
+            # Dates vides ou illisibles (0) en tête de tranche
+            start = bisect_right(keys, 0, start, end)
+            if start < end:
+                first = keys[start] if first is None else min(first, keys[start])
+                last = keys[end - 1] if last is None else max(last, keys[end - 1])
+        if first is None:
+            return None
+        return (date(first // 10000, first // 100 % 100, first % 100),
+                date(last // 10000, last // 100 % 100, last % 100))
+
+    def metrics(self, start: Optional[date] = None, end: Optional[date] = None,
+                granularity: str = "month") -> List[Dict[str, Any]]:
+        """
+        Métriques par employé de chaque période de [start, end]
+
+        Args:
+            start: Premier jour (défaut: première date de l'extraction)
+            end: Dernier jour (défaut: dernière date de l'extraction)
+            granularity: "day", "week", "month", "quarter", "year" ou "all"
+
+        Returns:
+            Une entrée par période : libellé, bornes (AAAA-MM-JJ), nombre
+            d'enregistrements, totaux par catégorie et métriques par NNI
+        """
+        date_range = self.date_range()
+        if date_range is None:
+            return []
+        start = start or date_range[0]
+        end = end or date_range[1]
+        periods = period_boundaries(start, end, granularity)
+
+        with timed("Métriques par période"):
+            count("periodes", len(periods))
+            with timed("Découpage des périodes"):
+                groups = self._split_periods(periods)
+            return [
+                self._period_entry(label, first_day, last_day, period_groups)
+                for (label, first_day, last_day), period_groups in zip(periods, groups)
+            ]
+
+    def _split_periods(self, periods: List[Tuple[str, date, date]]) -> List[Dict[str, List]]:
+        """Tranches NNI -> enregistrements de chaque période, en un passage sur les employés"""
+        store = self.store
+        keys = store.day_keys
+        records = store.records
+        period_keys = [(store.day_key(first), store.day_key(last)) for _, first, last in periods]
+        groups: List[Dict[str, List]] = [{} for _ in periods]
+
+        for position, nni in enumerate(store.nnis):
+            start, end = store.offsets[position], store.offsets[position + 1]
+            cut = bisect_left(keys, period_keys[0][0], start, end)
+            for period_index, (_, last_key) in enumerate(period_keys):
+                if cut >= end:
+                    break
+                stop = bisect_right(keys, last_key, cut, end)
+                if stop > cut:
+                    groups[period_index][nni] = records[cut:stop]
+                cut = stop
+        return groups
+
+    def _period_entry(self, label: str, first_day: date, last_day: date,
+                      employees_records: Dict[str, List]) -> Dict[str, Any]:
+        """Calcule les métriques d'une période à partir de ses tranches par employé"""
+        period_records = [record for employee_records in employees_records.values() for record in employee_records]
+        overtime = self.overtime_calculator.calculate_all_employees_overtime(period_records, employees_records)
+        sick_leave = self.sick_leave_calculator.calculate_all_employees_sick_leave(period_records, employees_records)
+        # Avec les tranches et les catégories, seules les clés des classifications servent
+        work_days = self.work_time_calculator.calculate_all_employees_work_days(
+            period_records, {category: [] for category in WORK_DAYS_CATEGORIES}, employees_records, self.categories
+        )
+
+        employees: Dict[str, Dict[str, Any]] = {}
+        totals: Dict[str, Dict[str, Any]] = {}
+        for nni in employees_records:
+            category = self.categories.get(nni, "AUTRES")
+            sick = sick_leave.get(nni, {})
+            days = work_days.get(category, {}).get(nni, {})
+            row = {
+                "category": category,
+                "overtime_hours": overtime.get(nni, 0.0),
+                "classic_sick_leaves": sick.get("classic_sick_leaves", 0),
+                "long_sick_leaves": sick.get("long_sick_leaves", 0),
+                "sick_leave_periods": sick.get("sick_leave_periods", 0),
+                "avg_hours_per_sick_leave": sick.get("avg_hours_per_sick_leave", 0.0),
+                "full_days": days.get("full_days", 0),
+                "partial_days": days.get("partial_days", 0),
+                "total_absence_hours": days.get("total_absence_hours", 0.0)
+            }
+            employees[nni] = row
+
+            total = totals.setdefault(category, {
+                "employees": 0, "overtime_hours": 0.0, "classic_sick_leaves": 0, "long_sick_leaves": 0,
+                "sick_leave_periods": 0, "full_days": 0, "partial_days": 0, "total_absence_hours": 0.0
+            })
+            total["employees"] += 1
+            for key in ("overtime_hours", "classic_sick_leaves", "long_sick_leaves", "sick_leave_periods",
+                        "full_days", "partial_days", "total_absence_hours"):
+                total[key] += row[key]
+
+        return {
+            "period": label,
+            "start": first_day.isoformat(),
+            "end": last_day.isoformat(),
+            "records": len(period_records),
+            "totals": totals,
+            "employees": employees
+        }
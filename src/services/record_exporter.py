@@ -0,0 +1,124 @@
+"""
+Export en flux des enregistrements PMT (NDJSON, CSV) par lots de taille fixe pour La Gabinette
+"""
+
+import csv
+import io
+import json
+from dataclasses import fields
+from itertools import islice
+from operator import attrgetter
+from typing import Iterable, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+from src.config.settings import RECORD_EXPORT_CONFIG
+from src.models.data_model import PMTRecord
+from src.utils.instrumentation import count
+from src.utils.progress import ProgressReporter
+
+
+RECORD_EXPORT_FORMATS = ["ndjson", "csv"]
+
+# Colonnes exportées : celles de PMTRecord.to_dict(), dans le même ordre
+RECORD_COLUMNS: Tuple[str, ...] = tuple(
+    field.name for field in fields(PMTRecord) if field.name not in ("validation_results", "shift_code")
+)
+
+
+def batched(records: Iterable[PMTRecord], batch_size: int) -> Iterator[List[PMTRecord]]:
+    """Découpe un flux d'enregistrements en lots d'au plus `batch_size` enregistrements"""
+    if batch_size < 1:
+        raise Exception(f"Taille de lot invalide: {batch_size}")
+    iterator = iter(records)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def iter_row_batches(batches: Iterable[List[PMTRecord]],
+                     columns: Sequence[str] = RECORD_COLUMNS) -> Iterator[List[tuple]]:
+    """Valeurs des colonnes de chaque enregistrement (tuples), lot par lot"""
+    getter = attrgetter(*columns)
+    if len(columns) == 1:
+        for batch in batches:
+            yield [(value,) for value in map(getter, batch)]
+    else:
+        for batch in batches:
+            yield list(map(getter, batch))
+
+
+def iter_ndjson_chunks(row_batches: Iterable[List[tuple]],
+                       columns: Sequence[str] = RECORD_COLUMNS) -> Iterator[Tuple[int, str]]:
+    """Un objet JSON par ligne ; produit (nombre de lignes, texte) pour chaque lot"""
+    dumps = json.JSONEncoder(ensure_ascii=False).encode
+    for rows in row_batches:
+        yield len(rows), "".join(dumps(dict(zip(columns, row))) + "\n" for row in rows)
+
+
+def iter_csv_chunks(row_batches: Iterable[List[tuple]], columns: Sequence[str] = RECORD_COLUMNS,
+                    separator: Optional[str] = None) -> Iterator[Tuple[int, str]]:
+    """
+    En-tête puis lignes CSV ; produit (nombre de lignes, texte) pour chaque lot
+
+    Le tampon du lot est réutilisé d'un lot à l'autre ; les valeurs absentes
+    (None) sont écrites vides.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=separator or RECORD_EXPORT_CONFIG["csv_separator"], lineterminator="\n")
+    writer.writerow(columns)
+    for rows in row_batches:
+        writer.writerows(rows)
+        yield len(rows), buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        # Aucun lot : l'en-tête seul
+        yield 0, buffer.getvalue()
+
+
+def write_records(records: Iterable[PMTRecord], output: TextIO, export_format: str = "ndjson",
+                  batch_size: Optional[int] = None, columns: Sequence[str] = RECORD_COLUMNS,
+                  reporter: Optional[ProgressReporter] = None) -> int:
+    """
+    Écrit un flux d'enregistrements en NDJSON ou CSV, un lot à la fois
+
+    Les enregistrements sont consommés au fil de l'écriture (liste,
+    générateur de filtrage...) : seul le lot en cours est converti en
+    mémoire, si bien que la mémoire reste constante quelle que soit la
+    taille du flux.
+
+    Args:
+        records: Enregistrements (itérable quelconque)
+        output: Fichier texte ouvert en écriture
+        export_format: "ndjson" ou "csv"
+        batch_size: Enregistrements par lot (défaut: RECORD_EXPORT_CONFIG["batch_size"])
+        columns: Colonnes exportées (défaut: toutes celles de PMTRecord.to_dict)
+        reporter: Progression (lignes écrites) et annulation vérifiées après chaque lot
+
+    Returns:
+        Nombre d'enregistrements écrits
+    """
+    if export_format not in RECORD_EXPORT_FORMATS:
+        raise Exception(f"Format inconnu: {export_format} (valeurs possibles: {', '.join(RECORD_EXPORT_FORMATS)})")
+    unknown = [column for column in columns if column not in RECORD_COLUMNS]
+    if unknown:
+        raise Exception(f"Colonnes inconnues: {', '.join(unknown)}")
+
+    row_batches = iter_row_batches(batched(records, batch_size or RECORD_EXPORT_CONFIG["batch_size"]), columns)
+    if export_format == "ndjson":
+        chunks = iter_ndjson_chunks(row_batches, columns)
+    else:
+        chunks = iter_csv_chunks(row_batches, columns)
+
+    written = 0
+    batches = 0
+    for rows, text in chunks:
+        output.write(text)
+        written += rows
+        batches += 1
+        if reporter is not None:
+            reporter.report("Écriture des enregistrements", rows=written)
+    count("lots", batches)
+    count("lignes", written)
+    return written
@@ -0,0 +1,129 @@
+"""
+Statistiques des enregistrements calculées au fil de la lecture pour La Gabinette
+"""
+
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from src.models.data_model import PMTRecord, ValidationResult, ValidationStatus
+from src.utils.helpers import date_sort_key
+
+
+class RecordStatistics:
+    """
+    Accumulateur des statistiques de résumé, alimenté enregistrement par enregistrement
+
+    Un seul passage pendant la lecture fournit les comptes de validation,
+    les employés et équipes distincts et la plage de dates ; les valeurs
+    sont ensuite disponibles sans reparcourir les enregistrements. Deux
+    accumulateurs se combinent (merge) pour un rechargement incrémental.
+
+    La plage de dates est chronologique : les dates JJ/MM/AAAA sont
+    comparées sous la forme (année, mois, jour), les dates illisibles sont
+    ignorées.
+    """
+
+    def __init__(self):
+        self.total_records = 0
+        self.records_valid = 0
+        self.records_with_warnings = 0
+        self.records_with_errors = 0
+        self.total_errors = 0
+        self.total_warnings = 0
+        self._employees: Set[Tuple[str, str]] = set()
+        self._teams: Set[str] = set()
+        self._min_date: Optional[Tuple[Tuple[int, int, int], str]] = None
+        self._max_date: Optional[Tuple[Tuple[int, int, int], str]] = None
+
+    def add(self, record: PMTRecord, validation_results: List[ValidationResult]) -> None:
+        """
+        Prend en compte un enregistrement et ses résultats de validation
+
+        Args:
+            record: Enregistrement lu
+            validation_results: Résultats de record.validate()
+        """
+        self.total_records += 1
+
+        errors = warnings = 0
+        for result in validation_results:
+            if result.status == ValidationStatus.ERROR:
+                errors += 1
+            elif result.status == ValidationStatus.WARNING:
+                warnings += 1
+        self.total_errors += errors
+        self.total_warnings += warnings
+        if errors:
+            self.records_with_errors += 1
+        else:
+            self.records_valid += 1
+        if warnings:
+            self.records_with_warnings += 1
+
+        if record.nom and record.prenom:
+            self._employees.add((record.nom, record.prenom))
+        if record.equipe_lib:
+            self._teams.add(record.equipe_lib)
+
+        if record.jour:
+            key = date_sort_key(record.jour)
+            if key is not None:
+                if self._min_date is None or key < self._min_date[0]:
+                    self._min_date = (key, record.jour)
+                if self._max_date is None or key > self._max_date[0]:
+                    self._max_date = (key, record.jour)
+
+    def merge(self, other: "RecordStatistics") -> None:
+        """
+        Ajoute les statistiques d'un autre accumulateur (lignes ajoutées au fichier)
+
+        Args:
+            other: Statistiques des nouveaux enregistrements
+        """
+        self.total_records += other.total_records
+        self.records_valid += other.records_valid
+        self.records_with_warnings += other.records_with_warnings
+        self.records_with_errors += other.records_with_errors
+        self.total_errors += other.total_errors
+        self.total_warnings += other.total_warnings
+        self._employees |= other._employees
+        self._teams |= other._teams
+        if other._min_date is not None and (self._min_date is None or other._min_date[0] < self._min_date[0]):
+            self._min_date = other._min_date
+        if other._max_date is not None and (self._max_date is None or other._max_date[0] > self._max_date[0]):
+            self._max_date = other._max_date
+
+    @property
+    def unique_employees(self) -> int:
+        """Employés distincts (nom, prénom)"""
+        return len(self._employees)
+
+    @property
+    def teams(self) -> List[str]:
+        """Libellés d'équipe distincts, triés"""
+        return sorted(self._teams)
+
+    def get_date_range(self) -> Dict[str, str]:
+        """Première et dernière date (format du fichier), chaînes vides si aucune"""
+        return {
+            "min_date": self._min_date[1] if self._min_date else "",
+            "max_date": self._max_date[1] if self._max_date else ""
+        }
+
+    def get_validation_summary(self) -> Dict[str, int]:
+        """Comptes de validation (même forme que l'ancien résumé de validation)"""
+        return {
+            "total_errors": self.total_errors,
+            "total_warnings": self.total_warnings,
+            "records_with_errors": self.records_with_errors,
+            "records_with_warnings": self.records_with_warnings
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Statistiques de résumé (forme de CSVProcessor.get_summary_statistics)"""
+        return {
+            "total_records": self.total_records,
+            "unique_employees": self.unique_employees,
+            "unique_teams": len(self._teams),
+            "date_range": self.get_date_range(),
+            "validation_summary": self.get_validation_summary()
+        }
@@ -0,0 +1,125 @@
+"""
+Enregistrements partitionnés par employé (NNI) pour La Gabinette
+"""
+
+from array import array
+from collections.abc import Mapping
+from datetime import date
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from src.models.data_model import PMTRecord
+from src.utils.helpers import date_sort_key
+
+
+# Clé des dates vides ou illisibles : avant toutes les autres (comme datetime.min)
+_NO_DATE = (0, 0, 0)
+
+
+class EmployeeRecordStore(Mapping):
+    """
+    Enregistrements triés une fois par (employé, date), en tranches contiguës
+
+    Les enregistrements sont rangés dans une seule liste : ceux d'un employé
+    occupent les positions offsets[i] à offsets[i + 1]. Les calculateurs
+    parcourent ces tranches au lieu de regrouper chacun les enregistrements
+    par NNI dans un dictionnaire de listes.
+
+    Les employés sont dans l'ordre de leur première apparition (ordre des
+    lignes des exports) ; à l'intérieur d'un employé, les enregistrements
+    sont dans l'ordre chronologique, à date égale dans l'ordre du fichier
+    (tri stable). Les enregistrements sans NNI, ignorés par tous les
+    calculateurs, ne sont pas conservés.
+
+    Le magasin se lit comme un dictionnaire NNI -> enregistrements de
+    l'employé ; il ne doit pas être modifié.
+
+    Les dates (day_keys, AAAAMMJJ) étant croissantes dans chaque tranche,
+    les enregistrements d'un employé sur une période s'obtiennent par
+    recherche dichotomique (voir PeriodMetrics).
+    """
+
+    def __init__(self, records: Iterable[PMTRecord]):
+        positions: Dict[str, int] = {}
+        keyed: List[Tuple[int, Tuple[int, int, int], PMTRecord]] = []
+        for record in records:
+            nni = record.nni
+            if not nni:
+                continue
+            position = positions.get(nni)
+            if position is None:
+                position = positions[nni] = len(positions)
+            date_key = date_sort_key(record.jour) if record.jour else None
+            keyed.append((position, date_key or _NO_DATE, record))
+
+        # Tri stable sur (employé, date) : l'enregistrement n'est jamais comparé
+        keyed.sort(key=lambda item: (item[0], item[1]))
+        self.records: List[PMTRecord] = [item[2] for item in keyed]
+        self.nnis: List[str] = list(positions)
+        self._positions = positions
+
+        self.offsets = array('l', [0] * (len(positions) + 1))
+        for index, item in enumerate(keyed):
+            self.offsets[item[0] + 1] = index + 1
+        self._day_keys: Optional[array] = None
+
+    @classmethod
+    def from_sorted(cls, records: List[PMTRecord], nnis: List[str], offsets: Sequence[int]) -> "EmployeeRecordStore":
+        """
+        Magasin sur des enregistrements déjà partitionnés (sans nouveau tri)
+
+        Args:
+            records: Enregistrements rangés par employé puis par date
+            nnis: NNI des employés, dans l'ordre des tranches
+            offsets: Début de chaque tranche, suivi de len(records)
+
+        Returns:
+            Magasin lisant ces tranches
+        """
+        store = cls.__new__(cls)
+        store.records = records
+        store.nnis = list(nnis)
+        store._positions = {nni: position for position, nni in enumerate(store.nnis)}
+        store.offsets = offsets
+        store._day_keys = None
+        return store
+
+    @staticmethod
+    def day_key(day: date) -> int:
+        """Clé AAAAMMJJ d'une date (même ordre que le tri des tranches)"""
+        return day.year * 10000 + day.month * 100 + day.day
+
+    @property
+    def day_keys(self) -> array:
+        """Date de chaque enregistrement en AAAAMMJJ (0 si vide ou illisible), calculée au premier appel"""
+        if self._day_keys is None:
+            keys = array('l')
+            for record in self.records:
+                date_key = date_sort_key(record.jour) if record.jour else None
+                year, month, day = date_key or _NO_DATE
+                keys.append(year * 10000 + month * 100 + day)
+            self._day_keys = keys
+        return self._day_keys
+
+    def bounds(self, nni: str) -> Tuple[int, int]:
+        """Positions (début, fin) des enregistrements d'un employé dans `records`"""
+        position = self._positions[nni]
+        return self.offsets[position], self.offsets[position + 1]
+
+    def __getitem__(self, nni: str) -> List[PMTRecord]:
+        start, end = self.bounds(nni)
+        return self.records[start:end]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.nnis)
+
+    def __len__(self) -> int:
+        return len(self.nnis)
+
+    def __contains__(self, nni: object) -> bool:
+        return nni in self._positions
+
+    def items(self) -> Iterator[Tuple[str, List[PMTRecord]]]:
+        """Tranches (NNI, enregistrements) dans l'ordre des employés"""
+        records, offsets = self.records, self.offsets
+        for position, nni in enumerate(self.nnis):
+            yield nni, records[offsets[position]:offsets[position + 1]]
@@ -0,0 +1,58 @@
+"""
+Cache des résultats dérivés d'un jeu d'enregistrements pour La Gabinette
+"""
+
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from src.utils.instrumentation import count
+
+
+class DerivedResultsCache:
+    """
+    Résultats calculés à partir des enregistrements chargés, mémorisés par clé
+
+    Toutes les entrées dépendent du même jeu d'enregistrements : elles sont
+    effacées ensemble par invalidate(), appelée à chaque modification de ce
+    jeu (chargement complet ou lignes ajoutées), et jamais autrement.
+
+    Les valeurs sont partagées entre les appelants : elles ne doivent pas
+    être modifiées.
+    """
+
+    def __init__(self, lock: Optional[threading.RLock] = None):
+        # Verrou partagé avec le propriétaire des enregistrements : un calcul
+        # qui le reprend ne peut pas s'interbloquer avec une invalidation
+        self._lock = lock or threading.RLock()
+        self._values: Dict[Hashable, Any] = {}
+        self.version = 0
+
+    def get(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Retourne la valeur mémorisée pour `key`, ou la calcule et la mémorise
+
+        Args:
+            key: Identifiant du résultat (ex: "classifications", ("filtre", "TIPS"))
+            compute: Calcul du résultat à partir des enregistrements courants
+
+        Returns:
+            Valeur du résultat
+        """
+        with self._lock:
+            if key in self._values:
+                count("resultats_en_cache")
+                return self._values[key]
+            # Calcul sous verrou : deux threads ne calculent pas le même résultat
+            value = compute()
+            self._values[key] = value
+            count("resultats_calcules")
+            return value
+
+    def invalidate(self) -> None:
+        """Efface tous les résultats (le jeu d'enregistrements a changé)"""
+        with self._lock:
+            self._values.clear()
+            self.version += 1
+
+    def __len__(self) -> int:
+        return len(self._values)
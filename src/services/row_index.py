@@ -0,0 +1,207 @@
+"""
+Index des lignes brutes d'une extraction CSV par NNI et par date (fichier projeté en mémoire)
+"""
+
+import csv
+import mmap
+import os
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from src.config.settings import CSV_ENCODING, CSV_SEPARATOR
+from src.models.data_model import CSVFormat
+from src.utils.logger import logger
+
+
+def deduplicate_columns(columns: List[str]) -> List[str]:
+    """
+    Renomme les colonnes répétées comme pandas ("De", "De.1", "De.2"...)
+
+    Les lignes relues depuis l'index ont ainsi les mêmes clés que celles
+    produites par pd.read_csv lors d'un chargement complet.
+    """
+    seen: Dict[str, int] = {}
+    result = []
+    for column in columns:
+        count = seen.get(column, 0)
+        seen[column] = count + 1
+        result.append(column if count == 0 else f"{column}.{count}")
+    return result
+
+
+class CSVRowIndex:
+    """
+    Positions (octets) des lignes d'une extraction, par NNI et par date
+
+    Le fichier est projeté en mémoire (mmap) et parcouru une seule fois :
+    seuls le NNI et la date de chaque ligne sont extraits, sans décodage
+    du reste. Les lignes d'un employé (ou d'un jour) sont ensuite relues et
+    analysées à la demande, ce qui évite de garder tous les enregistrements
+    en mémoire pour les vues de détail.
+
+    Les champs entre guillemets contenant un retour à la ligne ne sont pas
+    pris en charge (absents des extractions PMT).
+    """
+
+    BLOCK_SIZE = 8 * 1024 * 1024
+
+    def __init__(self, file_path: Path, csv_format: Optional[CSVFormat] = None):
+        """
+        Args:
+            file_path: Fichier CSV
+            csv_format: Format détecté (défaut: CSV_ENCODING et CSV_SEPARATOR)
+        """
+        self.logger = logger.get_logger("CSVRowIndex")
+        self.file_path = Path(file_path)
+        self.csv_format = csv_format or CSVFormat(encoding=CSV_ENCODING, separator=CSV_SEPARATOR)
+        self.encoding = self.csv_format.encoding
+        self.separator = self.csv_format.separator
+        self.columns: List[str] = []
+
+        self._file = None
+        self._mmap: Optional[mmap.mmap] = None
+        self._signature: Optional[Tuple[int, float]] = None
+        self._line_offsets = array('q')   # Début de chaque ligne de données
+        self._by_nni: Dict[str, array] = {}   # NNI -> indices de lignes
+        self._by_date: Dict[str, array] = {}  # Jour (JJ/MM/AAAA) -> indices de lignes
+
+    @property
+    def row_count(self) -> int:
+        """Nombre de lignes de données indexées"""
+        return len(self._line_offsets)
+
+    @property
+    def nnis(self) -> List[str]:
+        """NNI indexés, dans l'ordre de première apparition"""
+        return list(self._by_nni)
+
+    def build(self) -> "CSVRowIndex":
+        """
+        Projette le fichier en mémoire et indexe ses lignes (un seul parcours)
+
+        Returns:
+            L'index lui-même
+        """
+        self.close()
+        stat = os.stat(self.file_path)
+        self._signature = (stat.st_size, stat.st_mtime)
+        self._line_offsets = array('q')
+        self._by_nni = {}
+        self._by_date = {}
+        if stat.st_size == 0:
+            return self
+
+        self._file = open(self.file_path, 'rb')
+        self._mmap = mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        header_end = mm.find(b"\n")
+        if header_end < 0:
+            header_end = len(mm)
+        header = mm[:header_end].decode(self.encoding).rstrip("\r")
+        self.columns = deduplicate_columns(next(csv.reader([header], delimiter=self.separator), []))
+        try:
+            nni_position = self.columns.index("NNI")
+            date_position = self.columns.index("Jour")
+        except ValueError:
+            raise Exception("Colonnes NNI et Jour introuvables dans l'en-tête")
+
+        line_encoding = self.csv_format.byte_encoding
+        separator = self.separator.encode(line_encoding)
+        max_split = max(nni_position, date_position) + 1
+        offsets = self._line_offsets
+        by_nni = self._by_nni
+        by_date = self._by_date
+
+        position = header_end + 1
+        size = len(mm)
+        while position < size:
+            # Bloc coupé à la dernière fin de ligne complète
+            end = min(position + self.BLOCK_SIZE, size)
+            if end < size:
+                cut = mm.rfind(b"\n", position, end)
+                end = cut + 1 if cut >= position else (mm.find(b"\n", end) + 1 or size)
+            block = mm[position:end]
+
+            line_start = position
+            for line in block.split(b"\n"):
+                line_length = len(line) + 1
+                if line.strip(b"\r"):
+                    if b'"' in line:
+                        fields = next(csv.reader([line.decode(line_encoding)], delimiter=self.separator), [])
+                        nni = fields[nni_position] if len(fields) > nni_position else ""
+                        date = fields[date_position] if len(fields) > date_position else ""
+                    else:
+                        fields = line.split(separator, max_split)
+                        nni = fields[nni_position].decode(line_encoding) if len(fields) > nni_position else ""
+                        date = fields[date_position].decode(line_encoding) if len(fields) > date_position else ""
+
+                    row = len(offsets)
+                    offsets.append(line_start)
+                    indices = by_nni.get(nni)
+                    if indices is None:
+                        indices = by_nni[nni] = array('l')
+                    indices.append(row)
+                    indices = by_date.get(date)
+                    if indices is None:
+                        indices = by_date[date] = array('l')
+                    indices.append(row)
+                line_start += line_length
+            position = end
+
+        self.logger.info(f"Index de {self.file_path.name}: {len(offsets)} lignes, "
+                         f"{len(by_nni)} NNI, {len(by_date)} jours")
+        return self
+
+    def is_stale(self) -> bool:
+        """Indique si le fichier a changé (taille ou date) depuis la construction de l'index"""
+        try:
+            stat = os.stat(self.file_path)
+        except OSError:
+            return True
+        return (stat.st_size, stat.st_mtime) != self._signature
+
+    def get_rows(self, nni: Optional[str] = None, date: Optional[str] = None) -> List[Tuple[int, Dict[str, str]]]:
+        """
+        Relit les lignes d'un employé et/ou d'un jour
+
+        Args:
+            nni: NNI de l'employé
+            date: Jour au format de l'extraction (JJ/MM/AAAA)
+
+        Returns:
+            Liste (numéro de ligne du fichier, valeurs par colonne), dans l'ordre du fichier
+        """
+        if nni is None and date is None:
+            raise ValueError("Un NNI ou une date est requis")
+        if self._mmap is None:
+            return []
+
+        if nni is not None:
+            rows = self._by_nni.get(nni, array('l'))
+            if date is not None:
+                wanted = set(self._by_date.get(date, ()))
+                rows = [row for row in rows if row in wanted]
+        else:
+            rows = self._by_date.get(date, array('l'))
+
+        return [(row + 2, self._parse_line(row)) for row in rows]
+
+    def _parse_line(self, row: int) -> Dict[str, str]:
+        """Analyse une ligne à partir de sa position dans la projection"""
+        start = self._line_offsets[row]
+        end = self._mmap.find(b"\n", start)
+        line = self._mmap[start:end if end >= 0 else len(self._mmap)].rstrip(b"\r")
+        line = line.decode(self.csv_format.byte_encoding)
+        values = next(csv.reader([line], delimiter=self.separator), [])
+        values += [""] * (len(self.columns) - len(values))
+        return dict(zip(self.columns, values))
+
+    def close(self) -> None:
+        """Libère la projection et le fichier"""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
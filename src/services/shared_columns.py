@@ -0,0 +1,181 @@
+"""
+Enregistrements en colonnes dans une mémoire partagée entre processus pour La Gabinette
+"""
+
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.models.data_model import PMTRecord
+from src.services.record_store import EmployeeRecordStore
+from src.utils.logger import setup_process_logging
+
+
+# Attributs lus par la classification et les calculateurs : seuls ceux-ci sont placés en mémoire partagée
+SHARED_TEXT_FIELDS = (
+    "nni", "jour", "equipe_lib", "um_lib", "designation_jour", "jour_ferie", "fin_cycle",
+    "astreinte", "ht", "htm", "code", "des_unite", "heure_debut", "heure_fin"
+)
+
+_ALIGNMENT = 8
+
+
+class SharedRecordColumns:
+    """
+    Colonnes d'un EmployeeRecordStore placées dans un segment multiprocessing.shared_memory
+
+    Les colonnes texte sont encodées par dictionnaire (valeurs distinctes,
+    codes entiers du plus petit type suffisant) ; valeur, présence de la
+    valeur, poste 3x8 et offsets des employés sont des tableaux numpy. Tous
+    les tableaux sont rangés dans un seul segment : les processus de calcul
+    s'y attachent à partir de `layout` (petit dictionnaire sérialisable :
+    nom du segment, positions des tableaux, valeurs distinctes et NNI) et
+    lisent les mêmes octets sans copie. Seuls les résultats par lot
+    repassent par le pool.
+
+    Le processus qui crée le segment le libère (unlink) ; les autres ne font
+    que s'y attacher et s'en détacher (close).
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, layout: Dict[str, Any], owner: bool):
+        self._shm = shm
+        self.layout = layout
+        self._owner = owner
+        self._arrays: Dict[str, np.ndarray] = {
+            name: np.ndarray((length,), dtype=np.dtype(dtype), buffer=shm.buf, offset=offset)
+            for name, (dtype, offset, length) in layout["arrays"].items()
+        }
+
+    @classmethod
+    def create(cls, store: EmployeeRecordStore) -> "SharedRecordColumns":
+        """
+        Copie les colonnes utiles des enregistrements dans un nouveau segment
+
+        Args:
+            store: Enregistrements partitionnés par employé
+
+        Returns:
+            Colonnes partagées (à libérer par unlink())
+        """
+        records = store.records
+        arrays: Dict[str, np.ndarray] = {}
+        uniques: Dict[str, Tuple[str, ...]] = {}
+        for name in SHARED_TEXT_FIELDS:
+            index: Dict[str, int] = {}
+            codes = [index.setdefault(getattr(record, name), len(index)) for record in records]
+            uniques[name] = tuple(index)
+            arrays[name] = np.asarray(codes, dtype=np.min_scalar_type(max(len(index) - 1, 0)))
+
+        valeurs = [record.valeur for record in records]
+        arrays["valeur_missing"] = np.fromiter((valeur is None for valeur in valeurs), dtype=np.bool_, count=len(records))
+        arrays["valeur"] = np.fromiter((0.0 if valeur is None else valeur for valeur in valeurs),
+                                       dtype=np.float64, count=len(records))
+        arrays["shift_code"] = np.fromiter((record.get_shift_code() for record in records), dtype=np.int8,
+                                           count=len(records))
+        arrays["offsets"] = np.asarray(store.offsets, dtype=np.int64)
+
+        placement: Dict[str, Tuple[str, int, int]] = {}
+        size = 0
+        for name, values in arrays.items():
+            placement[name] = (values.dtype.str, size, len(values))
+            size += -(-values.nbytes // _ALIGNMENT) * _ALIGNMENT
+
+        shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        layout = {"name": shm.name, "arrays": placement, "uniques": uniques, "nnis": list(store.nnis)}
+        columns = cls(shm, layout, owner=True)
+        for name, values in arrays.items():
+            columns._arrays[name][:] = values
+        return columns
+
+    @classmethod
+    def attach(cls, layout: Dict[str, Any]) -> "SharedRecordColumns":
+        """S'attache au segment décrit par `layout` (processus de calcul)"""
+        return cls(shared_memory.SharedMemory(name=layout["name"]), layout, owner=False)
+
+    @property
+    def nbytes(self) -> int:
+        """Taille du segment partagé"""
+        return self._shm.size
+
+    def column(self, name: str) -> np.ndarray:
+        """Tableau d'une colonne (vue sur le segment, à ne pas modifier)"""
+        return self._arrays[name]
+
+    def employee_bounds(self, first: int, last: int) -> Tuple[int, int]:
+        """Positions (début, fin) des enregistrements des employés first..last-1"""
+        offsets = self._arrays["offsets"]
+        return int(offsets[first]), int(offsets[last])
+
+    def decode(self, first: int, last: int) -> EmployeeRecordStore:
+        """
+        Reconstruit les enregistrements (attributs utiles seulement) des employés first..last-1
+
+        Args:
+            first: Position du premier employé
+            last: Position suivant le dernier employé
+
+        Returns:
+            Magasin de ces employés, dans le même ordre
+        """
+        start, end = self.employee_bounds(first, last)
+        texts: List[List[str]] = []
+        for name in SHARED_TEXT_FIELDS:
+            values = self.layout["uniques"][name]
+            texts.append([values[code] for code in self._arrays[name][start:end].tolist()])
+
+        valeurs = self._arrays["valeur"][start:end].tolist()
+        missing = self._arrays["valeur_missing"][start:end].tolist()
+        shift_codes = self._arrays["shift_code"][start:end].tolist()
+
+        records = []
+        for position, fields in enumerate(zip(*texts)):
+            record = PMTRecord(**dict(zip(SHARED_TEXT_FIELDS, fields)))
+            if not missing[position]:
+                record.valeur = valeurs[position]
+            record.shift_code = shift_codes[position]
+            records.append(record)
+
+        offsets = [offset - start for offset in self._arrays["offsets"][first:last + 1].tolist()]
+        return EmployeeRecordStore.from_sorted(records, self.layout["nnis"][first:last], offsets)
+
+    def close(self) -> None:
+        """Détache le segment de ce processus"""
+        self._arrays = {}
+        self._shm.close()
+
+    def unlink(self) -> None:
+        """Détache puis libère le segment (processus créateur)"""
+        self.close()
+        if self._owner:
+            self._shm.unlink()
+
+    def __enter__(self) -> "SharedRecordColumns":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.unlink()
+
+
+_attached: Optional[SharedRecordColumns] = None
+
+
+def attach_worker(layout: Dict[str, Any], log_queue: Any = None) -> None:
+    """
+    Initialisation d'un processus du pool : attache le segment une fois pour tous ses lots
+
+    Args:
+        layout: Description du segment (SharedRecordColumns.layout)
+        log_queue: File des messages vers le processus parent (Logger.process_queue)
+    """
+    global _attached
+    if log_queue is not None:
+        setup_process_logging(log_queue)
+    _attached = SharedRecordColumns.attach(layout)
+
+
+def attached_columns() -> SharedRecordColumns:
+    """Colonnes attachées par attach_worker dans ce processus"""
+    if _attached is None:
+        raise Exception("Aucune mémoire partagée attachée dans ce processus")
+    return _attached
@@ -2,7 +2,7 @@
 Service de calcul des arrêts maladie pour La Gabinette
 """
 
-from typing import List, Dict, Set, Tuple, Any
+from typing import List, Dict, Set, Tuple, Any, Mapping, Optional
 from collections import defaultdict
 from datetime import datetime, timedelta
 
@@ -28,12 +28,15 @@ class SickLeaveCalculator:
         # Nombre de jours maximum entre deux arrêts pour considérer qu'ils font partie de la même période
         self.MAX_DAYS_BETWEEN_SICK_LEAVES = 3
     
-    def calculate_sick_leave_stats(self, records: List[PMTRecord]) -> Dict[str, Dict[str, Any]]:
+    def calculate_sick_leave_stats(self, records: List[PMTRecord],
+                                   employees_records: Optional[Mapping[str, List[PMTRecord]]] = None) -> Dict[str, Dict[str, Any]]:
         """
         Calcule les statistiques d'arrêt maladie pour tous les employés
         
         Args:
             records: Liste des enregistrements PMT
+            employees_records: Enregistrements déjà groupés par NNI et triés par date
+                (EmployeeRecordStore) ; à défaut ils sont groupés et triés ici
             
         Returns:
             Dictionnaire avec les statistiques d'arrêt maladie par employé
@@ -44,15 +47,20 @@ class SickLeaveCalculator:
         sick_leave_stats = {}
         
         # Regrouper les enregistrements par employé
-        employees_records = defaultdict(list)
-        for record in records:
-            if record.nni:
-                employees_records[record.nni].append(record)
+        presorted = employees_records is not None
+        if not presorted:
+            employees_records = defaultdict(list)
+            for record in records:
+                if record.nni:
+                    employees_records[record.nni].append(record)
         
         # Calculer les statistiques pour chaque employé
         for nni, emp_records in employees_records.items():
             # Trier les enregistrements par date
-            sorted_records = sorted(emp_records, key=lambda r: datetime.strptime(r.jour, "%d/%m/%Y") if r.jour else datetime.min)
+            if presorted:
+                sorted_records = emp_records
+            else:
+                sorted_records = sorted(emp_records, key=lambda r: datetime.strptime(r.jour, "%d/%m/%Y") if r.jour else datetime.min)
             
             # Calculer les statistiques d'arrêt maladie
             classic_sick_leaves, long_sick_leaves, sick_leave_periods, avg_hours_per_sick_leave = self._calculate_employee_sick_leave(sorted_records)
@@ -152,17 +160,19 @@ class SickLeaveCalculator:
         
         return periods 
 
-    def calculate_all_employees_sick_leave(self, records: List[PMTRecord]) -> Dict[str, Dict[str, Any]]:
+    def calculate_all_employees_sick_leave(self, records: List[PMTRecord],
+                                           employees_records: Optional[Mapping[str, List[PMTRecord]]] = None) -> Dict[str, Dict[str, Any]]:
         """
         Calcule les statistiques d'arrêt maladie pour tous les employés
         
         Args:
             records: Liste des enregistrements PMT
+            employees_records: Enregistrements groupés par NNI et triés par date (optionnel)
             
         Returns:
             Dictionnaire avec les statistiques d'arrêt maladie par employé
         """
         self.logger.info(f"Calcul des arrêts maladie pour {len(records)} enregistrements")
-        result = self.calculate_sick_leave_stats(records)
+        result = self.calculate_sick_leave_stats(records, employees_records)
         self.logger.info(f"Résultat du calcul des arrêts maladie : {len(result)} employés")
         return result 
\ No newline at end of file
@@ -0,0 +1,198 @@
+"""
+Séries journalières par employé (heures supplémentaires, absences, jours travaillés) pour La Gabinette
+"""
+
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from src.services.overtime_calculator import OvertimeCalculator
+from src.services.record_store import EmployeeRecordStore
+from src.services.work_time_calculator import WorkTimeCalculator
+from src.utils.helpers import date_sort_key
+from src.utils.instrumentation import timed
+from src.utils.logger import logger
+
+
+# Fenêtres glissantes nommées, en jours (la fenêtre se termine au jour considéré)
+ROLLING_WINDOWS = {"week": 7, "month": 30}
+
+METRICS = ["overtime_hours", "absence_hours", "full_days", "partial_days"]
+
+
+def rolling_sum(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Sommes glissantes sur les `window` derniers jours, par différence de sommes cumulées
+
+    Args:
+        values: Tableau (employés, jours)
+        window: Largeur de la fenêtre en jours
+
+    Returns:
+        Tableau de même forme ; la colonne j vaut la somme des colonnes j-window+1..j
+    """
+    if window < 1:
+        raise Exception(f"Fenêtre invalide: {window} jour(s)")
+    cumulative = np.zeros((values.shape[0], values.shape[1] + 1), dtype=np.float64)
+    np.cumsum(values, axis=1, dtype=np.float64, out=cumulative[:, 1:])
+    shifted = np.zeros_like(cumulative[:, 1:])
+    if window < cumulative.shape[1]:
+        shifted[:, window:] = cumulative[:, 1:-window]
+    return cumulative[:, 1:] - shifted
+
+
+class EmployeeTimeSeries:
+    """
+    Séries journalières denses par employé sur la plage de dates de l'extraction
+
+    Chaque métrique est un tableau numpy (employés, jours) : heures
+    supplémentaires et heures d'absence du jour, indicateurs de jour complet
+    et partiel (ASTREINTES et TIPS, mêmes règles que WorkTimeCalculator).
+    Les lignes suivent l'ordre des employés du magasin, les colonnes les
+    jours du premier au dernier jour de l'extraction.
+
+    Les séries sont calculées une fois ; toute fenêtre glissante s'en déduit
+    par sommes cumulées, sans repasser par les calculateurs.
+    """
+
+    def __init__(self, store: EmployeeRecordStore, categories: Dict[str, str]):
+        """
+        Args:
+            store: Enregistrements partitionnés par employé
+            categories: Catégorie de chaque NNI (EmployeeClassifier.categorize_employees)
+        """
+        self.logger = logger.get_logger("EmployeeTimeSeries")
+        self.nnis: List[str] = list(store.nnis)
+        self._rows = {nni: row for row, nni in enumerate(self.nnis)}
+        self.start: Optional[date] = None
+        self.days = 0
+        self.series: Dict[str, np.ndarray] = {}
+        self._build(store, categories)
+
+    def _build(self, store: EmployeeRecordStore, categories: Dict[str, str]) -> None:
+        """Remplit les séries à partir du détail journalier des calculateurs"""
+        with timed("Séries journalières"):
+            day_index = self._index_days(store)
+            shape = (len(self.nnis), self.days)
+            overtime = np.zeros(shape, dtype=np.float64)
+            absence = np.zeros(shape, dtype=np.float64)
+            full = np.zeros(shape, dtype=np.int8)
+            partial = np.zeros(shape, dtype=np.int8)
+
+            overtime_calculator = OvertimeCalculator()
+            work_time_calculator = WorkTimeCalculator()
+            for row, (nni, employee_records) in enumerate(store.items()):
+                for jour, hours in overtime_calculator.calculate_daily_overtime(employee_records).items():
+                    column = day_index.get(jour)
+                    if column is not None:
+                        overtime[row, column] += hours
+
+                category = categories.get(nni)
+                for jour, (day_type, hours) in work_time_calculator.calculate_daily_work_days(
+                        employee_records, category).items():
+                    column = day_index.get(jour)
+                    if column is None:
+                        continue
+                    if day_type == "full":
+                        full[row, column] = 1
+                    elif day_type == "partial":
+                        partial[row, column] = 1
+                        absence[row, column] += hours
+
+            self.series = {
+                "overtime_hours": overtime,
+                "absence_hours": absence,
+                "full_days": full,
+                "partial_days": partial
+            }
+
+    def _index_days(self, store: EmployeeRecordStore) -> Dict[str, int]:
+        """Fixe la plage de dates et retourne la colonne de chaque libellé de jour"""
+        dates: Dict[str, date] = {}
+        for record in store.records:
+            jour = record.jour
+            if jour and jour not in dates:
+                key = date_sort_key(jour)
+                try:
+                    dates[jour] = date(*key) if key else None
+                except ValueError:
+                    dates[jour] = None
+        valid = [day for day in dates.values() if day is not None]
+        if not valid:
+            return {}
+        self.start = min(valid)
+        self.days = (max(valid) - self.start).days + 1
+        return {jour: (day - self.start).days for jour, day in dates.items() if day is not None}
+
+    @property
+    def dates(self) -> List[date]:
+        """Jours des colonnes"""
+        return [self.start + timedelta(days=offset) for offset in range(self.days)]
+
+    def _window(self, window: Any) -> int:
+        """Largeur en jours d'une fenêtre nommée ("week", "month") ou numérique"""
+        if isinstance(window, str):
+            if window not in ROLLING_WINDOWS:
+                raise Exception(f"Fenêtre inconnue: {window} (valeurs possibles: {', '.join(ROLLING_WINDOWS)})")
+            return ROLLING_WINDOWS[window]
+        return int(window)
+
+    def _series(self, metric: str) -> np.ndarray:
+        """Tableau journalier d'une métrique"""
+        if metric not in self.series:
+            raise Exception(f"Métrique inconnue: {metric} (valeurs possibles: {', '.join(METRICS)})")
+        return self.series[metric]
+
+    def rolling(self, metric: str, window: Any = "week") -> np.ndarray:
+        """
+        Sommes glissantes d'une métrique pour tous les employés
+
+        Args:
+            metric: "overtime_hours", "absence_hours", "full_days" ou "partial_days"
+            window: "week" (7 jours), "month" (30 jours) ou un nombre de jours
+
+        Returns:
+            Tableau (employés, jours)
+        """
+        return rolling_sum(self._series(metric), self._window(window))
+
+    def employee_series(self, nni: str, window: Any = "week") -> Optional[Dict[str, Any]]:
+        """
+        Séries journalières et glissantes d'un employé (None s'il est inconnu)
+
+        Returns:
+            Dictionnaire : dates (AAAA-MM-JJ), séries journalières et sommes glissantes par métrique
+        """
+        row = self._rows.get(nni)
+        if row is None:
+            return None
+        width = self._window(window)
+        result: Dict[str, Any] = {"nni": nni, "window_days": width, "dates": [day.isoformat() for day in self.dates]}
+        for metric in METRICS:
+            daily = self.series[metric][row:row + 1]
+            result[metric] = daily[0].tolist()
+            result[f"{metric}_rolling"] = rolling_sum(daily, width)[0].tolist()
+        return result
+
+    def peaks(self, metric: str = "overtime_hours", window: Any = "week") -> List[Dict[str, Any]]:
+        """
+        Pic de la somme glissante de chaque employé (valeur et dernier jour de la fenêtre)
+
+        Args:
+            metric: Métrique des séries
+            window: Fenêtre nommée ou nombre de jours
+
+        Returns:
+            Une entrée par employé ayant une valeur non nulle, dans l'ordre des employés
+        """
+        if not self.days:
+            return []
+        rolled = self.rolling(metric, window)
+        columns = rolled.argmax(axis=1)
+        values = rolled[np.arange(len(self.nnis)), columns]
+        return [
+            {"nni": self.nnis[row], "value": float(values[row]),
+             "window_end": (self.start + timedelta(days=int(columns[row]))).isoformat()}
+            for row in np.flatnonzero(values > 0)
+        ]
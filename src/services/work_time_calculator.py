@@ -2,12 +2,12 @@
 Service de calcul des jours de travail complets et partiels pour La Gabinette
 """
 
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Mapping, Optional, Tuple
 from collections import defaultdict
 from datetime import datetime
 
 from src.models.data_model import PMTRecord
-from src.utils.logger import logger
+from src.utils.logger import AggregatedWarnings, logger
 
 
 class WorkTimeCalculator:
@@ -16,6 +16,7 @@ class WorkTimeCalculator:
     def __init__(self):
         self.logger = logger.get_logger("WorkTimeCalculator")
         self.FULL_DAY_HOURS = 8.0  # Nombre d'heures pour un jour complet
+        self._unit_warnings = AggregatedWarnings(self.logger)  # Une ligne par unité inconnue
 
     def calculate_work_days_for_employee(self, records: List[PMTRecord], category: str) -> Dict[str, Any]:
         """
@@ -47,22 +48,12 @@ class WorkTimeCalculator:
                 'average_hours_per_day': 0.0
             }
 
-        # Grouper par jour pour analyser chaque jour
-        days_data = defaultdict(list)
-
-        for record in filtered_records:
-            if not record.jour or not record.nni:
-                continue
-            days_data[record.jour].append(record)
-
         # Analyser chaque jour pour déterminer s'il est complet ou partiel
         full_days = 0
         partial_days = 0
         total_absence_hours = 0.0
 
-        for day_key, day_records in days_data.items():
-            day_type, absence_hours = self._analyze_day(day_records)
-
+        for day_type, absence_hours in self._analyze_days(filtered_records).values():
             if day_type == "full":
                 full_days += 1
             elif day_type == "partial":
@@ -83,6 +74,32 @@ class WorkTimeCalculator:
             'total_days': total_days
         }
 
+    def calculate_daily_work_days(self, records: List[PMTRecord], category: str) -> Dict[str, Tuple[str, float]]:
+        """
+        Type de chaque jour travaillé d'un employé (détail de calculate_work_days_for_employee)
+
+        Args:
+            records: Liste des enregistrements d'un employé
+            category: Catégorie de l'employé (ASTREINTES ou TIPS)
+
+        Returns:
+            Dictionnaire jour (JJ/MM/AAAA) -> (type "full", "partial" ou "excluded", heures d'absence)
+        """
+        if not records or category not in ["ASTREINTES", "TIPS"]:
+            return {}
+        return self._analyze_days(self._filter_records_by_category_rules(records, category))
+
+    def _analyze_days(self, filtered_records: List[PMTRecord]) -> Dict[str, Tuple[str, float]]:
+        """Groupe les enregistrements retenus par jour et analyse chaque jour (ordre de première apparition)"""
+        days_data = defaultdict(list)
+
+        for record in filtered_records:
+            if not record.jour or not record.nni:
+                continue
+            days_data[record.jour].append(record)
+
+        return {day_key: self._analyze_day(day_records) for day_key, day_records in days_data.items()}
+
     def _analyze_day(self, day_records: List[PMTRecord]) -> Tuple[str, float]:
         """
         Analyse un jour pour déterminer s'il est complet ou partiel
@@ -122,7 +139,9 @@ class WorkTimeCalculator:
         else:
             return "full", 0.0
 
-    def calculate_all_employees_work_days(self, records: List[PMTRecord], classifications: Dict[str, List[PMTRecord]]) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    def calculate_all_employees_work_days(self, records: List[PMTRecord], classifications: Dict[str, List[PMTRecord]],
+                                          employees_records: Optional[Mapping[str, List[PMTRecord]]] = None,
+                                          categories: Optional[Mapping[str, str]] = None) -> Dict[str, Dict[str, Dict[str, Any]]]:
         """
         Calcule les jours de travail pour tous les employés ASTREINTES et TIPS uniquement
         Exclut les 3X8, AUTRES et les catégories Agence/DR Paris
@@ -130,6 +149,9 @@ class WorkTimeCalculator:
         Args:
             records: Liste de tous les enregistrements
             classifications: Classifications des employés par catégorie
+            employees_records: Enregistrements déjà groupés par NNI (ex: EmployeeRecordStore)
+            categories: Catégorie de chaque NNI (EmployeeClassifier.categorize_employees) ;
+                avec employees_records, évite de regrouper les listes des catégories
 
         Returns:
             Dictionnaire avec les statistiques par catégorie puis par employé (catégorie -> NNI -> stats)
@@ -146,13 +168,21 @@ class WorkTimeCalculator:
             if category not in classifications:
                 continue
 
-            category_records = classifications[category]
+            if employees_records is not None and categories is not None:
+                # Tranches des employés de la catégorie, dans l'ordre des employés
+                employee_records = {
+                    nni: employees_records[nni]
+                    for nni in employees_records
+                    if categories.get(nni) == category
+                }
+            else:
+                category_records = classifications[category]
 
-            # Grouper par employé
-            employee_records = defaultdict(list)
-            for record in category_records:
-                if record.nni:
-                    employee_records[record.nni].append(record)
+                # Grouper par employé
+                employee_records = defaultdict(list)
+                for record in category_records:
+                    if record.nni:
+                        employee_records[record.nni].append(record)
 
             # Calculer pour chaque employé de cette catégorie
             category_results = {}
@@ -162,6 +192,7 @@ class WorkTimeCalculator:
 
             results[category] = category_results
 
+        self._unit_warnings.flush()
         self.logger.info(f"Jours de travail calculés pour {len(results)} catégories")
         return results
 
@@ -182,7 +213,8 @@ class WorkTimeCalculator:
             if self._should_include_record_for_category(record, category):
                 filtered_records.append(record)
 
-        self.logger.info(f"Catégorie {category}: {len(filtered_records)} enregistrements retenus sur {len(records)}")
+        # Appelée une fois par employé : DEBUG pour rester hors des profils
+        self.logger.debug(f"Catégorie {category}: {len(filtered_records)} enregistrements retenus sur {len(records)}")
         return filtered_records
 
     def _should_include_record_for_category(self, record: PMTRecord, category: str) -> bool:
@@ -278,7 +310,7 @@ class WorkTimeCalculator:
             return value
         else:
             # Unité inconnue, traiter comme des heures
-            self.logger.warning(f"Unité inconnue pour absence: '{unit}', traité comme heures")
+            self._unit_warnings.warning(unit, f"Unité inconnue pour absence: '{unit}', traité comme heures")
             return value
 
     def get_work_time_summary_by_category(self, records: List[PMTRecord], classifications: Dict[str, List[PMTRecord]]) -> Dict[str, Dict[str, Any]]:
@@ -0,0 +1,165 @@
+"""
+Planificateur de filtrage en arrière-plan pour La Gabinette
+"""
+
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from src.models.data_model import PMTRecord
+from src.utils.logger import logger
+
+
+DATE_PLACEHOLDER = "JJ/MM/AAAA"
+
+
+def apply_record_filters(records: Sequence[PMTRecord], criteria: Dict[str, Any]) -> List[PMTRecord]:
+    """
+    Applique les critères de filtrage de l'interface à une liste d'enregistrements
+
+    Fonction pure : elle ne lit aucun widget et peut donc être exécutée
+    dans un thread de travail sur un instantané immuable des données.
+
+    Args:
+        records: Enregistrements à filtrer (instantané)
+        criteria: Critères ('equipe_lib', 'name', 'date')
+
+    Returns:
+        Liste des enregistrements correspondant à tous les critères
+    """
+    team = criteria.get("equipe_lib")
+    name = (criteria.get("name") or "").strip().lower()
+    date = (criteria.get("date") or "").strip()
+    if date == DATE_PLACEHOLDER:
+        date = ""
+
+    if not team and not name and not date:
+        return list(records)
+
+    filtered_records = []
+    for record in records:
+        if team and record.equipe_lib != team:
+            continue
+        if name and name not in record.nom.lower() and name not in record.prenom.lower():
+            continue
+        if date and date not in record.jour:
+            continue
+        filtered_records.append(record)
+
+    return filtered_records
+
+
+class FilterScheduler:
+    """
+    Regroupe les demandes de filtrage et les exécute hors du thread Tk
+
+    Chaque demande reçoit un numéro de génération. Les demandes rapprochées
+    sont fusionnées (anti-rebond via root.after / after_cancel), un seul thread
+    de travail traite la demande la plus récente, et les résultats devenus
+    obsolètes entre-temps sont ignorés avant d'être renvoyés à l'interface.
+    """
+
+    def __init__(self, root, query: Callable[[Tuple[PMTRecord, ...], Dict[str, Any]], List[PMTRecord]],
+                 on_result: Callable[[List[PMTRecord], Dict[str, Any]], None],
+                 on_error: Optional[Callable[[str], None]] = None,
+                 delay_ms: int = 300):
+        self.logger = logger.get_logger("FilterScheduler")
+        self._root = root
+        self._query = query
+        self._on_result = on_result
+        self._on_error = on_error
+        self._delay_ms = delay_ms
+
+        self._after_id: Optional[str] = None
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._pending: Optional[Tuple[int, Tuple[PMTRecord, ...], Dict[str, Any]]] = None
+        self._worker_running = False
+
+    def schedule(self, snapshot: Tuple[PMTRecord, ...], criteria: Dict[str, Any],
+                 delay_ms: Optional[int] = None) -> int:
+        """
+        Planifie un filtrage après un délai, en annulant la demande précédente
+
+        Doit être appelée depuis le thread Tk.
+
+        Args:
+            snapshot: Instantané immuable des enregistrements
+            criteria: Critères de filtrage lus dans les widgets
+            delay_ms: Délai d'anti-rebond (défaut: celui du planificateur)
+
+        Returns:
+            Numéro de génération de la demande
+        """
+        if self._after_id is not None:
+            self._root.after_cancel(self._after_id)
+            self._after_id = None
+
+        self._generation += 1
+        generation = self._generation
+        delay = self._delay_ms if delay_ms is None else delay_ms
+
+        self._after_id = self._root.after(
+            delay, lambda: self._dispatch(generation, snapshot, criteria)
+        )
+        return generation
+
+    def submit(self, snapshot: Tuple[PMTRecord, ...], criteria: Dict[str, Any]) -> int:
+        """Planifie un filtrage immédiat (bouton « Appliquer »)"""
+        return self.schedule(snapshot, criteria, delay_ms=0)
+
+    def cancel(self) -> None:
+        """Annule la demande en attente et invalide les résultats en cours de calcul"""
+        if self._after_id is not None:
+            self._root.after_cancel(self._after_id)
+            self._after_id = None
+        self._generation += 1
+        with self._lock:
+            self._pending = None
+
+    def _dispatch(self, generation: int, snapshot: Tuple[PMTRecord, ...], criteria: Dict[str, Any]) -> None:
+        """Transmet la demande au thread de travail (un seul thread actif à la fois)"""
+        self._after_id = None
+
+        with self._lock:
+            # Seule la demande la plus récente est conservée
+            self._pending = (generation, snapshot, criteria)
+            if self._worker_running:
+                return
+            self._worker_running = True
+
+        thread = threading.Thread(target=self._worker_loop, daemon=True)
+        thread.start()
+
+    def _worker_loop(self) -> None:
+        """Traite les demandes en attente jusqu'à épuisement"""
+        while True:
+            with self._lock:
+                job = self._pending
+                self._pending = None
+                if job is None:
+                    self._worker_running = False
+                    return
+
+            generation, snapshot, criteria = job
+            if generation != self._generation:
+                continue  # Déjà remplacée par une demande plus récente
+
+            try:
+                result = self._query(snapshot, criteria)
+                self._root.after(0, lambda g=generation, r=result, c=criteria: self._deliver(g, r, c))
+            except Exception as e:
+                self.logger.error(f"Erreur lors du filtrage: {str(e)}")
+                self._root.after(0, lambda g=generation, msg=str(e): self._deliver_error(g, msg))
+
+    def _deliver(self, generation: int, result: List[PMTRecord], criteria: Dict[str, Any]) -> None:
+        """Renvoie le résultat à l'interface s'il est toujours d'actualité"""
+        if generation != self._generation:
+            self.logger.debug(f"Résultat de filtrage obsolète ignoré (génération {generation})")
+            return
+        self._on_result(result, criteria)
+
+    def _deliver_error(self, generation: int, error_message: str) -> None:
+        """Renvoie une erreur à l'interface si elle est toujours d'actualité"""
+        if generation != self._generation or self._on_error is None:
+            return
+        self._on_error(error_message)
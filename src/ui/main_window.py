@@ -7,16 +7,43 @@ from tkinter import filedialog, messagebox, ttk
 import ttkbootstrap as ttk_bs
 from ttkbootstrap.constants import *
 from pathlib import Path
+from datetime import datetime
 from typing import Optional, List, Dict, Any
 import threading
-from PIL import Image, ImageTk
 import io
 
 from src.config.settings import UI_CONFIG, OUTPUT_DIR
-from src.services.csv_processor import CSVProcessor
-from src.services.export_service import ExportService
 from src.models.data_model import PMTRecord, ProcessingResult
+from src.ui.filter_scheduler import FilterScheduler, apply_record_filters, DATE_PLACEHOLDER
+from src.utils.instrumentation import format_timing_tree
 from src.utils.logger import logger
+from src.utils.progress import CancellationToken, OperationCancelledError, ProgressEvent, format_duration
+
+
+# Choix de l'onglet Classements -> paramètres de EmployeeRanking
+RANKING_METRICS = {
+    "Heures supplémentaires": "overtime_hours",
+    "Périodes d'arrêt maladie": "sick_leave_periods",
+    "Arrêts maladie (code 41)": "classic_sick_leaves",
+    "Arrêts maladie (code 5H)": "long_sick_leaves",
+    "Moyenne d'heures par arrêt": "avg_hours_per_sick_leave",
+    "Jours complets": "full_days",
+    "Jours partiels": "partial_days",
+    "Heures d'absence": "total_absence_hours"
+}
+
+RANKING_GROUPS = {
+    "Agence": ["agency"],
+    "Catégorie": ["category"],
+    "Agence et catégorie": ["agency", "category"],
+    "Tous les employés": []
+}
+
+RANKING_MODES = {
+    "Top K": "top",
+    "Atypiques (z-score)": "zscore",
+    "Atypiques (IQR)": "iqr"
+}
 
 
 class MainWindow:
@@ -25,14 +52,19 @@ class MainWindow:
     def __init__(self):
         self.logger = logger.get_logger("MainWindow")
 
-        # Services
-        self.csv_processor = CSVProcessor()
-        self.export_service = ExportService()
+        # Services (créés au premier usage, voir _preload_services)
+        self._csv_processor = None
+        self._export_service = None
+        self._services_lock = threading.Lock()
 
         # État de l'application
         self.current_file_path: Optional[str] = None
         self.current_records: List[PMTRecord] = []
         self.filtered_records: List[PMTRecord] = []
+        self._records_snapshot: tuple = ()
+        self._cancel_token: Optional[CancellationToken] = None
+        self._last_timings: Dict[str, Any] = {}
+        self._ranking = None  # Classements de l'extraction chargée (créés au premier calcul)
 
         # Interface
         self.root = ttk_bs.Window(
@@ -41,12 +73,54 @@ class MainWindow:
             size=tuple(map(int, UI_CONFIG["window_size"].split('x')))
         )
 
+        # Filtrage en arrière-plan (anti-rebond + résultats obsolètes ignorés)
+        self.filter_scheduler = FilterScheduler(
+            self.root,
+            query=apply_record_filters,
+            on_result=self._on_filters_applied,
+            on_error=self._on_filters_error
+        )
+
         self._setup_ui()
         self._setup_bindings()
         self._center_window()
 
+        # Charger pandas et les services une fois la fenêtre affichée
+        self.root.after(100, self._preload_services)
+
         self.logger.info("Interface utilisateur initialisée")
 
+    @property
+    def csv_processor(self):
+        """Processeur CSV (import de pandas au premier accès)"""
+        with self._services_lock:
+            if self._csv_processor is None:
+                from src.services.csv_processor import CSVProcessor
+                self._csv_processor = CSVProcessor()
+            return self._csv_processor
+
+    @property
+    def export_service(self):
+        """Service d'export (import de pandas/xlsxwriter au premier accès)"""
+        with self._services_lock:
+            if self._export_service is None:
+                from src.services.export_service import ExportService
+                from src.services.metrics_store import MetricsStore
+                self._export_service = ExportService(metrics_store=MetricsStore())
+            return self._export_service
+
+    def _preload_services(self):
+        """Initialise les services en arrière-plan pendant que l'utilisateur choisit un fichier"""
+        def preload_worker():
+            try:
+                self.csv_processor
+                self.export_service
+                self.logger.debug("Services initialisés en arrière-plan")
+            except Exception as e:
+                self.logger.error(f"Erreur lors de l'initialisation des services: {str(e)}")
+
+        threading.Thread(target=preload_worker, daemon=True).start()
+
     def _setup_ui(self):
         """Configure l'interface utilisateur"""
         # Configuration de la grille principale
@@ -119,9 +193,22 @@ class MainWindow:
             state=DISABLED,
             width=12
         )
-        self.toolbar_buttons["export_summary"].pack(side=LEFT, padx=(0, 8))
+        self.toolbar_buttons["export_summary"].pack(side=LEFT, padx=(0, 6))
         self._create_tooltip(self.toolbar_buttons["export_summary"], "Exporter un résumé détaillé au format texte")
 
+        # Bouton Export Lignes - enregistrements filtrés, écrits en flux
+        self.toolbar_buttons["export_records"] = ttk_bs.Button(
+            export_frame,
+            text="🧾  Lignes",
+            bootstyle="info-outline",
+            command=self._export_records,
+            state=DISABLED,
+            width=12
+        )
+        self.toolbar_buttons["export_records"].pack(side=LEFT, padx=(0, 8))
+        self._create_tooltip(self.toolbar_buttons["export_records"],
+                             "Exporter les enregistrements filtrés, ligne à ligne (CSV ou NDJSON)")
+
         # Séparateur
         sep2 = ttk_bs.Separator(main_buttons_frame, orient=VERTICAL)
         sep2.pack(side=LEFT, fill=Y, padx=10)
@@ -136,7 +223,7 @@ class MainWindow:
             width=13
         )
         self.toolbar_buttons["refresh"].pack(side=LEFT, padx=(0, 8))
-        self._create_tooltip(self.toolbar_buttons["refresh"], "Actualiser l'affichage des données")
+        self._create_tooltip(self.toolbar_buttons["refresh"], "Relire les lignes ajoutées au fichier depuis son chargement")
 
         # Logo Enedis (à droite)
         self._create_logo(toolbar_inner)
@@ -151,6 +238,7 @@ class MainWindow:
                 # Essayer d'abord avec cairosvg si disponible
                 try:
                     import cairosvg
+                    from PIL import Image, ImageTk
                     # Convertir SVG en PNG en mémoire
                     png_data = cairosvg.svg2png(url=str(logo_path), output_width=160, output_height=80)
 
@@ -230,6 +318,9 @@ class MainWindow:
         # Onglet Comparaison
         self._create_comparison_tab()
 
+        # Onglet Classements
+        self._create_ranking_tab()
+
     def _create_data_tab(self):
         """Crée l'onglet des données"""
         data_frame = ttk_bs.Frame(self.notebook)
@@ -295,7 +386,7 @@ class MainWindow:
         self.date_filter.grid(row=1, column=1, sticky="ew", padx=(0, 10), pady=(5, 0))
 
         # Ajouter un placeholder manuel
-        self.date_filter.insert(0, "JJ/MM/AAAA")
+        self.date_filter.insert(0, DATE_PLACEHOLDER)
         self.date_filter.bind("<FocusIn>", self._on_date_filter_focus_in)
         self.date_filter.bind("<FocusOut>", self._on_date_filter_focus_out)
         self.date_filter.config(foreground="gray")
@@ -430,6 +521,137 @@ class MainWindow:
         # Variables pour stocker les résultats de comparaison
         self.comparison_results = None
 
+    def _create_ranking_tab(self):
+        """Crée l'onglet des classements (top K et valeurs atypiques par agence/catégorie)"""
+        ranking_frame = ttk_bs.Frame(self.notebook)
+        self.notebook.add(ranking_frame, text="🏆 Classements")
+
+        # Configuration de la grille
+        ranking_frame.grid_rowconfigure(1, weight=1)
+        ranking_frame.grid_columnconfigure(0, weight=1)
+
+        # Zone des paramètres
+        controls_frame = ttk_bs.LabelFrame(ranking_frame, text="Paramètres", padding=10)
+        controls_frame.grid(row=0, column=0, sticky="ew", padx=5, pady=5)
+
+        ttk_bs.Label(controls_frame, text="Métrique:").grid(row=0, column=0, sticky="w", padx=(0, 5))
+        self.ranking_metric = ttk_bs.Combobox(controls_frame, state="readonly", values=list(RANKING_METRICS))
+        self.ranking_metric.set(next(iter(RANKING_METRICS)))
+        self.ranking_metric.grid(row=0, column=1, sticky="ew", padx=(0, 10))
+
+        ttk_bs.Label(controls_frame, text="Par:").grid(row=0, column=2, sticky="w", padx=(0, 5))
+        self.ranking_group = ttk_bs.Combobox(controls_frame, state="readonly", values=list(RANKING_GROUPS))
+        self.ranking_group.set(next(iter(RANKING_GROUPS)))
+        self.ranking_group.grid(row=0, column=3, sticky="ew", padx=(0, 10))
+
+        ttk_bs.Label(controls_frame, text="Mode:").grid(row=1, column=0, sticky="w", padx=(0, 5), pady=(5, 0))
+        self.ranking_mode = ttk_bs.Combobox(controls_frame, state="readonly", values=list(RANKING_MODES))
+        self.ranking_mode.set(next(iter(RANKING_MODES)))
+        self.ranking_mode.grid(row=1, column=1, sticky="ew", padx=(0, 10), pady=(5, 0))
+
+        ttk_bs.Label(controls_frame, text="K / seuil:").grid(row=1, column=2, sticky="w", padx=(0, 5), pady=(5, 0))
+        self.ranking_parameter = ttk_bs.Entry(controls_frame, width=8)
+        self.ranking_parameter.grid(row=1, column=3, sticky="w", padx=(0, 10), pady=(5, 0))
+        self._create_tooltip(self.ranking_parameter,
+                             "Top K : employés par groupe (défaut 20)\n"
+                             "z-score : seuil de |z| (défaut 3)\nIQR : facteur de l'écart interquartile (défaut 1,5)")
+
+        self.ranking_button = ttk_bs.Button(
+            controls_frame,
+            text="Calculer",
+            bootstyle=PRIMARY,
+            command=self._run_ranking,
+            state=DISABLED
+        )
+        self.ranking_button.grid(row=1, column=4, sticky="e", pady=(5, 0))
+
+        controls_frame.grid_columnconfigure(1, weight=1)
+        controls_frame.grid_columnconfigure(3, weight=1)
+
+        # Zone des résultats
+        results_frame = ttk_bs.LabelFrame(ranking_frame, text="Résultats", padding=5)
+        results_frame.grid(row=1, column=0, sticky="nsew", padx=5, pady=5)
+        results_frame.grid_rowconfigure(0, weight=1)
+        results_frame.grid_columnconfigure(0, weight=1)
+
+        columns = ["group", "rank", "nom", "prenom", "equipe", "value", "score"]
+        headers = ["Groupe", "Rang", "Nom", "Prénom", "Équipe", "Valeur", "Score"]
+        self.ranking_tree = ttk_bs.Treeview(results_frame, columns=columns, show="headings")
+        for col, header in zip(columns, headers):
+            self.ranking_tree.heading(col, text=header)
+            self.ranking_tree.column(col, width=160 if col in ("group", "equipe") else 90)
+
+        v_scrollbar_ranking = ttk_bs.Scrollbar(results_frame, orient=VERTICAL, command=self.ranking_tree.yview)
+        self.ranking_tree.configure(yscrollcommand=v_scrollbar_ranking.set)
+
+        self.ranking_tree.grid(row=0, column=0, sticky="nsew")
+        v_scrollbar_ranking.grid(row=0, column=1, sticky="ns")
+
+    def _run_ranking(self):
+        """Calcule le classement ou les valeurs atypiques demandés dans un thread de travail"""
+        if not self.current_records:
+            return
+
+        metric = RANKING_METRICS[self.ranking_metric.get()]
+        group_by = RANKING_GROUPS[self.ranking_group.get()]
+        mode = RANKING_MODES[self.ranking_mode.get()]
+        parameter_text = self.ranking_parameter.get().strip().replace(",", ".")
+        try:
+            parameter = float(parameter_text) if parameter_text else None
+        except ValueError:
+            messagebox.showerror("Paramètre invalide", f"K ou seuil attendu (nombre): {parameter_text}")
+            return
+
+        self.ranking_button.config(state=DISABLED)
+        self.status_label.config(text="Calcul du classement...")
+        records = self.current_records
+        metrics = self.csv_processor.metrics
+
+        def ranking_worker():
+            try:
+                ranking = self._ranking
+                if ranking is None:
+                    from src.services.metric_ranking import EmployeeRanking
+                    ranking = EmployeeRanking(self.export_service.build_employee_rows(records, metrics=metrics))
+                    # Conservé seulement si aucune autre extraction n'a été chargée entre-temps
+                    if records is self.current_records:
+                        self._ranking = ranking
+                if mode == "top":
+                    k = int(parameter) if parameter is not None else None
+                    rows = [
+                        (group, entry["rank"], entry, "")
+                        for group in ranking.top_k(metric, k, group_by)
+                        for entry in group["top"]
+                    ]
+                else:
+                    result = ranking.outliers(metric, mode, parameter, group_by)
+                    rows = [(entry, "", entry, entry["score"]) for entry in result["outliers"]]
+                self.root.after(0, lambda: self._on_ranking_completed(metric, group_by, rows))
+            except Exception as e:
+                error_message = str(e)
+                self.root.after(0, lambda: self._on_ranking_error(error_message))
+
+        threading.Thread(target=ranking_worker, daemon=True).start()
+
+    def _on_ranking_completed(self, metric: str, group_by: List[str], rows: List[tuple]):
+        """Affiche les lignes du classement (double-clic : détail de l'employé)"""
+        self.ranking_button.config(state=NORMAL)
+        for item in self.ranking_tree.get_children():
+            self.ranking_tree.delete(item)
+
+        for group, rank, entry, score in rows:
+            label = " / ".join(str(group[key]) for key in group_by) or "Tous"
+            values = [label, rank, entry["nom"] or "", entry["prenom"] or "", entry["equipe"] or "",
+                      round(entry[metric], 2), score]
+            self.ranking_tree.insert("", tk.END, text=entry["nni"], values=values)
+        self.status_label.config(text=f"Classement : {len(rows)} employés")
+
+    def _on_ranking_error(self, error_message: str):
+        """Callback appelé en cas d'erreur de classement"""
+        self.ranking_button.config(state=NORMAL)
+        self.status_label.config(text="Erreur de classement")
+        messagebox.showerror("Erreur", f"Impossible de calculer le classement:\n{error_message}")
+
     def _select_file1(self):
         """Sélectionne le premier fichier XLSX"""
         file_path = filedialog.askopenfilename(
@@ -473,7 +695,7 @@ class MainWindow:
 
         # Désactiver le bouton et afficher le loader
         self.compare_button.config(state=DISABLED, text="⏳ Comparaison en cours...")
-        self._set_loading_state(True)
+        cancel_token = self._set_loading_state(True)
         self.status_label.config(text="Comparaison en cours...")
 
         def comparison_worker():
@@ -483,11 +705,17 @@ class MainWindow:
                 comparison_service = ComparisonService()
                 
                 # Lancer la comparaison
-                results = comparison_service.compare_files(file1_path, file2_path)
+                results = comparison_service.compare_files(
+                    file1_path, file2_path,
+                    progress_callback=self._post_progress,
+                    cancel_token=cancel_token
+                )
                 
                 # Mettre à jour l'UI dans le thread principal
                 self.root.after(0, lambda: self._on_comparison_completed(results))
                 
+            except OperationCancelledError:
+                self.root.after(0, self._on_comparison_cancelled)
             except Exception as e:
                 self.root.after(0, lambda: self._on_comparison_error(str(e)))
 
@@ -502,6 +730,7 @@ class MainWindow:
         
         # Stocker les résultats
         self.comparison_results = results
+        self._set_last_timings(results.get('timings', {}))
         
         # Afficher les résultats
         self._display_comparison_results(results)
@@ -512,6 +741,12 @@ class MainWindow:
         self.status_label.config(text="Comparaison terminée")
         self.logger.info("Comparaison terminée avec succès")
 
+    def _on_comparison_cancelled(self):
+        """Callback appelé quand la comparaison est annulée"""
+        self._set_loading_state(False)
+        self.compare_button.config(state=NORMAL, text="⚖️ Lancer la comparaison")
+        self.status_label.config(text="Comparaison annulée")
+
     def _on_comparison_error(self, error_message):
         """Callback appelé en cas d'erreur de comparaison"""
         self._set_loading_state(False)
@@ -575,6 +810,110 @@ class MainWindow:
         )
         self.progress_bar.pack(side=RIGHT, padx=(5, 0))
 
+        # Bouton d'annulation du traitement en cours
+        self.cancel_button = ttk_bs.Button(
+            status_frame,
+            text="✖ Annuler",
+            bootstyle="danger-outline",
+            command=self._cancel_operation,
+            state=DISABLED,
+            width=10
+        )
+        self.cancel_button.pack(side=RIGHT, padx=(5, 0))
+
+        # Durées par étape du dernier traitement
+        self.timings_button = ttk_bs.Button(
+            status_frame,
+            text="⏱ Durées",
+            bootstyle="secondary-outline",
+            command=self._show_timings,
+            state=DISABLED,
+            width=10
+        )
+        self.timings_button.pack(side=RIGHT, padx=(5, 0))
+
+    def _set_last_timings(self, timings: Dict[str, Any]):
+        """Mémorise l'arbre des durées du dernier traitement"""
+        if not timings:
+            return
+        self._last_timings = timings
+        self.timings_button.config(state=NORMAL)
+
+    def _show_timings(self):
+        """Affiche l'arbre des durées du dernier traitement"""
+        if not self._last_timings:
+            return
+
+        window = tk.Toplevel(self.root)
+        window.title(f"Durées - {self._last_timings['name']}")
+        window.geometry("620x480")
+
+        text = tk.Text(window, wrap="none", font=("Consolas", 10))
+        scrollbar = ttk_bs.Scrollbar(window, orient=VERTICAL, command=text.yview)
+        text.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=RIGHT, fill=Y)
+        text.pack(fill=BOTH, expand=True)
+
+        text.insert("1.0", "\n".join(format_timing_tree(self._last_timings)))
+        text.config(state=DISABLED)
+
+    def _on_record_double_click(self, event):
+        """Ouvre le détail de l'employé de la ligne double-cliquée"""
+        tree = event.widget
+        item = tree.identify_row(event.y)
+        if not item:
+            return
+        nni = tree.item(item, "text")
+        if nni and self.current_file_path:
+            self._show_employee_detail(nni)
+
+    def _show_employee_detail(self, nni: str):
+        """
+        Affiche toutes les lignes d'un employé
+
+        Les lignes sont relues depuis le fichier source via l'index par NNI
+        (construit au premier détail demandé), pas depuis les enregistrements
+        affichés qui sont limités aux 1000 premiers.
+        """
+        self.status_label.config(text=f"Lecture des lignes de {nni}...")
+
+        def detail_worker():
+            try:
+                records = self.csv_processor.get_employee_records(nni)
+                self.root.after(0, lambda: self._open_employee_detail(nni, records))
+            except Exception as e:
+                error_message = str(e)
+                self.root.after(0, lambda: messagebox.showerror(
+                    "Erreur", f"Impossible de lire les lignes de {nni}:\n{error_message}"))
+
+        threading.Thread(target=detail_worker, daemon=True).start()
+
+    def _open_employee_detail(self, nni: str, records: List[PMTRecord]):
+        """Fenêtre de détail d'un employé"""
+        self.status_label.config(text=f"{len(records)} lignes pour {nni}")
+        window = tk.Toplevel(self.root)
+        name = f"{records[0].nom} {records[0].prenom}" if records else nni
+        window.title(f"Détail - {name} ({nni})")
+        window.geometry("980x480")
+
+        columns = ["row_number", "jour", "designation_jour", "code", "valeur", "des_unite",
+                   "ht_de_1", "ht_a_1", "htm_de_1", "htm_a_1", "he_de_1", "he_a_1"]
+        headers = ["Ligne", "Date", "Jour", "Code", "Valeur", "Unité",
+                   "HT de", "HT à", "HTM de", "HTM à", "HE de", "HE à"]
+
+        tree = ttk_bs.Treeview(window, columns=columns, show="headings")
+        scrollbar = ttk_bs.Scrollbar(window, orient=VERTICAL, command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        for col, header in zip(columns, headers):
+            tree.heading(col, text=header)
+            tree.column(col, width=70 if col != "designation_jour" else 110)
+        scrollbar.pack(side=RIGHT, fill=Y)
+        tree.pack(fill=BOTH, expand=True)
+
+        for record in records:
+            values = [getattr(record, col, None) for col in columns]
+            tree.insert("", tk.END, values=["" if value is None else str(value) for value in values])
+
     def _setup_bindings(self):
         """Configure les liaisons d'événements"""
         # Liaison pour la fermeture de l'application
@@ -585,6 +924,11 @@ class MainWindow:
         self.date_filter.bind('<KeyRelease>', self._on_filter_change)
         self.team_filter.bind('<<ComboboxSelected>>', self._on_filter_change)
 
+        # Double-clic sur une ligne : toutes les lignes de l'employé
+        self.data_tree.bind('<Double-1>', self._on_record_double_click)
+        self.filtered_tree.bind('<Double-1>', self._on_record_double_click)
+        self.ranking_tree.bind('<Double-1>', self._on_record_double_click)
+
     def _open_file(self):
         """Ouvre un fichier CSV"""
         file_path = filedialog.askopenfilename(
@@ -596,14 +940,19 @@ class MainWindow:
         if file_path:
             self._load_file_async(file_path)
 
-    def _load_file_async(self, file_path: str):
-        """Charge un fichier de manière asynchrone"""
-        self._set_loading_state(True)
+    def _load_file_async(self, file_path: str, incremental: bool = False):
+        """Charge un fichier de manière asynchrone (incremental: lignes ajoutées seulement)"""
+        cancel_token = self._set_loading_state(True)
         self.status_label.config(text=f"Chargement de {Path(file_path).name}...")
 
         def load_worker():
             try:
-                result = self.csv_processor.load_file(file_path)
+                result = self.csv_processor.load_file(
+                    file_path,
+                    progress_callback=self._post_progress,
+                    cancel_token=cancel_token,
+                    incremental=incremental
+                )
                 self.root.after(0, lambda: self._on_file_loaded(result, file_path))
             except Exception as e:
                 self.root.after(0, lambda: self._on_file_error(str(e)))
@@ -614,10 +963,14 @@ class MainWindow:
     def _on_file_loaded(self, result: ProcessingResult, file_path: str):
         """Callback appelé quand le fichier est chargé"""
         self._set_loading_state(False)
+        self._set_last_timings(result.timings)
 
         if result.success:
             self.current_file_path = file_path
+            self.filter_scheduler.cancel()
             self.current_records = self.csv_processor.get_records()
+            self._records_snapshot = tuple(self.current_records)
+            self._ranking = None
             self.filtered_records = self.current_records.copy()
 
             self._update_file_info(result)
@@ -625,12 +978,18 @@ class MainWindow:
             self._update_filters()
             self._update_classifications()
             self._enable_toolbar_buttons()
+            self.ranking_button.config(state=NORMAL)
 
-            self.status_label.config(
-                text=f"Fichier chargé: {result.records_processed} enregistrements"
-            )
+            if result.incremental:
+                status = (f"Fichier actualisé: {result.records_appended} nouvelles lignes, "
+                          f"{result.records_processed} enregistrements")
+            else:
+                status = f"Fichier chargé: {result.records_processed} enregistrements"
+            self.status_label.config(text=status)
 
             self.logger.info(f"Fichier chargé avec succès: {file_path}")
+        elif result.cancelled:
+            self.status_label.config(text="Chargement annulé")
         else:
             messagebox.showerror(
                 "Erreur de chargement",
@@ -644,14 +1003,59 @@ class MainWindow:
         messagebox.showerror("Erreur", f"Erreur lors du chargement:\n{error_message}")
         self.status_label.config(text="Erreur de chargement")
 
-    def _set_loading_state(self, loading: bool):
-        """Active/désactive l'état de chargement"""
+    def _set_loading_state(self, loading: bool) -> Optional[CancellationToken]:
+        """
+        Active/désactive l'état de chargement
+
+        Returns:
+            Le jeton d'annulation du traitement qui démarre (None à l'arrêt)
+        """
         if loading:
+            self._cancel_token = CancellationToken()
+            self.progress_bar.config(mode='indeterminate', value=0)
             self.progress_bar.start()
+            self.cancel_button.config(state=NORMAL)
             self.root.config(cursor="wait")
         else:
+            self._cancel_token = None
             self.progress_bar.stop()
+            self.progress_bar.config(mode='indeterminate', value=0)
+            self.cancel_button.config(state=DISABLED)
             self.root.config(cursor="")
+        return self._cancel_token
+
+    def _cancel_operation(self):
+        """Demande l'annulation du traitement en cours"""
+        if self._cancel_token is not None:
+            self._cancel_token.cancel()
+            self.cancel_button.config(state=DISABLED)
+            self.status_label.config(text="Annulation en cours...")
+
+    def _post_progress(self, event: ProgressEvent):
+        """Callback de progression appelé depuis un thread de travail"""
+        self.root.after(0, lambda: self._on_progress(event))
+
+    def _on_progress(self, event: ProgressEvent):
+        """Affiche la progression, le débit et le temps restant dans la barre de statut"""
+        if self._cancel_token is None or self._cancel_token.is_cancelled:
+            return
+
+        fraction = event.fraction
+        if fraction is not None:
+            if str(self.progress_bar.cget('mode')) != 'determinate':
+                self.progress_bar.stop()
+                self.progress_bar.config(mode='determinate', maximum=100)
+            self.progress_bar.config(value=fraction * 100)
+
+        parts = [event.stage]
+        if event.rows_processed:
+            parts.append(f"{event.rows_processed:,} lignes".replace(",", " "))
+            parts.append(f"{event.rows_per_second:,.0f} lignes/s".replace(",", " "))
+        if fraction is not None:
+            parts.append(f"{fraction * 100:.0f}%")
+            parts.append(f"restant: {format_duration(event.eta_seconds)}")
+
+        self.status_label.config(text=" - ".join(parts))
 
     def _update_file_info(self, result: ProcessingResult):
         """Met à jour les informations du fichier"""
@@ -698,7 +1102,8 @@ Temps de traitement: {result.processing_time:.2f}s"""
                     values.append("")
                 else:
                     values.append(str(value))
-            self.data_tree.insert("", tk.END, values=values)
+            # Le NNI (colonne texte masquée) sert à ouvrir le détail de l'employé
+            self.data_tree.insert("", tk.END, text=record.nni, values=values)
 
     def _update_filters(self):
         """Met à jour les options de filtres"""
@@ -706,7 +1111,7 @@ Temps de traitement: {result.processing_time:.2f}s"""
             return
 
         # Mettre à jour les équipes disponibles
-        teams = sorted(set(record.equipe_lib for record in self.current_records if record.equipe_lib))
+        teams = self.csv_processor.get_teams()
         self.team_filter["values"] = ["Toutes"] + teams
         self.team_filter.set("Toutes")
 
@@ -737,50 +1142,42 @@ Temps de traitement: {result.processing_time:.2f}s"""
         else:
             return "Autre"
 
+    def _get_filter_criteria(self) -> Dict[str, Any]:
+        """Lit les critères de filtrage dans les widgets (thread Tk uniquement)"""
+        team = self.team_filter.get()
+        return {
+            "equipe_lib": team if team and team != "Toutes" else None,
+            "name": self.name_filter.get().strip(),
+            "date": self.date_filter.get().strip()
+        }
+
     def _apply_filters(self):
-        """Applique les filtres sélectionnés"""
+        """Applique immédiatement les filtres sélectionnés"""
         if not self.current_records:
             return
 
-        filters = {}
-
-        # Filtre par équipe
-        team = self.team_filter.get()
-        if team and team != "Toutes":
-            filters["equipe_lib"] = team
-
-        # Filtre par nom
-        name = self.name_filter.get().strip()
-        if name:
-            # Recherche partielle dans nom ou prénom
-            self.filtered_records = [
-                record for record in self.current_records
-                if name.lower() in record.nom.lower() or name.lower() in record.prenom.lower()
-            ]
-        else:
-            self.filtered_records = self.current_records.copy()
-
-        # Appliquer les autres filtres
-        if filters:
-            self.filtered_records = self.csv_processor.filter_records(**filters)
-
-        # Filtre par date
-        date = self.date_filter.get().strip()
-        if date and date != "JJ/MM/AAAA":
-            self.filtered_records = [
-                record for record in self.filtered_records
-                if date in record.jour
-            ]
+        self.filter_scheduler.submit(self._records_snapshot, self._get_filter_criteria())
+        self.status_label.config(text="Filtrage en cours...")
 
+    def _on_filters_applied(self, filtered_records: List[PMTRecord], criteria: Dict[str, Any]):
+        """Callback appelé avec le résultat du dernier filtrage demandé"""
+        self.filtered_records = filtered_records
         self._update_filtered_display()
         self.status_label.config(text=f"Filtres appliqués: {len(self.filtered_records)} enregistrements")
 
+    def _on_filters_error(self, error_message: str):
+        """Callback appelé en cas d'erreur de filtrage"""
+        self.status_label.config(text="Erreur lors du filtrage")
+        self.logger.error(f"Erreur de filtrage: {error_message}")
+
     def _reset_filters(self):
         """Réinitialise tous les filtres"""
+        self.filter_scheduler.cancel()
+
         self.team_filter.set("Toutes")
         self.name_filter.delete(0, tk.END)
         self.date_filter.delete(0, tk.END)
-        self.date_filter.insert(0, "JJ/MM/AAAA")
+        self.date_filter.insert(0, DATE_PLACEHOLDER)
         self.date_filter.config(foreground="gray")
 
         self.filtered_records = self.current_records.copy()
@@ -789,19 +1186,22 @@ Temps de traitement: {result.processing_time:.2f}s"""
 
     def _on_filter_change(self, event=None):
         """Callback appelé quand un filtre change"""
-        # Auto-application des filtres après un délai
-        self.root.after(500, self._apply_filters)
+        if not self.current_records:
+            return
+
+        # Auto-application des filtres après un délai ; chaque frappe remplace la demande précédente
+        self.filter_scheduler.schedule(self._records_snapshot, self._get_filter_criteria())
 
     def _on_date_filter_focus_in(self, event):
         """Appelé quand le champ date reçoit le focus"""
-        if self.date_filter.get() == "JJ/MM/AAAA":
+        if self.date_filter.get() == DATE_PLACEHOLDER:
             self.date_filter.delete(0, tk.END)
             self.date_filter.config(foreground="black")
 
     def _on_date_filter_focus_out(self, event):
         """Appelé quand le champ date perd le focus"""
         if not self.date_filter.get().strip():
-            self.date_filter.insert(0, "JJ/MM/AAAA")
+            self.date_filter.insert(0, DATE_PLACEHOLDER)
             self.date_filter.config(foreground="gray")
 
     def _update_filtered_display(self):
@@ -833,55 +1233,135 @@ Temps de traitement: {result.processing_time:.2f}s"""
                     values.append("")
                 else:
                     values.append(str(value))
-            self.filtered_tree.insert("", tk.END, values=values)
+            self.filtered_tree.insert("", tk.END, text=record.nni, values=values)
 
     def _enable_toolbar_buttons(self):
         """Active les boutons de la barre d'outils"""
         for button in self.toolbar_buttons.values():
             button.config(state=NORMAL)
 
+    def _ask_export_path(self, title: str, prefix: str, extension: str, filetypes: List[tuple]) -> Optional[str]:
+        """Demande le chemin d'export dans le thread Tk (None si annulé)"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_path = filedialog.asksaveasfilename(
+            title=title,
+            defaultextension=extension,
+            filetypes=filetypes,
+            initialdir=str(Path.home() / "Documents"),
+            initialfile=f"{prefix}_{timestamp}{extension}"
+        )
+        return output_path or None
+
+    def _run_export_async(self, export_func, label: str, output_path: str, store_metrics: bool = False):
+        """
+        Lance un export dans un thread de travail avec progression et annulation
+
+        store_metrics: enregistrer les métriques par employé dans la base (export non filtré)
+        """
+        records_to_export = self.filtered_records if self.filtered_records != self.current_records else self.current_records
+        # Sans filtre, les métriques par employé du chargement sont réutilisées
+        metrics = self.csv_processor.metrics if records_to_export is self.current_records else None
+        cancel_token = self._set_loading_state(True)
+        self.status_label.config(text=f"Export {label} en cours...")
+
+        def export_worker():
+            try:
+                options = {}
+                if store_metrics and metrics is not None:
+                    options["dataset"] = self.csv_processor.get_dataset_ref()
+                export_path = export_func(
+                    records_to_export,
+                    output_path=output_path,
+                    progress_callback=self._post_progress,
+                    cancel_token=cancel_token,
+                    metrics=metrics,
+                    **options
+                )
+                timings = self.export_service.last_timings
+                self.root.after(0, lambda: self._on_export_completed(label, export_path, timings))
+            except OperationCancelledError:
+                self.root.after(0, lambda: self._on_export_cancelled(label))
+            except Exception as e:
+                self.root.after(0, lambda: self._on_export_error(label, str(e)))
+
+        thread = threading.Thread(target=export_worker, daemon=True)
+        thread.start()
+
+    def _on_export_completed(self, label: str, export_path: str, timings: Optional[Dict[str, Any]] = None):
+        """Callback appelé quand un export est terminé"""
+        self._set_loading_state(False)
+        self._set_last_timings(timings or {})
+        self.status_label.config(text=f"Export {label} terminé")
+        messagebox.showinfo("Export réussi", f"Fichier exporté vers:\n{export_path}")
+        self.logger.info(f"Export {label} réussi: {export_path}")
+
+    def _on_export_cancelled(self, label: str):
+        """Callback appelé quand un export est annulé"""
+        self._set_loading_state(False)
+        self.status_label.config(text=f"Export {label} annulé")
+
+    def _on_export_error(self, label: str, error_message: str):
+        """Callback appelé en cas d'erreur d'export"""
+        self._set_loading_state(False)
+        self.status_label.config(text=f"Erreur d'export {label}")
+        messagebox.showerror("Erreur d'export", f"Erreur lors de l'export {label}:\n{error_message}")
+        self.logger.error(f"Erreur export {label}: {error_message}")
+
     def _export_excel(self):
         """Exporte vers Excel"""
         if not self.current_records:
             return
 
-        try:
-            records_to_export = self.filtered_records if self.filtered_records != self.current_records else self.current_records
-            export_path = self.export_service.export_to_excel(records_to_export, use_file_dialog=True)
-            messagebox.showinfo("Export réussi", f"Fichier exporté vers:\n{export_path}")
-            self.logger.info(f"Export Excel réussi: {export_path}")
-
-        except Exception as e:
-            if "annulé par l'utilisateur" not in str(e):
-                messagebox.showerror("Erreur d'export", f"Erreur lors de l'export Excel:\n{str(e)}")
-                self.logger.error(f"Erreur export Excel: {str(e)}")
-            # Si l'export est annulé, on ne fait rien (pas d'erreur)
+        output_path = self._ask_export_path(
+            "Sauvegarder l'export Excel", "export_gabinette", ".xlsx",
+            [("Fichiers Excel", "*.xlsx"), ("Tous les fichiers", "*.*")]
+        )
+        if output_path:  # Si l'export est annulé, on ne fait rien (pas d'erreur)
+            self._run_export_async(self.export_service.export_to_excel, "Excel", output_path, store_metrics=True)
 
     def _export_summary(self):
         """Exporte le résumé vers un fichier texte"""
         if not self.current_records:
             return
 
-        try:
-            records_to_export = self.filtered_records if self.filtered_records != self.current_records else self.current_records
-            summary_path = self.export_service.export_summary_to_text(records_to_export, use_file_dialog=True)
-            messagebox.showinfo("Export réussi", f"Résumé exporté vers:\n{summary_path}")
-            self.logger.info(f"Export résumé réussi: {summary_path}")
+        output_path = self._ask_export_path(
+            "Sauvegarder le résumé", "resume_gabinette", ".txt",
+            [("Fichiers texte", "*.txt"), ("Tous les fichiers", "*.*")]
+        )
+        if output_path:  # Si l'export est annulé, on ne fait rien (pas d'erreur)
+            self._run_export_async(self.export_service.export_summary_to_text, "résumé", output_path)
 
-        except Exception as e:
-            if "annulé par l'utilisateur" not in str(e):
-                messagebox.showerror("Erreur d'export", f"Erreur lors de l'export résumé:\n{str(e)}")
-                self.logger.error(f"Erreur export résumé: {str(e)}")
-            # Si l'export est annulé, on ne fait rien (pas d'erreur)
+    def _export_records(self):
+        """Exporte les enregistrements filtrés ligne à ligne (CSV ou NDJSON selon l'extension)"""
+        if not self.current_records:
+            return
+
+        output_path = self._ask_export_path(
+            "Sauvegarder les enregistrements", "enregistrements_gabinette", ".csv",
+            [("Fichiers CSV", "*.csv"), ("JSON par ligne", "*.ndjson"), ("Tous les fichiers", "*.*")]
+        )
+        if not output_path:  # Si l'export est annulé, on ne fait rien (pas d'erreur)
+            return
+
+        export_format = "ndjson" if output_path.lower().endswith((".ndjson", ".jsonl")) else "csv"
+
+        def export_records(records, metrics=None, **options):
+            # Aucune métrique : les enregistrements sont écrits tels quels
+            return self.export_service.export_records(records, export_format=export_format, **options)
+
+        self._run_export_async(export_records, export_format.upper(), output_path)
 
     def _refresh_data(self):
-        """Actualise les données"""
+        """Actualise les données (seules les lignes ajoutées au fichier sont relues)"""
         if self.current_file_path:
-            self._load_file_async(self.current_file_path)
+            self._load_file_async(self.current_file_path, incremental=True)
 
     def _on_closing(self):
         """Callback appelé à la fermeture de l'application"""
         self.logger.info("Fermeture de l'application")
+        self.filter_scheduler.cancel()
+        if self._cancel_token is not None:
+            self._cancel_token.cancel()
         self.root.destroy()
 
     def _center_window(self):
@@ -0,0 +1,115 @@
+"""
+Détection rapide de l'encodage et du séparateur d'une extraction CSV
+
+Seuls les premiers Ko du fichier sont lus : un fichier au mauvais format
+(classeur Excel, UTF-16, binaire, en-tête non reconnu) est rejeté avant
+toute lecture par pandas, et chaque fichier d'un lot est lu avec son propre
+encodage.
+"""
+
+import codecs
+import csv
+from pathlib import Path
+from typing import List, Optional
+
+from src.config.settings import (
+    CSV_ENCODING, CSV_SEPARATOR, CSV_SEPARATOR_CANDIDATES, CSV_SNIFF_BYTES, EXPECTED_COLUMNS
+)
+from src.models.data_model import CSVFormat
+from src.utils.helpers import clean_string
+
+
+def detect_encoding(sample: bytes, complete: bool = False) -> str:
+    """
+    Détermine l'encodage à partir du début du fichier
+
+    Un BOM UTF-8 donne "utf-8-sig" ; un échantillon UTF-8 valide contenant
+    des caractères non ASCII donne "utf-8" ; sinon l'encodage par défaut des
+    extractions (CSV_ENCODING, dont l'ASCII est un sous-ensemble).
+
+    Args:
+        sample: Premiers octets du fichier
+        complete: L'échantillon contient tout le fichier
+
+    Returns:
+        Nom de l'encodage
+    """
+    if sample.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    if sample.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        raise Exception("Encodage UTF-16 non pris en charge : enregistrer l'extraction en UTF-8 ou latin1")
+    if sample.isascii():
+        return CSV_ENCODING
+
+    try:
+        # Décodeur incrémental : un caractère coupé en fin d'échantillon n'est pas une erreur
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=complete)
+        return "utf-8"
+    except UnicodeDecodeError:
+        return CSV_ENCODING
+
+
+def detect_separator(header: str, candidates: Optional[List[str]] = None) -> str:
+    """
+    Choisit le séparateur qui fait apparaître le plus de colonnes attendues
+
+    Args:
+        header: Ligne d'en-tête décodée
+        candidates: Séparateurs essayés (défaut: CSV_SEPARATOR_CANDIDATES)
+
+    Returns:
+        Séparateur retenu
+    """
+    expected = {clean_string(column) for column in EXPECTED_COLUMNS}
+    best_separator, best_score = CSV_SEPARATOR, 0
+    for separator in candidates or CSV_SEPARATOR_CANDIDATES:
+        fields = next(csv.reader([header], delimiter=separator), [])
+        score = sum(1 for column in fields if clean_string(column) in expected)
+        if score > best_score:
+            best_separator, best_score = separator, score
+
+    if best_score == 0:
+        tried = " ".join(repr(separator) for separator in candidates or CSV_SEPARATOR_CANDIDATES)
+        raise Exception(f"En-tête non reconnu : aucune colonne attendue (séparateurs essayés : {tried})")
+    return best_separator
+
+
+def sniff_csv_format(file_path: Path, sample_size: int = CSV_SNIFF_BYTES) -> CSVFormat:
+    """
+    Détecte l'encodage et le séparateur d'une extraction
+
+    Args:
+        file_path: Fichier CSV
+        sample_size: Octets lus en tête de fichier
+
+    Returns:
+        Format détecté (en-tête compris)
+    """
+    with open(file_path, 'rb') as file:
+        sample = file.read(sample_size)
+        complete = not file.read(1)
+
+    if not sample:
+        raise Exception("Fichier vide")
+    if sample.startswith(b"PK\x03\x04"):
+        raise Exception("Classeur Excel ou archive ZIP : exporter l'extraction au format CSV")
+
+    encoding = detect_encoding(sample, complete)
+    if b"\x00" in sample:
+        raise Exception("Fichier binaire : ce n'est pas une extraction CSV")
+
+    header_end = sample.find(b"\n")
+    if header_end < 0:
+        if not complete:
+            raise Exception(f"Aucune fin de ligne dans les {sample_size // 1024} premiers Ko")
+        header_end = len(sample)
+
+    header = sample[:header_end].decode(encoding).rstrip("\r")
+
+    separator = detect_separator(header)
+    return CSVFormat(
+        encoding=encoding,
+        separator=separator,
+        columns=next(csv.reader([header], delimiter=separator), []),
+        header_size=min(header_end + 1, len(sample))
+    )
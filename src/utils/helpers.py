@@ -4,7 +4,7 @@ Fonctions utilitaires communes pour La Gabinette
 
 import re
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 from pathlib import Path
 
 def validate_date_format(date_string: str, format_string: str = "%d/%m/%Y") -> bool:
@@ -25,6 +25,26 @@ def validate_date_format(date_string: str, format_string: str = "%d/%m/%Y") -> b
         return False
 
 
+def date_sort_key(date_string: str) -> Optional[Tuple[int, int, int]]:
+    """
+    Clé chronologique d'une date JJ/MM/AAAA, sans passer par strptime
+
+    Args:
+        date_string: La chaîne de date
+
+    Returns:
+        Tuple (année, mois, jour) ou None si la date est illisible
+    """
+    parts = date_string.split("/")
+    if len(parts) != 3:
+        return None
+    try:
+        day, month, year = (int(part) for part in parts)
+    except ValueError:
+        return None
+    return year, month, day
+
+
 def validate_time_format(time_string: str, format_string: str = "%H:%M:%S") -> bool:
     """
     Valide le format d'une heure
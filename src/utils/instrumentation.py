@@ -0,0 +1,180 @@
+"""
+Instrumentation légère des traitements : chronomètres et compteurs par étape
+
+Un traitement ouvre une exécution avec `start_run()` ; les services imbriqués
+chronomètrent leurs étapes avec `timed()` et incrémentent des compteurs avec
+`count()`. Sans exécution active dans le thread courant, ces appels ne font
+rien, ce qui permet de les laisser en place dans les chemins critiques.
+
+Exemple:
+    with start_run("Chargement") as run:
+        with timed("read_csv"):
+            ...
+        count("lignes", 1000)
+    print(run.to_dict())
+"""
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from src.utils.logger import logger
+
+
+class TimingNode:
+    """Nœud de l'arbre des durées : une étape, ses compteurs et ses sous-étapes"""
+
+    __slots__ = ("name", "seconds", "calls", "counters", "children")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.seconds = 0.0
+        self.calls = 0
+        self.counters: Dict[str, int] = {}
+        self.children: Dict[str, "TimingNode"] = {}
+
+    def child(self, name: str) -> "TimingNode":
+        """Retourne la sous-étape `name` (les appels répétés sont cumulés)"""
+        node = self.children.get(name)
+        if node is None:
+            node = self.children[name] = TimingNode(name)
+        return node
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convertit le nœud et ses sous-étapes en dictionnaire sérialisable"""
+        result: Dict[str, Any] = {
+            "name": self.name,
+            "seconds": round(self.seconds, 6),
+            "calls": self.calls
+        }
+        if self.counters:
+            result["counters"] = dict(self.counters)
+        if self.children:
+            result["children"] = [child.to_dict() for child in self.children.values()]
+        return result
+
+
+class _RunState(threading.local):
+    """Pile des étapes en cours, propre à chaque thread"""
+
+    def __init__(self):
+        self.stack: List[TimingNode] = []
+
+
+_state = _RunState()
+
+
+def current_node() -> Optional[TimingNode]:
+    """Étape en cours dans le thread courant (None hors exécution instrumentée)"""
+    return _state.stack[-1] if _state.stack else None
+
+
+@contextmanager
+def start_run(name: str, log: bool = True) -> Iterator[TimingNode]:
+    """
+    Ouvre une exécution instrumentée
+
+    Si une exécution est déjà active dans le thread (ex: la ligne de commande
+    englobant chargement et export), l'exécution devient une étape de celle-ci
+    et seule l'exécution la plus externe est écrite dans le log.
+
+    Args:
+        name: Nom de l'exécution (ex: "Chargement", "Export Excel")
+        log: Écrire l'arbre des durées en JSON dans le log à la fin
+
+    Yields:
+        Nœud racine de l'exécution (to_dict() pour l'arbre complet)
+    """
+    parent = current_node()
+    node = parent.child(name) if parent is not None else TimingNode(name)
+    _state.stack.append(node)
+    start = time.perf_counter()
+    try:
+        yield node
+    finally:
+        node.seconds += time.perf_counter() - start
+        node.calls += 1
+        _state.stack.pop()
+        if parent is None and log:
+            log_timings(node)
+
+
+@contextmanager
+def timed(name: str) -> Iterator[None]:
+    """
+    Chronomètre une étape de l'exécution en cours
+
+    Args:
+        name: Nom de l'étape (les appels de même nom au même niveau sont cumulés)
+    """
+    parent = current_node()
+    if parent is None:
+        yield
+        return
+
+    node = parent.child(name)
+    _state.stack.append(node)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        node.seconds += time.perf_counter() - start
+        node.calls += 1
+        _state.stack.pop()
+
+
+def add_time(name: str, seconds: float, calls: int = 1) -> None:
+    """
+    Ajoute une durée mesurée à la main à une sous-étape de l'étape en cours
+
+    Destinée aux boucles par ligne, où un gestionnaire de contexte par
+    itération coûterait trop cher : on cumule perf_counter() localement
+    puis on appelle add_time() une fois par bloc.
+    """
+    parent = current_node()
+    if parent is None:
+        return
+    node = parent.child(name)
+    node.seconds += seconds
+    node.calls += calls
+
+
+def count(name: str, value: int = 1) -> None:
+    """Incrémente un compteur de l'étape en cours"""
+    node = current_node()
+    if node is not None:
+        node.counters[name] = node.counters.get(name, 0) + value
+
+
+def log_timings(node: TimingNode) -> None:
+    """Écrit l'arbre des durées en JSON (une ligne) dans le log"""
+    logger.get_logger("Instrumentation").info(
+        f"Durées {node.name}: {json.dumps(node.to_dict(), ensure_ascii=False)}"
+    )
+
+
+def format_timing_tree(timings: Dict[str, Any], indent: int = 0) -> List[str]:
+    """
+    Formate un arbre des durées (to_dict) en lignes de texte indentées
+
+    Args:
+        timings: Arbre des durées
+        indent: Niveau d'indentation de départ
+
+    Returns:
+        Lignes du type "  Étape ........ 1.234 s (x3)"
+    """
+    label = "  " * indent + timings["name"]
+    line = f"{label:<45} {timings['seconds']:>9.3f} s"
+    if timings.get("calls", 1) > 1:
+        line += f" (x{timings['calls']})"
+    counters = timings.get("counters")
+    if counters:
+        line += "  " + ", ".join(f"{key}={value}" for key, value in counters.items())
+
+    lines = [line]
+    for child in timings.get("children", []):
+        lines.extend(format_timing_tree(child, indent + 1))
+    return lines
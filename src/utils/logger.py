@@ -2,10 +2,15 @@
 Système de logging centralisé pour La Gabinette
 """
 
+import atexit
 import logging
 import logging.handlers
+import multiprocessing
+import queue
+import threading
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, Iterator, Optional, Tuple
 
 from src.config.settings import LOGGING_CONFIG
 
@@ -15,6 +20,7 @@ class Logger:
 
     _instance: Optional['Logger'] = None
     _logger: Optional[logging.Logger] = None
+    _listener: Optional[logging.handlers.QueueListener] = None
 
     def __new__(cls) -> 'Logger':
         if cls._instance is None:
@@ -26,13 +32,20 @@ class Logger:
             self._setup_logger()
 
     def _setup_logger(self) -> None:
-        """Configure le logger principal"""
+        """
+        Configure le logger principal
+
+        Les services ne font qu'empiler les messages dans une file (QueueHandler) ;
+        l'écriture dans le fichier et sur la console est faite par un thread
+        d'arrière-plan (QueueListener), hors des boucles de calcul.
+        """
         self._logger = logging.getLogger("PMTAnalytics")
         self._logger.setLevel(getattr(logging, LOGGING_CONFIG["level"]))
 
         # Éviter la duplication des handlers
         if not self._logger.handlers:
             # Handler pour fichier avec rotation
+            Path(LOGGING_CONFIG["file"]).parent.mkdir(parents=True, exist_ok=True)
             file_handler = logging.handlers.RotatingFileHandler(
                 LOGGING_CONFIG["file"],
                 maxBytes=LOGGING_CONFIG["max_bytes"],
@@ -50,9 +63,44 @@ class Logger:
             file_handler.setFormatter(formatter)
             console_handler.setFormatter(formatter)
 
-            # Ajouter les handlers
-            self._logger.addHandler(file_handler)
-            self._logger.addHandler(console_handler)
+            # Écriture asynchrone : file d'attente + thread d'écriture
+            log_queue: queue.SimpleQueue = queue.SimpleQueue()
+            self._listener = logging.handlers.QueueListener(
+                log_queue, file_handler, console_handler, respect_handler_level=True
+            )
+            self._listener.start()
+            atexit.register(self.shutdown)
+
+            self._logger.addHandler(logging.handlers.QueueHandler(log_queue))
+
+    def shutdown(self) -> None:
+        """Vide la file d'attente et arrête le thread d'écriture (appelée à la sortie)"""
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+
+    @contextmanager
+    def process_queue(self) -> Iterator[Any]:
+        """
+        File multiprocessing où les processus d'un pool envoient leurs messages
+
+        Les processus créés par fork héritent du QueueHandler mais pas du
+        thread d'écriture : sans cette file, leurs messages seraient perdus.
+        Chaque processus appelle setup_process_logging(file) à son démarrage ;
+        les messages reçus sont repris ici par les handlers de ce processus,
+        jusqu'à la sortie du bloc.
+
+        Yields:
+            File à transmettre à setup_process_logging
+        """
+        process_queue = multiprocessing.Queue()
+        listener = logging.handlers.QueueListener(process_queue, _ForwardHandler())
+        listener.start()
+        try:
+            yield process_queue
+        finally:
+            listener.stop()
+            process_queue.close()
 
     def get_logger(self, name: str = None) -> logging.Logger:
         """Retourne un logger avec le nom spécifié"""
@@ -81,6 +129,65 @@ class Logger:
         self._logger.critical(message)
 
 
+class _ForwardHandler(logging.Handler):
+    """Reprend un message venu d'un autre processus par le logger de même nom de ce processus"""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        logging.getLogger(record.name).handle(record)
+
+
+def setup_process_logging(process_queue: Any) -> None:
+    """
+    Envoie les messages d'un processus du pool au processus parent (voir Logger.process_queue)
+
+    Remplace les handlers hérités du parent, dont le thread d'écriture
+    n'existe pas dans ce processus.
+    """
+    app_logger = logging.getLogger("PMTAnalytics")
+    for handler in list(app_logger.handlers):
+        app_logger.removeHandler(handler)
+    app_logger.addHandler(logging.handlers.QueueHandler(process_queue))
+    app_logger.setLevel(getattr(logging, LOGGING_CONFIG["level"]))
+    app_logger.propagate = False  # Propagé par le parent à la réception
+
+
+class AggregatedWarnings:
+    """
+    Regroupe les avertissements répétés d'une boucle
+
+    Seule la première occurrence de chaque clé est écrite immédiatement ;
+    les suivantes sont comptées puis résumées en une ligne par flush()
+    (ex: "Unité inconnue ... (37 occurrences)").
+    """
+
+    def __init__(self, log: logging.Logger):
+        self._log = log
+        self._lock = threading.Lock()
+        self._counts: Dict[str, Tuple[str, int]] = {}
+
+    def warning(self, key: str, message: str) -> None:
+        """
+        Signale un avertissement, écrit seulement à la première occurrence de `key`
+
+        Args:
+            key: Identifiant de l'avertissement (ex: l'unité inconnue)
+            message: Message complet de la première occurrence
+        """
+        with self._lock:
+            first_message, count = self._counts.get(key, (message, 0))
+            self._counts[key] = (first_message, count + 1)
+        if count == 0:
+            self._log.warning(message)
+
+    def flush(self) -> None:
+        """Écrit le résumé des avertissements répétés puis remet les compteurs à zéro"""
+        with self._lock:
+            counts, self._counts = self._counts, {}
+        for message, count in counts.values():
+            if count > 1:
+                self._log.warning(f"{message} ({count} occurrences)")
+
+
 # Instance globale du logger
 logger = Logger()
  
\ No newline at end of file
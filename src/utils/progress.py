@@ -0,0 +1,179 @@
+"""
+Suivi de progression et annulation coopérative des traitements longs
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+
+class OperationCancelledError(Exception):
+    """Levée quand un traitement est interrompu à la demande de l'utilisateur"""
+
+
+class CancellationToken:
+    """
+    Jeton d'annulation partagé entre l'interface et un traitement
+
+    Le traitement vérifie le jeton entre deux blocs de travail (annulation
+    coopérative) ; l'interface appelle cancel() depuis n'importe quel thread.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        """Demande l'annulation du traitement"""
+        self._event.set()
+
+    @property
+    def is_cancelled(self) -> bool:
+        """True si l'annulation a été demandée"""
+        return self._event.is_set()
+
+    def raise_if_cancelled(self) -> None:
+        """Lève OperationCancelledError si l'annulation a été demandée"""
+        if self._event.is_set():
+            raise OperationCancelledError("Opération annulée par l'utilisateur")
+
+
+@dataclass
+class ProgressEvent:
+    """Instantané de progression transmis au callback"""
+    stage: str
+    rows_processed: int = 0
+    total_rows: Optional[int] = None
+    bytes_processed: int = 0
+    total_bytes: Optional[int] = None
+    step: int = 0
+    total_steps: Optional[int] = None
+    elapsed: float = 0.0
+
+    @property
+    def fraction(self) -> Optional[float]:
+        """Avancement entre 0 et 1, ou None si inconnu"""
+        if self.total_bytes:
+            return min(self.bytes_processed / self.total_bytes, 1.0)
+        if self.total_rows:
+            return min(self.rows_processed / self.total_rows, 1.0)
+        if self.total_steps:
+            return min(self.step / self.total_steps, 1.0)
+        return None
+
+    @property
+    def rows_per_second(self) -> float:
+        """Débit moyen en lignes par seconde depuis le début du traitement"""
+        return self.rows_processed / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def eta_seconds(self) -> Optional[float]:
+        """Temps restant estimé en secondes, ou None si inconnu"""
+        fraction = self.fraction
+        if not fraction or self.elapsed <= 0:
+            return None
+        return self.elapsed * (1.0 - fraction) / fraction
+
+
+ProgressCallback = Callable[[ProgressEvent], None]
+
+
+class ProgressReporter:
+    """
+    Émet des ProgressEvent vers un callback optionnel et vérifie le jeton d'annulation
+
+    Les mises à jour d'une même étape sont limitées à une toutes les
+    `min_interval` secondes ; un changement d'étape est toujours transmis.
+    """
+
+    def __init__(self, callback: Optional[ProgressCallback] = None,
+                 cancel_token: Optional[CancellationToken] = None,
+                 total_rows: Optional[int] = None,
+                 total_bytes: Optional[int] = None,
+                 total_steps: Optional[int] = None,
+                 min_interval: float = 0.1):
+        self.callback = callback
+        self.cancel_token = cancel_token
+        self.total_rows = total_rows
+        self.total_bytes = total_bytes
+        self.total_steps = total_steps
+        self.min_interval = min_interval
+
+        self._start = time.perf_counter()
+        self._last_emit = 0.0
+        self._last_stage: Optional[str] = None
+        self.rows_processed = 0
+        self.bytes_processed = 0
+        self.step = 0
+
+    def check_cancelled(self) -> None:
+        """Point d'annulation coopérative"""
+        if self.cancel_token is not None:
+            self.cancel_token.raise_if_cancelled()
+
+    def report(self, stage: str, rows: Optional[int] = None, bytes_processed: Optional[int] = None,
+               step: Optional[int] = None, force: bool = False) -> None:
+        """
+        Met à jour la progression, vérifie l'annulation puis notifie le callback
+
+        Args:
+            stage: Nom de l'étape en cours
+            rows: Nombre total de lignes traitées jusqu'ici
+            bytes_processed: Nombre total d'octets traités jusqu'ici
+            step: Numéro de l'étape courante (traitements découpés en étapes)
+            force: Ignorer la limitation de fréquence
+        """
+        if rows is not None:
+            self.rows_processed = rows
+        if bytes_processed is not None:
+            self.bytes_processed = bytes_processed
+        if step is not None:
+            self.step = step
+
+        self.check_cancelled()
+
+        if self.callback is None:
+            return
+
+        now = time.perf_counter()
+        if not force and stage == self._last_stage and now - self._last_emit < self.min_interval:
+            return
+
+        self._last_emit = now
+        self._last_stage = stage
+        self.callback(ProgressEvent(
+            stage=stage,
+            rows_processed=self.rows_processed,
+            total_rows=self.total_rows,
+            bytes_processed=self.bytes_processed,
+            total_bytes=self.total_bytes,
+            step=self.step,
+            total_steps=self.total_steps,
+            elapsed=now - self._start
+        ))
+
+    def advance(self, stage: str, rows: Optional[int] = None) -> None:
+        """Passe à l'étape suivante (traitements découpés en étapes)"""
+        self.report(stage, rows=rows, step=self.step + 1, force=True)
+
+
+def format_duration(seconds: Optional[float]) -> str:
+    """
+    Formate une durée pour la barre de statut
+
+    Args:
+        seconds: Durée en secondes (None si inconnue)
+
+    Returns:
+        Durée lisible (ex: "1 min 05 s")
+    """
+    if seconds is None:
+        return "--"
+    seconds = int(round(seconds))
+    if seconds < 60:
+        return f"{seconds} s"
+    minutes, seconds = divmod(seconds, 60)
+    if minutes < 60:
+        return f"{minutes} min {seconds:02d} s"
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours} h {minutes:02d} min"
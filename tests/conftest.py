@@ -0,0 +1,97 @@
+"""
+Fixtures communes des tests de La Gabinette : extractions PMT minimales écrites à la volée
+"""
+
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+# Mêmes chemins que run.py : racine (imports src.*) et src (imports config.*)
+for path in (ROOT, ROOT / "src"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from src.config.settings import CSV_ENCODING, CSV_SEPARATOR, EXPECTED_COLUMNS  # noqa: E402
+from src.services.record_exporter import RECORD_COLUMNS  # noqa: E402
+
+
+# Attribut de PMTRecord de chaque colonne de l'extraction (même ordre, row_number en moins)
+ROW_FIELDS = RECORD_COLUMNS[:len(EXPECTED_COLUMNS)]
+
+JOURS = ["Lundi", "Mardi", "Mercredi", "Jeudi", "Vendredi", "Samedi", "Dimanche"]
+
+ROW_DEFAULTS = {
+    "um": "75", "um_lib": "DR PARIS", "dum": "7501", "dum_lib": "BATIGNOLLES",
+    "equipe": "7501", "equipe_lib": "PV B TERRAIN", "nom": "DURAND", "prenom": "Camille",
+    "fin_cycle": "N"
+}
+
+
+def make_row(nni: str = "A000001", jour: str = "02/01/2024", **fields) -> list:
+    """
+    Ligne d'extraction (valeurs des EXPECTED_COLUMNS)
+
+    Args:
+        nni: NNI de l'employé
+        jour: Date JJ/MM/AAAA (jour de la semaine déduit ; vide possible)
+        **fields: Autres attributs de PMTRecord (ex: code="41", valeur="1", ht="J")
+    """
+    values = dict(ROW_DEFAULTS, nni=nni, jour=jour,
+                  designation_jour=JOURS[datetime.strptime(jour, "%d/%m/%Y").weekday()] if jour else "")
+    values.update(fields)
+    return ["" if values.get(name) is None else str(values.get(name, "")) for name in ROW_FIELDS]
+
+
+def csv_text(rows, separator: str = CSV_SEPARATOR) -> str:
+    """Lignes de données au format de l'extraction (une fin de ligne après chaque ligne)"""
+    return "".join(separator.join(row) + "\n" for row in rows)
+
+
+@pytest.fixture
+def pmt_row():
+    """Constructeur de lignes d'extraction (voir make_row)"""
+    return make_row
+
+
+@pytest.fixture
+def write_pmt_csv(tmp_path):
+    """
+    Écrit une extraction PMT dans le répertoire temporaire du test
+
+    Appel : write_pmt_csv(rows, name="extraction.csv", encoding=CSV_ENCODING,
+    separator=";", header=True, final_newline=True) -> Path
+    """
+    def write(rows, name: str = "extraction.csv", encoding: str = CSV_ENCODING,
+              separator: str = CSV_SEPARATOR, header: bool = True, final_newline: bool = True) -> Path:
+        text = csv_text(([EXPECTED_COLUMNS] if header else []) + list(rows), separator)
+        if not final_newline:
+            text = text[:-1]
+        path = tmp_path / name
+        path.write_bytes(text.encode(encoding))
+        return path
+
+    return write
+
+
+@pytest.fixture
+def month_rows():
+    """Un mois de lignes pour quelques employés (présence, arrêts maladie, astreinte)"""
+    def build(nnis=("A000001", "A000002", "A000003"), month: int = 1, year: int = 2024, days: int = 31) -> list:
+        rows = []
+        for index, nni in enumerate(nnis):
+            for day in range(1, days + 1):
+                jour = f"{day:02d}/{month:02d}/{year}"
+                if datetime(year, month, day).weekday() >= 5:
+                    rows.append(make_row(nni, jour, prenom=f"P{index}"))
+                elif (day + index) % 7 == 0:
+                    rows.append(make_row(nni, jour, prenom=f"P{index}", code="41", designation_code="Maladie",
+                                         valeur="1", des_unite="Jour(s)"))
+                else:
+                    rows.append(make_row(nni, jour, prenom=f"P{index}", ht="J", ht_de_1="08:00:00",
+                                         ht_a_1="17:00:00", heure_debut="08:00:00", heure_fin="17:00:00"))
+        return rows
+
+    return build
@@ -0,0 +1,143 @@
+"""
+Tests de l'API HTTP locale (appels directs de _dispatch ; socket locale pour _handle_connection)
+"""
+
+import asyncio
+import json
+import threading
+
+from src.services.api_server import MetricsAPIServer
+from tests.conftest import csv_text
+
+
+def request(server, method, target, headers=None):
+    status, etag, body = asyncio.run(server._dispatch(method, target, headers or {}))
+    return status, etag, json.loads(body) if body else None
+
+
+def raw_exchange(server, data):
+    """Envoie des octets bruts à _handle_connection (socket locale) et renvoie la réponse"""
+    async def exchange():
+        listener = await asyncio.start_server(server._handle_connection, "127.0.0.1", 0)
+        async with listener:
+            reader, writer = await asyncio.open_connection(*listener.sockets[0].getsockname()[:2])
+            writer.write(data)
+            await writer.drain()
+            response = await reader.read()
+            writer.close()
+            return response
+
+    head, _, body = asyncio.run(exchange()).partition(b"\r\n\r\n")
+    return int(head.split(b" ")[1]), json.loads(body)
+
+
+def append_rows(path, rows):
+    with open(path, "ab") as file:
+        file.write(csv_text(rows).encode("latin1"))
+
+
+def test_parallel_reloads_are_serialized(write_pmt_csv, month_rows):
+    rows = month_rows(nnis=[f"A{index:06d}" for index in range(6)])
+    path = write_pmt_csv(rows[:60])
+    server = MetricsAPIServer(port=0)
+    server.load(str(path))
+    append_rows(path, rows[60:])
+
+    errors = []
+
+    def reload():
+        try:
+            server.load(str(path), incremental=True)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=reload) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    records = server._snapshot()["records"]
+    assert len(records) == len(rows)
+    assert len({record.row_number for record in records}) == len(rows)
+    assert request(server, "GET", "/api/status")[2]["records"] == len(rows)
+
+
+def test_concurrent_reload_requests(write_pmt_csv, month_rows):
+    rows = month_rows()
+    path = write_pmt_csv(rows[:30])
+    server = MetricsAPIServer(port=0)
+    server.load(str(path))
+    append_rows(path, rows[30:])
+
+    async def reload_all():
+        return await asyncio.gather(*(server._dispatch("POST", "/api/reload", {}) for _ in range(4)))
+
+    statuses = [status for status, _, _ in asyncio.run(reload_all())]
+    assert 200 in statuses and set(statuses) <= {200, 409}
+    records = server._snapshot()["records"]
+    assert len({record.row_number for record in records}) == len(records) == len(rows)
+
+
+def test_responses_follow_reloads(write_pmt_csv, month_rows):
+    rows = month_rows()
+    path = write_pmt_csv(rows[:31])
+    server = MetricsAPIServer(port=0)
+    server.load(str(path))
+
+    status, etag, payload = request(server, "GET", "/api/records?nni=A000001&limit=5")
+    assert status == 200 and payload["total"] == 31 and len(payload["records"]) == 5
+    assert request(server, "GET", "/api/records?nni=A000001", {"if-none-match": etag})[0] == 200
+    assert request(server, "GET", "/api/records?nni=A000001&limit=5", {"if-none-match": etag})[0] == 304
+    assert request(server, "GET", "/api/employees/A000001")[2]["nni"] == "A000001"
+    assert request(server, "GET", "/api/employees/A000002")[0] == 404
+
+    append_rows(path, rows[31:])
+    assert request(server, "POST", "/api/reload")[0] == 200
+    status, new_etag, payload = request(server, "GET", "/api/records?nni=A000001&limit=5")
+    assert status == 200 and new_etag != etag and payload["total"] == 31
+    assert request(server, "GET", "/api/employees/A000002")[0] == 200
+    assert request(server, "GET", "/api/status")[2]["employees"] == 3
+
+
+def test_unknown_filter_is_rejected(write_pmt_csv, pmt_row):
+    server = MetricsAPIServer(port=0)
+    server.load(str(write_pmt_csv([pmt_row()])))
+    assert request(server, "GET", "/api/records?inconnu=1")[0] == 400
+    assert request(server, "GET", "/api/records?offset=x")[0] == 400
+    assert request(server, "GET", "/api/records?offset=-1")[0] == 400
+    assert request(server, "GET", "/api/records?limit=-1")[0] == 400
+    assert request(server, "GET", "/api/records?offset=1")[2]["records"] == []
+
+
+def test_invalid_content_length_is_rejected(write_pmt_csv, pmt_row):
+    server = MetricsAPIServer(port=0)
+    server.load(str(write_pmt_csv([pmt_row()])))
+
+    for length in (b"abc", b"-5"):
+        status, payload = raw_exchange(
+            server, b"GET /api/status HTTP/1.1\r\nContent-Length: " + length + b"\r\n\r\n"
+        )
+        assert (status, payload) == (400, {"error": "En-tête Content-Length invalide"})
+
+    status, payload = raw_exchange(
+        server, b"GET /api/status HTTP/1.1\r\nContent-Length: 2\r\nConnection: close\r\n\r\n{}"
+    )
+    assert status == 200 and "employees" in payload
+
+
+def test_numeric_filters_are_converted(write_pmt_csv, pmt_row):
+    rows = [pmt_row(jour="02/01/2024", code="41", valeur="1"),
+            pmt_row(jour="03/01/2024", code="41", valeur="0.5"),
+            pmt_row(jour="04/01/2024")]
+    server = MetricsAPIServer(port=0)
+    server.load(str(write_pmt_csv(rows)))
+
+    payload = request(server, "GET", "/api/records?valeur=1")[2]
+    assert [record["jour"] for record in payload["records"]] == ["02/01/2024"]
+    assert request(server, "GET", "/api/records?valeur=0.50")[2]["total"] == 1
+    assert request(server, "GET", "/api/records?row_number=4")[2]["records"][0]["jour"] == "04/01/2024"
+    assert request(server, "GET", "/api/records?code=41&jour=03/01/2024")[2]["total"] == 1
+    assert request(server, "GET", "/api/records?valeur=abc")[0] == 400
+    assert request(server, "GET", "/api/records?validation_results=x")[0] == 400
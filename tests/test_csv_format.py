@@ -0,0 +1,55 @@
+"""
+Tests de la détection de l'encodage et du séparateur des extractions
+"""
+
+import codecs
+
+import pytest
+
+from src.services.csv_processor import CSVProcessor
+from src.utils.csv_format import detect_encoding, detect_separator, sniff_csv_format
+
+
+@pytest.mark.parametrize("encoding, separator", [
+    ("latin1", ";"), ("utf-8", ";"), ("utf-8-sig", ";"), ("latin1", ","), ("utf-8", "\t")
+])
+def test_sniff_csv_format(write_pmt_csv, pmt_row, encoding, separator):
+    path = write_pmt_csv([pmt_row(nom="LEFÈVRE", prenom="Hélène")], encoding=encoding, separator=separator)
+
+    csv_format = sniff_csv_format(path)
+
+    assert csv_format.encoding == encoding
+    assert csv_format.separator == separator
+    assert csv_format.columns[14] == "NNI"
+
+    processor = CSVProcessor()
+    assert processor.load_file(str(path)).success
+    assert processor.get_records()[0].nom == "LEFÈVRE"
+
+
+def test_detect_encoding():
+    assert detect_encoding(b"NNI;Nom\n") == "latin1"
+    assert detect_encoding(codecs.BOM_UTF8 + b"NNI") == "utf-8-sig"
+    assert detect_encoding("Prénom".encode("utf-8")) == "utf-8"
+    assert detect_encoding("Prénom".encode("latin1")) == "latin1"
+    # Caractère UTF-8 coupé en fin d'échantillon partiel
+    assert detect_encoding("Prénom é".encode("utf-8")[:-1]) == "utf-8"
+    with pytest.raises(Exception):
+        detect_encoding(codecs.BOM_UTF16_LE + "NNI".encode("utf-16-le"))
+
+
+def test_detect_separator_rejects_unknown_header():
+    assert detect_separator("NNI|Nom|Jour", ["|", ";"]) == "|"
+    with pytest.raises(Exception):
+        detect_separator("a;b;c")
+
+
+def test_sniff_rejects_excel_and_binary(tmp_path):
+    workbook = tmp_path / "extraction.xlsx"
+    workbook.write_bytes(b"PK\x03\x04" + b"\x00" * 32)
+    binary = tmp_path / "extraction.bin"
+    binary.write_bytes(b"NNI;Nom\x00\x01\n")
+
+    for path in (workbook, binary):
+        with pytest.raises(Exception):
+            sniff_csv_format(path)
@@ -0,0 +1,78 @@
+"""
+Tests du chargement CSV : rechargement incrémental
+"""
+
+from src.services.csv_processor import CSVProcessor
+from tests.conftest import csv_text
+
+
+def record_keys(processor):
+    return [(record.nni, record.jour, record.code, record.heure_fin, record.row_number)
+            for record in processor.get_records()]
+
+
+def full_load(path):
+    processor = CSVProcessor()
+    assert processor.load_file(str(path)).success
+    return processor
+
+
+def test_incremental_reload_reads_only_appended_rows(write_pmt_csv, month_rows):
+    rows = month_rows()
+    path = write_pmt_csv(rows[:40])
+    processor = CSVProcessor()
+    assert processor.load_file(str(path)).records_processed == 40
+
+    with open(path, "ab") as file:
+        file.write(csv_text(rows[40:]).encode("latin1"))
+    result = processor.load_file(str(path), incremental=True)
+
+    assert result.success and result.incremental
+    assert result.records_appended == len(rows) - 40
+    assert record_keys(processor) == record_keys(full_load(path))
+    assert processor.metrics.get_overtime_by_employee() == full_load(path).metrics.get_overtime_by_employee()
+    assert processor.metrics.get_sick_leave_by_employee() == full_load(path).metrics.get_sick_leave_by_employee()
+
+
+def test_incremental_reload_after_rewrite_is_full(write_pmt_csv, month_rows):
+    rows = month_rows()
+    path = write_pmt_csv(rows[:40])
+    processor = CSVProcessor()
+    processor.load_file(str(path))
+
+    # Même taille de préfixe mais dernière ligne lue modifiée
+    write_pmt_csv(rows[:39] + [rows[60]] + rows[40:50])
+    result = processor.load_file(str(path), incremental=True)
+
+    assert result.success and not result.incremental
+    assert record_keys(processor) == record_keys(full_load(path))
+
+
+def test_incremental_reload_after_unterminated_last_line(write_pmt_csv, pmt_row):
+    rows = [pmt_row("A000001", f"{day:02d}/01/2024", heure_debut="08:00:00", heure_fin="17:00:00")
+            for day in range(1, 6)]
+    path = write_pmt_csv(rows, final_newline=False)
+    content = path.read_bytes()
+    # Dernière ligne coupée au milieu de l'heure de fin, sans fin de ligne
+    path.write_bytes(content[:-4])
+
+    processor = CSVProcessor()
+    assert processor.load_file(str(path)).success
+    assert processor.get_dataset_ref() is not None
+
+    with open(path, "ab") as file:
+        file.write(content[-4:] + b"\n")
+    result = processor.load_file(str(path), incremental=True)
+
+    assert result.success and not result.incremental
+    assert record_keys(processor) == record_keys(full_load(path))
+    assert processor.get_records()[-1].heure_fin == "17:00:00"
+
+
+def test_dataset_ref_rejects_extended_unterminated_file(write_pmt_csv, pmt_row):
+    path = write_pmt_csv([pmt_row(), pmt_row(jour="03/01/2024")], final_newline=False)
+    processor = full_load(path)
+
+    with open(path, "ab") as file:
+        file.write(b"0")
+    assert processor.get_dataset_ref() is None
@@ -0,0 +1,44 @@
+"""
+Tests des règles métier de filtrage par catégorie
+"""
+
+from src.models.data_model import PMTRecord
+from src.services.employee_classifier import EmployeeClassifier
+
+
+def record(jour, designation_jour="Mardi", astreinte="", jour_ferie="", ht="", heures=("", "")):
+    return PMTRecord(nni="A000001", jour=jour, designation_jour=designation_jour, astreinte=astreinte,
+                     jour_ferie=jour_ferie, ht=ht, heure_debut=heures[0], heure_fin=heures[1])
+
+
+def test_3x8_rule_keeps_shifts_outside_astreinte():
+    records = [
+        record("01/01/2024", jour_ferie="X", heures=("07:30:00", "15:30:00")),
+        record("06/01/2024", designation_jour="Samedi", heures=("15:30:00", "23:30:00")),
+        record("07/01/2024", designation_jour="Dimanche", heures=("23:30:00", "07:30:00")),
+        record("08/01/2024", astreinte="I", heures=("07:30:00", "15:30:00")),
+        record("09/01/2024", ht="J", heures=("08:00:00", "17:00:00")),
+    ]
+
+    kept = EmployeeClassifier().filter_records_by_business_rules(records, '3X8')
+
+    assert [r.jour for r in kept] == ["01/01/2024", "06/01/2024", "07/01/2024"]
+
+
+def test_other_category_rules():
+    records = [
+        record("02/01/2024", ht="J"),
+        record("06/01/2024", designation_jour="Samedi", ht="J"),
+        record("06/01/2024", designation_jour="Samedi", astreinte="I"),
+        record("01/01/2024", jour_ferie="X", ht="J"),
+        record("03/01/2024", astreinte="I", ht="J"),
+        record("04/01/2024", ht="R"),
+    ]
+    classifier = EmployeeClassifier()
+
+    def kept(category):
+        return [(r.jour, r.astreinte) for r in classifier.filter_records_by_business_rules(records, category)]
+
+    assert kept('ASTREINTES') == [("02/01/2024", ""), ("06/01/2024", "I"), ("03/01/2024", "I")]
+    assert kept('TIPS') == [("02/01/2024", ""), ("06/01/2024", "")]
+    assert kept('AUTRES') == [("02/01/2024", ""), ("06/01/2024", ""), ("04/01/2024", "")]
@@ -0,0 +1,93 @@
+"""
+Tests du filtrage de l'interface et de son planificateur en arrière-plan
+"""
+
+import threading
+
+from src.config.settings import EXPECTED_COLUMNS
+from src.models.data_model import PMTRecord
+from src.ui.filter_scheduler import DATE_PLACEHOLDER, FilterScheduler, apply_record_filters
+from tests.conftest import make_row
+
+
+class ImmediateRoot:
+    """Remplace la fenêtre Tk : after exécute le rappel sur-le-champ"""
+
+    def __init__(self):
+        self.cancelled = []
+
+    def after(self, delay, callback, *args):
+        callback(*args)
+        return f"after#{delay}"
+
+    def after_cancel(self, after_id):
+        self.cancelled.append(after_id)
+
+
+def record(nni, **fields):
+    return PMTRecord.from_csv_row(dict(zip(EXPECTED_COLUMNS, make_row(nni, **fields))))
+
+
+RECORDS = (
+    record("A000001", nom="DURAND", prenom="Camille", jour="02/01/2024"),
+    record("A000002", nom="MARTIN", prenom="Lucie", jour="03/01/2024", equipe_lib="PV G TERRAIN"),
+    record("A000003", nom="BERNARD", prenom="Martine", jour="02/02/2024", equipe_lib="PV G TERRAIN"),
+)
+
+
+def nnis(records):
+    return [record.nni for record in records]
+
+
+def test_apply_record_filters():
+    assert nnis(apply_record_filters(RECORDS, {})) == ["A000001", "A000002", "A000003"]
+    assert nnis(apply_record_filters(RECORDS, {"equipe_lib": "PV G TERRAIN"})) == ["A000002", "A000003"]
+    # Nom ou prénom, sans tenir compte de la casse
+    assert nnis(apply_record_filters(RECORDS, {"name": " mart "})) == ["A000002", "A000003"]
+    assert nnis(apply_record_filters(RECORDS, {"date": "02/"})) == ["A000001", "A000003"]
+    assert nnis(apply_record_filters(RECORDS, {"equipe_lib": "PV G TERRAIN", "name": "martin",
+                                               "date": "/01/2024"})) == ["A000002"]
+    assert nnis(apply_record_filters(RECORDS, {"equipe_lib": "PV B TERRAIN", "name": "lucie"})) == []
+
+
+def test_apply_record_filters_ignores_date_placeholder():
+    assert nnis(apply_record_filters(RECORDS, {"date": DATE_PLACEHOLDER})) == ["A000001", "A000002", "A000003"]
+    assert nnis(apply_record_filters(RECORDS, {"date": DATE_PLACEHOLDER, "name": "durand"})) == ["A000001"]
+
+
+def test_deliver_ignores_stale_generation():
+    delivered = []
+    scheduler = FilterScheduler(ImmediateRoot(), apply_record_filters,
+                                on_result=lambda result, criteria: delivered.append(criteria))
+
+    first = scheduler.submit((), {"name": "a"})
+    second = scheduler.submit((), {"name": "b"})
+    delivered.clear()
+
+    scheduler._deliver(first, [], {"name": "a"})
+    assert delivered == []
+    scheduler._deliver(second, [], {"name": "b"})
+    assert delivered == [{"name": "b"}]
+
+
+def test_result_superseded_while_computing_is_dropped():
+    release = threading.Event()
+    done = threading.Event()
+    delivered = []
+
+    def query(snapshot, criteria):
+        if criteria["name"] == "lent":
+            release.wait(5)
+        return apply_record_filters(snapshot, criteria)
+
+    def on_result(result, criteria):
+        delivered.append((criteria["name"], nnis(result)))
+        done.set()
+
+    scheduler = FilterScheduler(ImmediateRoot(), query, on_result=on_result)
+    scheduler.submit(RECORDS, {"name": "lent"})
+    scheduler.submit(RECORDS, {"name": "lucie"})
+    release.set()
+
+    assert done.wait(5)
+    assert delivered == [("lucie", ["A000002"])]
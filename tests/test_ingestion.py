@@ -0,0 +1,66 @@
+"""
+Tests de l'ingestion automatique du dossier d'entrée
+"""
+
+import pytest
+
+from src.services.ingestion import IngestionService
+from src.services.metrics_store import MetricsStore
+
+
+@pytest.fixture
+def folders(tmp_path):
+    input_dir = tmp_path / "input"
+    input_dir.mkdir()
+    return input_dir, tmp_path / "output", MetricsStore(tmp_path / "metrics.sqlite3")
+
+
+def test_run_once_ingests_each_file_once(folders, write_pmt_csv, month_rows, pmt_row):
+    input_dir, output_dir, store = folders
+    write_pmt_csv(month_rows(nnis=("A000001",)), name="input/janvier.csv")
+    write_pmt_csv([pmt_row("A000002")], name="input/equipe2.csv")
+    (input_dir / "illisible.csv").write_bytes(b"a;b;c\n1;2;3\n")
+    (input_dir / "notes.txt").write_text("ignoré", encoding="utf-8")
+
+    def service():
+        return IngestionService(input_dir, output_dir, store, workers=2, formats=["txt", "xlsx"])
+
+    results = service().run_once()
+
+    assert sorted((result["file"].rsplit("/", 1)[-1], result["success"]) for result in results) == [
+        ("equipe2.csv", True), ("illisible.csv", False), ("janvier.csv", True)]
+    ingestions = store.list_ingestions()
+    assert len(ingestions) == 3
+    assert {output.rsplit("/", 1)[-1] for row in ingestions for output in row["outputs"]} == {
+        "janvier.txt", "janvier.xlsx", "equipe2.txt", "equipe2.xlsx"}
+    assert all((output_dir / name).exists() for name in ("janvier.txt", "equipe2.xlsx"))
+    assert len(store.list_datasets()) == 2
+
+    # Contenu identique : ignoré sans nouvelle ligne d'ingestion ; le fichier en échec est retenté
+    second = service().run_once()
+    assert sorted(result.get("skipped", False) for result in second) == [False, True, True]
+    assert len(store.list_ingestions()) == 4
+
+
+def test_poll_waits_for_stable_files_and_defers_when_queue_is_full(folders, write_pmt_csv, pmt_row):
+    input_dir, output_dir, store = folders
+    service = IngestionService(input_dir, output_dir, store, queue_size=1, stable_polls=2)
+    path = write_pmt_csv([pmt_row()], name="input/a.csv")
+
+    assert [service.poll(), service.poll()] == [0, 0]
+    # Fichier encore en cours de copie : l'attente recommence
+    write_pmt_csv([pmt_row(), pmt_row(jour="03/01/2024")], name="input/a.csv")
+    assert [service.poll(), service.poll()] == [0, 0]
+    assert service.poll() == 1
+    assert service.poll() == 0 and service.pending_count == 1
+
+    write_pmt_csv([pmt_row()], name="input/b.csv")
+    write_pmt_csv([pmt_row()], name="input/c.csv")
+    assert [service.poll(), service.poll(), service.poll()] == [0, 0, 0]  # File pleine : b et c attendent
+
+    assert service._queue.get_nowait()[0] == path
+    assert service.poll() == 1
+    assert service._queue.get_nowait()[0].name == "b.csv"
+    assert service.poll() == 1
+    assert service._queue.get_nowait()[0].name == "c.csv"
+    assert service.poll() == 0
@@ -0,0 +1,74 @@
+"""
+Tests des classements (top K) et des valeurs atypiques par groupe
+"""
+
+import numpy as np
+import pytest
+
+from src.services.metric_ranking import EmployeeRanking, top_k_indices
+
+
+@pytest.mark.parametrize("k", [0, 1, 5, 50, 200])
+def test_top_k_indices_matches_stable_sort(k):
+    values = np.random.default_rng(k).integers(0, 20, size=100).astype(np.float64)
+    expected = sorted(range(len(values)), key=lambda position: (-values[position], position))[:k]
+    assert top_k_indices(values, k).tolist() == expected
+
+
+def employee_rows(values, agencies, category):
+    return [{"NNI": f"{category[0]}{index:03d}", "Nom": "N", "Prénom": "P", "Équipe": "E",
+             "Agence": agency, "Heure_Supp": value}
+            for index, (value, agency) in enumerate(zip(values, agencies))]
+
+
+@pytest.fixture
+def ranking():
+    return EmployeeRanking({
+        "TIPS": employee_rows([5, 0, 12, 7, 7, 1], ["Batignolles"] * 3 + ["Italie"] * 3, "TIPS"),
+        "ASTREINTES": employee_rows([3, 30, 2, 4, 3, 2, 3, 2], ["Batignolles"] * 8, "ASTREINTES"),
+    })
+
+
+def test_top_k_by_group(ranking):
+    result = ranking.top_k("overtime_hours", k=2, group_by=("agency",))
+
+    assert [(group["agency"], group["employees"]) for group in result] == [("Batignolles", 11), ("Italie", 3)]
+    assert [(entry["nni"], entry["overtime_hours"], entry["rank"]) for entry in result[0]["top"]] == [
+        ("A001", 30.0, 1), ("T002", 12.0, 2)]
+    assert [entry["nni"] for entry in result[1]["top"]] == ["T003", "T004"]
+
+    everyone = ranking.top_k("overtime_hours", k=None, group_by=())
+    assert len(everyone) == 1 and len(everyone[0]["top"]) == 13  # Les valeurs nulles ne sont pas classées
+
+
+def brute_force_zscores(values):
+    std = values.std()
+    return (values - values.mean()) / std if std else np.zeros_like(values)
+
+
+def test_zscore_outliers_match_brute_force(ranking):
+    result = ranking.outliers("overtime_hours", "zscore", threshold=2.0, group_by=("category",))
+
+    values = ranking.values("overtime_hours")
+    categories = np.array(["TIPS"] * 6 + ["ASTREINTES"] * 8)
+    expected = set()
+    for category in ("TIPS", "ASTREINTES"):
+        positions = np.flatnonzero(categories == category)
+        scores = brute_force_zscores(values[positions])
+        expected |= {ranking.rows[position]["NNI"] for position in positions[np.abs(scores) > 2.0]}
+
+    assert {entry["nni"] for entry in result["outliers"]} == expected == {"A001"}
+    stats = {group["category"]: group for group in result["groups"]}
+    assert stats["ASTREINTES"]["mean"] == pytest.approx(values[categories == "ASTREINTES"].mean(), abs=1e-4)
+
+
+def test_iqr_outliers(ranking):
+    result = ranking.outliers("overtime_hours", "iqr", threshold=1.5, group_by=("category",))
+
+    values = ranking.values("overtime_hours")[6:]
+    q1, q3 = np.percentile(values, [25, 75])
+    assert {group["category"]: (group["q1"], group["q3"]) for group in result["groups"]}["ASTREINTES"] == (q1, q3)
+    assert [entry["nni"] for entry in result["outliers"]] == ["A001"]
+    assert result["outliers"][0]["score"] == pytest.approx((30 - q3) / (q3 - q1), abs=1e-4)
+    with pytest.raises(Exception):
+        ranking.outliers("overtime_hours", "mad")
@@ -0,0 +1,94 @@
+"""
+Tests de la base SQLite des métriques par employé
+"""
+
+import pytest
+
+from src.services.csv_processor import CSVProcessor
+from src.services.export_service import ExportService
+from src.services.metrics_store import METRIC_COLUMNS, MetricsStore
+
+
+def export_row(nni, agence="Batignolles", heure_supp=0.0, **columns):
+    row = {name: None for name in METRIC_COLUMNS}
+    row.update({"NNI": nni, "Agence": agence, "Nom": "DURAND", "Prénom": "Camille", "Heure_Supp": heure_supp})
+    row.update(columns)
+    return row
+
+
+@pytest.fixture
+def store(tmp_path):
+    return MetricsStore(tmp_path / "metrics.sqlite3")
+
+
+def test_database_directory_is_created(tmp_path):
+    store = MetricsStore(tmp_path / "new" / "sub" / "metrics.sqlite3")
+    assert store.list_datasets() == []
+    assert (tmp_path / "new" / "sub" / "metrics.sqlite3").exists()
+
+
+def test_store_metrics_round_trip(store, write_pmt_csv, month_rows):
+    rows = month_rows()
+    rows[0][13] = "PV G TERRAIN"  # Première ligne de A000001 : agence Grenelle
+    processor = CSVProcessor()
+    processor.load_file(str(write_pmt_csv(rows)))
+    records = processor.get_records()
+    dataset = processor.get_dataset_ref()
+    service = ExportService(metrics_store=store)
+
+    service.store_metrics(records, dataset, metrics=processor.metrics)
+
+    expected = service.build_employee_rows(records, metrics=processor.metrics)
+    stored = store.get_export_rows(dataset.fingerprint)
+    assert stored == {category: [{name: row.get(name) for name in METRIC_COLUMNS} for row in category_rows]
+                      for category, category_rows in sorted(expected.items()) if category_rows}
+    info = store.get_dataset(dataset.fingerprint)
+    assert (info["period_start"], info["period_end"], info["records"]) == ("2024-01-01", "2024-01-31", 93)
+    assert store.get_export_rows("inconnue") is None
+
+
+def test_query_filters(store):
+    store.save_dataset("f1", "janvier.csv", {
+        "TIPS": [export_row("A1", heure_supp=2.0), export_row("A2", agence="Grenelle")],
+        "3X8": [export_row("A3", agence="Grenelle")]
+    }, ("2024-01-01", "2024-01-31"), 100)
+    store.save_dataset("f2", "fevrier.csv", {"TIPS": [export_row("A1", heure_supp=5.0)]},
+                       ("2024-02-01", "2024-02-29"), 50)
+
+    assert [(row["Source"], row["Heure_Supp"]) for row in store.query(nni="A1")] == [
+        ("janvier.csv", 2.0), ("fevrier.csv", 5.0)]
+    assert [row["NNI"] for row in store.query(category="TIPS", agency="Grenelle")] == ["A2"]
+    assert [row["NNI"] for row in store.query(agency="Grenelle")] == ["A2", "A3"]
+    assert [row["Catégorie"] for row in store.query(category="3X8")] == ["3X8"]
+    assert [row["Source"] for row in store.query(nni="A1", period_start="2024-02-01")] == ["fevrier.csv"]
+    assert [row["Source"] for row in store.query(fingerprint="f1", nni="A1")] == ["janvier.csv"]
+    assert {dataset["fingerprint"]: dataset["employees"] for dataset in store.list_datasets()} == {"f1": 3, "f2": 1}
+
+
+def test_save_dataset_replaces_same_fingerprint(store):
+    store.save_dataset("f1", "a.csv", {"TIPS": [export_row("A1"), export_row("A2")]})
+    store.save_dataset("f1", "a.csv", {"TIPS": [export_row("A3")]})
+    assert [row["NNI"] for row in store.query()] == ["A3"]
+
+
+def test_diff_datasets(store):
+    store.save_dataset("f1", "a.csv", {"TIPS": [export_row("A1", heure_supp=1.0), export_row("A2")]})
+    store.save_dataset("f2", "b.csv", {"TIPS": [export_row("A3"), export_row("A1", heure_supp=4.0)]})
+
+    only1, only2, common = store.diff_datasets("f1", "f2", "TIPS")
+
+    assert (only1, only2) == (["A2"], ["A3"])
+    assert [(row1["NNI"], row1["Heure_Supp"], row2["Heure_Supp"]) for row1, row2 in common] == [("A1", 1.0, 4.0)]
+    with pytest.raises(Exception):
+        store.diff_datasets("f1", "inconnue", "TIPS")
+
+
+def test_is_ingested_only_after_success(store):
+    entry = {"file": "a.csv", "fingerprint": "f1", "success": False, "error": "illisible",
+             "started_at": "2024-01-01T00:00:00"}
+    store.record_ingestion(entry)
+    assert not store.is_ingested("f1")
+
+    store.record_ingestion(dict(entry, success=True, error=None, rows=10, outputs=["a.xlsx"]))
+    assert store.is_ingested("f1") and not store.is_ingested("f2")
+    assert [(row["success"], row["outputs"]) for row in store.list_ingestions()] == [(True, ["a.xlsx"]), (False, [])]
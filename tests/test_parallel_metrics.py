@@ -0,0 +1,45 @@
+"""
+Tests du calcul des métriques dans un pool de processus
+"""
+
+import logging
+
+import pytest
+
+from src.services.csv_processor import CSVProcessor
+from src.services.parallel_metrics import ParallelMetricsExecutor, compute_store_metrics
+from src.services.record_store import EmployeeRecordStore
+
+
+@pytest.fixture
+def store(write_pmt_csv, month_rows, pmt_row):
+    nnis = [f"A{index:06d}" for index in range(8)]
+    rows = month_rows(nnis=nnis)
+    # Heures supplémentaires dans une unité inconnue : un avertissement par processus de calcul
+    rows += [pmt_row(nni, "09/01/2024", ht="J", code="D", valeur="2", des_unite="Minute(s)") for nni in nnis]
+    processor = CSVProcessor()
+    processor.load_file(str(write_pmt_csv(rows)))
+    return EmployeeRecordStore(processor.get_records())
+
+
+def unit_warnings(caplog):
+    return [record for record in caplog.records if "Unité inconnue" in record.getMessage()]
+
+
+def test_split_covers_every_employee_once(store):
+    bounds = ParallelMetricsExecutor(backend="process", workers=2, shards_per_worker=2).split(store)
+    assert bounds[0][0] == 0 and bounds[-1][1] == len(store)
+    assert all(previous[1] == following[0] for previous, following in zip(bounds, bounds[1:]))
+
+
+def test_process_pool_matches_inline_and_forwards_logs(store, caplog):
+    caplog.set_level(logging.INFO)
+    executor = ParallelMetricsExecutor(backend="process", workers=2)
+
+    result = executor.compute(store)
+
+    assert not [record for record in caplog.records if "Calcul parallèle impossible" in record.getMessage()]
+    assert unit_warnings(caplog)
+    assert all(record.processName != "MainProcess" for record in unit_warnings(caplog))
+    assert result == compute_store_metrics(store)
+    assert list(result[0]) == store.nnis
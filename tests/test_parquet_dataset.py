@@ -0,0 +1,102 @@
+"""
+Tests de l'archive Parquet partitionnée et de son manifeste
+"""
+
+import json
+
+import pytest
+
+from src.services.csv_processor import CSVProcessor
+from src.services.export_service import ExportService
+from src.services.parquet_dataset import DATASET_SCHEMA_VERSION, MANIFEST_NAME, PartitionedParquetDataset
+from src.utils.progress import CancellationToken, OperationCancelledError, ProgressReporter
+
+
+@pytest.fixture
+def loaded(write_pmt_csv, month_rows, pmt_row):
+    rows = month_rows(month=1) + month_rows(month=2, days=29)
+    rows[0][13] = "PV G TERRAIN"  # A000001 le 01/01 : agence Grenelle
+    rows.append(pmt_row("A000001", "", code="41"))  # Sans date : jamais archivée
+    processor = CSVProcessor()
+    processor.load_file(str(write_pmt_csv(rows)))
+    return processor.get_records(), processor.metrics.get_categories()
+
+
+def append(dataset, records, categories, **kwargs):
+    return dataset.append(records, categories, ExportService()._get_agence_from_equipe_lib, **kwargs)
+
+
+def test_group_new_records_skips_archived_and_undated_days(tmp_path, loaded):
+    records, categories = loaded
+    dataset = PartitionedParquetDataset(tmp_path / "dataset")
+
+    groups, new_dates, skipped = dataset._group_new_records(
+        records, {"2024-01-02"}, categories, ExportService()._get_agence_from_equipe_lib)
+
+    assert sorted(groups) == ["month=2024-01/agency=Batignolles/category=TIPS",
+                              "month=2024-01/agency=Grenelle/category=TIPS",
+                              "month=2024-02/agency=Batignolles/category=TIPS"]
+    assert skipped == {"archived": 3, "undated": 1}
+    assert len(new_dates) == 59
+    assert sum(len(group[1]) for group in groups.values()) == 180 - 3
+
+
+def test_manifest_versions_and_partitioning_are_checked(tmp_path):
+    root = tmp_path / "dataset"
+    dataset = PartitionedParquetDataset(root)
+    assert dataset.read_manifest()["total_rows"] == 0
+
+    root.mkdir()
+    manifest = dict(dataset.read_manifest(), schema_version=DATASET_SCHEMA_VERSION + 1)
+    (root / MANIFEST_NAME).write_text(json.dumps(manifest), encoding="utf-8")
+    with pytest.raises(Exception):
+        dataset.read_manifest()
+
+    manifest["schema_version"] = DATASET_SCHEMA_VERSION
+    (root / MANIFEST_NAME).write_text(json.dumps(manifest), encoding="utf-8")
+    assert dataset.read_manifest()["partition_by"] == ["month", "agency", "category"]
+    with pytest.raises(Exception):
+        PartitionedParquetDataset(root, partition_by=["month"]).read_manifest()
+    with pytest.raises(Exception):
+        PartitionedParquetDataset(root, partition_by=["week"])
+
+
+def test_append_writes_only_new_days(tmp_path, loaded):
+    pytest.importorskip("pyarrow")
+    records, categories = loaded
+    january = [record for record in records if record.jour.endswith("/01/2024")]
+    dataset = PartitionedParquetDataset(tmp_path / "dataset")
+
+    first = append(dataset, january, categories, source="janvier.csv")
+    second = append(dataset, records, categories, source="fevrier.csv")
+    third = append(dataset, records, categories)
+
+    assert (first["rows"], second["rows"], third["rows"]) == (93, 87, 0)
+    assert second["skipped_archived"] == 93 and second["skipped_undated"] == 1
+    assert second["partitions"] == ["month=2024-02/agency=Batignolles/category=TIPS"]
+    manifest = dataset.read_manifest()
+    assert manifest["total_rows"] == 180
+    assert len(manifest["dates"]) == 60
+    assert [entry["source"] for entry in manifest["appends"]] == ["janvier.csv", "fevrier.csv"]
+    assert len(dataset.files()) == 3 and len(dataset.files(month="2024-02")) == 1
+
+    table = dataset.read_table(agency="Batignolles")
+    assert table.num_rows == 179
+    assert sorted(table.column("row_number").to_pylist()) == sorted(
+        record.row_number for record in records if record.jour and record.row_number != 2)
+    grenelle = dataset.read_table(agency="Grenelle").to_pylist()
+    assert [(row["nni"], str(row["date"]), row["category"]) for row in grenelle] == [
+        ("A000001", "2024-01-01", "TIPS")]
+
+
+def test_cancelled_append_leaves_no_files(tmp_path, loaded):
+    pytest.importorskip("pyarrow")
+    records, categories = loaded
+    dataset = PartitionedParquetDataset(tmp_path / "dataset")
+    token = CancellationToken()
+
+    with pytest.raises(OperationCancelledError):
+        append(dataset, records, categories, reporter=ProgressReporter(lambda progress: token.cancel(), token))
+
+    assert list((tmp_path / "dataset").rglob("*.parquet")) == []
+    assert dataset.read_manifest()["total_rows"] == 0
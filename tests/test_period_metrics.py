@@ -0,0 +1,87 @@
+"""
+Tests des métriques par période : découpage des périodes et tranches par dichotomie
+"""
+
+import argparse
+from datetime import date
+
+import pytest
+
+from src.cli import run_periods_command
+from src.services.csv_processor import CSVProcessor
+from src.services.period_metrics import period_boundaries
+
+
+def test_period_boundaries_labels_and_truncation():
+    assert period_boundaries(date(2024, 1, 15), date(2024, 3, 10), "month") == [
+        ("2024-01", date(2024, 1, 15), date(2024, 1, 31)),
+        ("2024-02", date(2024, 2, 1), date(2024, 2, 29)),
+        ("2024-03", date(2024, 3, 1), date(2024, 3, 10)),
+    ]
+    assert [label for label, _, _ in period_boundaries(date(2023, 12, 30), date(2024, 1, 8), "week")] == [
+        "2023-S52", "2024-S01", "2024-S02"]
+    assert [label for label, _, _ in period_boundaries(date(2024, 2, 1), date(2024, 11, 30), "quarter")] == [
+        "2024-T1", "2024-T2", "2024-T3", "2024-T4"]
+    assert period_boundaries(date(2024, 1, 1), date(2024, 1, 2), "all") == [
+        ("2024-01-01/2024-01-02", date(2024, 1, 1), date(2024, 1, 2))]
+    with pytest.raises(Exception):
+        period_boundaries(date(2024, 1, 2), date(2024, 1, 1))
+    with pytest.raises(Exception):
+        period_boundaries(date(2024, 1, 1), date(2024, 1, 2), "decade")
+
+
+@pytest.fixture
+def two_months(write_pmt_csv, month_rows):
+    rows = month_rows(month=1) + month_rows(month=2, days=29)
+    processor = CSVProcessor()
+    assert processor.load_file(str(write_pmt_csv(rows))).success
+    return processor, len(rows)
+
+
+def test_periods_split_every_record_once(two_months):
+    processor, total = two_months
+
+    months = processor.metrics.get_period_metrics(granularity="month")
+    days = processor.metrics.get_period_metrics(granularity="day")
+
+    assert [period["period"] for period in months] == ["2024-01", "2024-02"]
+    assert [period["records"] for period in months] == [93, 87]
+    assert sum(period["records"] for period in days) == total == 180
+    assert len(days) == 60
+    window = processor.metrics.get_period_metrics(date(2024, 1, 30), date(2024, 2, 2), "month")
+    assert [period["records"] for period in window] == [6, 6]
+
+
+def test_all_period_matches_whole_extraction(two_months):
+    processor, _ = two_months
+    metrics = processor.metrics
+
+    (period,) = metrics.get_period_metrics(granularity="all")
+
+    sick_leave = metrics.get_sick_leave_by_employee()
+    for nni, row in period["employees"].items():
+        assert row["overtime_hours"] == metrics.get_overtime_by_employee().get(nni, 0.0)
+        assert row["classic_sick_leaves"] == sick_leave[nni]["classic_sick_leaves"]
+        assert row["sick_leave_periods"] == sick_leave[nni]["sick_leave_periods"]
+        assert row["category"] == metrics.get_categories()[nni]
+
+
+def test_periods_command_leaves_cached_results_intact(write_pmt_csv, month_rows, monkeypatch):
+    path = write_pmt_csv(month_rows(month=1) + month_rows(month=2, days=29))
+    args = argparse.Namespace(input=str(path), granularity="month", date_from=None, date_to=None, nni="A000002")
+
+    cached = []
+    original = CSVProcessor.load_file
+
+    def load_file(self, *load_args, **load_kwargs):
+        cached.append(self)
+        return original(self, *load_args, **load_kwargs)
+
+    monkeypatch.setattr(CSVProcessor, "load_file", load_file)
+    report = run_periods_command(args)
+
+    assert report["success"]
+    assert all("employees" not in period for period in report["periods"])
+    assert report["periods"][0]["employee"]["category"]
+    periods = cached[0].metrics.get_period_metrics(None, None, "month")
+    assert all("employees" in period for period in periods)
@@ -0,0 +1,77 @@
+"""
+Tests de l'export en flux des enregistrements (NDJSON, CSV) par lots
+"""
+
+import csv
+import io
+import json
+
+import pytest
+
+from src.services.csv_processor import CSVProcessor
+from src.services.record_exporter import RECORD_COLUMNS, batched, write_records
+from src.utils.progress import CancellationToken, OperationCancelledError, ProgressReporter
+
+
+@pytest.fixture
+def records(write_pmt_csv, month_rows):
+    processor = CSVProcessor()
+    processor.load_file(str(write_pmt_csv(month_rows())))
+    return processor.get_records()
+
+
+def test_batched_sizes():
+    assert [len(batch) for batch in batched(range(25), 10)] == [10, 10, 5]
+    assert list(batched([], 10)) == []
+    with pytest.raises(Exception):
+        list(batched(range(3), 0))
+
+
+@pytest.mark.parametrize("batch_size", [1, 7, 1000])
+def test_ndjson_matches_to_dict(records, batch_size):
+    output = io.StringIO()
+
+    written = write_records(iter(records), output, "ndjson", batch_size=batch_size)
+
+    lines = output.getvalue().splitlines()
+    assert written == len(lines) == len(records)
+    assert [json.loads(line) for line in lines] == [json.loads(json.dumps(r.to_dict(), default=str)) for r in records]
+    assert list(json.loads(lines[0])) == list(RECORD_COLUMNS)
+
+
+def test_csv_batches_and_progress(records):
+    output = io.StringIO()
+    reported = []
+    reporter = ProgressReporter(lambda progress: reported.append(progress.rows_processed), min_interval=0)
+
+    written = write_records(records, output, "csv", batch_size=40, columns=("nni", "jour", "valeur"),
+                            reporter=reporter)
+
+    rows = list(csv.reader(io.StringIO(output.getvalue()), delimiter=";"))
+    assert written == len(records) == 93
+    assert rows[0] == ["nni", "jour", "valeur"]
+    assert rows[1:] == [[r.nni, r.jour, "" if r.valeur is None else str(r.valeur)] for r in records]
+    assert reported == [40, 80, 93]
+
+
+def test_cancellation_stops_after_a_batch(records):
+    token = CancellationToken()
+    token.cancel()
+    output = io.StringIO()
+
+    with pytest.raises(OperationCancelledError):
+        write_records(records, output, "ndjson", batch_size=10, reporter=ProgressReporter(cancel_token=token))
+    assert len(output.getvalue().splitlines()) == 10
+
+
+def test_csv_without_records_writes_header():
+    output = io.StringIO()
+    assert write_records([], output, "csv", columns=("nni",)) == 0
+    assert output.getvalue() == "nni\n"
+
+
+def test_invalid_format_or_column():
+    with pytest.raises(Exception):
+        write_records([], io.StringIO(), "xml")
+    with pytest.raises(Exception):
+        write_records([], io.StringIO(), "csv", columns=("inconnue",))
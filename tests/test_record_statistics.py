@@ -0,0 +1,84 @@
+"""
+Tests des statistiques de résumé calculées au fil de la lecture
+"""
+
+from src.config.settings import EXPECTED_COLUMNS
+from src.models.data_model import PMTRecord
+from src.services.csv_processor import CSVProcessor
+from src.services.record_statistics import RecordStatistics
+from tests.conftest import ROW_FIELDS, csv_text, make_row
+
+
+def statistics_of(rows):
+    statistics = RecordStatistics()
+    for row_number, row in enumerate(rows, start=2):
+        record = PMTRecord.from_csv_row(dict(zip(EXPECTED_COLUMNS, row)), row_number)
+        statistics.add(record, record.validate())
+    return statistics
+
+
+def test_date_range_is_chronological():
+    unreadable = make_row(jour="")
+    unreadable[ROW_FIELDS.index("jour")] = "12/2024"
+    statistics = statistics_of([make_row(jour=jour) for jour in
+                                ("31/01/2024", "02/03/2024", "15/02/2024", "01/01/2024")] + [unreadable])
+
+    # Comparaison (année, mois, jour) et non textuelle : "31/01" > "02/03" en ordre de chaîne
+    assert statistics.get_date_range() == {"min_date": "01/01/2024", "max_date": "02/03/2024"}
+    assert RecordStatistics().get_date_range() == {"min_date": "", "max_date": ""}
+
+
+def test_validation_counts():
+    statistics = statistics_of([
+        make_row(heure_debut="08:00:00"),
+        make_row(um_lib="DR LYON"),
+        make_row(nom="", heure_debut="8h", heure_fin="17h"),
+        make_row("A000002", jour="", nom="MARTIN", equipe_lib="PV G TERRAIN")
+    ])
+
+    assert statistics.to_dict() == {
+        "total_records": 4,
+        "unique_employees": 2,
+        "unique_teams": 2,
+        "date_range": {"min_date": "02/01/2024", "max_date": "02/01/2024"},
+        "validation_summary": {
+            "total_errors": 2,
+            "total_warnings": 3,
+            "records_with_errors": 2,
+            "records_with_warnings": 2
+        }
+    }
+    assert statistics.records_valid == 2
+    assert statistics.teams == ["PV B TERRAIN", "PV G TERRAIN"]
+
+
+def test_merge_equals_single_pass(month_rows):
+    rows = month_rows() + [make_row(nom="", jour="05/12/2023"), make_row(um_lib="DR LYON", jour="02/03/2024")]
+    merged = statistics_of(rows[:50])
+    merged.merge(statistics_of(rows[50:]))
+
+    assert merged.to_dict() == statistics_of(rows).to_dict()
+    assert merged.get_date_range() == {"min_date": "05/12/2023", "max_date": "02/03/2024"}
+
+    empty = RecordStatistics()
+    empty.merge(merged)
+    assert empty.to_dict() == merged.to_dict()
+
+
+def test_incremental_reload_merges_statistics(write_pmt_csv, month_rows):
+    rows = month_rows() + [make_row("A000004", jour="02/03/2024", nom="MARTIN", equipe_lib="PV G TERRAIN")]
+    path = write_pmt_csv(rows[:40])
+    processor = CSVProcessor()
+    assert processor.load_file(str(path)).success
+
+    with open(path, "ab") as file:
+        file.write(csv_text(rows[40:]).encode("latin1"))
+    assert processor.load_file(str(path), incremental=True).incremental
+
+    full = CSVProcessor()
+    assert full.load_file(str(path)).success
+    summary = processor.get_summary_statistics()
+    assert summary == full.get_summary_statistics()
+    assert summary["total_records"] == len(rows)
+    assert summary["unique_employees"] == 4 and summary["unique_teams"] == 2
+    assert summary["date_range"] == {"min_date": "01/01/2024", "max_date": "02/03/2024"}
@@ -0,0 +1,63 @@
+"""
+Tests du magasin d'enregistrements partitionné par (NNI, date)
+"""
+
+from datetime import date
+
+from src.models.data_model import PMTRecord
+from src.services.record_store import EmployeeRecordStore
+
+
+def record(nni, jour, row_number):
+    return PMTRecord(nni=nni, jour=jour, row_number=row_number)
+
+
+def test_records_sorted_by_employee_then_date():
+    records = [
+        record("B", "03/01/2024", 2),
+        record("A", "02/01/2024", 3),
+        record("B", "01/01/2024", 4),
+        record("", "01/01/2024", 5),
+        record("A", "", 6),
+        record("B", "03/01/2024", 7),
+        record("A", "01/02/2023", 8),
+    ]
+
+    store = EmployeeRecordStore(records)
+
+    # Employés dans l'ordre d'apparition, sans ligne vide ; à date égale, ordre du fichier
+    assert store.nnis == ["B", "A"]
+    assert list(store.offsets) == [0, 3, 6]
+    assert [r.row_number for r in store["B"]] == [4, 2, 7]
+    assert [r.row_number for r in store["A"]] == [6, 8, 3]
+    assert store.bounds("A") == (3, 6)
+    assert "" not in store and len(store) == 2
+    assert list(store.day_keys) == [20240101, 20240103, 20240103, 0, 20230201, 20240102]
+    assert dict(store.items()) == {"B": store["B"], "A": store["A"]}
+    assert EmployeeRecordStore.day_key(date(2024, 5, 14)) == 20240514
+
+
+def test_from_sorted_reads_the_same_slices():
+    store = EmployeeRecordStore([record("A", "02/01/2024", 2), record("B", "01/01/2024", 3),
+                                 record("A", "01/01/2024", 4)])
+
+    copy = EmployeeRecordStore.from_sorted(store.records, store.nnis, store.offsets)
+
+    assert dict(copy.items()) == dict(store.items())
+    assert list(copy.day_keys) == list(store.day_keys)
+
+
+def test_store_of_loaded_extraction(write_pmt_csv, month_rows):
+    from src.services.csv_processor import CSVProcessor
+
+    rows = month_rows()
+    processor = CSVProcessor()
+    processor.load_file(str(write_pmt_csv(list(reversed(rows)))))
+
+    store = processor.metrics.get_record_store()
+
+    assert store.nnis == ["A000003", "A000002", "A000001"]
+    for nni, employee_records in store.items():
+        keys = [EmployeeRecordStore.day_key(date(int(r.jour[6:]), int(r.jour[3:5]), int(r.jour[:2])))
+                for r in employee_records]
+        assert keys == sorted(keys) and len(keys) == 31
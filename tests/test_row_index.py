@@ -0,0 +1,44 @@
+"""
+Tests de l'index des lignes brutes par NNI et par date
+"""
+
+import pytest
+
+from src.services.csv_processor import CSVProcessor
+from src.services.row_index import CSVRowIndex, deduplicate_columns
+from src.utils.csv_format import sniff_csv_format
+
+
+def test_deduplicate_columns_like_pandas():
+    assert deduplicate_columns(["De", "à", "De", "à", "De"]) == ["De", "à", "De.1", "à.1", "De.2"]
+
+
+@pytest.mark.parametrize("encoding, separator", [("latin1", ";"), ("utf-8-sig", ";"), ("utf-8", ",")])
+def test_index_rows_by_nni_and_date(write_pmt_csv, month_rows, encoding, separator):
+    rows = month_rows()
+    rows[4][16] = "Éloïse"
+    path = write_pmt_csv(rows, encoding=encoding, separator=separator)
+
+    index = CSVRowIndex(path, sniff_csv_format(path)).build()
+    try:
+        assert index.row_count == len(rows)
+        assert index.nnis == ["A000001", "A000002", "A000003"]
+        employee_rows = index.get_rows(nni="A000001")
+        assert [number for number, _ in employee_rows] == list(range(2, 33))
+        assert employee_rows[4][1]["Prénom"] == "Éloïse"
+        assert employee_rows[0][1]["NNI"] == "A000001"
+        assert [number for number, _ in index.get_rows(date="05/01/2024")] == [6, 37, 68]
+        assert [number for number, _ in index.get_rows(nni="A000002", date="05/01/2024")] == [37]
+    finally:
+        index.close()
+
+
+def test_employee_records_match_full_load(write_pmt_csv, month_rows):
+    path = write_pmt_csv(month_rows(), encoding="utf-8-sig")
+    processor = CSVProcessor()
+    assert processor.load_file(str(path)).success
+
+    loaded = [record for record in processor.get_records() if record.nni == "A000002"]
+    assert processor.get_employee_records("A000002") == loaded
+    assert processor.get_employee_records("A000002", jour="09/01/2024") == [
+        record for record in loaded if record.jour == "09/01/2024"]
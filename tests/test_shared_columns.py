@@ -0,0 +1,43 @@
+"""
+Tests des colonnes d'enregistrements en mémoire partagée
+"""
+
+import pytest
+
+from src.services.csv_processor import CSVProcessor
+from src.services.parallel_metrics import compute_store_metrics
+from src.services.record_store import EmployeeRecordStore
+from src.services.shared_columns import SHARED_TEXT_FIELDS, SharedRecordColumns
+
+
+@pytest.fixture
+def store(write_pmt_csv, month_rows, pmt_row):
+    rows = month_rows(nnis=("A000001", "A000002", "A000003", "A000004"))
+    rows.append(pmt_row("A000004", "31/01/2024", astreinte="I", heure_debut="23:30:00", heure_fin="07:30:00"))
+    processor = CSVProcessor()
+    processor.load_file(str(write_pmt_csv(rows)))
+    return EmployeeRecordStore(processor.get_records())
+
+
+def shared_view(record):
+    return ({name: getattr(record, name) for name in SHARED_TEXT_FIELDS}, record.valeur, record.get_shift_code())
+
+
+def test_create_attach_decode_round_trip(store):
+    with SharedRecordColumns.create(store) as columns:
+        attached = SharedRecordColumns.attach(columns.layout)
+        try:
+            assert columns.employee_bounds(1, 3) == store.bounds("A000002")[:1] + store.bounds("A000003")[1:]
+            for first, last in ((0, 4), (1, 3), (3, 4)):
+                decoded = attached.decode(first, last)
+                assert decoded.nnis == store.nnis[first:last]
+                assert [list(map(shared_view, records)) for _, records in decoded.items()] == [
+                    list(map(shared_view, store[nni])) for nni in store.nnis[first:last]]
+        finally:
+            attached.close()
+
+
+def test_decoded_store_gives_same_metrics(store):
+    with SharedRecordColumns.create(store) as columns:
+        decoded = columns.decode(0, len(store))
+        assert compute_store_metrics(decoded) == compute_store_metrics(store)
@@ -0,0 +1,68 @@
+"""
+Tests des séries journalières et des sommes glissantes par employé
+"""
+
+from datetime import date
+
+import numpy as np
+import pytest
+
+from src.services.csv_processor import CSVProcessor
+from src.services.time_series import rolling_sum
+
+
+def naive_rolling_sum(values, window):
+    return np.array([[row[max(0, day - window + 1):day + 1].sum() for day in range(len(row))] for row in values])
+
+
+@pytest.mark.parametrize("window", [1, 3, 7, 40])
+def test_rolling_sum_matches_naive_windows(window):
+    values = np.random.default_rng(window).integers(0, 5, size=(4, 31)).astype(np.float64)
+    assert np.allclose(rolling_sum(values, window), naive_rolling_sum(values, window))
+
+
+def test_rolling_sum_rejects_empty_window():
+    with pytest.raises(Exception):
+        rolling_sum(np.zeros((1, 3)), 0)
+
+
+@pytest.fixture
+def metrics(write_pmt_csv, month_rows, pmt_row):
+    overtime = [("02/01/2024", "2"), ("03/01/2024", "1.5"), ("10/01/2024", "3")]
+    rows = month_rows() + [
+        pmt_row("A000001", jour, ht="J", code="D", valeur=valeur, des_unite="Heure(s)") for jour, valeur in overtime
+    ]
+    processor = CSVProcessor()
+    processor.load_file(str(write_pmt_csv(rows)))
+    return processor.metrics
+
+
+def test_series_match_employee_metrics(metrics):
+    series = metrics.get_time_series()
+
+    assert series.dates[0] == date(2024, 1, 1) and series.days == 31
+    overtime = metrics.get_overtime_by_employee()
+    work_days = metrics.get_work_days_by_category()
+    for row, nni in enumerate(series.nnis):
+        assert series.series["overtime_hours"][row].sum() == pytest.approx(overtime[nni])
+        stats = work_days.get(metrics.get_categories()[nni], {}).get(nni, {})
+        assert series.series["full_days"][row].sum() == stats.get("full_days", 0)
+        assert series.series["partial_days"][row].sum() == stats.get("partial_days", 0)
+    assert overtime["A000001"] == pytest.approx(6.5)
+
+
+def test_employee_series_and_peaks(metrics):
+    series = metrics.get_time_series()
+
+    employee = series.employee_series("A000001", "week")
+    assert employee["window_days"] == 7 and len(employee["dates"]) == 31
+    assert employee["overtime_hours_rolling"][7] == pytest.approx(3.5)   # 02/01..08/01
+    assert employee["overtime_hours_rolling"][9] == pytest.approx(3.0)   # 04/01..10/01
+    assert series.employee_series("Z999999") is None
+
+    assert series.peaks("overtime_hours", "week") == [
+        {"nni": "A000001", "value": 3.5, "window_end": "2024-01-03"}]
+    assert series.peaks("overtime_hours", "month") == [
+        {"nni": "A000001", "value": 6.5, "window_end": "2024-01-10"}]
+    with pytest.raises(Exception):
+        series.rolling("overtime_hours", "fortnight")